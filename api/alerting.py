@@ -1,12 +1,17 @@
 """
 Alerting Module
 Created: 2025-12-10
-Last Modified: 2025-12-10 18:00:00
-Version: 1.0.0
+Last Modified: 2025-12-12 10:00:00
+Version: 1.2.1
 Description: Alerting rules and notification system for monitoring
 """
 
-from typing import Dict, List, Optional, Callable
+import inspect
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Callable, Tuple
 from datetime import datetime
 from enum import Enum
 from api.logging_config import system_logger
@@ -45,28 +50,111 @@ class Alert:
     def __repr__(self) -> str:
         return f"Alert(name={self.name}, severity={self.severity.value}, message={self.message})"
 
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable representation"""
+        return {
+            "name": self.name,
+            "severity": self.severity.value,
+            "message": self.message,
+            "timestamp": self.timestamp.isoformat(),
+            "metadata": self.metadata,
+        }
+
+
+class AlertThreshold:
+    """
+    Trigger/clear thresholds for a numeric alert rule
+
+    An alert triggers above `warning`/`critical` and only clears (or
+    de-escalates) once the value drops below the threshold minus
+    `clear_margin`, so values hovering around a threshold do not flap.
+    """
+
+    def __init__(self, warning: float, critical: float, clear_margin: float = 0.0):
+        self.warning = warning
+        self.critical = critical
+        self.clear_margin = clear_margin
+
+    def classify(
+        self, value: float, current: Optional[AlertSeverity] = None
+    ) -> Optional[AlertSeverity]:
+        """
+        Severity for a value given the currently active severity
+
+        Returns:
+            CRITICAL, WARNING or None (below the applicable thresholds)
+        """
+        critical = self.critical
+        warning = self.warning
+        if current == AlertSeverity.CRITICAL:
+            critical -= self.clear_margin
+        if current in (AlertSeverity.WARNING, AlertSeverity.CRITICAL):
+            warning -= self.clear_margin
+        if value > critical:
+            return AlertSeverity.CRITICAL
+        if value > warning:
+            return AlertSeverity.WARNING
+        return None
+
+
+# Default evaluation interval for rules without an explicit interval (seconds)
+DEFAULT_RULE_INTERVAL = 30.0
+
+# Interval for refreshing Prometheus metrics from the scheduler thread (seconds)
+METRICS_UPDATE_INTERVAL = 30.0
+
+# Maximum number of alerts kept in history (overall and per severity)
+MAX_HISTORY_SIZE = 1000
+
+# Alert change types passed to alert callbacks
+ALERT_TRIGGERED = "triggered"
+ALERT_UPDATED = "updated"
+ALERT_RESOLVED = "resolved"
+
 
 class AlertRule:
-    """Alert rule definition"""
+    """
+    Alert rule definition
+
+    Each rule is evaluated by the scheduler every `interval` seconds. Check
+    functions that accept a `snapshot` keyword receive the system snapshot
+    collected once per scheduler tick instead of probing on their own.
+    A new alert is only raised once the condition has held for `debounce`
+    seconds (0 = on the first failing evaluation).
+    """
 
     def __init__(
         self,
         name: str,
         severity: AlertSeverity,
-        check_function: Callable[[], Optional[Alert]],
+        check_function: Callable[..., Optional[Alert]],
         enabled: bool = True,
+        interval: float = DEFAULT_RULE_INTERVAL,
+        debounce: float = 0.0,
     ):
         self.name = name
         self.severity = severity
         self.check_function = check_function
         self.enabled = enabled
+        self.interval = interval
+        self.debounce = debounce
+        self._accepts_snapshot = _accepts_keyword(check_function, "snapshot")
 
-    def evaluate(self, bridge=None, event_detector=None) -> Optional[Alert]:
+    def evaluate(
+        self,
+        bridge=None,
+        event_detector=None,
+        snapshot: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Alert]:
         """Evaluate alert rule"""
         if not self.enabled:
             return None
 
         try:
+            if self._accepts_snapshot:
+                return self.check_function(
+                    bridge=bridge, event_detector=event_detector, snapshot=snapshot
+                )
             return self.check_function(bridge=bridge, event_detector=event_detector)
         except Exception as e:
             system_logger.error(
@@ -81,8 +169,25 @@ class AlertManager:
     def __init__(self):
         self.rules: List[AlertRule] = []
         self.active_alerts: Dict[str, Alert] = {}
-        self.alert_history: List[Alert] = []
-        self.max_history_size = 1000
+        self.max_history_size = MAX_HISTORY_SIZE
+        self.alert_history: Deque[Alert] = deque(maxlen=self.max_history_size)
+        # Per-severity history index (get_alert_history(severity=...) is O(limit))
+        self._history_by_severity: Dict[AlertSeverity, Deque[Alert]] = {
+            severity: deque(maxlen=self.max_history_size) for severity in AlertSeverity
+        }
+        # Rule name -> monotonic time the condition was first seen (debounce)
+        self._pending_since: Dict[str, float] = {}
+        # Numeric rule thresholds with clear hysteresis
+        self.thresholds: Dict[str, AlertThreshold] = {
+            "high_memory_usage": AlertThreshold(80.0, 90.0, clear_margin=5.0),
+            "high_cpu_usage": AlertThreshold(80.0, 90.0, clear_margin=10.0),
+            "high_disk_usage": AlertThreshold(85.0, 95.0, clear_margin=2.0),
+            "high_cpu_temperature": AlertThreshold(70.0, 80.0, clear_margin=5.0),
+        }
+        self.alert_callbacks: List[Callable[[str, Alert], None]] = []
+        # Evaluation runs on the scheduler thread, reads on the event loop
+        self._lock = threading.RLock()
+        self._scheduler: Optional["AlertScheduler"] = None
 
         # Initialize default alert rules
         self._initialize_default_rules()
@@ -95,9 +200,8 @@ class AlertManager:
             AlertRule(
                 name="esp32_disconnected",
                 severity=AlertSeverity.CRITICAL,
-                check_function=lambda bridge=None, event_detector=None: self._check_esp32_connection(
-                    bridge=bridge, event_detector=event_detector
-                ),
+                check_function=self._check_esp32_connection,
+                interval=10.0,
             )
         )
 
@@ -106,9 +210,18 @@ class AlertManager:
             AlertRule(
                 name="esp32_status_stale",
                 severity=AlertSeverity.WARNING,
-                check_function=lambda bridge=None, event_detector=None: self._check_esp32_status_age(
-                    bridge=bridge, event_detector=event_detector
-                ),
+                check_function=self._check_esp32_status_age,
+                interval=15.0,
+            )
+        )
+
+        # ESP32 hard fault alert (also triggered immediately by FAULT_DETECTED)
+        self.add_rule(
+            AlertRule(
+                name="esp32_fault",
+                severity=AlertSeverity.CRITICAL,
+                check_function=self._check_esp32_fault,
+                interval=10.0,
             )
         )
 
@@ -117,9 +230,9 @@ class AlertManager:
             AlertRule(
                 name="high_memory_usage",
                 severity=AlertSeverity.WARNING,
-                check_function=lambda bridge=None, event_detector=None: self._check_memory_usage(
-                    bridge=bridge, event_detector=event_detector
-                ),
+                check_function=self._check_memory_usage,
+                interval=30.0,
+                debounce=60.0,
             )
         )
 
@@ -128,9 +241,9 @@ class AlertManager:
             AlertRule(
                 name="high_cpu_usage",
                 severity=AlertSeverity.WARNING,
-                check_function=lambda bridge=None, event_detector=None: self._check_cpu_usage(
-                    bridge=bridge, event_detector=event_detector
-                ),
+                check_function=self._check_cpu_usage,
+                interval=30.0,
+                debounce=60.0,
             )
         )
 
@@ -139,9 +252,8 @@ class AlertManager:
             AlertRule(
                 name="high_disk_usage",
                 severity=AlertSeverity.WARNING,
-                check_function=lambda bridge=None, event_detector=None: self._check_disk_usage(
-                    bridge=bridge, event_detector=event_detector
-                ),
+                check_function=self._check_disk_usage,
+                interval=300.0,
             )
         )
 
@@ -150,9 +262,9 @@ class AlertManager:
             AlertRule(
                 name="high_cpu_temperature",
                 severity=AlertSeverity.CRITICAL,
-                check_function=lambda bridge=None, event_detector=None: self._check_cpu_temperature(
-                    bridge=bridge, event_detector=event_detector
-                ),
+                check_function=self._check_cpu_temperature,
+                interval=60.0,
+                debounce=120.0,
             )
         )
 
@@ -161,9 +273,8 @@ class AlertManager:
             AlertRule(
                 name="event_detector_stopped",
                 severity=AlertSeverity.WARNING,
-                check_function=lambda bridge=None, event_detector=None: self._check_event_detector(
-                    bridge=bridge, event_detector=event_detector
-                ),
+                check_function=self._check_event_detector,
+                interval=30.0,
             )
         )
 
@@ -181,62 +292,174 @@ class AlertManager:
         self,
         bridge: Optional["ESP32Bridge"] = None,
         event_detector: Optional["EventDetector"] = None,
+        snapshot: Optional[Dict[str, Any]] = None,
+        now: Optional[float] = None,
     ) -> List[Alert]:
         """Evaluate all alert rules"""
+        return self.evaluate_rules(
+            self.rules,
+            bridge=bridge,
+            event_detector=event_detector,
+            snapshot=snapshot,
+            now=now,
+        )
+
+    def evaluate_rules(
+        self,
+        rules: Iterable[AlertRule],
+        bridge: Optional["ESP32Bridge"] = None,
+        event_detector: Optional["EventDetector"] = None,
+        snapshot: Optional[Dict[str, Any]] = None,
+        now: Optional[float] = None,
+    ) -> List[Alert]:
+        """
+        Evaluate the given alert rules
+
+        The system snapshot is collected once and shared by all rules when
+        not provided by the caller. New alerts respect each rule's debounce
+        window; severity changes of an active alert apply immediately.
+        """
+        if snapshot is None:
+            snapshot = collect_system_snapshot()
+        now = time.monotonic() if now is None else now
+
         new_alerts = []
+        changes: List[Tuple[str, Alert]] = []
 
-        for rule in self.rules:
-            alert = rule.evaluate(bridge=bridge, event_detector=event_detector)
-            if alert:
-                # Check if alert is new or changed
-                if rule.name not in self.active_alerts:
-                    # New alert
-                    self.active_alerts[rule.name] = alert
-                    self.alert_history.append(alert)
-                    new_alerts.append(alert)
-
-                    # Log alert
-                    log_level = {
-                        AlertSeverity.INFO: system_logger.info,
-                        AlertSeverity.WARNING: system_logger.warning,
-                        AlertSeverity.CRITICAL: system_logger.error,
-                    }
-                    log_func = log_level.get(alert.severity, system_logger.warning)
-                    log_func(f"Alert triggered: {alert.name} - {alert.message}")
-                else:
-                    # Alert already active - check if severity changed
-                    old_alert = self.active_alerts[rule.name]
-                    if old_alert.severity != alert.severity:
+        with self._lock:
+            for rule in rules:
+                alert = rule.evaluate(
+                    bridge=bridge, event_detector=event_detector, snapshot=snapshot
+                )
+                if alert:
+                    # Check if alert is new or changed
+                    if rule.name not in self.active_alerts:
+                        pending_since = self._pending_since.setdefault(rule.name, now)
+                        if now - pending_since < rule.debounce:
+                            continue
+
+                        # New alert
+                        self._pending_since.pop(rule.name, None)
                         self.active_alerts[rule.name] = alert
-                        self.alert_history.append(alert)
+                        self._record_history(alert)
                         new_alerts.append(alert)
-            else:
-                # Alert resolved
-                if rule.name in self.active_alerts:
-                    old_alert = self.active_alerts[rule.name]
-                    del self.active_alerts[rule.name]
-                    system_logger.info(f"Alert resolved: {rule.name}")
+                        changes.append((ALERT_TRIGGERED, alert))
+
+                        # Log alert
+                        log_level = {
+                            AlertSeverity.INFO: system_logger.info,
+                            AlertSeverity.WARNING: system_logger.warning,
+                            AlertSeverity.CRITICAL: system_logger.error,
+                        }
+                        log_func = log_level.get(alert.severity, system_logger.warning)
+                        log_func(f"Alert triggered: {alert.name} - {alert.message}")
+                    else:
+                        # Alert already active - check if severity changed
+                        old_alert = self.active_alerts[rule.name]
+                        if old_alert.severity != alert.severity:
+                            self.active_alerts[rule.name] = alert
+                            self._record_history(alert)
+                            new_alerts.append(alert)
+                            changes.append((ALERT_UPDATED, alert))
+                else:
+                    self._pending_since.pop(rule.name, None)
+                    # Alert resolved
+                    if rule.name in self.active_alerts:
+                        resolved = self.active_alerts.pop(rule.name)
+                        changes.append((ALERT_RESOLVED, resolved))
+                        system_logger.info(f"Alert resolved: {rule.name}")
 
-        # Trim alert history
-        if len(self.alert_history) > self.max_history_size:
-            self.alert_history = self.alert_history[-self.max_history_size :]
+        # Callbacks run outside the lock (they may read the manager)
+        for change, alert in changes:
+            self._notify_callbacks(change, alert)
 
         return new_alerts
 
+    def _record_history(self, alert: Alert) -> None:
+        """Append alert to history and the severity index (lock held)"""
+        self.alert_history.append(alert)
+        self._history_by_severity[alert.severity].append(alert)
+
+    # Callbacks
+
+    def register_callback(self, callback: Callable[[str, Alert], None]) -> None:
+        """
+        Register an alert change callback
+
+        Args:
+            callback: Called as callback(change, alert) where change is
+                      "triggered", "updated" or "resolved"
+        """
+        if callback not in self.alert_callbacks:
+            self.alert_callbacks.append(callback)
+
+    def unregister_callback(self, callback: Callable[[str, Alert], None]) -> None:
+        """Remove an alert change callback"""
+        if callback in self.alert_callbacks:
+            self.alert_callbacks.remove(callback)
+
+    def _notify_callbacks(self, change: str, alert: Alert) -> None:
+        for callback in list(self.alert_callbacks):
+            try:
+                callback(change, alert)
+            except Exception as e:
+                system_logger.error(f"Alert callback error: {e}", exc_info=True)
+
+    # Scheduling
+
+    @property
+    def is_scheduled(self) -> bool:
+        """Whether rules are evaluated by the background scheduler"""
+        return self._scheduler is not None and self._scheduler.is_running
+
+    def start_scheduler(
+        self,
+        bridge: Optional["ESP32Bridge"] = None,
+        event_detector: Optional["EventDetector"] = None,
+        metrics_interval: Optional[float] = METRICS_UPDATE_INTERVAL,
+    ) -> "AlertScheduler":
+        """
+        Start evaluating rules on their own intervals in a worker thread
+
+        Also subscribes to bridge connection changes and EventDetector
+        events so disconnects and hard faults are evaluated immediately.
+        """
+        with self._lock:
+            if self._scheduler is None:
+                self._scheduler = AlertScheduler(
+                    self,
+                    bridge=bridge,
+                    event_detector=event_detector,
+                    metrics_interval=metrics_interval,
+                )
+            scheduler = self._scheduler
+        scheduler.start()
+        return scheduler
+
+    def stop_scheduler(self, timeout: float = 2.0) -> None:
+        """Stop the background scheduler"""
+        scheduler = self._scheduler
+        if scheduler is not None:
+            scheduler.stop(timeout=timeout)
+
     def get_active_alerts(self) -> List[Alert]:
         """Get all active alerts"""
-        return list(self.active_alerts.values())
+        with self._lock:
+            return list(self.active_alerts.values())
 
     def get_alert_history(
         self,
         limit: int = 100,
         severity: Optional[AlertSeverity] = None,
     ) -> List[Alert]:
-        """Get alert history"""
-        history = self.alert_history[-limit:]
-        if severity:
-            history = [a for a in history if a.severity == severity]
-        return history
+        """Get the most recent alerts (oldest first), optionally by severity"""
+        with self._lock:
+            history = (
+                self._history_by_severity[severity] if severity else self.alert_history
+            )
+            recent = list(itertools.islice(reversed(history), limit))
+        recent.reverse()
+        return recent
 
     # Alert check functions
 
@@ -255,137 +478,106 @@ class AlertManager:
     def _check_esp32_status_age(
         self, bridge=None, event_detector=None
     ) -> Optional[Alert]:
-        """Check ESP32 status age"""
-        if bridge and bridge.is_connected:
-            status_data = bridge.get_status(max_age_seconds=60.0)
-            if status_data and hasattr(status_data, "timestamp"):
-                import time
-
-                age = time.time() - status_data.timestamp
-                if age > 30:  # 30 seconds threshold
-                    return Alert(
-                        name="esp32_status_stale",
-                        severity=AlertSeverity.WARNING,
-                        message=f"ESP32 status is stale (age: {age:.1f}s)",
-                        metadata={"age_seconds": age},
-                    )
-        return None
-
-    def _check_memory_usage(self, bridge=None, event_detector=None) -> Optional[Alert]:
-        """Check memory usage"""
-        try:
-            import psutil
-
-            memory = psutil.virtual_memory()
-            usage = memory.percent
-            if usage > 90:
-                return Alert(
-                    name="high_memory_usage",
-                    severity=AlertSeverity.CRITICAL,
-                    message=f"Memory usage is critical ({usage:.1f}%)",
-                    metadata={"usage_percent": usage},
-                )
-            elif usage > 80:
+        """Check ESP32 status age (time since the last STAT frame)"""
+        if bridge and bridge.is_connected and hasattr(bridge, "get_io_stats"):
+            age = bridge.get_io_stats().get("status_age_seconds")
+            if isinstance(age, (int, float)) and age > 30:  # 30 seconds threshold
                 return Alert(
-                    name="high_memory_usage",
+                    name="esp32_status_stale",
                     severity=AlertSeverity.WARNING,
-                    message=f"Memory usage is high ({usage:.1f}%)",
-                    metadata={"usage_percent": usage},
+                    message=f"ESP32 status is stale (age: {age:.1f}s)",
+                    metadata={"age_seconds": age},
                 )
-        except ImportError:
-            pass
         return None
 
-    def _check_cpu_usage(self, bridge=None, event_detector=None) -> Optional[Alert]:
-        """Check CPU usage"""
-        try:
-            import psutil
+    def _check_memory_usage(
+        self, bridge=None, event_detector=None, snapshot=None
+    ) -> Optional[Alert]:
+        """Check memory usage"""
+        return self._threshold_alert(
+            "high_memory_usage",
+            (snapshot or {}).get("system_memory_percent"),
+            label="Memory usage",
+            unit="%",
+            metadata_key="usage_percent",
+        )
 
-            usage = psutil.cpu_percent(interval=0.1)
-            if usage > 90:
-                return Alert(
-                    name="high_cpu_usage",
-                    severity=AlertSeverity.CRITICAL,
-                    message=f"CPU usage is critical ({usage:.1f}%)",
-                    metadata={"usage_percent": usage},
-                )
-            elif usage > 80:
-                return Alert(
-                    name="high_cpu_usage",
-                    severity=AlertSeverity.WARNING,
-                    message=f"CPU usage is high ({usage:.1f}%)",
-                    metadata={"usage_percent": usage},
-                )
-        except ImportError:
-            pass
-        return None
+    def _check_cpu_usage(
+        self, bridge=None, event_detector=None, snapshot=None
+    ) -> Optional[Alert]:
+        """Check CPU usage"""
+        return self._threshold_alert(
+            "high_cpu_usage",
+            (snapshot or {}).get("system_cpu_percent"),
+            label="CPU usage",
+            unit="%",
+            metadata_key="usage_percent",
+        )
 
-    def _check_disk_usage(self, bridge=None, event_detector=None) -> Optional[Alert]:
+    def _check_disk_usage(
+        self, bridge=None, event_detector=None, snapshot=None
+    ) -> Optional[Alert]:
         """Check disk usage"""
-        try:
-            import psutil
-
-            disk = psutil.disk_usage("/")
-            usage = (disk.used / disk.total) * 100
-            if usage > 95:
-                return Alert(
-                    name="high_disk_usage",
-                    severity=AlertSeverity.CRITICAL,
-                    message=f"Disk usage is critical ({usage:.1f}%)",
-                    metadata={"usage_percent": usage},
-                )
-            elif usage > 85:
-                return Alert(
-                    name="high_disk_usage",
-                    severity=AlertSeverity.WARNING,
-                    message=f"Disk usage is high ({usage:.1f}%)",
-                    metadata={"usage_percent": usage},
-                )
-        except ImportError:
-            pass
-        return None
+        return self._threshold_alert(
+            "high_disk_usage",
+            (snapshot or {}).get("disk_percent"),
+            label="Disk usage",
+            unit="%",
+            metadata_key="usage_percent",
+        )
 
     def _check_cpu_temperature(
-        self, bridge=None, event_detector=None
+        self, bridge=None, event_detector=None, snapshot=None
     ) -> Optional[Alert]:
         """Check CPU temperature"""
-        try:
-            temp = None
-            # Raspberry Pi: /sys/class/thermal/thermal_zone0/temp
-            try:
-                with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-                    temp_millidegree = int(f.read().strip())
-                    temp = temp_millidegree / 1000.0
-            except (OSError, ValueError, FileNotFoundError):
-                # Try psutil sensors
-                try:
-                    import psutil
-
-                    temps = psutil.sensors_temperatures()
-                    if "cpu_thermal" in temps:
-                        temp = temps["cpu_thermal"][0].current
-                    elif "coretemp" in temps:
-                        temp = temps["coretemp"][0].current
-                except (ImportError, AttributeError, KeyError, IndexError):
-                    pass
-
-            if temp is not None:
-                if temp > 80:
-                    return Alert(
-                        name="high_cpu_temperature",
-                        severity=AlertSeverity.CRITICAL,
-                        message=f"CPU temperature is critical ({temp:.1f}°C)",
-                        metadata={"temperature_celsius": temp},
-                    )
-                elif temp > 70:
-                    return Alert(
-                        name="high_cpu_temperature",
-                        severity=AlertSeverity.WARNING,
-                        message=f"CPU temperature is high ({temp:.1f}°C)",
-                        metadata={"temperature_celsius": temp},
-                    )
-        except Exception:
-            pass
+        return self._threshold_alert(
+            "high_cpu_temperature",
+            (snapshot or {}).get("cpu_temperature_celsius"),
+            label="CPU temperature",
+            unit="°C",
+            metadata_key="temperature_celsius",
+        )
+
+    def _threshold_alert(
+        self,
+        name: str,
+        value: Optional[float],
+        label: str,
+        unit: str,
+        metadata_key: str,
+    ) -> Optional[Alert]:
+        """Build an alert from a value using the rule's hysteresis thresholds"""
+        threshold = self.thresholds.get(name)
+        if value is None or threshold is None:
+            return None
+        active = self.active_alerts.get(name)
+        severity = threshold.classify(value, active.severity if active else None)
+        if severity is None:
+            return None
+        level = "critical" if severity == AlertSeverity.CRITICAL else "high"
+        return Alert(
+            name=name,
+            severity=severity,
+            message=f"{label} is {level} ({value:.1f}{unit})",
+            metadata={metadata_key: value},
+        )
+
+    def _check_esp32_fault(self, bridge=None, event_detector=None) -> Optional[Alert]:
+        """Check ESP32 hard fault state"""
+        if bridge and bridge.is_connected:
+            from api.event_detector import ESP32State
+
+            status_data = bridge.get_status()
+            if (
+                isinstance(status_data, dict)
+                and status_data.get("STATE") == ESP32State.FAULT_HARD.value
+            ):
+                return Alert(
+                    name="esp32_fault",
+                    severity=AlertSeverity.CRITICAL,
+                    message="ESP32 reports FAULT_HARD",
+                    metadata={"state": status_data.get("STATE")},
+                )
         return None
 
     def _check_event_detector(
@@ -401,13 +593,197 @@ class AlertManager:
         return None
 
 
+class AlertScheduler:
+    """
+    Background alert rule scheduler
+
+    Runs in a daemon thread: each rule is due every `rule.interval`
+    seconds, and all rules due in the same tick share one system snapshot.
+    Bridge disconnects and EventDetector fault events call trigger(), which
+    wakes the thread so the affected rules are evaluated immediately.
+    """
+
+    # Rules evaluated immediately on bridge connection changes
+    CONNECTION_RULES = ("esp32_disconnected", "esp32_status_stale")
+    # Rules evaluated immediately on EventDetector events
+    EVENT_RULES = {
+        "FAULT_DETECTED": ("esp32_fault",),
+    }
+
+    def __init__(
+        self,
+        manager: AlertManager,
+        bridge: Optional["ESP32Bridge"] = None,
+        event_detector: Optional["EventDetector"] = None,
+        metrics_interval: Optional[float] = METRICS_UPDATE_INTERVAL,
+    ):
+        self.manager = manager
+        self.bridge = bridge
+        self.event_detector = event_detector
+        self.metrics_interval = metrics_interval
+        self._next_run: Dict[str, float] = {}
+        self._next_metrics_run = 0.0
+        self._triggered: set = set()
+        self._trigger_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the scheduler thread and subscribe to triggers (idempotent)"""
+        if self.is_running:
+            return
+        if self.bridge is not None and hasattr(
+            self.bridge, "register_connection_callback"
+        ):
+            self.bridge.register_connection_callback(self._on_connection_change)
+        if self.event_detector is not None:
+            self.event_detector.register_callback(self._on_event)
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="alert-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the scheduler thread and unsubscribe from triggers"""
+        self._stop_event.set()
+        self._wakeup.set()
+        if self.bridge is not None and hasattr(
+            self.bridge, "unregister_connection_callback"
+        ):
+            self.bridge.unregister_connection_callback(self._on_connection_change)
+        if self.event_detector is not None:
+            self.event_detector.unregister_callback(self._on_event)
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout=timeout)
+
+    def trigger(self, *rule_names: str) -> None:
+        """Request immediate evaluation of the given rules (thread-safe)"""
+        with self._trigger_lock:
+            self._triggered.update(rule_names)
+        self._wakeup.set()
+
+    def _on_connection_change(self, connected: bool) -> None:
+        self.trigger(*self.CONNECTION_RULES)
+
+    def _on_event(self, event_type: Any, event_data: Dict[str, Any]) -> None:
+        rules = self.EVENT_RULES.get(getattr(event_type, "value", event_type))
+        if rules:
+            self.trigger(*rules)
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                system_logger.error(f"Alert scheduler error: {e}", exc_info=True)
+            self._wakeup.wait(self._seconds_until_next_run())
+            self._wakeup.clear()
+
+    def run_pending(self, now: Optional[float] = None) -> List[Alert]:
+        """
+        Evaluate due and triggered rules once
+
+        Returns:
+            Newly triggered alerts
+        """
+        now = time.monotonic() if now is None else now
+
+        with self._trigger_lock:
+            triggered = self._triggered
+            self._triggered = set()
+
+        due = [
+            rule
+            for rule in self.manager.rules
+            if rule.enabled
+            and (rule.name in triggered or now >= self._next_run.get(rule.name, 0.0))
+        ]
+
+        alerts: List[Alert] = []
+        if due:
+            alerts = self.manager.evaluate_rules(
+                due,
+                bridge=self.bridge,
+                event_detector=self.event_detector,
+                snapshot=collect_system_snapshot(),
+                now=now,
+            )
+            for rule in due:
+                self._next_run[rule.name] = now + rule.interval
+            if alerts:
+                system_logger.warning(f"{len(alerts)} new alert(s) triggered")
+
+        if self.metrics_interval and now >= self._next_metrics_run:
+            from api.metrics import update_all_metrics
+
+            update_all_metrics(bridge=self.bridge, event_detector=self.event_detector)
+            self._next_metrics_run = now + self.metrics_interval
+
+        return alerts
+
+    def _seconds_until_next_run(self) -> float:
+        now = time.monotonic()
+        candidates = [
+            self._next_run.get(rule.name, now)
+            for rule in self.manager.rules
+            if rule.enabled
+        ]
+        if self.metrics_interval:
+            candidates.append(self._next_metrics_run)
+        if not candidates:
+            return DEFAULT_RULE_INTERVAL
+        return max(0.0, min(candidates) - now)
+
+
+def collect_system_snapshot() -> Dict[str, Any]:
+    """
+    Collect the system values shared by all rules in one evaluation
+
+    Reads the background system probe snapshot; samples once inline only
+    when the probe is not running (e.g. standalone evaluate_all calls).
+    """
+    try:
+        from api.system_probe import get_system_probe
+
+        probe = get_system_probe()
+        if probe.is_running:
+            snapshot = probe.get_snapshot()
+            if snapshot:
+                return snapshot
+        return probe.sample()
+    except Exception as e:
+        system_logger.debug(f"System snapshot collection failed: {e}")
+        return {}
+
+
+def _accepts_keyword(function: Callable, keyword: str) -> bool:
+    """Whether a callable accepts the given keyword argument"""
+    try:
+        parameters = inspect.signature(function).parameters
+    except (TypeError, ValueError):
+        return False
+    return keyword in parameters or any(
+        p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters.values()
+    )
+
+
 # Global alert manager instance
 _alert_manager: Optional[AlertManager] = None
+_alert_manager_lock = threading.Lock()
 
 
 def get_alert_manager() -> AlertManager:
     """Get global alert manager instance"""
     global _alert_manager
     if _alert_manager is None:
-        _alert_manager = AlertManager()
+        with _alert_manager_lock:
+            if _alert_manager is None:
+                _alert_manager = AlertManager()
     return _alert_manager
@@ -27,6 +27,10 @@ CACHE_TTL = config.CACHE_TTL  # Varsayılan: 5 dakika
 # In-memory cache storage
 _memory_cache: dict[str, dict[str, Any]] = {}
 
+# Cache hit/miss sayaçları (key_prefix bazında, metrics için)
+_cache_hits: dict[str, int] = {}
+_cache_misses: dict[str, int] = {}
+
 
 class CacheBackend:
     """Cache backend interface"""
@@ -276,7 +280,9 @@ def cache_response(
             cache_backend = get_cache_backend()
             cached_response = cache_backend.get(cache_key)
 
+            counter_key = key_prefix or "default"
             if cached_response is not None:
+                _cache_hits[counter_key] = _cache_hits.get(counter_key, 0) + 1
                 system_logger.debug(f"Cache hit: {cache_key}")
                 return JSONResponse(
                     content=cached_response,
@@ -284,6 +290,7 @@ def cache_response(
                 )
 
             # Cache miss - fonksiyonu çalıştır
+            _cache_misses[counter_key] = _cache_misses.get(counter_key, 0) + 1
             system_logger.debug(f"Cache miss: {cache_key}")
             response = await func(*args, **kwargs)
 
@@ -390,6 +397,23 @@ def invalidate_cache(pattern: Optional[str] = None) -> None:
         cache_backend.clear()
 
 
+def get_cache_hit_stats() -> dict[str, dict[str, int]]:
+    """
+    Key prefix bazında cache hit/miss sayılarını al
+
+    Returns:
+        {key_prefix: {"hits": int, "misses": int}}
+    """
+    prefixes = set(_cache_hits) | set(_cache_misses)
+    return {
+        prefix: {
+            "hits": _cache_hits.get(prefix, 0),
+            "misses": _cache_misses.get(prefix, 0),
+        }
+        for prefix in prefixes
+    }
+
+
 def get_cache_stats() -> dict[str, Any]:
     """Cache istatistiklerini al"""
     cache_backend = get_cache_backend()
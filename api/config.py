@@ -1,14 +1,14 @@
 """
 Configuration Management Module
 Created: 2025-12-10 15:50:00
-Last Modified: 2025-12-10 15:50:00
-Version: 1.0.0
+Last Modified: 2025-12-12 12:00:00
+Version: 1.8.1
 Description: Merkezi configuration management - Environment variable yönetimi ve validation
 """
 
 import os
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, List, Optional
 
 from api.logging_config import system_logger
 
@@ -25,6 +25,15 @@ class Config:
     TEST_API_USER_ID: Optional[str] = None
     DEBUG: bool = False
 
+    # Process Model
+    # standalone: tek uvicorn worker'ı seri portun sahibidir (varsayılan)
+    # worker: seri port hardware daemon'dadır (python -m api.hardware.daemon),
+    #         API worker'ları durumu HARDWARE_SOCKET_PATH üzerinden okur
+    API_MODE: str = "standalone"
+    HARDWARE_SOCKET_PATH: str = "/run/charger/hardware.sock"
+    # Seri port sahibinin durumu yayınladığı mmap kaydı (boş ise kapalı)
+    SHARED_STATUS_PATH: str = "/dev/shm/charger-status"
+
     # CORS Configuration
     CORS_ALLOWED_ORIGINS: str = "*"
     CORS_ALLOWED_METHODS: str = "GET,POST,PUT,DELETE,OPTIONS"
@@ -41,6 +50,11 @@ class Config:
     RATE_LIMIT_API_KEY: str = "200/minute"
     RATE_LIMIT_CHARGE: str = "10/minute"
     RATE_LIMIT_STATUS: str = "30/minute"
+    # Route template -> limit override, örn: "/api/charge/start:5/minute"
+    RATE_LIMIT_ROUTES: Dict[str, str] = {}
+    RATE_LIMIT_BACKEND: str = "memory"  # memory, redis (worker'lar arası ortak)
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_MAX_KEYS: int = 10000  # memory backend maksimum anahtar sayısı
 
     # Database Configuration
     DATABASE_PATH: Optional[str] = None  # None ise varsayılan kullanılır
@@ -49,6 +63,29 @@ class Config:
     ESP32_PORT: Optional[str] = None  # None ise otomatik bulunur
     ESP32_BAUDRATE: int = 115200
 
+    # ESP32 Log Sampling Configuration
+    # Mesaj tipi -> N (her N mesajdan 1'i loglanır), örn: "status_request:20,ack:1"
+    ESP32_LOG_SAMPLE_RATES: Dict[str, int] = {}
+    ESP32_LOG_STATUS_CHANGE_ONLY: bool = True
+    ESP32_LOG_STATUS_HEARTBEAT: float = 300.0  # saniye
+    ESP32_LOG_RATE: float = 1.0  # token/saniye (0 = sınırsız)
+    ESP32_LOG_BURST: int = 20
+
+    # Meter Sampling Configuration
+    METER_SAMPLE_INTERVAL: float = 1.0  # saniye (arka plan okuma periyodu)
+    METER_HISTORY_SIZE: int = 600  # ring buffer'daki son okuma sayısı
+    METER_MAX_READING_AGE: float = 5.0  # saniye (session için kabul edilen yaş)
+    METER_PERSIST_INTERVAL: float = 60.0  # saniye (session okuması kayıt periyodu)
+
+    # Meter Connection Configuration
+    # Boş: meter yok (MockMeter), örn: "rtu:///dev/ttyAMA5?baudrate=9600&parity=E"
+    # veya "tcp://192.168.1.50:502"; fiziksel meter yoksa ESP32 telemetrisinden
+    # sanal meter: "virtual://?voltage=230&phases=1"
+    METER_URL: str = ""
+    METER_PROFILE: str = "abb_b23"
+    METER_SLAVE_ID: int = 1
+    METER_TIMEOUT: float = 1.0  # saniye (Modbus response timeout)
+
     @classmethod
     def load(cls) -> None:
         """
@@ -64,6 +101,15 @@ class Config:
         cls.TEST_API_USER_ID = os.getenv("TEST_API_USER_ID")
         cls.DEBUG = os.getenv("DEBUG", "false").lower() == "true"
 
+        # Process Model
+        cls.API_MODE = os.getenv("API_MODE", "standalone").lower()
+        cls.HARDWARE_SOCKET_PATH = os.getenv(
+            "HARDWARE_SOCKET_PATH", "/run/charger/hardware.sock"
+        )
+        cls.SHARED_STATUS_PATH = os.getenv(
+            "SHARED_STATUS_PATH", "/dev/shm/charger-status"
+        )
+
         # CORS Configuration
         cls.CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "*")
         cls.CORS_ALLOWED_METHODS = os.getenv(
@@ -84,6 +130,18 @@ class Config:
         cls.RATE_LIMIT_API_KEY = os.getenv("RATE_LIMIT_API_KEY", "200/minute")
         cls.RATE_LIMIT_CHARGE = os.getenv("RATE_LIMIT_CHARGE", "10/minute")
         cls.RATE_LIMIT_STATUS = os.getenv("RATE_LIMIT_STATUS", "30/minute")
+        cls.RATE_LIMIT_ROUTES = cls._parse_route_limits(
+            os.getenv("RATE_LIMIT_ROUTES", "")
+        )
+        cls.RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+        cls.RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", cls.REDIS_URL)
+        try:
+            cls.RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+        except ValueError:
+            system_logger.warning(
+                f"Geçersiz RATE_LIMIT_MAX_KEYS değeri: {os.getenv('RATE_LIMIT_MAX_KEYS')}, varsayılan kullanılıyor: 10000"
+            )
+            cls.RATE_LIMIT_MAX_KEYS = 10000
 
         # Database Configuration
         cls.DATABASE_PATH = os.getenv("DATABASE_PATH")
@@ -98,6 +156,57 @@ class Config:
             )
             cls.ESP32_BAUDRATE = 115200
 
+        # ESP32 Log Sampling Configuration
+        cls.ESP32_LOG_SAMPLE_RATES = cls._parse_sample_rates(
+            os.getenv("ESP32_LOG_SAMPLE_RATES", "")
+        )
+        cls.ESP32_LOG_STATUS_CHANGE_ONLY = (
+            os.getenv("ESP32_LOG_STATUS_CHANGE_ONLY", "true").lower() == "true"
+        )
+        try:
+            cls.ESP32_LOG_STATUS_HEARTBEAT = float(
+                os.getenv("ESP32_LOG_STATUS_HEARTBEAT", "300")
+            )
+            cls.ESP32_LOG_RATE = float(os.getenv("ESP32_LOG_RATE", "1.0"))
+            cls.ESP32_LOG_BURST = int(os.getenv("ESP32_LOG_BURST", "20"))
+        except ValueError:
+            system_logger.warning(
+                "Geçersiz ESP32 log sampling değeri, varsayılanlar kullanılıyor"
+            )
+            cls.ESP32_LOG_STATUS_HEARTBEAT = 300.0
+            cls.ESP32_LOG_RATE = 1.0
+            cls.ESP32_LOG_BURST = 20
+
+        # Meter Sampling Configuration
+        try:
+            cls.METER_SAMPLE_INTERVAL = float(os.getenv("METER_SAMPLE_INTERVAL", "1.0"))
+            cls.METER_HISTORY_SIZE = int(os.getenv("METER_HISTORY_SIZE", "600"))
+            cls.METER_MAX_READING_AGE = float(os.getenv("METER_MAX_READING_AGE", "5.0"))
+            cls.METER_PERSIST_INTERVAL = float(
+                os.getenv("METER_PERSIST_INTERVAL", "60.0")
+            )
+        except ValueError:
+            system_logger.warning(
+                "Geçersiz meter sampling değeri, varsayılanlar kullanılıyor"
+            )
+            cls.METER_SAMPLE_INTERVAL = 1.0
+            cls.METER_HISTORY_SIZE = 600
+            cls.METER_MAX_READING_AGE = 5.0
+            cls.METER_PERSIST_INTERVAL = 60.0
+
+        # Meter Connection Configuration
+        cls.METER_URL = os.getenv("METER_URL", "")
+        cls.METER_PROFILE = os.getenv("METER_PROFILE", "abb_b23").lower()
+        try:
+            cls.METER_SLAVE_ID = int(os.getenv("METER_SLAVE_ID", "1"))
+            cls.METER_TIMEOUT = float(os.getenv("METER_TIMEOUT", "1.0"))
+        except ValueError:
+            system_logger.warning(
+                "Geçersiz meter bağlantı değeri, varsayılanlar kullanılıyor"
+            )
+            cls.METER_SLAVE_ID = 1
+            cls.METER_TIMEOUT = 1.0
+
         # Validation
         cls.validate()
 
@@ -109,6 +218,12 @@ class Config:
         Raises:
             ValueError: Geçersiz configuration değerleri varsa
         """
+        # Process model validation
+        if cls.API_MODE not in ["standalone", "worker"]:
+            raise ValueError(
+                f"Geçersiz API_MODE: {cls.API_MODE} (geçerli: standalone, worker)"
+            )
+
         # Cache backend validation
         if cls.CACHE_BACKEND not in ["memory", "redis"]:
             raise ValueError(
@@ -121,6 +236,12 @@ class Config:
                 f"Geçersiz CACHE_TTL: {cls.CACHE_TTL} (0 veya pozitif olmalı)"
             )
 
+        # Rate limit backend validation
+        if cls.RATE_LIMIT_BACKEND not in ["memory", "redis"]:
+            raise ValueError(
+                f"Geçersiz RATE_LIMIT_BACKEND: {cls.RATE_LIMIT_BACKEND} (geçerli: memory, redis)"
+            )
+
         # Rate limit format validation (basit kontrol)
         rate_limits = [
             cls.RATE_LIMIT_DEFAULT,
@@ -128,6 +249,7 @@ class Config:
             cls.RATE_LIMIT_API_KEY,
             cls.RATE_LIMIT_CHARGE,
             cls.RATE_LIMIT_STATUS,
+            *cls.RATE_LIMIT_ROUTES.values(),
         ]
         for limit in rate_limits:
             if "/" not in limit:
@@ -135,6 +257,32 @@ class Config:
                     f"Geçersiz rate limit formatı: {limit} (format: 'number/period', örn: '100/minute')"
                 )
 
+        # Meter sampling validation
+        if (
+            cls.METER_SAMPLE_INTERVAL <= 0
+            or cls.METER_HISTORY_SIZE < 1
+            or cls.METER_PERSIST_INTERVAL <= 0
+        ):
+            raise ValueError(
+                f"Geçersiz meter sampling: interval={cls.METER_SAMPLE_INTERVAL}, "
+                f"history={cls.METER_HISTORY_SIZE}, "
+                f"persist={cls.METER_PERSIST_INTERVAL} (pozitif olmalı)"
+            )
+
+        # Meter connection validation
+        if cls.METER_URL and not cls.METER_URL.startswith(
+            ("rtu://", "tcp://", "virtual://")
+        ):
+            raise ValueError(
+                f"Geçersiz METER_URL: {cls.METER_URL} "
+                f"(geçerli: rtu://..., tcp://..., virtual://...)"
+            )
+        if not 1 <= cls.METER_SLAVE_ID <= 247 or cls.METER_TIMEOUT <= 0:
+            raise ValueError(
+                f"Geçersiz meter bağlantısı: slave_id={cls.METER_SLAVE_ID} (1-247), "
+                f"timeout={cls.METER_TIMEOUT} (pozitif olmalı)"
+            )
+
         # ESP32 baudrate validation
         valid_baudrates = [9600, 19200, 38400, 57600, 115200, 230400, 460800, 921600]
         if cls.ESP32_BAUDRATE not in valid_baudrates:
@@ -157,6 +305,16 @@ class Config:
             raise ValueError("SECRET_API_KEY environment variable tanımlı değil")
         return cls.SECRET_API_KEY
 
+    @classmethod
+    def is_api_worker(cls) -> bool:
+        """
+        Bu süreç donanıma sahip olmayan bir API worker'ı mı
+
+        Returns:
+            bool: API_MODE=worker ise True (bridge/event detector hardware daemon'da)
+        """
+        return cls.API_MODE == "worker"
+
     @classmethod
     def get_user_id(cls) -> Optional[str]:
         """
@@ -215,6 +373,48 @@ class Config:
         """
         return [header.strip() for header in cls.CORS_ALLOWED_HEADERS.split(",")]
 
+    @staticmethod
+    def _parse_sample_rates(value: str) -> Dict[str, int]:
+        """
+        ESP32 log sampling oranlarını parse et
+
+        Args:
+            value: "tip:N,tip:N" formatında string (örn: "status_request:20,ack:1")
+
+        Returns:
+            Dict[str, int]: Mesaj tipi -> N (geçersiz girdiler atlanır)
+        """
+        rates: Dict[str, int] = {}
+        for item in value.split(","):
+            if ":" not in item:
+                continue
+            message_type, rate = item.split(":", 1)
+            try:
+                rates[message_type.strip()] = max(1, int(rate))
+            except ValueError:
+                system_logger.warning(f"Geçersiz ESP32 log sampling oranı: {item}")
+        return rates
+
+    @staticmethod
+    def _parse_route_limits(value: str) -> Dict[str, str]:
+        """
+        Route bazlı rate limit override'larını parse et
+
+        Args:
+            value: "route:limit,route:limit" formatında string
+                   (örn: "/api/charge/start:5/minute,/api/status:60/minute")
+
+        Returns:
+            Dict[str, str]: Route template -> rate limit string
+        """
+        limits: Dict[str, str] = {}
+        for item in value.split(","):
+            if ":" not in item:
+                continue
+            route, limit = item.split(":", 1)
+            limits[route.strip()] = limit.strip()
+        return limits
+
 
 # Global config instance
 config = Config()
@@ -1,15 +1,17 @@
 """
 Database Core Module
 Created: 2025-12-10 19:00:00
-Last Modified: 2025-12-10 19:00:00
-Version: 2.0.0
+Last Modified: 2025-12-11 23:00:00
+Version: 2.2.0
 Description: SQLite database yönetimi ve session storage - Core module
 """
 
 import sqlite3
 import threading
 import time
-from typing import Optional, Dict, Any, Tuple
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Deque, Iterator, List, Tuple
 from pathlib import Path
 import sys
 import os
@@ -22,6 +24,9 @@ from api.logging_config import system_logger
 from api.database import migrations
 from api.database.queries import DatabaseQueryMixin
 
+# Güncel şema versiyonu (son migration adımı)
+SCHEMA_VERSION = migrations.LATEST_VERSION
+
 
 class Database(DatabaseQueryMixin):
     """
@@ -50,252 +55,93 @@ class Database(DatabaseQueryMixin):
         # Query result cache (basit in-memory cache)
         self._query_cache: Dict[str, Tuple[Any, float]] = {}
         self._cache_ttl = 60.0  # 60 saniye cache TTL
+        # Yazma süreleri (metrics tarafından drain edilir)
+        self._write_durations: Deque[float] = deque(maxlen=200)
+        # Bekleyen + çalışan yazma işlemi sayısı (readiness kontrolü için)
+        self._pending_writes = 0
+        self._pending_writes_lock = threading.Lock()
         self._initialize_database()
-        # Database optimization'ı başlat
-        self._optimize_database()
 
-    def _initialize_database(self):
-        """Database'i başlat ve tabloları oluştur"""
+    def _initialize_database(self) -> bool:
+        """
+        Database şemasını güncelle (bekleyen migration adımları)
+
+        Güncel database'de tek bir versiyon sorgusu yapılır; tablo, kolon ve
+        index adımları api/database/migrations.py'de sıralı olarak tutulur.
+
+        Returns:
+            bool: En az bir migration adımı uygulandı ise True
+        """
         with self.lock:
             conn = self._get_connection()
             try:
-                cursor = conn.cursor()
-
-                # Sessions tablosu (güncellenmiş şema: INTEGER timestamps + metrikler)
-                cursor.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS sessions (
-                        session_id TEXT PRIMARY KEY,
-                        user_id TEXT,
-                        start_time INTEGER NOT NULL,
-                        end_time INTEGER,
-                        start_state INTEGER NOT NULL CHECK(start_state >= 0 AND start_state <= 8),
-                        end_state INTEGER CHECK(end_state IS NULL OR (end_state >= 0 AND end_state <= 8)),
-                        status TEXT NOT NULL CHECK(status IN ('ACTIVE', 'COMPLETED', 'CANCELLED', 'FAULTED')),
-
-                        -- Süre metrikleri
-                        duration_seconds INTEGER CHECK(duration_seconds IS NULL OR duration_seconds >= 0),
-                        charging_duration_seconds INTEGER CHECK(charging_duration_seconds IS NULL OR charging_duration_seconds >= 0),
-                        idle_duration_seconds INTEGER CHECK(idle_duration_seconds IS NULL OR idle_duration_seconds >= 0),
-
-                        -- Enerji metrikleri
-                        total_energy_kwh REAL CHECK(total_energy_kwh IS NULL OR total_energy_kwh >= 0),
-                        start_energy_kwh REAL CHECK(start_energy_kwh IS NULL OR start_energy_kwh >= 0),
-                        end_energy_kwh REAL CHECK(end_energy_kwh IS NULL OR end_energy_kwh >= 0),
-
-                        -- Güç metrikleri
-                        max_power_kw REAL CHECK(max_power_kw IS NULL OR max_power_kw >= 0),
-                        avg_power_kw REAL CHECK(avg_power_kw IS NULL OR avg_power_kw >= 0),
-                        min_power_kw REAL CHECK(min_power_kw IS NULL OR min_power_kw >= 0),
-
-                        -- Akım metrikleri
-                        max_current_a REAL CHECK(max_current_a IS NULL OR max_current_a >= 0),
-                        avg_current_a REAL CHECK(avg_current_a IS NULL OR avg_current_a >= 0),
-                        min_current_a REAL CHECK(min_current_a IS NULL OR min_current_a >= 0),
-                        set_current_a REAL CHECK(set_current_a IS NULL OR set_current_a >= 0),
-
-                        -- Voltaj metrikleri
-                        max_voltage_v REAL CHECK(max_voltage_v IS NULL OR max_voltage_v >= 0),
-                        avg_voltage_v REAL CHECK(avg_voltage_v IS NULL OR avg_voltage_v >= 0),
-                        min_voltage_v REAL CHECK(min_voltage_v IS NULL OR min_voltage_v >= 0),
-
-                        -- Event ve metadata
-                        event_count INTEGER DEFAULT 0 CHECK(event_count >= 0),
-                        events TEXT NOT NULL DEFAULT '[]',
-                        metadata TEXT NOT NULL DEFAULT '{}',
-
-                        -- Audit fields (INTEGER timestamps)
-                        created_at INTEGER NOT NULL,
-                        updated_at INTEGER NOT NULL
-                    )
-                    """
-                )
-
-                # Migration: Eski TEXT timestamp kolonları varsa migrate et
-                migrations.migrate_timestamp_columns(cursor)
-
-                # Migration: Yeni metrik kolonlarını ekle (eğer yoksa)
-                migrations.migrate_metrics_columns(cursor)
-
-                # Migration: user_id kolonunu ekle (eğer yoksa)
-                migrations.migrate_user_id_column(cursor)
-
-                # Session events tablosu (normalized)
-                cursor.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS session_events (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        session_id TEXT NOT NULL,
-                        user_id TEXT,
-                        event_type TEXT NOT NULL,
-                        event_timestamp INTEGER NOT NULL,
-                        from_state INTEGER,
-                        to_state INTEGER,
-                        from_state_name TEXT,
-                        to_state_name TEXT,
-                        current_a REAL,
-                        voltage_v REAL,
-                        power_kw REAL,
-                        event_data TEXT,
-                        status_data TEXT,
-                        created_at INTEGER NOT NULL,
-                        FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
-                    )
-                    """
-                )
-
-                # Session events index'ler
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_session_events_session_id
-                    ON session_events(session_id)
-                    """
-                )
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_session_events_event_type
-                    ON session_events(event_type)
-                    """
-                )
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_session_events_timestamp
-                    ON session_events(event_timestamp DESC)
-                    """
-                )
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_session_events_session_timestamp
-                    ON session_events(session_id, event_timestamp DESC)
-                    """
-                )
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_session_events_session_type
-                    ON session_events(session_id, event_type)
-                    """
-                )
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_sessions_user_id
-                    ON sessions(user_id)
-                    """
-                )
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_sessions_user_start_time
-                    ON sessions(user_id, start_time DESC)
-                    """
-                )
-                # Database optimization index'leri
-                self._create_optimization_indexes(cursor)
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_session_events_user_id
-                    ON session_events(user_id)
-                    """
-                )
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_session_events_user_timestamp
-                    ON session_events(user_id, event_timestamp DESC)
-                    """
-                )
-
-                # Foreign keys aktif et
-                cursor.execute("PRAGMA foreign_keys=ON")
-
-                # Index'ler (performans için)
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_sessions_start_time
-                    ON sessions(start_time DESC)
-                    """
-                )
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_sessions_status
-                    ON sessions(status)
-                    """
-                )
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_sessions_end_time
-                    ON sessions(end_time DESC)
-                    """
-                )
-                # Composite index'ler (performans iyileştirmesi)
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_sessions_status_start_time
-                    ON sessions(status, start_time DESC)
-                    """
-                )
-                cursor.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_sessions_status_end_time
-                    ON sessions(status, end_time DESC)
-                    """
-                )
-
-                conn.commit()
-                system_logger.info(f"Database initialized: {self.db_path}")
+                applied = migrations.run_migrations(conn)
             except Exception as e:
                 system_logger.error(
                     f"Database initialization error: {e}", exc_info=True
                 )
-                conn.rollback()
                 raise
             # Connection persistent - close gerekmez
+        if applied:
+            system_logger.info(
+                f"Database initialized: {self.db_path} "
+                f"(schema v{applied[0] - 1} -> v{applied[-1]})"
+            )
+        else:
+            system_logger.debug(
+                f"Database schema güncel (v{migrations.LATEST_VERSION}): {self.db_path}"
+            )
+        return bool(applied)
 
-    def _create_optimization_indexes(self, cursor):
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
         """
-        Database optimization için ek index'ler oluştur
+        Yazma işlemleri için database lock'u (kuyruk derinliği sayılır)
 
-        Args:
-            cursor: Database cursor
+        Lock'u bekleyen ve tutan yazma işlemleri get_write_queue_depth()
+        ile görülebilir.
         """
+        with self._pending_writes_lock:
+            self._pending_writes += 1
         try:
-            # get_current_session için optimize edilmiş index
-            # (status, end_time, start_time) composite index
-            cursor.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_sessions_status_end_start
-                ON sessions(status, end_time, start_time DESC)
-                WHERE end_time IS NULL
-                """
-            )
-            # user_id ve status kombinasyonu için index
-            cursor.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_sessions_user_status_start
-                ON sessions(user_id, status, start_time DESC)
-                """
-            )
-            system_logger.debug("Optimization indexes created")
-        except Exception as e:
-            system_logger.warning(f"Optimization index creation failed: {e}")
+            with self.lock:
+                yield
+        finally:
+            with self._pending_writes_lock:
+                self._pending_writes -= 1
 
-    def _optimize_database(self):
+    def get_write_queue_depth(self) -> int:
         """
-        Database'i optimize et (index'ler, query plan analizi)
+        Bekleyen ve çalışan yazma işlemi sayısını al
+
+        Returns:
+            Yazma kuyruğu derinliği (sadece bellekteki sayaç okunur)
         """
-        try:
-            from api.database_optimization import optimize_indexes, get_query_statistics
+        return self._pending_writes
 
-            conn = self._get_connection()
-            # Index optimization
-            opt_results = optimize_indexes(conn)
-            if opt_results.get("created"):
-                system_logger.info(
-                    f"Database optimization: {len(opt_results['created'])} index created"
-                )
-            # Query statistics
-            stats = get_query_statistics(conn)
-            if stats:
-                system_logger.debug(f"Database statistics: {stats}")
-        except Exception as e:
-            system_logger.warning(f"Database optimization failed: {e}")
+    def _record_write_duration(self, seconds: float) -> None:
+        """
+        Yazma işlemi süresini kaydet
+
+        Args:
+            seconds: Commit dahil yazma süresi (saniye)
+        """
+        self._write_durations.append(seconds)
+
+    def drain_write_durations(self) -> List[float]:
+        """
+        Birikmiş yazma sürelerini al ve temizle (metrics için)
+
+        Returns:
+            Yazma süreleri listesi (saniye)
+        """
+        durations = []
+        while self._write_durations:
+            try:
+                durations.append(self._write_durations.popleft())
+            except IndexError:
+                break
+        return durations
 
     def _get_from_cache(self, key: str) -> Optional[Any]:
         """
@@ -1,13 +1,16 @@
 """
 Database Migrations Module
 Created: 2025-12-10 19:00:00
-Last Modified: 2025-12-10 19:00:00
-Version: 1.0.0
-Description: Database migration operations
+Last Modified: 2025-12-12 07:00:00
+Version: 2.1.0
+Description: Database migration operations - schema_version tablosu ve sıralı
+             migration runner (sadece bekleyen adımlar, tek transaction)
 """
 
 import sqlite3
+import time
 from datetime import datetime
+from typing import Callable, List, Tuple
 import sys
 import os
 
@@ -115,14 +118,15 @@ def migrate_user_id_column(cursor):
         # sessions tablosuna user_id ekle
         cursor.execute("PRAGMA table_info(sessions)")
         columns = [col[1] for col in cursor.fetchall()]
-        if "user_id" not in columns:
+        if columns and "user_id" not in columns:
             cursor.execute("ALTER TABLE sessions ADD COLUMN user_id TEXT")
             system_logger.info("user_id kolonu sessions tablosuna eklendi")
 
         # session_events tablosuna user_id ekle
         cursor.execute("PRAGMA table_info(session_events)")
+        # Tablo henüz yoksa (PRAGMA boş döner) sonraki adımda oluşturulur
         columns = [col[1] for col in cursor.fetchall()]
-        if "user_id" not in columns:
+        if columns and "user_id" not in columns:
             cursor.execute("ALTER TABLE session_events ADD COLUMN user_id TEXT")
             system_logger.info("user_id kolonu session_events tablosuna eklendi")
     except Exception as e:
@@ -177,3 +181,237 @@ def migrate_metrics_columns(cursor):
                     )
     except Exception as e:
         system_logger.warning(f"Metrics columns migration error: {e}")
+
+
+# Uygulanan migration adımları (version, açıklama, applied_at)
+SCHEMA_VERSION_TABLE = "schema_version"
+
+# Index'ler (isim, SQL) - index adımı tarafından oluşturulur
+SESSION_INDEXES: Tuple[Tuple[str, str], ...] = (
+    ("idx_session_events_session_id", "session_events(session_id)"),
+    ("idx_session_events_event_type", "session_events(event_type)"),
+    ("idx_session_events_timestamp", "session_events(event_timestamp DESC)"),
+    (
+        "idx_session_events_session_timestamp",
+        "session_events(session_id, event_timestamp DESC)",
+    ),
+    ("idx_session_events_session_type", "session_events(session_id, event_type)"),
+    ("idx_session_events_user_id", "session_events(user_id)"),
+    (
+        "idx_session_events_user_timestamp",
+        "session_events(user_id, event_timestamp DESC)",
+    ),
+    ("idx_sessions_user_id", "sessions(user_id)"),
+    ("idx_sessions_user_start_time", "sessions(user_id, start_time DESC)"),
+    ("idx_sessions_start_time", "sessions(start_time DESC)"),
+    ("idx_sessions_status", "sessions(status)"),
+    ("idx_sessions_end_time", "sessions(end_time DESC)"),
+    ("idx_sessions_status_start_time", "sessions(status, start_time DESC)"),
+    ("idx_sessions_status_end_time", "sessions(status, end_time DESC)"),
+    # get_current_session için (status, end_time, start_time) partial index
+    (
+        "idx_sessions_status_end_start",
+        "sessions(status, end_time, start_time DESC) WHERE end_time IS NULL",
+    ),
+    ("idx_sessions_user_status_start", "sessions(user_id, status, start_time DESC)"),
+)
+
+
+def _create_sessions_table(cursor):
+    """
+    sessions tablosu
+
+    Eski database'lerde (TEXT timestamp'ler, eksik metrik/user_id kolonları)
+    tablo yerinde güncellenir.
+    """
+    # Sessions tablosu (güncellenmiş şema: INTEGER timestamps + metrikler)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            user_id TEXT,
+            start_time INTEGER NOT NULL,
+            end_time INTEGER,
+            start_state INTEGER NOT NULL CHECK(start_state >= 0 AND start_state <= 8),
+            end_state INTEGER CHECK(end_state IS NULL OR (end_state >= 0 AND end_state <= 8)),
+            status TEXT NOT NULL CHECK(status IN ('ACTIVE', 'COMPLETED', 'CANCELLED', 'FAULTED')),
+
+            -- Süre metrikleri
+            duration_seconds INTEGER CHECK(duration_seconds IS NULL OR duration_seconds >= 0),
+            charging_duration_seconds INTEGER CHECK(charging_duration_seconds IS NULL OR charging_duration_seconds >= 0),
+            idle_duration_seconds INTEGER CHECK(idle_duration_seconds IS NULL OR idle_duration_seconds >= 0),
+
+            -- Enerji metrikleri
+            total_energy_kwh REAL CHECK(total_energy_kwh IS NULL OR total_energy_kwh >= 0),
+            start_energy_kwh REAL CHECK(start_energy_kwh IS NULL OR start_energy_kwh >= 0),
+            end_energy_kwh REAL CHECK(end_energy_kwh IS NULL OR end_energy_kwh >= 0),
+
+            -- Güç metrikleri
+            max_power_kw REAL CHECK(max_power_kw IS NULL OR max_power_kw >= 0),
+            avg_power_kw REAL CHECK(avg_power_kw IS NULL OR avg_power_kw >= 0),
+            min_power_kw REAL CHECK(min_power_kw IS NULL OR min_power_kw >= 0),
+
+            -- Akım metrikleri
+            max_current_a REAL CHECK(max_current_a IS NULL OR max_current_a >= 0),
+            avg_current_a REAL CHECK(avg_current_a IS NULL OR avg_current_a >= 0),
+            min_current_a REAL CHECK(min_current_a IS NULL OR min_current_a >= 0),
+            set_current_a REAL CHECK(set_current_a IS NULL OR set_current_a >= 0),
+
+            -- Voltaj metrikleri
+            max_voltage_v REAL CHECK(max_voltage_v IS NULL OR max_voltage_v >= 0),
+            avg_voltage_v REAL CHECK(avg_voltage_v IS NULL OR avg_voltage_v >= 0),
+            min_voltage_v REAL CHECK(min_voltage_v IS NULL OR min_voltage_v >= 0),
+
+            -- Event ve metadata
+            event_count INTEGER DEFAULT 0 CHECK(event_count >= 0),
+            events TEXT NOT NULL DEFAULT '[]',
+            metadata TEXT NOT NULL DEFAULT '{}',
+
+            -- Audit fields (INTEGER timestamps)
+            created_at INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL
+        )
+        """
+    )
+
+    migrate_timestamp_columns(cursor)
+    migrate_metrics_columns(cursor)
+    migrate_user_id_column(cursor)
+
+
+def _create_session_events_table(cursor):
+    """session_events tablosu (normalized event kayıtları)"""
+    # Session events tablosu (normalized)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS session_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            user_id TEXT,
+            event_type TEXT NOT NULL,
+            event_timestamp INTEGER NOT NULL,
+            from_state INTEGER,
+            to_state INTEGER,
+            from_state_name TEXT,
+            to_state_name TEXT,
+            current_a REAL,
+            voltage_v REAL,
+            power_kw REAL,
+            event_data TEXT,
+            status_data TEXT,
+            created_at INTEGER NOT NULL,
+            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+        )
+        """
+    )
+    # Eski session_events tablosunda user_id kolonu olmayabilir
+    migrate_user_id_column(cursor)
+
+
+def _create_session_indexes(cursor):
+    """Sorgu index'leri (session listeleme, aktif session, kullanıcı geçmişi)"""
+    for name, definition in SESSION_INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+def _create_meter_readings_table(cursor):
+    """
+    meter_readings tablosu (session başına periyodik enerji sayacı okumaları)
+
+    Satır başına sadece zaman ve tamsayı Wh/W tutulur; (session_id,
+    timestamp) birincil anahtarlı WITHOUT ROWID tablo ayrı index gerektirmez
+    ve session silindiğinde okumaları da silinir.
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS meter_readings (
+            session_id TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            energy_wh INTEGER NOT NULL CHECK(energy_wh >= 0),
+            power_w INTEGER,
+            PRIMARY KEY (session_id, timestamp),
+            FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """
+    )
+
+
+# Sıralı migration adımları: (version, açıklama, fonksiyon)
+# Yeni şema değişikliği yeni bir adım olarak sona eklenir; mevcut adımlar
+# değiştirilmez (uygulanmış database'lerde tekrar çalışmaz).
+MIGRATIONS: Tuple[Tuple[int, str, Callable], ...] = (
+    (1, "sessions tablosu", _create_sessions_table),
+    (2, "session_events tablosu", _create_session_events_table),
+    (3, "session index'leri", _create_session_indexes),
+    (4, "meter_readings tablosu", _create_meter_readings_table),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    Uygulanmış son migration versiyonu
+
+    Args:
+        conn: SQLite connection
+
+    Returns:
+        Versiyon (schema_version tablosu yoksa 0)
+    """
+    try:
+        row = conn.execute(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def run_migrations(conn: sqlite3.Connection) -> List[int]:
+    """
+    Bekleyen migration adımlarını tek transaction içinde uygula
+
+    Güncel database'de sadece tek bir versiyon sorgusu yapılır. Aynı
+    database'i açan diğer süreçler (hardware daemon, API worker'ları)
+    BEGIN IMMEDIATE ile sıraya girer; versiyon lock alındıktan sonra
+    tekrar okunur, böylece bir adım iki kez uygulanmaz. Herhangi bir adım
+    hata verirse tüm adımlar geri alınır.
+
+    Args:
+        conn: SQLite connection
+
+    Returns:
+        Uygulanan versiyonlar (güncelse boş liste)
+    """
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return []
+
+    applied: List[int] = []
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at INTEGER NOT NULL
+            )
+            """
+        )
+        current = get_schema_version(conn)
+        for version, description, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            migrate(cursor)
+            cursor.execute(
+                f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, description, applied_at) "
+                "VALUES (?, ?, ?)",
+                (version, description, int(time.time())),
+            )
+            applied.append(version)
+            system_logger.info(f"Database migration v{version} uygulandı: {description}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return applied
@@ -1,13 +1,14 @@
 """
 Database Queries Module
 Created: 2025-12-10 20:30:00
-Last Modified: 2025-12-10 20:30:00
-Version: 1.0.0
+Last Modified: 2025-12-12 11:00:00
+Version: 1.2.0
 Description: Database query metodları - Query operations mixin
 """
 
 import sqlite3
 import json
+import time
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 import sys
@@ -49,9 +50,10 @@ class DatabaseQueryMixin:
         Returns:
             Başarı durumu
         """
-        with self.lock:
+        with self._write_lock():
             conn = self._get_connection()
             try:
+                write_started = time.perf_counter()
                 cursor = conn.cursor()
                 now_timestamp = int(datetime.now().timestamp())
                 start_time_timestamp = int(start_time.timestamp())
@@ -79,6 +81,7 @@ class DatabaseQueryMixin:
                 )
 
                 conn.commit()
+                self._record_write_duration(time.perf_counter() - write_started)
                 # Cache'i temizle (yeni session eklendi)
                 self._clear_cache("sessions:")
                 return True
@@ -132,9 +135,10 @@ class DatabaseQueryMixin:
         Returns:
             Başarı durumu
         """
-        with self.lock:
+        with self._write_lock():
             conn = self._get_connection()
             try:
+                write_started = time.perf_counter()
                 cursor = conn.cursor()
 
                 # Mevcut session'ı al
@@ -211,6 +215,7 @@ class DatabaseQueryMixin:
                 cursor.execute(query, update_values)
 
                 conn.commit()
+                self._record_write_duration(time.perf_counter() - write_started)
                 # Cache'i temizle (session güncellendi)
                 self._clear_cache("sessions:")
                 return True
@@ -420,9 +425,10 @@ class DatabaseQueryMixin:
         Returns:
             Başarı durumu
         """
-        with self.lock:
+        with self._write_lock():
             conn = self._get_connection()
             try:
+                write_started = time.perf_counter()
                 cursor = conn.cursor()
                 timestamp_int = int(event_timestamp.timestamp())
                 created_at_int = int(datetime.now().timestamp())
@@ -464,6 +470,7 @@ class DatabaseQueryMixin:
                 )
 
                 conn.commit()
+                self._record_write_duration(time.perf_counter() - write_started)
                 return True
             except Exception as e:
                 system_logger.error(f"Create event error: {e}", exc_info=True)
@@ -526,6 +533,108 @@ class DatabaseQueryMixin:
                 system_logger.error(f"Get session events error: {e}", exc_info=True)
                 return []
 
+    def add_meter_reading(
+        self,
+        session_id: str,
+        timestamp: float,
+        energy_kwh: float,
+        power_kw: Optional[float] = None,
+    ) -> bool:
+        """
+        Session'a meter enerji sayacı okuması ekle
+
+        Enerji Wh, güç W olarak tamsayı saklanır. Aynı saniyedeki ikinci
+        okuma öncekinin yerine geçer.
+
+        Args:
+            session_id: Session UUID
+            timestamp: Okuma zamanı (Unix timestamp)
+            energy_kwh: Enerji sayacı (kWh)
+            power_kw: Aktif güç (kW, opsiyonel)
+
+        Returns:
+            Başarı durumu
+        """
+        with self._write_lock():
+            conn = self._get_connection()
+            try:
+                write_started = time.perf_counter()
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO meter_readings
+                    (session_id, timestamp, energy_wh, power_w)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (
+                        session_id,
+                        int(timestamp),
+                        int(round(energy_kwh * 1000)),
+                        int(round(power_kw * 1000)) if power_kw is not None else None,
+                    ),
+                )
+                conn.commit()
+                self._record_write_duration(time.perf_counter() - write_started)
+                return True
+            except Exception as e:
+                system_logger.error(f"Add meter reading error: {e}", exc_info=True)
+                conn.rollback()
+                return False
+
+    def get_meter_readings(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Session'ın meter okumalarını al (eskiden yeniye)
+
+        Args:
+            session_id: Session UUID
+
+        Returns:
+            timestamp, energy_kwh, power_kw dict'leri listesi
+        """
+        with self.lock:
+            conn = self._get_connection()
+            try:
+                rows = conn.execute(
+                    """
+                    SELECT timestamp, energy_wh, power_w FROM meter_readings
+                    WHERE session_id = ?
+                    ORDER BY timestamp
+                    """,
+                    (session_id,),
+                ).fetchall()
+                return [
+                    {
+                        "timestamp": row["timestamp"],
+                        "energy_kwh": row["energy_wh"] / 1000.0,
+                        "power_kw": (
+                            row["power_w"] / 1000.0 if row["power_w"] is not None else None
+                        ),
+                    }
+                    for row in rows
+                ]
+            except Exception as e:
+                system_logger.error(f"Get meter readings error: {e}", exc_info=True)
+                return []
+
+    def get_max_meter_energy(self) -> Optional[float]:
+        """
+        Kaydedilmiş en yüksek meter enerji sayacı değeri (tüm session'lar)
+
+        Returns:
+            Enerji (kWh) veya None (kayıt yok)
+        """
+        with self.lock:
+            conn = self._get_connection()
+            try:
+                row = conn.execute(
+                    "SELECT MAX(energy_wh) AS energy_wh FROM meter_readings"
+                ).fetchone()
+                if row is None or row["energy_wh"] is None:
+                    return None
+                return row["energy_wh"] / 1000.0
+            except Exception as e:
+                system_logger.error(f"Get max meter energy error: {e}", exc_info=True)
+                return None
+
     def migrate_events_to_table(self, session_id: Optional[str] = None) -> int:
         """
         Mevcut events JSON'ını session_events tablosuna migrate et
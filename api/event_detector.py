@@ -1,8 +1,8 @@
 """
 Event Detection Module
 Created: 2025-12-09 22:50:00
-Last Modified: 2025-12-09 22:50:00
-Version: 1.0.0
+Last Modified: 2025-12-11 20:00:00
+Version: 1.1.0
 Description: ESP32 state transition detection ve event classification modülü
 """
 
@@ -360,11 +360,21 @@ def get_event_detector(bridge_getter: Callable) -> EventDetector:
     Args:
         bridge_getter: ESP32Bridge instance'ı döndüren callable
 
+    Worker modunda (API_MODE=worker) state takibi hardware daemon'dadır;
+    aynı arayüzü sağlayan RemoteEventDetector döndürülür.
+
     Returns:
         EventDetector instance
     """
     global event_detector_instance
 
+    from api.config import config
+
+    if config.is_api_worker():
+        from api.hardware import get_hardware_client
+
+        return get_hardware_client().event_detector
+
     if event_detector_instance is None:
         with event_detector_lock:
             if event_detector_instance is None:
@@ -0,0 +1,27 @@
+"""
+Hardware Process Package
+Created: 2025-12-11 20:00:00
+Last Modified: 2025-12-11 20:00:00
+Version: 1.0.0
+Description: Çoklu worker modu - seri portun tek sahibi hardware daemon ve
+             API worker'larının kullandığı istemci vekilleri
+"""
+
+from api.hardware.client import (
+    HardwareClient,
+    HardwareDaemonError,
+    RemoteBridge,
+    RemoteEventDetector,
+    get_hardware_client,
+)
+
+# HardwareDaemon, "python -m api.hardware.daemon" çalıştırılırken çift import
+# olmaması için buradan re-export edilmez: from api.hardware.daemon import ...
+
+__all__ = [
+    "HardwareClient",
+    "HardwareDaemonError",
+    "RemoteBridge",
+    "RemoteEventDetector",
+    "get_hardware_client",
+]
@@ -0,0 +1,523 @@
+"""
+Hardware Daemon Client
+Created: 2025-12-11 20:00:00
+Last Modified: 2025-12-12 10:00:00
+Version: 1.1.0
+Description: API worker tarafı - hardware daemon'a bağlanır, push edilen
+             durumu bellekte tutar ve ESP32Bridge / EventDetector yerine
+             kullanılan RemoteBridge / RemoteEventDetector vekillerini sağlar
+"""
+
+import itertools
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from api.config import config
+from api.hardware.protocol import (
+    EVENT_CONNECTION,
+    EVENT_PING,
+    EVENT_SNAPSHOT,
+    EVENT_STATE,
+    EVENT_STATS,
+    EVENT_STATUS,
+    METHOD_SET_PENDING_USER_ID,
+    METHOD_SUBSCRIBE,
+    PING_INTERVAL,
+    ProtocolError,
+    decode_message,
+    encode_message,
+)
+from api.logging_config import system_logger
+
+# İstek/yanıt bağlantısı için varsayılan timeout (saniye)
+REQUEST_TIMEOUT = 3.0
+
+# Push bağlantısı koptuğunda yeniden bağlanma bekleme süreleri (saniye)
+RECONNECT_DELAY = 0.5
+MAX_RECONNECT_DELAY = 10.0
+
+
+class HardwareDaemonError(Exception):
+    """Hardware daemon'a ulaşılamadı veya istek hata döndürdü"""
+
+
+class HardwareClient:
+    """
+    Hardware daemon istemcisi
+
+    İki bağlantı kullanır: push kanalı (arka plan thread'i, durum güncellemeleri)
+    ve istek/yanıt kanalı (komutlar, lock ile serileştirilir). Okumalar
+    (is_connected, get_status, bridge istatistikleri, event detector durumu)
+    push kanalından gelen ve bellekte tutulan durumdan yapılır; daemon'a
+    gidiş-dönüş gerektirmez.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        request_timeout: float = REQUEST_TIMEOUT,
+    ):
+        """
+        Hardware client başlatıcı
+
+        Args:
+            socket_path: Unix domain socket yolu (None ise config'den)
+            request_timeout: İstek/yanıt timeout süresi (saniye)
+        """
+        self.socket_path = socket_path or config.HARDWARE_SOCKET_PATH
+        self.request_timeout = request_timeout
+        self.bridge = RemoteBridge(self)
+        self.event_detector = RemoteEventDetector(self)
+        self._ids = itertools.count(1)
+        self._request_lock = threading.Lock()
+        self._request_sock: Optional[socket.socket] = None
+        self._request_reader = None
+        self._subscribe_sock: Optional[socket.socket] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._linked = False
+
+    @property
+    def is_linked(self) -> bool:
+        """Push kanalı bağlı ve snapshot alınmış mı"""
+        return self._linked
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # Yaşam döngüsü
+
+    def start(self) -> None:
+        """Push kanalı thread'ini başlat (idempotent)"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._subscribe_loop, name="hardware-client", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Bağlantıları kapat ve thread'i durdur"""
+        self._stop_event.set()
+        sock = self._subscribe_sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        with self._request_lock:
+            self._close_request()
+
+    def wait_linked(self, timeout: float) -> bool:
+        """Push kanalı bağlanana kadar bekle"""
+        deadline = time.monotonic() + timeout
+        while not self._linked and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self._linked
+
+    # İstek/yanıt
+
+    def call(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Daemon'da bir metodu çağır
+
+        Bağlantı hatasında bir kez yeniden bağlanılır.
+
+        Args:
+            method: Metod adı (protocol.BRIDGE_METHODS veya set_pending_user_id)
+            params: Metod parametreleri
+            timeout: Yanıt timeout süresi (None ise request_timeout)
+
+        Returns:
+            Metodun dönüş değeri
+
+        Raises:
+            HardwareDaemonError: Daemon'a ulaşılamadı veya metod hata verdi
+        """
+        request = {"id": next(self._ids), "method": method, "params": params or {}}
+        with self._request_lock:
+            for attempt in range(2):
+                try:
+                    if self._request_sock is None:
+                        self._request_sock = self._connect()
+                        self._request_reader = self._request_sock.makefile("rb")
+                    self._request_sock.settimeout(timeout or self.request_timeout)
+                    self._request_sock.sendall(encode_message(request))
+                    line = self._request_reader.readline()
+                    if not line:
+                        raise ConnectionResetError("Hardware daemon bağlantıyı kapattı")
+                    response = decode_message(line)
+                    break
+                except (OSError, ProtocolError) as e:
+                    self._close_request()
+                    if attempt:
+                        raise HardwareDaemonError(f"Hardware daemon'a ulaşılamadı: {e}")
+
+        if "error" in response:
+            raise HardwareDaemonError(response["error"])
+        return response.get("result")
+
+    def set_pending_user_id(self, user_id: Optional[str]) -> None:
+        """Şarjı başlatan kullanıcıyı daemon'daki session manager'a ilet"""
+        self.call(METHOD_SET_PENDING_USER_ID, {"user_id": user_id})
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.request_timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _close_request(self) -> None:
+        if self._request_reader is not None:
+            try:
+                self._request_reader.close()
+            except OSError:
+                pass
+            self._request_reader = None
+        if self._request_sock is not None:
+            try:
+                self._request_sock.close()
+            except OSError:
+                pass
+            self._request_sock = None
+
+    # Push kanalı
+
+    def _subscribe_loop(self) -> None:
+        delay = RECONNECT_DELAY
+        logged_failure = False
+        while not self._stop_event.is_set():
+            sock = None
+            try:
+                sock = self._connect()
+                # Daemon PING_INTERVAL'de bir ping gönderir
+                sock.settimeout(PING_INTERVAL * 3)
+                self._subscribe_sock = sock
+                sock.sendall(encode_message({"id": 0, "method": METHOD_SUBSCRIBE}))
+                reader = sock.makefile("rb")
+                for line in reader:
+                    self._apply(decode_message(line))
+                    delay = RECONNECT_DELAY
+                    if logged_failure:
+                        system_logger.info("Hardware daemon bağlantısı yeniden kuruldu")
+                        logged_failure = False
+            except (OSError, ProtocolError) as e:
+                if not self._stop_event.is_set() and not logged_failure:
+                    system_logger.warning(f"Hardware daemon bağlantısı yok: {e}")
+                    logged_failure = True
+            finally:
+                self._subscribe_sock = None
+                if sock is not None:
+                    sock.close()
+                self._set_linked(False)
+
+            self._stop_event.wait(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _apply(self, message: Dict[str, Any]) -> None:
+        """Push mesajını yerel duruma uygula (push thread'inde çalışır)"""
+        event = message.get("event")
+        data = message.get("data")
+        if event == EVENT_STATUS:
+            self.bridge._apply_status(data)
+        elif event == EVENT_STATE:
+            self.event_detector._apply_event(data)
+        elif event == EVENT_CONNECTION:
+            self.bridge._apply_connection(data)
+        elif event == EVENT_PING:
+            self.event_detector._apply_detector_state(data)
+        elif event == EVENT_STATS:
+            self.bridge._apply_stats(data)
+        elif event == EVENT_SNAPSHOT:
+            self.bridge._apply_connection(data)
+            if data.get("status"):
+                self.bridge._apply_status(data["status"])
+            self.bridge._apply_stats(data.get("stats"))
+            self.event_detector._apply_detector_state(data.get("detector"))
+            self._set_linked(True)
+
+    def _set_linked(self, linked: bool) -> None:
+        if self._linked == linked:
+            return
+        self._linked = linked
+        self.bridge._update_connected()
+
+
+class RemoteBridge:
+    """
+    Worker sürecindeki ESP32Bridge vekili
+
+    Router'ların ve servislerin kullandığı ESP32Bridge arayüzünü sağlar.
+    Durum ve istatistik okumaları yereldir (async handler'lardan güvenle
+    çağrılabilir); komutlar hardware daemon'a iletilir.
+    is_connected hem daemon bağlantısını hem ESP32 bağlantısını kapsar.
+    """
+
+    _monitor_thread = None
+
+    def __init__(self, client: HardwareClient):
+        self._client = client
+        self.status_lock = threading.Lock()
+        self.last_status: Optional[Dict[str, Any]] = None
+        self._last_status_monotonic: Optional[float] = None
+        self._remote_connected = False
+        self._reconnect_attempts = 0
+        self._is_connected = False
+        self._status_callbacks: List[Callable[[Dict[str, Any]], None]] = []
+        self._connection_callbacks: List[Callable[[bool], None]] = []
+        self._io_stats: Dict[str, Any] = {}
+        self._log_sampling_stats: Dict[str, Any] = {}
+        self._ack_latencies: deque = deque(maxlen=100)
+
+    @property
+    def is_connected(self) -> bool:
+        return self._is_connected
+
+    # Okumalar (yerel)
+
+    def get_status(self, max_age_seconds: float = 10.0) -> Optional[Dict[str, Any]]:
+        """
+        Son durum bilgisini al (ESP32Bridge.get_status ile aynı yaş kontrolü)
+
+        Returns:
+            Durum dict'i veya None (veri çok eskiyse veya yoksa)
+        """
+        with self.status_lock:
+            if not self.last_status:
+                return None
+            try:
+                timestamp_str = self.last_status.get("timestamp")
+                if timestamp_str:
+                    age_seconds = (
+                        datetime.now() - datetime.fromisoformat(timestamp_str)
+                    ).total_seconds()
+                    if age_seconds > max_age_seconds:
+                        return None
+            except (ValueError, TypeError):
+                pass
+            return self.last_status.copy()
+
+    def get_io_stats(self) -> Dict[str, Any]:
+        """
+        Seri port I/O istatistikleri (daemon'dan son push edilen sayaçlar)
+
+        STAT yaşı yerel olarak, son push edilen STAT'ın alınma anından hesaplanır.
+        """
+        last_status = self._last_status_monotonic
+        return {
+            **self._io_stats,
+            "status_age_seconds": (
+                time.monotonic() - last_status if last_status is not None else None
+            ),
+        }
+
+    def get_log_sampling_stats(self) -> Dict[str, Any]:
+        return self._log_sampling_stats
+
+    def drain_ack_latencies(self) -> List[tuple]:
+        latencies = []
+        while self._ack_latencies:
+            try:
+                latencies.append(self._ack_latencies.popleft())
+            except IndexError:
+                break
+        return latencies
+
+    # Komutlar (daemon'a iletilir)
+
+    def get_status_sync(self, timeout: float = 2.0) -> Optional[Dict[str, Any]]:
+        return self._command(
+            "get_status_sync", {"timeout": timeout}, timeout=timeout + 1.0
+        )
+
+    def send_authorization(self, **kwargs: Any) -> bool:
+        return bool(self._command("send_authorization", kwargs))
+
+    def send_current_set(self, amperage: int, **kwargs: Any) -> bool:
+        return bool(self._command("send_current_set", {"amperage": amperage, **kwargs}))
+
+    def send_charge_stop(self, **kwargs: Any) -> bool:
+        return bool(self._command("send_charge_stop", kwargs))
+
+    def _command(
+        self, method: str, params: Dict[str, Any], timeout: Optional[float] = None
+    ) -> Any:
+        # ACK beklemesi (timeout * deneme sayısı) istek timeout'una eklenir
+        if timeout is None:
+            ack_timeout = params.get("timeout", 1.0) * (
+                params.get("max_retries", 1) + 1
+            )
+            timeout = self._client.request_timeout + ack_timeout
+        try:
+            return self._client.call(method, params, timeout=timeout)
+        except HardwareDaemonError as e:
+            system_logger.error(f"Hardware daemon komutu başarısız ({method}): {e}")
+            return None
+
+    # Callback'ler
+
+    def register_status_callback(self, callback: Callable[[Dict[str, Any]], None]):
+        if callback not in self._status_callbacks:
+            self._status_callbacks.append(callback)
+
+    def unregister_status_callback(self, callback: Callable[[Dict[str, Any]], None]):
+        if callback in self._status_callbacks:
+            self._status_callbacks.remove(callback)
+
+    def register_connection_callback(self, callback: Callable[[bool], None]):
+        if callback not in self._connection_callbacks:
+            self._connection_callbacks.append(callback)
+
+    def unregister_connection_callback(self, callback: Callable[[bool], None]):
+        if callback in self._connection_callbacks:
+            self._connection_callbacks.remove(callback)
+
+    def disconnect(self) -> None:
+        """Seri port daemon'a ait - worker tarafında yapılacak bir şey yok"""
+
+    # Push uygulama (HardwareClient thread'inde)
+
+    def _apply_status(self, status: Dict[str, Any]) -> None:
+        with self.status_lock:
+            self.last_status = status
+            self._last_status_monotonic = time.monotonic()
+        for callback in list(self._status_callbacks):
+            try:
+                callback(status)
+            except Exception as e:
+                system_logger.error(f"Status callback hatası: {e}", exc_info=True)
+
+    def _apply_stats(self, stats: Optional[Dict[str, Any]]) -> None:
+        if not stats:
+            return
+        if isinstance(stats.get("io"), dict):
+            self._io_stats = stats["io"]
+        if isinstance(stats.get("log_sampling"), dict):
+            self._log_sampling_stats = stats["log_sampling"]
+        for command, seconds in stats.get("ack_latencies") or []:
+            self._ack_latencies.append((command, seconds))
+
+    def _apply_connection(self, data: Dict[str, Any]) -> None:
+        self._remote_connected = bool(data.get("connected"))
+        self._reconnect_attempts = data.get("reconnect_attempts", 0)
+        self._update_connected()
+
+    def _update_connected(self) -> None:
+        connected = self._client.is_linked and self._remote_connected
+        if connected == self._is_connected:
+            return
+        self._is_connected = connected
+        for callback in list(self._connection_callbacks):
+            try:
+                callback(connected)
+            except Exception as e:
+                system_logger.error(f"Connection callback hatası: {e}", exc_info=True)
+
+
+class _RemoteMonitorThread:
+    """Daemon'daki event detector thread'inin canlılığı (Thread arayüzü)"""
+
+    def __init__(self, detector: "RemoteEventDetector"):
+        self._detector = detector
+
+    def is_alive(self) -> bool:
+        return self._detector._client.is_linked and self._detector._thread_alive
+
+
+class RemoteEventDetector:
+    """
+    Worker sürecindeki EventDetector vekili
+
+    State transition'lar daemon'daki EventDetector'da tespit edilir ve push
+    edilir; burada kaydolan callback'ler aynı imza ile çağrılır.
+    """
+
+    def __init__(self, client: HardwareClient):
+        self._client = client
+        self.current_state: Optional[int] = None
+        self.previous_state: Optional[int] = None
+        self.event_callbacks: List[Callable] = []
+        self._monitoring = False
+        self._thread_alive = False
+        self._monitor_thread = _RemoteMonitorThread(self)
+
+    @property
+    def is_monitoring(self) -> bool:
+        return self._client.is_linked and self._monitoring
+
+    def get_current_state(self) -> Optional[int]:
+        return self.current_state
+
+    def get_previous_state(self) -> Optional[int]:
+        return self.previous_state
+
+    def register_callback(self, callback: Callable):
+        if callback not in self.event_callbacks:
+            self.event_callbacks.append(callback)
+
+    def unregister_callback(self, callback: Callable):
+        if callback in self.event_callbacks:
+            self.event_callbacks.remove(callback)
+
+    def _apply_detector_state(self, state: Optional[Dict[str, Any]]) -> None:
+        if not state:
+            return
+        self._monitoring = bool(state.get("monitoring"))
+        self._thread_alive = bool(state.get("thread_alive"))
+        self.current_state = state.get("current_state")
+        self.previous_state = state.get("previous_state")
+
+    def _apply_event(self, data: Dict[str, Any]) -> None:
+        from api.event_detector import EventType
+
+        self._apply_detector_state(data.get("detector"))
+        try:
+            event_type = EventType(data.get("event_type"))
+        except ValueError:
+            event_type = data.get("event_type")
+        event_data = data.get("event_data") or {}
+        for callback in list(self.event_callbacks):
+            try:
+                callback(event_type, event_data)
+            except Exception as e:
+                system_logger.error(f"Event callback hatası: {e}", exc_info=True)
+
+
+# Singleton instance
+_hardware_client_instance: Optional[HardwareClient] = None
+_hardware_client_lock = threading.Lock()
+
+
+def get_hardware_client() -> HardwareClient:
+    """
+    Hardware client singleton instance'ı döndür
+
+    Returns:
+        HardwareClient instance
+    """
+    global _hardware_client_instance
+
+    if _hardware_client_instance is None:
+        with _hardware_client_lock:
+            if _hardware_client_instance is None:
+                _hardware_client_instance = HardwareClient()
+
+    return _hardware_client_instance
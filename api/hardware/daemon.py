@@ -0,0 +1,450 @@
+"""
+Hardware Daemon
+Created: 2025-12-11 20:00:00
+Last Modified: 2025-12-12 12:00:00
+Version: 1.3.1
+Description: Seri portun, event detector'ın ve session yazıcısının tek sahibi
+             olan süreç - durumu Unix domain socket üzerinden API worker'larına
+             yayınlar ve worker'lardan gelen komutları ESP32'ye iletir
+
+Kullanım:
+    python -m api.hardware.daemon [--socket /run/charger/hardware.sock]
+"""
+
+import argparse
+import os
+import queue
+import signal
+import socketserver
+import stat
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
+from api.config import config
+from api.hardware.protocol import (
+    BRIDGE_METHODS,
+    EVENT_CONNECTION,
+    EVENT_PING,
+    EVENT_SNAPSHOT,
+    EVENT_STATE,
+    EVENT_STATS,
+    EVENT_STATUS,
+    METHOD_SET_PENDING_USER_ID,
+    METHOD_SUBSCRIBE,
+    PING_INTERVAL,
+    STATS_INTERVAL,
+    ProtocolError,
+    decode_message,
+    encode_message,
+)
+from api.logging_config import system_logger
+
+# Abone başına maksimum bekleyen mesaj sayısı (dolarsa abone düşürülür)
+SUBSCRIBER_QUEUE_SIZE = 64
+
+
+class _Subscriber:
+    """Push mesajlarını alan tek bir worker bağlantısı"""
+
+    def __init__(self, maxsize: int):
+        self.queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(
+            maxsize=maxsize
+        )
+        self.dropped = False
+
+    def drop(self) -> None:
+        self.dropped = True
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    """
+    Tek bir worker bağlantısı
+
+    İlk mesaj "subscribe" ise bağlantı push kanalına dönüşür; aksi halde
+    istek/yanıt döngüsü olarak çalışır.
+    """
+
+    def handle(self) -> None:
+        daemon: "HardwareDaemon" = self.server.hardware_daemon
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            try:
+                message = decode_message(line)
+            except ProtocolError as e:
+                self._send({"id": None, "error": str(e)})
+                continue
+
+            if message.get("method") == METHOD_SUBSCRIBE:
+                daemon.serve_subscriber(self._send, message.get("id"))
+                return
+
+            self._send(daemon.handle_request(message))
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        self.wfile.write(encode_message(message))
+        self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    hardware_daemon: "HardwareDaemon"
+
+
+class HardwareDaemon:
+    """
+    Donanım sahibi süreç
+
+    ESP32Bridge, EventDetector ve SessionManager bu süreçte çalışır. Her
+    STAT mesajı, bağlantı değişikliği ve state transition'ı abone olan
+    worker'lara push edilir; bridge istatistikleri STATS_INTERVAL'de bir
+    yayınlanır. Worker'lar okumaları bu yayından yapar ve komutları (authorization, current set, charge stop, ...) istek/yanıt
+    bağlantısı ile iletir.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        bridge=None,
+        event_detector=None,
+        session_manager=None,
+    ):
+        """
+        Hardware daemon başlatıcı
+
+        Args:
+            socket_path: Unix domain socket yolu (None ise config'den)
+            bridge: ESP32Bridge instance'ı (None ise start() sırasında oluşturulur)
+            event_detector: EventDetector instance'ı
+            session_manager: SessionManager instance'ı
+        """
+        self.socket_path = socket_path or config.HARDWARE_SOCKET_PATH
+        self.bridge = bridge
+        self.event_detector = event_detector
+        self.session_manager = session_manager
+        self._server: Optional[_UnixServer] = None
+        self._server_thread: Optional[threading.Thread] = None
+        self._subscribers: List[_Subscriber] = []
+        self._subscribers_lock = threading.Lock()
+        self._callbacks_registered = False
+        self._stats_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self._server_thread is not None and self._server_thread.is_alive()
+
+    # Yaşam döngüsü
+
+    def start(self) -> None:
+        """Donanımı başlat (verilmediyse), callback'lere kaydol ve socket'i dinle"""
+        if self.is_running:
+            return
+        # Donanım açılmadan önce: socket yolu güvenli değilse hiç başlama
+        self._prepare_socket_path()
+        if self.bridge is None:
+            self._start_hardware()
+
+        self.bridge.register_status_callback(self._on_status)
+        self.bridge.register_connection_callback(self._on_connection)
+        if self.event_detector is not None:
+            # Session manager'dan sonra kaydolur: worker'a event ulaştığında
+            # session database'e yazılmış olur
+            self.event_detector.register_callback(self._on_event)
+        self._callbacks_registered = True
+
+        self._server = _UnixServer(self.socket_path, _ConnectionHandler)
+        self._server.hardware_daemon = self
+        # Sadece aynı kullanıcı/grup (API worker'ları) bağlanabilir
+        os.chmod(self.socket_path, 0o660)
+
+        self._server_thread = threading.Thread(
+            target=self._server.serve_forever, name="hardware-daemon", daemon=True
+        )
+        self._server_thread.start()
+
+        self._stop_event.clear()
+        self._stats_thread = threading.Thread(
+            target=self._stats_loop, name="hardware-daemon-stats", daemon=True
+        )
+        self._stats_thread.start()
+        system_logger.info(f"Hardware daemon dinliyor: {self.socket_path}")
+
+    def _prepare_socket_path(self) -> None:
+        """
+        Socket dizinini oluştur ve önceki süreçten kalan socket'i sil
+
+        Raises:
+            PermissionError: Yoldaki dosya başka bir kullanıcıya aitse veya
+                socket değilse (başka bir sürecin dosyası silinmez/ele geçirilmez)
+        """
+        socket_dir = os.path.dirname(self.socket_path)
+        if socket_dir:
+            os.makedirs(socket_dir, mode=0o770, exist_ok=True)
+
+        try:
+            path_stat = os.lstat(self.socket_path)
+        except FileNotFoundError:
+            return
+        if path_stat.st_uid != os.getuid():
+            raise PermissionError(
+                f"Socket yolu başka bir kullanıcıya ait (uid={path_stat.st_uid}): "
+                f"{self.socket_path}"
+            )
+        if not stat.S_ISSOCK(path_stat.st_mode):
+            raise PermissionError(f"Socket yolu bir socket değil: {self.socket_path}")
+        # Önceki süreçten kalan socket dosyası
+        os.unlink(self.socket_path)
+
+    def stop(self) -> None:
+        """Socket'i kapat ve callback kayıtlarını kaldır"""
+        self._stop_event.set()
+        if self._stats_thread is not None:
+            self._stats_thread.join(timeout=2.0)
+            self._stats_thread = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._server_thread is not None:
+            self._server_thread.join(timeout=2.0)
+            self._server_thread = None
+        if self._callbacks_registered:
+            self.bridge.unregister_status_callback(self._on_status)
+            self.bridge.unregister_connection_callback(self._on_connection)
+            if self.event_detector is not None:
+                self.event_detector.unregister_callback(self._on_event)
+            self._callbacks_registered = False
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscriber in subscribers:
+            # Bekleyen handler thread'ini uyandır; bağlantı kapanır ve
+            # worker'lar kopmayı hemen görür
+            subscriber.drop()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        system_logger.info("Hardware daemon durduruldu")
+
+    def _start_hardware(self) -> None:
+        """Bridge, event detector ve session manager'ı bu süreçte başlat"""
+        from api.event_detector import get_event_detector
+        from api.session import get_session_manager
+        from esp32.bridge import get_esp32_bridge
+
+        self.bridge = get_esp32_bridge()
+        self.event_detector = get_event_detector(get_esp32_bridge)
+        self.event_detector.start_monitoring()
+        self.session_manager = get_session_manager()
+        self.session_manager.register_with_event_detector(self.event_detector)
+        if config.SHARED_STATUS_PATH:
+            from api.shared_status import get_shared_status_publisher
+
+            shared_status = get_shared_status_publisher()
+            if shared_status.open():
+                shared_status.attach(
+                    self.bridge, self.event_detector, self.session_manager
+                )
+        system_logger.info(
+            "Hardware daemon: bridge, event detector ve session manager başlatıldı"
+        )
+
+    # Durum
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Yeni abone için tam durum
+
+        Returns:
+            Bağlantı durumu, son STAT ve event detector durumu
+        """
+        bridge = self.bridge
+        return {
+            "connected": bool(bridge and bridge.is_connected),
+            "reconnect_attempts": getattr(bridge, "_reconnect_attempts", 0),
+            "status": (
+                bridge.get_status(max_age_seconds=float("inf")) if bridge else None
+            ),
+            "detector": self._detector_state(),
+            "stats": self.get_stats(drain=False),
+        }
+
+    def get_stats(self, drain: bool = True) -> Dict[str, Any]:
+        """
+        Bridge istatistikleri (worker'ların metrics ve probe'ları için)
+
+        Args:
+            drain: Birikmiş ACK sürelerini de al (ve bridge'de temizle)
+
+        Returns:
+            I/O sayaçları, log sampling sayaçları ve ACK süreleri
+        """
+        bridge = self.bridge
+        if bridge is None:
+            return {}
+        stats = {
+            "io": bridge.get_io_stats(),
+            "log_sampling": bridge.get_log_sampling_stats(),
+            "ack_latencies": [],
+        }
+        if drain:
+            stats["ack_latencies"] = bridge.drain_ack_latencies()
+        return stats
+
+    def _stats_loop(self) -> None:
+        """İstatistikleri periyodik olarak tüm abonelere yayınla"""
+        while not self._stop_event.wait(STATS_INTERVAL):
+            try:
+                self.publish(EVENT_STATS, self.get_stats())
+            except Exception as e:
+                system_logger.warning(f"Hardware daemon istatistik hatası: {e}")
+
+    def _detector_state(self) -> Optional[Dict[str, Any]]:
+        detector = self.event_detector
+        if detector is None:
+            return None
+        thread = detector._monitor_thread
+        return {
+            "monitoring": detector.is_monitoring,
+            "thread_alive": bool(thread and thread.is_alive()),
+            "current_state": detector.get_current_state(),
+            "previous_state": detector.get_previous_state(),
+        }
+
+    # İstek/yanıt
+
+    def handle_request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Worker isteğini işle
+
+        Args:
+            message: {"id": ..., "method": ..., "params": {...}}
+
+        Returns:
+            {"id": ..., "result": ...} veya {"id": ..., "error": ...}
+        """
+        request_id = message.get("id")
+        method = message.get("method")
+        params = message.get("params") or {}
+        try:
+            if method == METHOD_SET_PENDING_USER_ID:
+                if self.session_manager is not None:
+                    self.session_manager.set_pending_user_id(params.get("user_id"))
+                return {"id": request_id, "result": None}
+            if method not in BRIDGE_METHODS or self.bridge is None:
+                raise ProtocolError(f"Bilinmeyen metod: {method}")
+            result = getattr(self.bridge, method)(**params)
+            return {"id": request_id, "result": result}
+        except Exception as e:
+            system_logger.warning(f"Hardware daemon istek hatası ({method}): {e}")
+            return {"id": request_id, "error": str(e)}
+
+    # Push kanalı
+
+    def serve_subscriber(self, send, request_id: Any = None) -> None:
+        """
+        Aboneye snapshot ve ardından push mesajlarını gönder
+
+        Bağlantının handler thread'inde çalışır; bağlantı kopana veya abone
+        düşürülene kadar döner.
+        """
+        subscriber = _Subscriber(SUBSCRIBER_QUEUE_SIZE)
+        with self._subscribers_lock:
+            self._subscribers.append(subscriber)
+        try:
+            send(
+                {"id": request_id, "event": EVENT_SNAPSHOT, "data": self.get_snapshot()}
+            )
+            while not subscriber.dropped:
+                try:
+                    message = subscriber.queue.get(timeout=PING_INTERVAL)
+                except queue.Empty:
+                    message = {"event": EVENT_PING, "data": self._detector_state()}
+                if message is None:
+                    break
+                send(message)
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass
+        finally:
+            with self._subscribers_lock:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+
+    def publish(self, event: str, data: Any) -> None:
+        """Mesajı tüm abonelere yayınla (thread-safe)"""
+        message = {"event": event, "data": data}
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.queue.put_nowait(message)
+            except queue.Full:
+                subscriber.drop()
+                system_logger.warning("Yavaş hardware daemon abonesi düşürüldü")
+
+    def _on_status(self, status: Dict[str, Any]) -> None:
+        self.publish(EVENT_STATUS, status)
+
+    def _on_connection(self, connected: bool) -> None:
+        self.publish(
+            EVENT_CONNECTION,
+            {
+                "connected": connected,
+                "reconnect_attempts": getattr(self.bridge, "_reconnect_attempts", 0),
+            },
+        )
+
+    def _on_event(self, event_type, event_data: Dict[str, Any]) -> None:
+        self.publish(
+            EVENT_STATE,
+            {
+                "event_type": getattr(event_type, "value", event_type),
+                "event_data": event_data,
+                "detector": self._detector_state(),
+            },
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Charger hardware daemon")
+    parser.add_argument("--socket", default=None, help="Unix domain socket yolu")
+    args = parser.parse_args()
+
+    # Daemon her zaman donanımın sahibidir (ortamda API_MODE=worker olsa bile)
+    config.API_MODE = "standalone"
+
+    daemon = HardwareDaemon(socket_path=args.socket)
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+
+    try:
+        daemon.start()
+    except Exception as e:
+        system_logger.error(f"Hardware daemon başlatılamadı: {e}", exc_info=True)
+        sys.exit(1)
+
+    stop_event.wait()
+    daemon.stop()
+    from api.meter import get_meter_sampler
+    from api.shared_status import get_shared_status_publisher
+
+    get_shared_status_publisher().close()
+    get_meter_sampler().stop()
+    if daemon.event_detector is not None:
+        daemon.event_detector.stop_monitoring()
+    if daemon.bridge is not None:
+        daemon.bridge.disconnect()
+
+
+if __name__ == "__main__":
+    main()
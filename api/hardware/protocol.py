@@ -0,0 +1,87 @@
+"""
+Hardware Daemon Protocol
+Created: 2025-12-11 20:00:00
+Last Modified: 2025-12-12 12:00:00
+Version: 1.1.1
+Description: Hardware daemon ile API worker'ları arasındaki Unix domain socket
+             protokolü - satır bazlı JSON mesajları
+"""
+
+import json
+from typing import Any, Dict
+
+# Varsayılan Unix domain socket yolu (config.HARDWARE_SOCKET_PATH ile ezilir)
+# Servise ait dizin (systemd RuntimeDirectory=charger); /tmp herkese yazılabilir
+DEFAULT_SOCKET_PATH = "/run/charger/hardware.sock"
+
+# Tek bir mesajın maksimum boyutu (byte) - bozuk/kötü niyetli istemciye karşı
+MAX_MESSAGE_SIZE = 1024 * 1024
+
+# Abonelere mesaj gelmediğinde gönderilen ping aralığı (saniye)
+# İstemci bu sürenin üç katı boyunca mesaj alamazsa bağlantıyı ölü kabul eder
+PING_INTERVAL = 5.0
+
+# Bridge istatistiklerinin (I/O sayaçları, log sampling, ACK süreleri)
+# abonelere push edilme aralığı (saniye)
+STATS_INTERVAL = 5.0
+
+# İstek metodları
+METHOD_SUBSCRIBE = "subscribe"
+METHOD_SET_PENDING_USER_ID = "set_pending_user_id"
+
+# Worker'ların çağırabileceği bridge metodları (whitelist)
+# İstatistikler istek/yanıt ile değil, EVENT_STATS ile push edilir
+BRIDGE_METHODS = frozenset(
+    {
+        "send_authorization",
+        "send_current_set",
+        "send_charge_stop",
+        "get_status_sync",
+    }
+)
+
+# Push mesaj tipleri (daemon -> abone)
+EVENT_SNAPSHOT = "snapshot"
+EVENT_STATUS = "status"
+EVENT_CONNECTION = "connection"
+EVENT_STATE = "state"
+EVENT_PING = "ping"
+EVENT_STATS = "stats"
+
+
+class ProtocolError(Exception):
+    """Geçersiz protokol mesajı"""
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """
+    Mesajı tek satır JSON olarak encode et
+
+    Args:
+        message: JSON'a çevrilebilir mesaj
+
+    Returns:
+        Satır sonu ile biten UTF-8 byte dizisi
+    """
+    return (
+        json.dumps(message, ensure_ascii=False, default=str, separators=(",", ":"))
+        + "\n"
+    ).encode("utf-8")
+
+
+def decode_message(line: bytes) -> Dict[str, Any]:
+    """
+    Tek satırlık mesajı decode et
+
+    Raises:
+        ProtocolError: Mesaj çok büyük, JSON değil veya obje değil
+    """
+    if len(line) > MAX_MESSAGE_SIZE:
+        raise ProtocolError("Mesaj çok büyük")
+    try:
+        message = json.loads(line)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ProtocolError(f"Geçersiz JSON: {e}")
+    if not isinstance(message, dict):
+        raise ProtocolError("Mesaj JSON obje olmalı")
+    return message
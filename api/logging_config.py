@@ -1,19 +1,21 @@
 """
 Logging Configuration Module
 Created: 2025-12-09 15:40:00
-Last Modified: 2025-12-09 15:40:00
-Version: 1.0.0
+Last Modified: 2025-12-11 10:30:00
+Version: 1.1.0
 Description: Structured logging configuration for AC Charger API
+             (QueueHandler/QueueListener tabanlı asenkron pipeline)
 """
 
+import atexit
 import logging
 import json
+import queue
 import sys
 from pathlib import Path
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
-from typing import Any, Dict, Optional
-import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional
 
 # Log dosyaları için klasör
 LOG_DIR = Path(__file__).parent.parent / "logs"
@@ -28,11 +30,23 @@ SYSTEM_LOG_FILE = LOG_DIR / "system.log"
 MAX_BYTES = 10 * 1024 * 1024  # 10MB
 BACKUP_COUNT = 5  # 5 yedek dosya
 
+# Log queue kapasitesi (logger başına)
+# Dolarsa yeni kayıtlar atılır; hot path hiçbir zaman disk I/O için beklemez.
+LOG_QUEUE_SIZE = 10000
+
+
+def _json_default(value: Any) -> str:
+    """JSON'a çevrilemeyen değerler için fallback (tek geçişte string'e çevir)"""
+    return str(value)
+
 
 class JSONFormatter(logging.Formatter):
     """
     JSON formatında log mesajları oluşturan formatter
     Thread-safe
+
+    Non-serializable değerler json.dumps(default=...) ile tek geçişte
+    string'e çevrilir (alan başına ayrı serialization testi yapılmaz).
     """
 
     def format(self, record: logging.LogRecord) -> str:
@@ -57,22 +71,18 @@ class JSONFormatter(logging.Formatter):
             }
 
             # Exception bilgisi varsa ekle
+            # (queue'ya konmadan önce exc_text olarak hazırlanmış olabilir)
             if record.exc_info:
                 log_data["exception"] = self.formatException(record.exc_info)
+            elif record.exc_text:
+                log_data["exception"] = record.exc_text
 
             # Ekstra alanlar varsa ekle
-            if hasattr(record, "extra_fields"):
-                # Non-serializable objeleri string'e çevir
-                safe_fields = {}
-                for key, value in record.extra_fields.items():
-                    try:
-                        json.dumps(value)  # Test serialization
-                        safe_fields[key] = value
-                    except (TypeError, ValueError):
-                        safe_fields[key] = str(value)
-                log_data.update(safe_fields)
-
-            return json.dumps(log_data, ensure_ascii=False)
+            extra_fields = getattr(record, "extra_fields", None)
+            if extra_fields:
+                log_data.update(extra_fields)
+
+            return json.dumps(log_data, ensure_ascii=False, default=_json_default)
         except Exception as e:
             # Fallback: basit JSON format
             return json.dumps(
@@ -91,6 +101,44 @@ class JSONFormatter(logging.Formatter):
             )
 
 
+class LogQueueHandler(QueueHandler):
+    """
+    Hot path için hafif QueueHandler
+
+    Varsayılan QueueHandler.prepare() kaydı çağıran thread'de tamamen
+    formatlar. Burada sadece mesaj birleştirilir ve exception traceback'i
+    metne çevrilir (frame referansları tutulmasın diye); JSON üretimi
+    QueueListener thread'inde yapılır.
+    Queue doluysa kayıt sessizce atılır ve sayaç artırılır.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped_records = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_records += 1
+
+
+_exception_formatter = logging.Formatter()
+
+# Aktif queue listener'lar (shutdown'da flush için)
+_listeners: List[QueueListener] = []
+
+
 def setup_logger(
     name: str,
     log_file: Path,
@@ -118,6 +166,9 @@ def setup_logger(
     if logger.handlers:
         return logger
 
+    # Gerçek I/O yapan handler'lar QueueListener thread'inde çalışır
+    target_handlers: List[logging.Handler] = []
+
     # JSON formatter
     json_formatter = JSONFormatter()
 
@@ -128,10 +179,12 @@ def setup_logger(
         )
         file_handler.setLevel(level)
         file_handler.setFormatter(json_formatter)
-        logger.addHandler(file_handler)
+        target_handlers.append(file_handler)
     except (OSError, PermissionError) as e:
         # Dosya yazma hatası - sadece console logging kullan
-        logger.warning(f"File logging failed for {log_file}: {e}, using console only")
+        sys.stderr.write(
+            f"File logging failed for {log_file}: {e}, using console only\n"
+        )
 
     # Console handler (geliştirme için)
     console_handler = logging.StreamHandler(sys.stdout)
@@ -142,11 +195,81 @@ def setup_logger(
         datefmt="%Y-%m-%d %H:%M:%S",
     )
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    target_handlers.append(console_handler)
+
+    # Logger sadece queue'ya yazar (hot path: enqueue only)
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = LogQueueHandler(log_queue)
+    queue_handler.setLevel(level)
+    logger.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, *target_handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
 
     return logger
 
 
+def stop_log_listeners() -> None:
+    """
+    Queue listener'ları durdur ve bekleyen kayıtları diske yaz
+
+    Process kapanışında atexit ile otomatik çağrılır.
+    """
+    while _listeners:
+        listener = _listeners.pop()
+        try:
+            listener.stop()
+        except Exception:
+            pass
+
+
+atexit.register(stop_log_listeners)
+
+
+def _make_record(
+    logger: logging.Logger,
+    level: int,
+    msg: str,
+    extra_fields: Dict[str, Any],
+) -> logging.LogRecord:
+    """
+    Ekstra alanlı log kaydı oluştur
+
+    Çağıran fonksiyonun konumu sys._getframe ile alınır
+    (inspect modülü ve frame zinciri taraması gerekmez).
+
+    Args:
+        logger: Hedef logger
+        level: Log seviyesi
+        msg: Log mesajı
+        extra_fields: JSON çıktısına eklenecek alanlar
+
+    Returns:
+        LogRecord
+    """
+    try:
+        frame = sys._getframe(2)
+        pathname = frame.f_code.co_filename
+        lineno = frame.f_lineno
+        func = frame.f_code.co_name
+    except (AttributeError, ValueError):
+        pathname, lineno, func = "", 0, None
+
+    record = logging.LogRecord(
+        name=logger.name,
+        level=level,
+        pathname=pathname,
+        lineno=lineno,
+        msg=msg,
+        args=(),
+        exc_info=None,
+        func=func,
+    )
+    record.extra_fields = extra_fields
+    return record
+
+
 # Ana logger'lar
 api_logger = setup_logger("api", API_LOG_FILE)
 esp32_logger = setup_logger("esp32", ESP32_LOG_FILE)
@@ -175,38 +298,27 @@ def log_api_request(
         **kwargs: Ekstra alanlar
     """
     try:
-        with _log_lock:  # Thread-safe logging
-            extra_fields = {
-                "type": "api_request",
-                "method": method,
-                "path": path,
-                **kwargs,
-            }
-
-            if client_ip:
-                extra_fields["client_ip"] = client_ip
-            if status_code:
-                extra_fields["status_code"] = status_code
-            if response_time_ms is not None:
-                extra_fields["response_time_ms"] = response_time_ms
-            if user_id:
-                extra_fields["user_id"] = user_id
-
-            # Log kaydına ekstra alanları ekle
-            import inspect
-
-            frame = inspect.currentframe().f_back
-            record = logging.LogRecord(
-                name=api_logger.name,
-                level=logging.INFO,
-                pathname=frame.f_code.co_filename if frame else "",
-                lineno=frame.f_lineno if frame else 0,
-                msg=f"{method} {path}",
-                args=(),
-                exc_info=None,
-            )
-            record.extra_fields = extra_fields
-            api_logger.handle(record)
+        extra_fields = {
+            "type": "api_request",
+            "method": method,
+            "path": path,
+            **kwargs,
+        }
+
+        if client_ip:
+            extra_fields["client_ip"] = client_ip
+        if status_code:
+            extra_fields["status_code"] = status_code
+        if response_time_ms is not None:
+            extra_fields["response_time_ms"] = response_time_ms
+        if user_id:
+            extra_fields["user_id"] = user_id
+
+        # Log kaydına ekstra alanları ekle
+        record = _make_record(
+            api_logger, logging.INFO, f"{method} {path}", extra_fields
+        )
+        api_logger.handle(record)
     except Exception as e:
         # Logging hatası API'yi etkilememeli
         # Fallback: basit console logging
@@ -232,31 +344,23 @@ def log_esp32_message(
         **kwargs: Ekstra alanlar
     """
     try:
-        with _log_lock:  # Thread-safe logging
-            extra_fields = {
-                "type": "esp32_message",
-                "message_type": message_type,
-                "direction": direction,
-                **kwargs,
-            }
-
-            if data is not None:
-                extra_fields["data"] = data
-
-            import inspect
-
-            frame = inspect.currentframe().f_back
-            record = logging.LogRecord(
-                name=esp32_logger.name,
-                level=logging.INFO,
-                pathname=frame.f_code.co_filename if frame else "",
-                lineno=frame.f_lineno if frame else 0,
-                msg=f"ESP32 {direction.upper()}: {message_type}",
-                args=(),
-                exc_info=None,
-            )
-            record.extra_fields = extra_fields
-            esp32_logger.handle(record)
+        extra_fields = {
+            "type": "esp32_message",
+            "message_type": message_type,
+            "direction": direction,
+            **kwargs,
+        }
+
+        if data is not None:
+            extra_fields["data"] = data
+
+        record = _make_record(
+            esp32_logger,
+            logging.INFO,
+            f"ESP32 {direction.upper()}: {message_type}",
+            extra_fields,
+        )
+        esp32_logger.handle(record)
     except Exception as e:
         # Logging hatası uygulamayı etkilememeli
         try:
@@ -283,26 +387,15 @@ def log_event(
         **kwargs: Ekstra alanlar
     """
     try:
-        with _log_lock:  # Thread-safe logging
-            extra_fields = {"type": "event", "event_type": event_type, **kwargs}
-
-            if event_data:
-                extra_fields["event_data"] = event_data
-
-            import inspect
-
-            frame = inspect.currentframe().f_back
-            record = logging.LogRecord(
-                name=system_logger.name,
-                level=level,
-                pathname=frame.f_code.co_filename if frame else "",
-                lineno=frame.f_lineno if frame else 0,
-                msg=f"Event: {event_type}",
-                args=(),
-                exc_info=None,
-            )
-            record.extra_fields = extra_fields
-            system_logger.handle(record)
+        extra_fields = {"type": "event", "event_type": event_type, **kwargs}
+
+        if event_data:
+            extra_fields["event_data"] = event_data
+
+        record = _make_record(
+            system_logger, level, f"Event: {event_type}", extra_fields
+        )
+        system_logger.handle(record)
     except Exception as e:
         # Logging hatası uygulamayı etkilememeli
         try:
@@ -311,10 +404,6 @@ def log_event(
             pass  # Son çare: sessizce geç
 
 
-# Thread-safe logging için lock
-_log_lock = threading.Lock()
-
-
 def get_logger(name: str) -> logging.Logger:
     """
     Logger instance'ı al (convenience function)
@@ -340,18 +429,17 @@ def thread_safe_log(
         message: Log mesajı
         **kwargs: Ekstra alanlar
     """
-    with _log_lock:
-        if kwargs:
-            record = logging.LogRecord(
-                name=logger.name,
-                level=level,
-                pathname="",
-                lineno=0,
-                msg=message,
-                args=(),
-                exc_info=None,
-            )
-            record.extra_fields = kwargs
-            logger.handle(record)
-        else:
-            logger.log(level, message)
+    if kwargs:
+        record = logging.LogRecord(
+            name=logger.name,
+            level=level,
+            pathname="",
+            lineno=0,
+            msg=message,
+            args=(),
+            exc_info=None,
+        )
+        record.extra_fields = kwargs
+        logger.handle(record)
+    else:
+        logger.log(level, message)
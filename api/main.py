@@ -1,7 +1,7 @@
 """
 AC Charger REST API
 Created: 2025-12-08
-Last Modified: 2025-12-10 02:30:00
+Last Modified: 2025-12-12 12:00:00
 Version: 2.0.0
 Description: ESP32 kontrolü için REST API endpoint'leri
 """
@@ -39,11 +39,18 @@ from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from api.event_detector import get_event_detector
 from api.exceptions import APIException
 from api.logging_config import log_api_request, system_logger
+from api.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    http_requests_total,
+    http_response_size_bytes,
+    resolve_route_template,
+)
 from api.rate_limiting import setup_rate_limiting
 from api.session import get_session_manager
 
@@ -52,6 +59,7 @@ from api.routers import (
     charge,
     current,
     meter,
+    probes,
     station,
     status as status_router,
     test,
@@ -76,69 +84,113 @@ app.include_router(meter.router)
 app.include_router(station.router)
 app.include_router(test.router)
 app.include_router(sessions.router)
+app.include_router(probes.router)
+
+
+# Loglanmayan path'ler (şarj başlatma/bitirme kendi event loglarını yazar,
+# liveness/readiness probe'ları birkaç saniyede bir çağrılır)
+UNLOGGED_PATHS = frozenset(
+    {"/api/charge/start", "/api/charge/stop", "/livez", "/readyz"}
+)
 
 
 # API Request Logging Middleware
-class APILoggingMiddleware(BaseHTTPMiddleware):
-    """API isteklerini loglayan middleware"""
+class APILoggingMiddleware:
+    """
+    API isteklerini loglayan ve metrics'e yazan middleware (pure ASGI)
 
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+    Status kodu ve response boyutu send() mesajlarından okunur; response
+    body'si sarılmaz veya buffer'lanmaz, streaming response'lar (SSE)
+    olduğu gibi geçer. Log kaydı logging queue'suna eklenir.
+    """
 
-        # İstemci IP adresini al
-        client_ip = request.client.host if request.client else None
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        # User ID'yi configuration'dan al (audit trail için)
-        user_id = config.get_user_id()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # İsteği işle
-        response = await call_next(request)
+        start_time = time.perf_counter()
+        method = scope["method"]
+        status_code = 500  # Response başlamadan exception olursa
+        response_size = 0
 
-        # Yanıt süresini hesapla
-        process_time = (time.time() - start_time) * 1000  # milisaniye
-        process_time_seconds = process_time / 1000.0
+        # In-flight gauge (route template ile, ham path ile değil)
+        in_progress = http_requests_in_progress.labels(
+            method=method, endpoint=resolve_route_template(scope)
+        )
+        in_progress.inc()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            message_type = message["type"]
+            if message_type == "http.response.start":
+                status_code = message["status"]
+            elif message_type == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
 
-        # Metrics'i güncelle
         try:
-            from api.metrics import (
-                http_requests_total,
-                http_request_duration_seconds,
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            self._record(
+                scope, status_code, response_size, time.perf_counter() - start_time
             )
 
-            # Request counter
-            endpoint = request.url.path
+    @staticmethod
+    def _record(
+        scope: Scope, status_code: int, response_size: int, duration: float
+    ) -> None:
+        """
+        İstek metriklerini güncelle ve logla
+
+        Args:
+            scope: ASGI scope (routing sonrası "route" içerir)
+            status_code: HTTP durum kodu
+            response_size: Gönderilen body boyutu (byte)
+            duration: İstek süresi (saniye)
+        """
+        method = scope["method"]
+
+        # Metrics'i güncelle
+        try:
+            # Label olarak eşleşen route template'i kullan
+            # (/api/sessions/{session_id}); eşleşmeyen path'ler tek label'da toplanır
+            endpoint = resolve_route_template(scope)
             http_requests_total.labels(
-                method=request.method,
-                endpoint=endpoint,
-                status_code=response.status_code,
+                method=method, endpoint=endpoint, status_code=status_code
             ).inc()
-
-            # Request duration histogram
             http_request_duration_seconds.labels(
-                method=request.method,
-                endpoint=endpoint,
-            ).observe(process_time_seconds)
+                method=method, endpoint=endpoint
+            ).observe(duration)
+            http_response_size_bytes.labels(method=method, endpoint=endpoint).observe(
+                response_size
+            )
         except Exception:
             # Metrics hatası API response'u etkilememeli
             pass
 
         # Logla (şarj başlatma/bitirme hariç)
-        if request.url.path not in ["/api/charge/start", "/api/charge/stop"]:
-            try:
-                log_api_request(
-                    method=request.method,
-                    path=request.url.path,
-                    client_ip=client_ip,
-                    status_code=response.status_code,
-                    response_time_ms=process_time,
-                    user_id=user_id,
-                )
-            except Exception:
-                # Logging hatası API response'u etkilememeli
-                # Sessizce geç (veya fallback logging)
-                pass
-
-        return response
+        path = scope["path"]
+        if path in UNLOGGED_PATHS:
+            return
+        try:
+            client = scope.get("client")
+            log_api_request(
+                method=method,
+                path=path,
+                client_ip=client[0] if client else None,
+                status_code=status_code,
+                response_time_ms=duration * 1000,
+                # User ID'yi configuration'dan al (audit trail için)
+                user_id=config.get_user_id(),
+            )
+        except Exception:
+            # Logging hatası API response'u etkilememeli
+            pass
 
 
 # CORS Middleware'i ekle
@@ -191,51 +243,70 @@ async def startup_event():
             }
         )
 
-        bridge = get_esp32_bridge()
-        if not bridge.is_connected:
-            system_logger.warning("ESP32 bağlantısı başlatılamadı")
+        # Health endpoint'inin ve Prometheus gauge'larının sistem değerleri
+        # (network, disk, memory, CPU, sıcaklık) arka plan probe servisinden
+        # okunur (event loop bloklanmaz)
+        from api.system_probe import get_system_probe
+
+        get_system_probe().start()
+
+        if config.is_api_worker():
+            # Seri port, event detector ve session yazıcısı hardware daemon'da;
+            # bu worker durumu Unix socket üzerinden alır, komutları iletir
+            from api.hardware import get_hardware_client
+
+            hardware_client = get_hardware_client()
+            hardware_client.start()
+            bridge = hardware_client.bridge
+            event_detector = hardware_client.event_detector
+            system_logger.info(
+                f"API worker modu: hardware daemon'a bağlanılıyor ({hardware_client.socket_path})"
+            )
         else:
-            system_logger.info("ESP32 bridge başarıyla başlatıldı")
+            bridge = get_esp32_bridge()
+            if not bridge.is_connected:
+                system_logger.warning("ESP32 bağlantısı başlatılamadı")
+            else:
+                system_logger.info("ESP32 bridge başarıyla başlatıldı")
+
+            # Event detector'ı başlat
+            event_detector = get_event_detector(get_esp32_bridge)
+            event_detector.start_monitoring()
+            system_logger.info("Event detector başlatıldı")
+
+            # Session manager'ı başlat ve event detector'a kaydet
+            session_manager = get_session_manager()
+            session_manager.register_with_event_detector(event_detector)
+            system_logger.info(
+                "Session manager başlatıldı ve event detector'a kaydedildi"
+            )
 
-        # Event detector'ı başlat
-        event_detector = get_event_detector(get_esp32_bridge)
-        event_detector.start_monitoring()
-        system_logger.info("Event detector başlatıldı")
+            # Diğer süreçler için /dev/shm durum kaydı (session manager'dan sonra)
+            if config.SHARED_STATUS_PATH:
+                from api.shared_status import get_shared_status_publisher
 
-        # Session manager'ı başlat ve event detector'a kaydet
-        session_manager = get_session_manager()
-        session_manager.register_with_event_detector(event_detector)
-        system_logger.info("Session manager başlatıldı ve event detector'a kaydedildi")
+                shared_status = get_shared_status_publisher()
+                if shared_status.open():
+                    shared_status.attach(bridge, event_detector, session_manager)
 
-        # Alert manager'ı başlat ve periyodik değerlendirme başlat
+        # Canlı durum yayıncısını bridge ve event detector'a bağla
+        # (session manager'dan sonra kaydolur, böylece session özeti güncel olur)
+        from api.streaming import get_status_broadcaster
+
+        get_status_broadcaster().attach(bridge=bridge, event_detector=event_detector)
+
+        # Alert manager'ı başlat: kurallar kendi aralıklarında worker thread'de
+        # değerlendirilir (metrics güncellemesi dahil), bağlantı kopması ve
+        # FAULT_HARD event'leri anında değerlendirme tetikler
         from api.alerting import get_alert_manager
-        import asyncio
 
-        alert_manager = get_alert_manager()
-        system_logger.info(
-            f"Alert manager başlatıldı ({len(alert_manager.rules)} alert rule)"
-        )
+        from api.streaming import get_alert_broadcaster
 
-        # Periyodik alert değerlendirme (her 30 saniyede bir)
-        async def periodic_alert_evaluation():
-            while True:
-                try:
-                    from api.metrics import update_all_metrics
-
-                    update_all_metrics(bridge=bridge, event_detector=event_detector)
-                    alerts = alert_manager.evaluate_all(
-                        bridge=bridge, event_detector=event_detector
-                    )
-                    if alerts:
-                        system_logger.warning(f"{len(alerts)} yeni alert tetiklendi")
-                except Exception as e:
-                    system_logger.error(f"Alert evaluation error: {e}", exc_info=True)
-                await asyncio.sleep(30)  # 30 saniye
-
-        # Background task olarak başlat
-        asyncio.create_task(periodic_alert_evaluation())
+        alert_manager = get_alert_manager()
+        get_alert_broadcaster().attach_alert_manager(alert_manager)
+        alert_manager.start_scheduler(bridge=bridge, event_detector=event_detector)
         system_logger.info(
-            "Periyodik alert değerlendirme başlatıldı (30 saniye interval)"
+            f"Alert scheduler başlatıldı ({len(alert_manager.rules)} alert rule)"
         )
 
     except Exception as e:
@@ -252,48 +323,97 @@ async def shutdown_event():
     try:
         system_logger.info("Shutdown başlatılıyor...")
 
-        # 1. Event detector'ı durdur (timeout ile)
-        try:
-            event_detector = get_event_detector(get_esp32_bridge)
-            if event_detector and event_detector.is_monitoring:
-                event_detector.stop_monitoring()
-                system_logger.info("Event detector durdurma komutu gönderildi")
-
-                # Monitor thread'inin bitmesini bekle (timeout ile)
-                if (
-                    event_detector._monitor_thread
-                    and event_detector._monitor_thread.is_alive()
-                ):
-                    event_detector._monitor_thread.join(timeout=5.0)
-                    if event_detector._monitor_thread.is_alive():
-                        system_logger.warning(
-                            "Event detector thread timeout - zorla durduruldu"
-                        )
+        if config.is_api_worker():
+            # Donanım hardware daemon'a ait - sadece daemon bağlantısını kapat
+            try:
+                from api.hardware import get_hardware_client
+
+                get_hardware_client().stop()
+                system_logger.info("Hardware daemon bağlantısı kapatıldı")
+            except Exception as e:
+                system_logger.warning(f"Hardware client durdurma hatası: {e}")
+
+        else:
+            # 1. Event detector'ı durdur (timeout ile)
+            try:
+                event_detector = get_event_detector(get_esp32_bridge)
+                if event_detector and event_detector.is_monitoring:
+                    event_detector.stop_monitoring()
+                    system_logger.info("Event detector durdurma komutu gönderildi")
+
+                    # Monitor thread'inin bitmesini bekle (timeout ile)
+                    if (
+                        event_detector._monitor_thread
+                        and event_detector._monitor_thread.is_alive()
+                    ):
+                        event_detector._monitor_thread.join(timeout=5.0)
+                        if event_detector._monitor_thread.is_alive():
+                            system_logger.warning(
+                                "Event detector thread timeout - zorla durduruldu"
+                            )
+                        else:
+                            system_logger.info(
+                                "Event detector thread başarıyla durduruldu"
+                            )
+            except Exception as e:
+                system_logger.warning(
+                    f"Event detector durdurma hatası: {e}", exc_info=True
+                )
+
+            # 2. ESP32 bridge'i kapat (timeout ile)
+            try:
+                bridge = get_esp32_bridge()
+                if bridge:
+                    if bridge.is_connected:
+                        # Monitor thread'inin bitmesini bekle
+                        if bridge._monitor_thread and bridge._monitor_thread.is_alive():
+                            bridge._monitor_running = False
+                            bridge._monitor_thread.join(timeout=3.0)
+                            if bridge._monitor_thread.is_alive():
+                                system_logger.warning(
+                                    "ESP32 bridge monitor thread timeout"
+                                )
+
+                        bridge.disconnect()
+                        system_logger.info("ESP32 bridge kapatıldı")
                     else:
-                        system_logger.info("Event detector thread başarıyla durduruldu")
+                        system_logger.info("ESP32 bridge zaten bağlantısız")
+            except Exception as e:
+                system_logger.warning(
+                    f"ESP32 bridge kapatma hatası: {e}", exc_info=True
+                )
+
+        # 3. Paylaşılan durum kaydı, meter sampler, alert scheduler ve sistem metrik toplayıcısını durdur
+        try:
+            from api.shared_status import get_shared_status_publisher
+
+            get_shared_status_publisher().close()
+        except Exception as e:
+            system_logger.warning(f"Paylaşılan durum kaydı kapatma hatası: {e}")
+
+        if not config.is_api_worker():
+            try:
+                from api.meter import get_meter_sampler
+
+                get_meter_sampler().stop()
+            except Exception as e:
+                system_logger.warning(f"Meter sampler durdurma hatası: {e}")
+
+        try:
+            from api.alerting import get_alert_manager
+
+            get_alert_manager().stop_scheduler()
         except Exception as e:
-            system_logger.warning(f"Event detector durdurma hatası: {e}", exc_info=True)
+            system_logger.warning(f"Alert scheduler durdurma hatası: {e}")
 
-        # 2. ESP32 bridge'i kapat (timeout ile)
         try:
-            bridge = get_esp32_bridge()
-            if bridge:
-                if bridge.is_connected:
-                    # Monitor thread'inin bitmesini bekle
-                    if bridge._monitor_thread and bridge._monitor_thread.is_alive():
-                        bridge._monitor_running = False
-                        bridge._monitor_thread.join(timeout=3.0)
-                        if bridge._monitor_thread.is_alive():
-                            system_logger.warning("ESP32 bridge monitor thread timeout")
-
-                    bridge.disconnect()
-                    system_logger.info("ESP32 bridge kapatıldı")
-                else:
-                    system_logger.info("ESP32 bridge zaten bağlantısız")
+            from api.system_probe import get_system_probe
+
+            get_system_probe().stop()
         except Exception as e:
-            system_logger.warning(f"ESP32 bridge kapatma hatası: {e}", exc_info=True)
+            system_logger.warning(f"System probe durdurma hatası: {e}")
 
-        # 3. Shutdown süresini kontrol et
+        # 4. Shutdown süresini kontrol et
         shutdown_duration = time.time() - start_time
         if shutdown_duration > shutdown_timeout:
             system_logger.warning(
@@ -1,12 +1,46 @@
 """
 Meter Integration Module
 Created: 2025-12-10 07:00:00
-Last Modified: 2025-12-10 07:00:00
-Version: 1.0.0
+Last Modified: 2025-12-12 09:00:00
+Version: 1.5.0
 Description: Energy meter entegrasyonu için abstraction layer
 """
 
+from api.meter.bus import BusScheduler, scan_bus
 from api.meter.interface import MeterInterface, MeterReading, get_meter
 from api.meter.mock import MockMeter
+from api.meter.modbus import ModbusMeter
+from api.meter.power_quality import PowerQualityMonitor, get_power_quality_monitor
+from api.meter.registers import METER_PROFILES, MeterProfile, RegisterSpec
+from api.meter.sampler import MeterSampler, get_meter_sampler
+from api.meter.transport import (
+    ModbusError,
+    ModbusTransport,
+    RtuTransport,
+    TcpTransport,
+    get_transport_pool,
+)
+from api.meter.virtual import VirtualMeter
 
-__all__ = ["MeterInterface", "MeterReading", "get_meter", "MockMeter"]
+__all__ = [
+    "MeterInterface",
+    "MeterReading",
+    "get_meter",
+    "MockMeter",
+    "ModbusMeter",
+    "METER_PROFILES",
+    "MeterProfile",
+    "RegisterSpec",
+    "ModbusError",
+    "ModbusTransport",
+    "RtuTransport",
+    "TcpTransport",
+    "get_transport_pool",
+    "MeterSampler",
+    "get_meter_sampler",
+    "BusScheduler",
+    "scan_bus",
+    "PowerQualityMonitor",
+    "get_power_quality_monitor",
+    "VirtualMeter",
+]
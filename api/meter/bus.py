@@ -0,0 +1,402 @@
+"""
+Meter Bus Scheduler Module
+Created: 2025-12-12 05:00:00
+Last Modified: 2025-12-12 11:00:00
+Version: 1.0.1
+Description: Tek RS-485 hattındaki birden fazla meter'ın (slave ID) öncelik ve
+             periyoda göre sıralı okunması, yanıt vermeyen slave'ler için
+             back-off ve kısa timeout'lu hızlı bus taraması
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from api.logging_config import system_logger
+from api.meter.interface import MeterReading
+from api.meter.modbus import ModbusMeter
+from api.meter.registers import MODBUS_READ_HOLDING_REGISTERS
+from api.meter.transport import (
+    ModbusError,
+    ModbusExceptionResponse,
+    ModbusTransport,
+    RtuTransport,
+    rtu_char_time,
+)
+
+# Varsayılan periyotlar (saniye)
+ACTIVE_INTERVAL = 1.0  # Şarj eden noktanın meter'ı
+IDLE_INTERVAL = 30.0  # Boştaki meter'lar
+MAX_BACKOFF = 300.0  # Yanıt vermeyen slave için en uzun bekleme
+# Back-off çarpanının üssü (2**n) bu değerle sınırlanır; art arda binlerce
+# hatada float taşmasını (OverflowError) önler
+MAX_BACKOFF_EXPONENT = 16
+
+# set_active() ile seçilen meter'ın önceliği
+ACTIVE_PRIORITY = 10
+
+# Tarama: cevap frame'inin hat süresine eklenen meter işlem payı (saniye)
+SCAN_RESPONSE_MARGIN = 0.05
+SCAN_TCP_TIMEOUT = 0.2
+# Read request (8 byte) + tek register'lık response (7 byte)
+SCAN_FRAME_CHARS = 15
+
+
+@dataclass
+class BusDevice:
+    """
+    Bus üzerindeki bir meter ve okuma takvimi
+
+    Attributes:
+        meter: Okunacak ModbusMeter
+        interval: Okuma periyodu (saniye)
+        priority: Aynı anda sırası gelen meter'lar arasında öncelik (büyük önce)
+        next_poll: Bir sonraki okuma zamanı (time.monotonic)
+        failures: Art arda başarısız okuma sayısı
+        last_reading: Son geçerli okuma
+        last_success: Son başarılı okuma zamanı (time.monotonic)
+    """
+
+    meter: ModbusMeter
+    interval: float = IDLE_INTERVAL
+    priority: int = 0
+    next_poll: float = 0.0
+    failures: int = 0
+    last_reading: Optional[MeterReading] = None
+    last_success: Optional[float] = None
+
+    @property
+    def slave_id(self) -> int:
+        return self.meter.slave_id
+
+
+class BusScheduler:
+    """
+    RS-485 bus zamanlayıcısı
+
+    Hattaki tüm okumalar tek thread'den yapılır. Her turda sırası gelmiş
+    meter'lardan en yüksek öncelikli (eşitse en çok gecikmiş) olan okunur;
+    sırası gelen yoksa en yakın okuma zamanına kadar beklenir. Yanıt
+    vermeyen slave'in periyodu her hatada ikiye katlanır (MAX_BACKOFF'a
+    kadar), böylece timeout'lar aktif meter'ın okumalarını geciktirmez.
+    """
+
+    def __init__(
+        self,
+        active_interval: float = ACTIVE_INTERVAL,
+        idle_interval: float = IDLE_INTERVAL,
+        max_backoff: float = MAX_BACKOFF,
+    ):
+        """
+        Bus scheduler başlatıcı
+
+        Args:
+            active_interval: set_active() ile seçilen meter'ın periyodu (saniye)
+            idle_interval: Diğer meter'ların varsayılan periyodu (saniye)
+            max_backoff: Yanıt vermeyen slave için en uzun bekleme (saniye)
+        """
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+        self.max_backoff = max_backoff
+        self._devices: Dict[int, BusDevice] = {}
+        self._active_slave: Optional[int] = None
+        self._callbacks: List[Callable[[int, MeterReading], None]] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Scheduler thread'i çalışıyor mu?"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Scheduler thread'ini başlat (idempotent)"""
+        with self._lock:
+            if self.is_running:
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="meter-bus", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Scheduler thread'ini durdur"""
+        self._stop_event.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout=timeout)
+
+    def add_meter(
+        self,
+        meter: ModbusMeter,
+        interval: Optional[float] = None,
+        priority: int = 0,
+    ) -> BusDevice:
+        """
+        Meter'ı takvime ekle (ilk okuma hemen yapılır)
+
+        Args:
+            meter: Okunacak ModbusMeter
+            interval: Okuma periyodu (None: idle_interval)
+            priority: Öncelik (büyük önce)
+
+        Returns:
+            BusDevice
+        """
+        device = BusDevice(
+            meter,
+            interval=self.idle_interval if interval is None else interval,
+            priority=priority,
+            next_poll=time.monotonic(),
+        )
+        with self._lock:
+            self._devices[meter.slave_id] = device
+        self._wakeup.set()
+        return device
+
+    def remove_meter(self, slave_id: int) -> None:
+        """Meter'ı takvimden çıkar"""
+        with self._lock:
+            self._devices.pop(slave_id, None)
+            if self._active_slave == slave_id:
+                self._active_slave = None
+
+    def set_rate(
+        self, slave_id: int, interval: float, priority: Optional[int] = None
+    ) -> None:
+        """
+        Meter'ın periyodunu (ve önceliğini) değiştir
+
+        Args:
+            slave_id: Meter'ın slave ID'si
+            interval: Yeni periyot (saniye)
+            priority: Yeni öncelik (None: değişmez)
+        """
+        with self._lock:
+            device = self._devices[slave_id]
+            device.interval = interval
+            if priority is not None:
+                device.priority = priority
+            # Daha sık okunacaksa yeni periyot hemen geçerli olsun
+            device.next_poll = min(device.next_poll, time.monotonic() + interval)
+        self._wakeup.set()
+
+    def set_active(self, slave_id: Optional[int]) -> None:
+        """
+        Şarj eden noktanın meter'ını seç
+
+        Seçilen meter active_interval periyodu ve ACTIVE_PRIORITY ile,
+        önceki aktif meter idle_interval ile okunur.
+
+        Args:
+            slave_id: Aktif meter'ın slave ID'si (None: aktif meter yok)
+        """
+        with self._lock:
+            previous = self._devices.get(self._active_slave)
+            if previous is not None and self._active_slave != slave_id:
+                previous.interval = self.idle_interval
+                previous.priority = 0
+            self._active_slave = slave_id
+            device = self._devices.get(slave_id)
+            if device is not None:
+                device.interval = self.active_interval
+                device.priority = ACTIVE_PRIORITY
+                # Session başlangıcı için taze okuma: back-off'u da sıfırla
+                device.failures = 0
+                device.next_poll = time.monotonic()
+        self._wakeup.set()
+
+    def get_device(self, slave_id: int) -> Optional[BusDevice]:
+        """Slave ID'nin BusDevice'ı"""
+        return self._devices.get(slave_id)
+
+    def get_reading(
+        self, slave_id: int, max_age: Optional[float] = None
+    ) -> Optional[MeterReading]:
+        """
+        Meter'ın son geçerli okuması (bus'a gidilmez)
+
+        Args:
+            slave_id: Meter'ın slave ID'si
+            max_age: Kabul edilen en fazla yaş (saniye, None: sınırsız)
+
+        Returns:
+            MeterReading veya None
+        """
+        device = self._devices.get(slave_id)
+        if device is None or device.last_success is None:
+            return None
+        if max_age is not None and time.monotonic() - device.last_success > max_age:
+            return None
+        return device.last_reading
+
+    def register_callback(self, callback: Callable[[int, MeterReading], None]):
+        """
+        Okuma callback'i kaydet
+
+        Args:
+            callback: Her geçerli okumada çağrılır
+                     Signature: callback(slave_id: int, reading: MeterReading)
+        """
+        self._callbacks.append(callback)
+
+    def unregister_callback(self, callback: Callable[[int, MeterReading], None]):
+        """Okuma callback'ini kaldır"""
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def _next_due(self) -> Tuple[Optional[BusDevice], float]:
+        now = time.monotonic()
+        with self._lock:
+            due = None
+            earliest = None
+            for device in self._devices.values():
+                if device.next_poll <= now:
+                    if due is None or (device.priority, -device.next_poll) > (
+                        due.priority,
+                        -due.next_poll,
+                    ):
+                        due = device
+                elif earliest is None or device.next_poll < earliest:
+                    earliest = device.next_poll
+        if due is not None:
+            return due, 0.0
+        return None, (earliest - now) if earliest is not None else self.idle_interval
+
+    def poll_next(self) -> Optional[BusDevice]:
+        """
+        Sırası gelmiş en öncelikli meter'ı bir kez oku
+
+        Returns:
+            Okunan BusDevice veya None (sırası gelen meter yok)
+        """
+        device, _ = self._next_due()
+        if device is not None:
+            self.poll(device)
+        return device
+
+    def poll(self, device: BusDevice) -> Optional[MeterReading]:
+        """
+        Meter'ı oku ve takvimini güncelle
+
+        Args:
+            device: Okunacak BusDevice
+
+        Returns:
+            Geçerli okuma veya None
+        """
+        meter = device.meter
+        reading = None
+        if meter.is_connected() or meter.connect():
+            reading = meter.read_all()
+
+        now = time.monotonic()
+        if reading is None:
+            device.failures += 1
+            exponent = min(device.failures, MAX_BACKOFF_EXPONENT)
+            backoff = min(device.interval * (2**exponent), self.max_backoff)
+            device.next_poll = now + max(backoff, device.interval)
+            log = system_logger.warning if device.failures == 1 else system_logger.debug
+            log(
+                f"Meter yanıt vermiyor (slave {device.slave_id}, "
+                f"{device.failures}. hata), sonraki deneme {backoff:.0f} s sonra"
+            )
+            return None
+
+        device.failures = 0
+        device.next_poll = now + device.interval
+        if not reading.is_valid:
+            return None
+
+        device.last_reading = reading
+        device.last_success = now
+        for callback in list(self._callbacks):
+            try:
+                callback(device.slave_id, reading)
+            except Exception as e:
+                system_logger.error(f"Meter bus callback hatası: {e}", exc_info=True)
+        return reading
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            device, delay = self._next_due()
+            if device is None:
+                self._wakeup.wait(delay)
+                self._wakeup.clear()
+                continue
+            try:
+                self.poll(device)
+            except Exception as e:
+                system_logger.error(f"Meter bus okuma hatası: {e}", exc_info=True)
+                device.next_poll = time.monotonic() + device.interval
+
+
+def scan_timeout(transport: ModbusTransport) -> float:
+    """
+    Tarama için slave başına response timeout
+
+    RTU'da request + tek register'lık response'un hat süresi ve meter
+    işlem payı; TCP'de gateway gecikmesi için sabit süre.
+
+    Args:
+        transport: Taranacak bus'ın transport'u
+
+    Returns:
+        Timeout (saniye)
+    """
+    if isinstance(transport, RtuTransport):
+        return SCAN_FRAME_CHARS * rtu_char_time(transport.baudrate) + (
+            SCAN_RESPONSE_MARGIN
+        )
+    return SCAN_TCP_TIMEOUT
+
+
+def scan_bus(
+    transport: ModbusTransport,
+    slave_ids: Iterable[int] = range(1, 248),
+    function_code: int = MODBUS_READ_HOLDING_REGISTERS,
+    address: int = 0x0000,
+    timeout: Optional[float] = None,
+    on_found: Optional[Callable[[int], None]] = None,
+) -> List[int]:
+    """
+    Bus'ta yanıt veren slave ID'leri bul
+
+    Her ID'ye tek register'lık okuma gönderilir; data veya exception
+    response (ör. geçersiz adres) slave'in var olduğunu gösterir. RS-485
+    half-duplex olduğundan ID'ler sırayla denenir; hız, slave başına
+    baudrate'ten hesaplanan kısa timeout'tan gelir. Her ID ayrı bir
+    transaction olduğundan, çalışan BusScheduler'ın okumaları tarama
+    arasına girebilir.
+
+    Args:
+        transport: Açık transport
+        slave_ids: Denenecek ID'ler (varsayılan: 1-247)
+        function_code: Deneme okumasının function code'u
+        address: Deneme okumasının register adresi
+        timeout: Slave başına timeout (None: scan_timeout())
+        on_found: Bulunan her ID için çağrılır
+
+    Returns:
+        Yanıt veren slave ID'leri
+    """
+    if timeout is None:
+        timeout = scan_timeout(transport)
+
+    found = []
+    for slave_id in slave_ids:
+        try:
+            transport.read_registers(slave_id, function_code, address, 1, timeout)
+        except ModbusExceptionResponse:
+            pass
+        except ModbusError:
+            continue
+        found.append(slave_id)
+        if on_found is not None:
+            on_found(slave_id)
+    return found
@@ -1,13 +1,13 @@
 """
 Meter Interface
 Created: 2025-12-10 07:00:00
-Last Modified: 2025-12-10 07:00:00
-Version: 1.0.0
+Last Modified: 2025-12-12 09:00:00
+Version: 1.3.0
 Description: Energy meter interface tanımları
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Tuple
 from dataclasses import dataclass
 
 
@@ -24,6 +24,8 @@ class MeterReading:
         current_a: Akım (A)
         frequency_hz: Frekans (Hz) - opsiyonel
         is_valid: Okuma geçerli mi?
+        voltages_v: Faz-nötr voltajları (L1, L2, L3) - opsiyonel
+        currents_a: Faz akımları (L1, L2, L3) - opsiyonel
     """
 
     timestamp: float
@@ -33,6 +35,8 @@ class MeterReading:
     current_a: float
     frequency_hz: Optional[float] = None
     is_valid: bool = True
+    voltages_v: Optional[Tuple[float, float, float]] = None
+    currents_a: Optional[Tuple[float, float, float]] = None
 
 
 class MeterInterface(ABC):
@@ -142,15 +146,34 @@ def get_meter() -> MeterInterface:
     """
     Meter singleton instance'ı döndür
 
+    METER_URL tanımlıysa config'teki profil ve slave ID ile ModbusMeter,
+    virtual:// ise ESP32 telemetrisinden VirtualMeter, boşsa MockMeter
+    (meter entegrasyonu yok) kullanılır.
+
     Returns:
         MeterInterface instance
     """
     global _meter_instance
 
     if _meter_instance is None:
-        # Şimdilik MockMeter kullan (meter entegrasyonu yok)
-        from api.meter.mock import MockMeter
+        from api.config import config
+
+        if config.METER_URL.startswith("virtual://"):
+            from api.meter.virtual import create_virtual_meter
+
+            _meter_instance = create_virtual_meter(config.METER_URL)
+        elif config.METER_URL:
+            from api.meter.modbus import ModbusMeter
+
+            _meter_instance = ModbusMeter(
+                config.METER_URL,
+                slave_id=config.METER_SLAVE_ID,
+                profile=config.METER_PROFILE,
+                timeout=config.METER_TIMEOUT,
+            )
+        else:
+            from api.meter.mock import MockMeter
 
-        _meter_instance = MockMeter()
+            _meter_instance = MockMeter()
 
     return _meter_instance
@@ -1,132 +1,244 @@
 """
-Modbus Meter Implementation (Placeholder)
+Modbus Meter Implementation
 Created: 2025-12-10 07:00:00
-Last Modified: 2025-12-10 07:00:00
-Version: 1.0.0
-Description: Modbus meter entegrasyonu için placeholder
+Last Modified: 2025-12-12 08:00:00
+Version: 2.2.0
+Description: Modbus RTU/TCP meter entegrasyonu - model profilinin register
+             haritası planlanmış bloklar halinde paylaşılan transport
+             üzerinden okunur
 """
 
-from typing import Optional
-from api.meter.interface import MeterInterface, MeterReading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
 from api.logging_config import system_logger
+from api.meter.interface import MeterInterface, MeterReading
+from api.meter.registers import (
+    MeterProfile,
+    RegisterBlock,
+    decode_register_block,
+    get_meter_profile,
+    plan_register_blocks,
+)
+from api.meter.transport import (
+    ModbusError,
+    ModbusExceptionResponse,
+    ModbusTransport,
+    TransportPool,
+    get_transport_pool,
+)
+
+PHASES = ("l1", "l2", "l3")
 
 
 class ModbusMeter(MeterInterface):
     """
-    Modbus meter implementation (placeholder)
+    Modbus meter implementation
 
-    Gelecekte Modbus RTU/TCP meter entegrasyonu için hazırlık.
+    Transport (RTU veya TCP) URL'e göre havuzdan alınır; aynı bus'taki
+    meter'lar tek bağlantıyı paylaşır. Tam snapshot için request planı bir
+    kez hesaplanır (ABB B23: iki request).
     """
 
     def __init__(
-        self, port: str = "/dev/ttyUSB0", baudrate: int = 9600, slave_id: int = 1
+        self,
+        url: str,
+        slave_id: int = 1,
+        profile: Union[str, MeterProfile] = "abb_b23",
+        timeout: float = 1.0,
+        pool: Optional[TransportPool] = None,
     ):
         """
         Modbus meter başlatıcı
 
         Args:
-            port: Serial port (RTU) veya IP address (TCP)
-            baudrate: Baudrate (RTU için)
-            slave_id: Modbus slave ID
+            url: Transport URL'i (rtu:///dev/ttyAMA5?baudrate=9600, tcp://host:502)
+            slave_id: Modbus slave ID (TCP: unit ID)
+            profile: Profil anahtarı veya MeterProfile
+            timeout: Response timeout (saniye, paylaşılan bus'ta meter başına)
+            pool: Transport havuzu (None: paylaşılan havuz)
         """
-        self.port = port
-        self.baudrate = baudrate
+        self.url = url
         self.slave_id = slave_id
+        self.profile = (
+            get_meter_profile(profile) if isinstance(profile, str) else profile
+        )
+        self.timeout = timeout
+        self.pool = pool or get_transport_pool()
+        self.transport: Optional[ModbusTransport] = None
         self._connected = False
-        # TODO: Modbus client initialization
-        # from pymodbus.client import ModbusSerialClient veya ModbusTcpClient
+
+        # Tam snapshot ve tekil okumalar için request planları
+        self._snapshot_blocks = plan_register_blocks(self.profile.registers)
+        self._field_blocks: Dict[Tuple[str, ...], List[RegisterBlock]] = {}
 
     def connect(self) -> bool:
-        """Meter'a bağlan"""
-        # TODO: Modbus client connection
-        # self.client = ModbusSerialClient(...)
-        # self._connected = self.client.connect()
-        system_logger.warning("Modbus meter not implemented yet")
-        return False
+        """Transport'u havuzdan al ve aç"""
+        if self.transport is None:
+            self.transport = self.pool.acquire(self.url, self.timeout)
+        try:
+            self.transport.open()
+        except ModbusError as e:
+            system_logger.error(f"Modbus meter bağlantı hatası: {e}")
+            self._connected = False
+            return False
+        self._connected = True
+        return True
 
     def disconnect(self) -> bool:
-        """Meter bağlantısını kes"""
-        # TODO: Modbus client disconnect
+        """Transport'u havuza bırak"""
         self._connected = False
+        if self.transport is not None:
+            self.pool.release(self.transport)
+            self.transport = None
         return True
 
     def is_connected(self) -> bool:
         """Meter bağlantısı aktif mi?"""
         return self._connected
 
-    def read_energy(self) -> Optional[float]:
+    def _blocks_for(self, names: Tuple[str, ...]) -> List[RegisterBlock]:
+        blocks = self._field_blocks.get(names)
+        if blocks is None:
+            present = [name for name in names if name in self.profile.registers]
+            blocks = plan_register_blocks(self.profile.registers, present)
+            self._field_blocks[names] = blocks
+        return blocks
+
+    def read_values(
+        self, names: Optional[Iterable[str]] = None
+    ) -> Optional[Dict[str, Optional[float]]]:
         """
-        Toplam enerji okuma (kWh)
+        Profil register'larını birleştirilmiş bloklar halinde oku
 
-        Modbus register mapping örneği:
-        - Register 0x0000: Total Energy (kWh) - 32-bit float
+        Args:
+            names: Okunacak register adları (None: tam snapshot; profilde
+                   olmayan adlar atlanır)
 
         Returns:
-            Toplam enerji (kWh) veya None
+            Register adı -> değer veya None (bağlantı yok / transaction hatası)
         """
-        # TODO: Modbus read holding registers
-        # result = self.client.read_holding_registers(0x0000, 2, unit=self.slave_id)
-        # energy_kwh = decode_float32(result.registers)
-        return None
+        if not self._connected or self.transport is None:
+            return None
+
+        blocks = (
+            self._snapshot_blocks if names is None else self._blocks_for(tuple(names))
+        )
+        values: Dict[str, Optional[float]] = {}
+        try:
+            for block in blocks:
+                payload = self.transport.read_registers(
+                    self.slave_id,
+                    block.function_code,
+                    block.start,
+                    block.count,
+                    timeout=self.timeout,
+                )
+                values.update(
+                    decode_register_block(block, payload, self.profile.registers)
+                )
+        except ModbusExceptionResponse as e:
+            system_logger.error(
+                f"Modbus meter okuma hatası (slave {self.slave_id}): {e}"
+            )
+            return None
+        except ModbusError as e:
+            # Timeout / bağlantı hatası: sampler bir sonraki turda yeniden bağlanır
+            system_logger.warning(
+                f"Modbus meter yanıt vermiyor (slave {self.slave_id}): {e}"
+            )
+            self._connected = False
+            return None
+        return values
+
+    def _read_one(self, name: str) -> Optional[float]:
+        values = self.read_values((name,))
+        return None if values is None else values.get(name)
 
-    def read_power(self) -> Optional[float]:
-        """
-        Anlık güç okuma (kW)
-
-        Modbus register mapping örneği:
-        - Register 0x0002: Active Power (kW) - 32-bit float
+    def read_energy(self) -> Optional[float]:
+        """Toplam aktif enerji (kWh)"""
+        return self._read_one("energy_active")
 
-        Returns:
-            Anlık güç (kW) veya None
-        """
-        # TODO: Modbus read holding registers
-        return None
+    def read_power(self) -> Optional[float]:
+        """Toplam aktif güç (kW)"""
+        power_w = self._read_one("power_active")
+        return None if power_w is None else power_w / 1000.0
 
     def read_voltage(self) -> Optional[float]:
-        """
-        Voltaj okuma (V)
-
-        Modbus register mapping örneği:
-        - Register 0x0004: Voltage (V) - 32-bit float
-
-        Returns:
-            Voltaj (V) veya None
-        """
-        # TODO: Modbus read holding registers
-        return None
+        """Bağlı fazların ortalama faz-nötr voltajı (V)"""
+        values = self.read_values(tuple(f"voltage_{phase}" for phase in PHASES))
+        return None if values is None else _average_voltage(values)
 
     def read_current(self) -> Optional[float]:
-        """
-        Akım okuma (A)
-
-        Modbus register mapping örneği:
-        - Register 0x0006: Current (A) - 32-bit float
-
-        Returns:
-            Akım (A) veya None
-        """
-        # TODO: Modbus read holding registers
-        return None
+        """En yüklü fazın akımı (A)"""
+        values = self.read_values(tuple(f"current_{phase}" for phase in PHASES))
+        return None if values is None else _max_current(values)
 
     def read_all(self) -> Optional[MeterReading]:
         """
-        Tüm meter değerlerini oku
+        Tam snapshot oku
 
         Returns:
-            MeterReading objesi veya None
+            MeterReading (enerji okunamadıysa is_valid=False) veya None
+            (transaction hatası)
         """
-        # TODO: Batch Modbus read
-        return None
+        values = self.read_values()
+        if values is None:
+            return None
+
+        energy_kwh = values.get("energy_active")
+        power_w = values.get("power_active")
+        voltage_v = _average_voltage(values)
+        current_a = _max_current(values)
+        return MeterReading(
+            timestamp=time.time(),
+            energy_kwh=energy_kwh if energy_kwh is not None else 0.0,
+            power_kw=power_w / 1000.0 if power_w is not None else 0.0,
+            voltage_v=voltage_v if voltage_v is not None else 0.0,
+            current_a=current_a if current_a is not None else 0.0,
+            frequency_hz=values.get("frequency"),
+            is_valid=energy_kwh is not None,
+            voltages_v=_phase_values(values, "voltage"),
+            currents_a=_phase_values(values, "current"),
+        )
 
     def reset_energy_counter(self) -> bool:
         """
         Enerji sayacını sıfırla
 
-        Modbus register mapping örneği:
-        - Register 0x0008: Reset command (write 1)
+        Faturalama sayaçları Modbus üzerinden sıfırlanamaz (ABB B23:
+        sadece yetkili reset); session enerjisi başlangıç/bitiş farkından
+        hesaplanır.
 
         Returns:
-            Başarı durumu
+            False
         """
-        # TODO: Modbus write single register
+        system_logger.warning("Modbus meter enerji sayacı sıfırlanamaz")
         return False
+
+
+def _phase_values(
+    values: Dict[str, Optional[float]], quantity: str
+) -> Tuple[float, float, float]:
+    # Okunamayan faz 0 kabul edilir (tekil voltage_v / current_a ile aynı)
+    return tuple(values.get(f"{quantity}_{phase}") or 0.0 for phase in PHASES)
+
+
+def _average_voltage(values: Dict[str, Optional[float]]) -> Optional[float]:
+    # Bağlı olmayan fazlar 0 V okunur, ortalamaya katılmaz
+    voltages = [
+        values.get(f"voltage_{phase}")
+        for phase in PHASES
+        if values.get(f"voltage_{phase}")
+    ]
+    return sum(voltages) / len(voltages) if voltages else None
+
+
+def _max_current(values: Dict[str, Optional[float]]) -> Optional[float]:
+    # Tek fazlı şarjda yük tek fazda; ortalama akımı olduğundan düşük gösterir
+    currents = [
+        values[f"current_{phase}"]
+        for phase in PHASES
+        if values.get(f"current_{phase}") is not None
+    ]
+    return max(currents) if currents else None
@@ -0,0 +1,275 @@
+"""
+Power Quality Module
+Created: 2025-12-12 08:00:00
+Last Modified: 2025-12-12 11:00:00
+Version: 1.0.1
+Description: Üç faz güç kalitesi toplama - meter okumalarından faz başına
+             voltaj/akım ve faz dengesizliği için dakikalık min/max/ortalama;
+             son N dakika sabit boyutlu array ring buffer'da tutulur
+"""
+
+import math
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+
+from api.meter.interface import MeterReading
+
+# Varsayılan değerler
+POWER_QUALITY_PERIOD = 60.0  # saniye (bir aggregate satırı)
+POWER_QUALITY_WINDOW = 60  # saklanan dakika sayısı
+
+# Kanal sırası: V L1-L3, I L1-L3, voltaj dengesizliği, akım dengesizliği
+PHASE_COUNT = 3
+CHANNELS = 2 * PHASE_COUNT + 2
+_VOLTAGE_IMBALANCE = 2 * PHASE_COUNT
+_CURRENT_IMBALANCE = _VOLTAGE_IMBALANCE + 1
+
+# Ring buffer satırı: [başlangıç, örnek sayısı, min x CHANNELS, max x CHANNELS,
+# ortalama x CHANNELS]
+_ROW_MIN = 2
+_ROW_MAX = _ROW_MIN + CHANNELS
+_ROW_MEAN = _ROW_MAX + CHANNELS
+ROW_SIZE = _ROW_MEAN + CHANNELS
+
+_NAN = float("nan")
+
+
+def phase_imbalance(values: Sequence[float]) -> Optional[float]:
+    """
+    Faz dengesizliği (%): ortalamadan en büyük sapma / ortalama
+
+    Args:
+        values: Faz değerleri (bağlı fazlar)
+
+    Returns:
+        Yüzde dengesizlik veya None (değer yok / ortalama 0)
+    """
+    if not values:
+        return None
+    mean = sum(values) / len(values)
+    if mean <= 0:
+        return None
+    return max(abs(value - mean) for value in values) / mean * 100.0
+
+
+class PowerQualityMonitor:
+    """
+    Üç faz güç kalitesi monitörü
+
+    Her okuma içinde bulunulan dakikanın kanal başına min/max/toplam/sayı
+    accumulator'larına işlenir (sabit sayıda kanal: O(1)); dakika
+    değiştiğinde sonuç tek satır olarak ring buffer'a yazılır. Dashboard
+    sorguları liste taramadan hazır aggregate'leri okur; sorgu anında duvar
+    saati yeni dakikaya geçmişse açık dakika da kapatılır (okuma gelmese bile).
+    Okuma gelmeyen dakikalar için satır oluşmaz.
+
+    Dengesizlik sadece bağlı fazlar (voltajı 0'dan büyük) üzerinden
+    hesaplanır; tek fazlı tesisatta dengesizlik 0'dır, üç fazlı tesisatta
+    tek fazlı şarj akım dengesizliği olarak görünür.
+    """
+
+    def __init__(
+        self,
+        window: int = POWER_QUALITY_WINDOW,
+        period: float = POWER_QUALITY_PERIOD,
+    ):
+        """
+        Power quality monitor başlatıcı
+
+        Args:
+            window: Ring buffer'da tutulacak aggregate satırı sayısı
+            period: Aggregate periyodu (saniye)
+        """
+        self.window = window
+        self.period = period
+        self._rows = array("d", [_NAN]) * (window * ROW_SIZE)
+        self._head = 0  # Sonraki yazılacak satır
+        self._filled = 0
+        self._bucket: Optional[int] = None
+        self._samples = 0
+        self._min = array("d", [_NAN]) * CHANNELS
+        self._max = array("d", [_NAN]) * CHANNELS
+        self._sum = array("d", [0.0]) * CHANNELS
+        self._count = array("l", [0]) * CHANNELS
+        self._lock = threading.Lock()
+
+    def add_reading(self, reading: MeterReading) -> None:
+        """
+        Meter okumasını işle (MeterSampler callback'i olarak kullanılabilir)
+
+        Faz değerleri olmayan okumalar atlanır.
+
+        Args:
+            reading: Meter okuması
+        """
+        voltages = reading.voltages_v
+        currents = reading.currents_a
+        if not reading.is_valid or voltages is None or currents is None:
+            return
+
+        connected = [phase for phase in range(PHASE_COUNT) if voltages[phase] > 0]
+        voltage_imbalance = phase_imbalance([voltages[p] for p in connected])
+        current_imbalance = phase_imbalance([currents[p] for p in connected])
+        if current_imbalance is None and connected:
+            current_imbalance = 0.0  # Yük yok: dengeli
+
+        bucket = int(reading.timestamp // self.period)
+        with self._lock:
+            if bucket != self._bucket:
+                self._flush()
+                self._bucket = bucket
+            self._samples += 1
+            for phase in range(PHASE_COUNT):
+                self._update(phase, voltages[phase])
+                self._update(PHASE_COUNT + phase, currents[phase])
+            if voltage_imbalance is not None:
+                self._update(_VOLTAGE_IMBALANCE, voltage_imbalance)
+            if current_imbalance is not None:
+                self._update(_CURRENT_IMBALANCE, current_imbalance)
+
+    def _update(self, channel: int, value: float) -> None:
+        if not self._count[channel] or value < self._min[channel]:
+            self._min[channel] = value
+        if not self._count[channel] or value > self._max[channel]:
+            self._max[channel] = value
+        self._sum[channel] += value
+        self._count[channel] += 1
+
+    def _accumulated_row(self) -> array:
+        row = array("d", [self._bucket * self.period, float(self._samples)])
+        mins = array("d", [_NAN]) * CHANNELS
+        maxs = array("d", [_NAN]) * CHANNELS
+        means = array("d", [_NAN]) * CHANNELS
+        for channel in range(CHANNELS):
+            count = self._count[channel]
+            if count:
+                mins[channel] = self._min[channel]
+                maxs[channel] = self._max[channel]
+                means[channel] = self._sum[channel] / count
+        return row + mins + maxs + means
+
+    def _flush(self) -> None:
+        """İçinde bulunulan periyodu ring buffer'a yaz ve accumulator'ı sıfırla"""
+        if self._bucket is None or not self._samples:
+            return
+        offset = self._head * ROW_SIZE
+        self._rows[offset : offset + ROW_SIZE] = self._accumulated_row()
+        for channel in range(CHANNELS):
+            self._sum[channel] = 0.0
+            self._count[channel] = 0
+        self._samples = 0
+        self._head = (self._head + 1) % self.window
+        self._filled = min(self._filled + 1, self.window)
+
+    def _roll(self, now: float) -> int:
+        """
+        Duvar saati açık periyodu geçtiyse periyodu kapat (lock altında çağrılır)
+
+        Returns:
+            Şu anki periyot numarası
+        """
+        bucket = int(now // self.period)
+        if self._bucket is not None and bucket > self._bucket:
+            self._flush()
+            self._bucket = None
+        return bucket
+
+    def get_current(self, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        İçinde bulunulan (henüz tamamlanmamış) periyodun aggregate'i
+
+        Args:
+            now: Sorgu zamanı (Unix timestamp, None: time.time())
+
+        Returns:
+            Aggregate dict'i veya None (bu periyotta okuma yok)
+        """
+        with self._lock:
+            self._roll(time.time() if now is None else now)
+            if self._bucket is None or not self._samples:
+                return None
+            row = self._accumulated_row()
+        return _row_to_dict(row)
+
+    def get_history(
+        self, count: Optional[int] = None, now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Tamamlanmış periyotların aggregate'leri (eskiden yeniye)
+
+        Args:
+            count: Son N periyot içindeki satırlar (None: ring buffer'daki tümü);
+                   okuma olmayan periyotlar için satır yoktur
+            now: Sorgu zamanı (Unix timestamp, None: time.time())
+
+        Returns:
+            Aggregate dict'leri listesi
+        """
+        with self._lock:
+            bucket = self._roll(time.time() if now is None else now)
+            oldest = -math.inf if count is None else (bucket - count) * self.period
+            start = (self._head - self._filled) % self.window
+            rows = []
+            for i in range(self._filled):
+                offset = ((start + i) % self.window) * ROW_SIZE
+                if self._rows[offset] >= oldest:
+                    rows.append(self._rows[offset : offset + ROW_SIZE])
+        return [_row_to_dict(row) for row in rows]
+
+    def reset(self) -> None:
+        """Tüm aggregate'leri temizle"""
+        with self._lock:
+            self._rows[:] = array("d", [_NAN]) * (self.window * ROW_SIZE)
+            self._head = 0
+            self._filled = 0
+            self._bucket = None
+            self._samples = 0
+            for channel in range(CHANNELS):
+                self._sum[channel] = 0.0
+                self._count[channel] = 0
+
+
+def _value(value: float) -> Optional[float]:
+    return None if math.isnan(value) else round(value, 3)
+
+
+def _row_to_dict(row: Sequence[float]) -> Dict[str, Any]:
+    def stats(channel: int) -> Dict[str, Optional[float]]:
+        return {
+            "min": _value(row[_ROW_MIN + channel]),
+            "max": _value(row[_ROW_MAX + channel]),
+            "mean": _value(row[_ROW_MEAN + channel]),
+        }
+
+    return {
+        "timestamp": row[0],
+        "samples": int(row[1]),
+        "voltage_v": [stats(phase) for phase in range(PHASE_COUNT)],
+        "current_a": [stats(PHASE_COUNT + phase) for phase in range(PHASE_COUNT)],
+        "voltage_imbalance_pct": stats(_VOLTAGE_IMBALANCE),
+        "current_imbalance_pct": stats(_CURRENT_IMBALANCE),
+    }
+
+
+# Singleton instance
+_power_quality_monitor: Optional[PowerQualityMonitor] = None
+_power_quality_monitor_lock = threading.Lock()
+
+
+def get_power_quality_monitor() -> PowerQualityMonitor:
+    """
+    Power quality monitor singleton instance'ını döndür
+
+    Returns:
+        PowerQualityMonitor instance
+    """
+    global _power_quality_monitor
+
+    if _power_quality_monitor is None:
+        with _power_quality_monitor_lock:
+            if _power_quality_monitor is None:
+                _power_quality_monitor = PowerQualityMonitor()
+
+    return _power_quality_monitor
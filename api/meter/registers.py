@@ -0,0 +1,319 @@
+"""
+Meter Register Map Module
+Created: 2025-12-12 04:00:00
+Last Modified: 2025-12-12 06:00:00
+Version: 1.1.0
+Description: Modbus register haritaları, model profilleri, blok planlayıcı ve
+             register değeri çözümleme (RTU ve TCP transport'ları ortak kullanır)
+"""
+
+import struct
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Modbus Function Codes
+MODBUS_READ_COILS = 0x01
+MODBUS_READ_DISCRETE_INPUTS = 0x02
+MODBUS_READ_HOLDING_REGISTERS = 0x03
+MODBUS_READ_INPUT_REGISTERS = 0x04
+
+# Tek request'te okunabilecek en fazla register (FC03/FC04)
+MODBUS_MAX_READ_REGISTERS = 125
+
+# Birleştirilecek iki register arasındaki en fazla boşluk (register)
+# Boşluktaki register'lar da okunur; birkaç fazla byte, ayrı bir bus
+# transaction'ından (RTS geçişleri + bekleme + turnaround) çok daha ucuzdur
+DEFAULT_MAX_REGISTER_GAP = 8
+
+
+class RegisterSpec(NamedTuple):
+    """
+    Register haritası girdisi
+
+    Attributes:
+        address: Başlangıç register adresi
+        words: 16-bit register sayısı (1, 2 veya 4)
+        data_type: "u16", "s16", "u32", "s32", "u64", "s64" veya "f32"
+        scale: Ham değer çarpanı (örn: 0.01 -> 0.01 kWh çözünürlük)
+        function_code: MODBUS_READ_HOLDING_REGISTERS veya MODBUS_READ_INPUT_REGISTERS
+    """
+
+    address: int
+    words: int
+    data_type: str
+    scale: float = 1.0
+    function_code: int = MODBUS_READ_HOLDING_REGISTERS
+
+
+class RegisterBlock(NamedTuple):
+    """Tek Modbus request ile okunacak ardışık register bloğu"""
+
+    function_code: int
+    start: int
+    count: int
+    fields: Tuple[str, ...]
+
+
+class MeterProfile(NamedTuple):
+    """
+    Meter modeli profili
+
+    Register adları modeller arasında ortaktır (voltage_l1, power_active,
+    energy_active, ...); birimler: V, A, W, Hz, kWh.
+
+    Attributes:
+        name: Profil anahtarı (örn: "abb_b23")
+        model: Meter modeli
+        registers: Register adı -> RegisterSpec
+    """
+
+    name: str
+    model: str
+    registers: Dict[str, RegisterSpec]
+
+
+# ABB B-serisi (B21/B23/B24) Modbus register haritası - big-endian word sırası
+# Anlık değerler 0x5B00-0x5B2C, enerji sayaçları 0x5000-0x500F aralığında;
+# tam snapshot iki request ile okunur
+ABB_REGISTERS: Dict[str, RegisterSpec] = {
+    "voltage_l1": RegisterSpec(0x5B00, 2, "u32", 0.1),  # L1-N voltajı (V)
+    "voltage_l2": RegisterSpec(0x5B02, 2, "u32", 0.1),  # L2-N voltajı (V)
+    "voltage_l3": RegisterSpec(0x5B04, 2, "u32", 0.1),  # L3-N voltajı (V)
+    "current_l1": RegisterSpec(0x5B0C, 2, "u32", 0.01),  # L1 akımı (A)
+    "current_l2": RegisterSpec(0x5B0E, 2, "u32", 0.01),  # L2 akımı (A)
+    "current_l3": RegisterSpec(0x5B10, 2, "u32", 0.01),  # L3 akımı (A)
+    "power_active": RegisterSpec(0x5B14, 2, "s32", 0.01),  # Toplam aktif güç (W)
+    "power_reactive": RegisterSpec(0x5B1C, 2, "s32", 0.01),  # Reaktif güç (var)
+    "power_apparent": RegisterSpec(0x5B24, 2, "s32", 0.01),  # Görünür güç (VA)
+    "frequency": RegisterSpec(0x5B2C, 1, "u16", 0.01),  # Frekans (Hz)
+    "energy_active": RegisterSpec(0x5000, 4, "u64", 0.01),  # Aktif enerji (kWh)
+    "energy_reactive": RegisterSpec(0x500C, 4, "u64", 0.01),  # Reaktif enerji (kvarh)
+}
+
+# Eastron SDM630 (v2) - input register'lar, IEEE754 float (big-endian)
+# Faz değerleri (0x0000-0x000B) ve güç/frekans/import enerjisi (0x0034-0x0049)
+# iki request ile okunur
+EASTRON_SDM630_REGISTERS: Dict[str, RegisterSpec] = {
+    "voltage_l1": RegisterSpec(
+        0x0000, 2, "f32", function_code=MODBUS_READ_INPUT_REGISTERS
+    ),
+    "voltage_l2": RegisterSpec(
+        0x0002, 2, "f32", function_code=MODBUS_READ_INPUT_REGISTERS
+    ),
+    "voltage_l3": RegisterSpec(
+        0x0004, 2, "f32", function_code=MODBUS_READ_INPUT_REGISTERS
+    ),
+    "current_l1": RegisterSpec(
+        0x0006, 2, "f32", function_code=MODBUS_READ_INPUT_REGISTERS
+    ),
+    "current_l2": RegisterSpec(
+        0x0008, 2, "f32", function_code=MODBUS_READ_INPUT_REGISTERS
+    ),
+    "current_l3": RegisterSpec(
+        0x000A, 2, "f32", function_code=MODBUS_READ_INPUT_REGISTERS
+    ),
+    "power_active": RegisterSpec(
+        0x0034, 2, "f32", function_code=MODBUS_READ_INPUT_REGISTERS
+    ),
+    "power_apparent": RegisterSpec(
+        0x0038, 2, "f32", function_code=MODBUS_READ_INPUT_REGISTERS
+    ),
+    "power_reactive": RegisterSpec(
+        0x003C, 2, "f32", function_code=MODBUS_READ_INPUT_REGISTERS
+    ),
+    "frequency": RegisterSpec(
+        0x0046, 2, "f32", function_code=MODBUS_READ_INPUT_REGISTERS
+    ),
+    "energy_active": RegisterSpec(
+        0x0048, 2, "f32", function_code=MODBUS_READ_INPUT_REGISTERS
+    ),
+}
+
+METER_PROFILES: Dict[str, MeterProfile] = {
+    "abb_b23": MeterProfile("abb_b23", "ABB B23 112-100", ABB_REGISTERS),
+    "eastron_sdm630": MeterProfile(
+        "eastron_sdm630", "Eastron SDM630", EASTRON_SDM630_REGISTERS
+    ),
+}
+
+# Değer yok / geçersiz işaretleri (ABB: tüm bitler 1, signed için max pozitif)
+_NOT_AVAILABLE = {
+    "u16": 0xFFFF,
+    "s16": 0x7FFF,
+    "u32": 0xFFFFFFFF,
+    "s32": 0x7FFFFFFF,
+    "u64": 0xFFFFFFFFFFFFFFFF,
+    "s64": 0x7FFFFFFFFFFFFFFF,
+}
+
+# Register haritası veri tipleri (big-endian word sırası)
+_VALUE_STRUCTS = {
+    "u16": struct.Struct(">H"),
+    "s16": struct.Struct(">h"),
+    "u32": struct.Struct(">I"),
+    "s32": struct.Struct(">i"),
+    "u64": struct.Struct(">Q"),
+    "s64": struct.Struct(">q"),
+    "f32": struct.Struct(">f"),
+}
+
+
+def get_meter_profile(name: str) -> MeterProfile:
+    """
+    Profil anahtarından meter profilini döndür
+
+    Args:
+        name: Profil anahtarı (örn: "abb_b23")
+
+    Returns:
+        MeterProfile
+
+    Raises:
+        ValueError: Bilinmeyen profil
+    """
+    try:
+        return METER_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Bilinmeyen meter profili: {name} (geçerli: {', '.join(METER_PROFILES)})"
+        ) from None
+
+
+@lru_cache(maxsize=None)
+def register_struct(count: int) -> struct.Struct:
+    """count adet big-endian 16-bit register için Struct"""
+    return struct.Struct(f">{count}H")
+
+
+def plan_register_blocks(
+    register_map: Dict[str, RegisterSpec],
+    names: Optional[Iterable[str]] = None,
+    max_gap: int = DEFAULT_MAX_REGISTER_GAP,
+    max_count: int = MODBUS_MAX_READ_REGISTERS,
+) -> List[RegisterBlock]:
+    """
+    Register haritasını en az sayıda Modbus request'e böl
+
+    Aynı function code'a sahip, aralarında en fazla max_gap register boşluk
+    olan alanlar tek blokta birleştirilir; bir blok max_count register'ı
+    aşmaz.
+
+    Args:
+        register_map: Register adı -> RegisterSpec
+        names: Okunacak register adları (None: tümü)
+        max_gap: Birleştirilecek en fazla register boşluğu
+        max_count: Request başına en fazla register sayısı
+
+    Returns:
+        Adres sırasına göre RegisterBlock listesi
+    """
+    selected = (
+        register_map if names is None else {name: register_map[name] for name in names}
+    )
+    ordered = sorted(
+        selected.items(), key=lambda item: (item[1].function_code, item[1].address)
+    )
+
+    blocks: List[RegisterBlock] = []
+    for name, spec in ordered:
+        if spec.words > max_count:
+            raise ValueError(f"{name}: {spec.words} register tek request'e sığmaz")
+        if blocks:
+            last = blocks[-1]
+            end = max(last.start + last.count, spec.address + spec.words)
+            if (
+                last.function_code == spec.function_code
+                and spec.address - (last.start + last.count) <= max_gap
+                and end - last.start <= max_count
+            ):
+                blocks[-1] = last._replace(
+                    count=end - last.start, fields=last.fields + (name,)
+                )
+                continue
+        blocks.append(
+            RegisterBlock(spec.function_code, spec.address, spec.words, (name,))
+        )
+    return blocks
+
+
+def _scaled(raw, spec: RegisterSpec) -> Optional[float]:
+    if spec.data_type == "f32":
+        # NaN: değer yok
+        return None if raw != raw else raw * spec.scale
+    if raw == _NOT_AVAILABLE[spec.data_type]:
+        return None
+    return raw * spec.scale
+
+
+def decode_register_value(
+    registers: Sequence[int], offset: int, spec: RegisterSpec
+) -> Optional[float]:
+    """
+    Register listesinden tek bir değeri çöz (big-endian word sırası)
+
+    Args:
+        registers: Okunan 16-bit register değerleri
+        offset: Değerin listedeki başlangıç indeksi
+        spec: Değerin RegisterSpec'i
+
+    Returns:
+        Ölçeklenmiş değer veya None (eksik response / değer yok işareti)
+    """
+    words = registers[offset : offset + spec.words]
+    if len(words) < spec.words:
+        return None
+
+    data = register_struct(spec.words).pack(*(word & 0xFFFF for word in words))
+    return _scaled(_VALUE_STRUCTS[spec.data_type].unpack(data)[0], spec)
+
+
+def decode_register_block(
+    block: RegisterBlock, payload, register_map: Dict[str, RegisterSpec]
+) -> Dict[str, Optional[float]]:
+    """
+    Birleştirilmiş blok response'unu alan değerlerine ayır
+
+    Değerler response data'sından doğrudan struct.unpack_from ile okunur
+    (ara register listesi oluşturulmaz).
+
+    Args:
+        block: Okunan blok
+        payload: Response data byte'ları (bytes veya memoryview)
+        register_map: Register adı -> RegisterSpec
+
+    Returns:
+        Register adı -> değer (eksik response / değer yok işareti: None)
+    """
+    values = {}
+    for name in block.fields:
+        spec = register_map[name]
+        offset = (spec.address - block.start) * 2
+        if offset + spec.words * 2 > len(payload):
+            values[name] = None
+            continue
+        raw = _VALUE_STRUCTS[spec.data_type].unpack_from(payload, offset)[0]
+        values[name] = _scaled(raw, spec)
+    return values
+
+
+def encode_register_value(
+    spec: RegisterSpec, value: Optional[float]
+) -> Tuple[int, ...]:
+    """
+    Değeri register word'lerine çevir (decode_register_value'nun tersi)
+
+    Args:
+        spec: Değerin RegisterSpec'i
+        value: Birimli değer (None: değer yok işareti)
+
+    Returns:
+        spec.words adet 16-bit register (big-endian word sırası)
+    """
+    value_struct = _VALUE_STRUCTS[spec.data_type]
+    if spec.data_type == "f32":
+        raw = float("nan") if value is None else value / spec.scale
+    elif value is None:
+        raw = _NOT_AVAILABLE[spec.data_type]
+    else:
+        raw = int(round(value / spec.scale))
+    return register_struct(spec.words).unpack(value_struct.pack(raw))
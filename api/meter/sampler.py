@@ -0,0 +1,224 @@
+"""
+Meter Sampler Module
+Created: 2025-12-12 03:00:00
+Last Modified: 2025-12-12 07:00:00
+Version: 1.1.0
+Description: Arka plan meter örnekleme servisi - MeterInterface'i sabit
+             periyotta kendi thread'inde okur; son okuma ve son N örneklik
+             ring buffer session ve API kodu tarafından bus'a gidilmeden okunur,
+             geçerli okumalar callback'lere iletilir
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+from api.logging_config import system_logger
+from api.meter.interface import MeterInterface, MeterReading
+
+# Varsayılan değerler (config yüklenmemişse)
+METER_SAMPLE_INTERVAL = 1.0
+METER_HISTORY_SIZE = 600
+
+
+class MeterSampler:
+    """
+    Arka plan meter örnekleme servisi
+
+    RS-485 okumaları sadece sampler thread'inde yapılır. Son geçerli okuma
+    (okuma, monotonic zaman) çifti tek referans olarak saklanır, böylece
+    get_latest() kilit almadan O(1) döner. Periyot sabit takvime göre
+    işler (okuma süresi bir sonraki örneği kaydırmaz); okuma periyottan
+    uzun sürerse biriken gecikme atlanır.
+    """
+
+    def __init__(
+        self,
+        meter: MeterInterface,
+        interval: float = METER_SAMPLE_INTERVAL,
+        history_size: int = METER_HISTORY_SIZE,
+    ):
+        """
+        Meter sampler başlatıcı
+
+        Args:
+            meter: Okunacak meter
+            interval: Örnekleme periyodu (saniye)
+            history_size: Ring buffer'da tutulacak okuma sayısı
+        """
+        self.meter = meter
+        self.interval = interval
+        self._latest: Optional[Tuple[MeterReading, float]] = None
+        self._history: Deque[MeterReading] = deque(maxlen=history_size)
+        self._connected = False
+        self._callbacks: List[Callable[[MeterReading], None]] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Sampler thread'i çalışıyor mu?"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Sampler thread'ini başlat (idempotent)"""
+        with self._lock:
+            if self.is_running:
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="meter-sampler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Sampler thread'ini durdur"""
+        self._stop_event.set()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout=timeout)
+
+    def register_callback(self, callback: Callable[[MeterReading], None]):
+        """
+        Okuma callback'i kaydet
+
+        Args:
+            callback: Her geçerli okumada sampler thread'inde çağrılır
+                     Signature: callback(reading: MeterReading)
+        """
+        self._callbacks.append(callback)
+
+    def unregister_callback(self, callback: Callable[[MeterReading], None]):
+        """Okuma callback'ini kaldır"""
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def is_connected(self) -> bool:
+        """Son örnekleme turunda meter bağlı mıydı?"""
+        return self._connected
+
+    def get_latest(self, max_age: Optional[float] = None) -> Optional[MeterReading]:
+        """
+        Son geçerli okumayı döndür (bus'a gidilmez)
+
+        Args:
+            max_age: Kabul edilen en fazla yaş (saniye, None: sınırsız)
+
+        Returns:
+            MeterReading veya None (henüz okuma yok / okuma çok eski)
+        """
+        latest = self._latest
+        if latest is None:
+            return None
+        reading, sampled_at = latest
+        if max_age is not None and time.monotonic() - sampled_at > max_age:
+            return None
+        return reading
+
+    def get_latest_age(self) -> Optional[float]:
+        """
+        Son geçerli okumanın yaşı
+
+        Returns:
+            Saniye veya None (henüz okuma yok)
+        """
+        latest = self._latest
+        if latest is None:
+            return None
+        return time.monotonic() - latest[1]
+
+    def get_history(self, seconds: Optional[float] = None) -> List[MeterReading]:
+        """
+        Ring buffer'daki okumalar (eskiden yeniye)
+
+        Args:
+            seconds: Sadece son N saniyenin okumaları (None: tümü)
+
+        Returns:
+            MeterReading listesi (kopya)
+        """
+        with self._lock:
+            history = list(self._history)
+        if seconds is None:
+            return history
+        cutoff = time.time() - seconds
+        return [reading for reading in history if reading.timestamp >= cutoff]
+
+    def _run(self) -> None:
+        next_sample = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                self._connected = False
+                system_logger.debug(f"Meter örnekleme hatası: {e}")
+            next_sample += self.interval
+            delay = next_sample - time.monotonic()
+            if delay < 0:
+                next_sample = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+
+    def sample(self) -> Optional[MeterReading]:
+        """
+        Meter'ı bir kez oku ve cache'i güncelle
+
+        Bağlantı yoksa önce bağlanmayı dener. Geçersiz okumalar cache'e
+        yazılmaz ve callback'lere iletilmez; son geçerli okuma yaşlanır.
+
+        Returns:
+            Geçerli okuma veya None
+        """
+        meter = self.meter
+        if not meter.is_connected():
+            meter.connect()
+        self._connected = meter.is_connected()
+        if not self._connected:
+            return None
+
+        reading = meter.read_all()
+        if reading is None or not reading.is_valid:
+            return None
+
+        with self._lock:
+            self._history.append(reading)
+        self._latest = (reading, time.monotonic())
+        for callback in list(self._callbacks):
+            try:
+                callback(reading)
+            except Exception as e:
+                system_logger.error(
+                    f"Meter sampler callback hatası: {e}", exc_info=True
+                )
+        return reading
+
+
+# Singleton instance
+_meter_sampler: Optional[MeterSampler] = None
+_meter_sampler_lock = threading.Lock()
+
+
+def get_meter_sampler() -> MeterSampler:
+    """
+    Meter sampler singleton instance'ını döndür
+
+    Returns:
+        MeterSampler instance (get_meter() meter'ı ile, config periyoduyla)
+    """
+    global _meter_sampler
+
+    if _meter_sampler is None:
+        with _meter_sampler_lock:
+            if _meter_sampler is None:
+                from api.config import config
+                from api.meter.interface import get_meter
+
+                _meter_sampler = MeterSampler(
+                    get_meter(),
+                    interval=config.METER_SAMPLE_INTERVAL,
+                    history_size=config.METER_HISTORY_SIZE,
+                )
+
+    return _meter_sampler
@@ -0,0 +1,479 @@
+"""
+Meter Simulator Module
+Created: 2025-12-12 06:00:00
+Last Modified: 2025-12-12 06:00:00
+Version: 1.0.0
+Description: Fiziksel meter olmadan test ve benchmark için Modbus slave
+             simülatörü - profil register haritasını senaryolu güç/enerji
+             eğrisiyle Modbus TCP (localhost) veya pty üzerinden Modbus RTU
+             olarak sunar; gecikme, jitter ve hata enjeksiyonu ayarlanabilir
+"""
+
+import bisect
+import os
+import random
+import select
+import socketserver
+import struct
+import threading
+import time
+import tty
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from api.logging_config import system_logger
+from api.meter.registers import (
+    MODBUS_READ_HOLDING_REGISTERS,
+    MODBUS_READ_INPUT_REGISTERS,
+    MeterProfile,
+    encode_register_value,
+    get_meter_profile,
+)
+from api.meter.transport import crc16_modbus
+
+# Modbus exception kodları
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+SLAVE_DEVICE_FAILURE = 0x04
+
+# RTU read request: [Slave ID] [FC] [Adres x2] [Adet x2] [CRC x2]
+RTU_REQUEST_LENGTH = 8
+_READ_REQUEST = struct.Struct(">BHH")
+_MBAP_HEADER = struct.Struct(">HHHB")
+
+
+class PowerSegment(NamedTuple):
+    """
+    Güç eğrisi parçası (başlangıçtan bitişe doğrusal)
+
+    Attributes:
+        duration: Süre (saniye)
+        start_w: Başlangıç gücü (W)
+        end_w: Bitiş gücü (W)
+    """
+
+    duration: float
+    start_w: float
+    end_w: float
+
+
+class PowerCurve:
+    """
+    Parçalı doğrusal güç eğrisi
+
+    Enerji, eğrinin kesin integralidir (her parça için trapez); böylece
+    simülatörün enerji sayacı ile benchmark'ın referans enerjisi aynı
+    kaynaktan gelir. Eğri bittikten sonra son güç değeri korunur.
+    """
+
+    def __init__(self, segments: Sequence[Union[PowerSegment, Tuple[float, ...]]]):
+        """
+        Güç eğrisi başlatıcı
+
+        Args:
+            segments: PowerSegment veya (süre, başlangıç_w[, bitiş_w]) listesi
+        """
+        self.segments: List[PowerSegment] = [
+            PowerSegment(s[0], s[1], s[2] if len(s) > 2 else s[1]) for s in segments
+        ]
+        if not self.segments:
+            self.segments = [PowerSegment(0.0, 0.0, 0.0)]
+        self._starts: List[float] = []
+        self._energy_ws: List[float] = []
+        start = energy = 0.0
+        for segment in self.segments:
+            self._starts.append(start)
+            self._energy_ws.append(energy)
+            start += segment.duration
+            energy += segment.duration * (segment.start_w + segment.end_w) / 2
+        self.duration = start
+        self._total_ws = energy
+
+    @classmethod
+    def constant(cls, power_w: float) -> "PowerCurve":
+        """Sabit güç"""
+        return cls([(0.0, power_w)])
+
+    @classmethod
+    def charging_session(
+        cls,
+        peak_w: float = 7200.0,
+        ramp: float = 30.0,
+        hold: float = 600.0,
+        idle: float = 0.0,
+    ) -> "PowerCurve":
+        """
+        Tipik şarj session'ı: boşta -> rampa -> sabit güç -> rampa -> boşta
+
+        Args:
+            peak_w: Sabit şarj gücü (W)
+            ramp: Rampa süresi (saniye)
+            hold: Sabit güç süresi (saniye)
+            idle: Başta ve sondaki boşta kalma süresi (saniye)
+        """
+        return cls(
+            [
+                (idle, 0.0, 0.0),
+                (ramp, 0.0, peak_w),
+                (hold, peak_w, peak_w),
+                (ramp, peak_w, 0.0),
+                (idle, 0.0, 0.0),
+            ]
+        )
+
+    def _locate(self, t: float) -> Tuple[int, float]:
+        index = max(bisect.bisect_right(self._starts, t) - 1, 0)
+        return index, t - self._starts[index]
+
+    def power_at(self, t: float) -> float:
+        """t anındaki güç (W)"""
+        if t >= self.duration:
+            return self.segments[-1].end_w
+        index, offset = self._locate(max(t, 0.0))
+        segment = self.segments[index]
+        if segment.duration <= 0:
+            return segment.end_w
+        return segment.start_w + (segment.end_w - segment.start_w) * (
+            offset / segment.duration
+        )
+
+    def energy_at(self, t: float) -> float:
+        """0..t arasındaki enerji (kWh)"""
+        if t <= 0:
+            return 0.0
+        if t >= self.duration:
+            energy_ws = self._total_ws + (t - self.duration) * self.segments[-1].end_w
+        else:
+            index, offset = self._locate(t)
+            segment = self.segments[index]
+            energy_ws = (
+                self._energy_ws[index]
+                + offset * (segment.start_w + self.power_at(t)) / 2
+            )
+        return energy_ws / 3_600_000
+
+
+class MeterSimulator:
+    """
+    Modbus meter simülatörü
+
+    Register değerleri her request'te simülasyon zamanından hesaplanır
+    (ayrı bir güncelleme thread'i yoktur). speed > 1 ile zaman hızlandırılır
+    (örn: 60 -> bir saatlik session bir dakikada).
+    """
+
+    def __init__(
+        self,
+        curve: Optional[PowerCurve] = None,
+        profile: Union[str, MeterProfile] = "abb_b23",
+        slave_id: int = 1,
+        start_energy_kwh: float = 0.0,
+        voltage_v: float = 230.0,
+        frequency_hz: float = 50.0,
+        phases: int = 3,
+        speed: float = 1.0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        corrupt_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Meter simülatörü başlatıcı
+
+        Args:
+            curve: Güç eğrisi (None: 0 W)
+            profile: Sunulacak register haritasının profili
+            slave_id: Cevap verilecek slave ID (TCP: unit ID)
+            start_energy_kwh: Enerji sayacının başlangıç değeri (kWh)
+            voltage_v: Faz-nötr voltajı (V)
+            frequency_hz: Şebeke frekansı (Hz)
+            phases: Yükün dağıldığı faz sayısı (1 veya 3)
+            speed: Simülasyon zamanı / gerçek zaman
+            latency: Response öncesi bekleme (saniye)
+            jitter: Gecikmeye eklenen ±rastgele sapma (saniye)
+            error_rate: Exception response (slave device failure) oranı
+            drop_rate: Cevapsız bırakılan request oranı (timeout)
+            corrupt_rate: CRC'si bozulan response oranı (sadece RTU)
+            seed: Rastgele sayı üreteci tohumu (tekrarlanabilir hata dizisi)
+        """
+        self.curve = curve or PowerCurve.constant(0.0)
+        self.profile = (
+            get_meter_profile(profile) if isinstance(profile, str) else profile
+        )
+        self.slave_id = slave_id
+        self.start_energy_kwh = start_energy_kwh
+        self.voltage_v = voltage_v
+        self.frequency_hz = frequency_hz
+        self.phases = phases
+        self.speed = speed
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._started_at = time.monotonic()
+
+        # İstatistikler
+        self.requests = 0
+        self.errors = 0
+        self.dropped = 0
+        self.corrupted = 0
+
+        self._tcp_server: Optional[socketserver.ThreadingTCPServer] = None
+        self._ptys: List[Tuple[int, int]] = []
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    # --- Simülasyon zamanı ve değerler ---
+
+    def elapsed(self) -> float:
+        """Simülasyon zamanı (saniye)"""
+        return (time.monotonic() - self._started_at) * self.speed
+
+    def reset_clock(self) -> None:
+        """Simülasyon zamanını sıfırla (eğri baştan başlar)"""
+        self._started_at = time.monotonic()
+
+    def energy_kwh(self, t: Optional[float] = None) -> float:
+        """t anındaki gerçek enerji sayacı (kWh, yuvarlanmamış)"""
+        t = self.elapsed() if t is None else t
+        return self.start_energy_kwh + self.curve.energy_at(t)
+
+    def values_at(self, t: float) -> Dict[str, float]:
+        """
+        t anındaki ölçüm değerleri (profil register adlarıyla)
+
+        Args:
+            t: Simülasyon zamanı (saniye)
+
+        Returns:
+            Register adı -> birimli değer
+        """
+        power_w = self.curve.power_at(t)
+        current_a = power_w / (self.phases * self.voltage_v)
+        values = {
+            "power_active": power_w,
+            "power_reactive": 0.0,
+            "power_apparent": power_w,
+            "frequency": self.frequency_hz,
+            "energy_active": self.energy_kwh(t),
+            "energy_reactive": 0.0,
+        }
+        for index, phase in enumerate(("l1", "l2", "l3")):
+            values[f"voltage_{phase}"] = self.voltage_v
+            values[f"current_{phase}"] = current_a if index < self.phases else 0.0
+        return values
+
+    def read_registers(self, function_code: int, start: int, count: int) -> bytes:
+        """
+        Register bloğunun data byte'ları (şu anki değerlerle)
+
+        Raises:
+            ValueError: Blokta haritalanmış register yok (illegal data address)
+        """
+        words = [0] * count
+        values = None
+        for name, spec in self.profile.registers.items():
+            if spec.function_code != function_code:
+                continue
+            offset = spec.address - start
+            if offset < 0 or offset + spec.words > count:
+                continue
+            if values is None:
+                values = self.values_at(self.elapsed())
+            words[offset : offset + spec.words] = encode_register_value(
+                spec, values.get(name)
+            )
+        if values is None:
+            raise ValueError(f"Haritalanmamış register bloğu: 0x{start:04X}+{count}")
+        return struct.pack(f">{count}H", *words)
+
+    # --- Request işleme ---
+
+    def _chance(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._random_lock:
+            return self._random.random() < rate
+
+    def _delay(self) -> None:
+        delay = self.latency
+        if self.jitter:
+            with self._random_lock:
+                delay += self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def handle_pdu(self, unit_id: int, pdu: bytes) -> Optional[bytes]:
+        """
+        Request PDU'suna response PDU'su üret
+
+        Args:
+            unit_id: Slave / unit ID
+            pdu: [FC] [Adres x2] [Adet x2]
+
+        Returns:
+            Response PDU'su veya None (cevap verilmez)
+        """
+        if unit_id != self.slave_id:
+            return None
+        self.requests += 1
+        if self._chance(self.drop_rate):
+            self.dropped += 1
+            return None
+
+        self._delay()
+        function_code = pdu[0]
+        if function_code not in (
+            MODBUS_READ_HOLDING_REGISTERS,
+            MODBUS_READ_INPUT_REGISTERS,
+        ):
+            return bytes([function_code | 0x80, ILLEGAL_FUNCTION])
+        if self._chance(self.error_rate):
+            self.errors += 1
+            return bytes([function_code | 0x80, SLAVE_DEVICE_FAILURE])
+        _, start, count = _READ_REQUEST.unpack_from(pdu)
+        try:
+            data = self.read_registers(function_code, start, count)
+        except ValueError:
+            return bytes([function_code | 0x80, ILLEGAL_DATA_ADDRESS])
+        return bytes([function_code, len(data)]) + data
+
+    # --- Modbus TCP ---
+
+    def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Modbus TCP sunucusunu başlat
+
+        Args:
+            host: Dinlenecek adres
+            port: TCP portu (0: boş port)
+
+        Returns:
+            Transport URL'i (tcp://host:port)
+        """
+        simulator = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                connection = self.request
+                while not simulator._stop_event.is_set():
+                    header = _recv_exact(connection, _MBAP_HEADER.size)
+                    if header is None:
+                        return
+                    tid, protocol, length, unit = _MBAP_HEADER.unpack(header)
+                    pdu = _recv_exact(connection, length - 1)
+                    if pdu is None:
+                        return
+                    response = simulator.handle_pdu(unit, pdu)
+                    if response is not None:
+                        connection.sendall(
+                            _MBAP_HEADER.pack(tid, protocol, len(response) + 1, unit)
+                            + response
+                        )
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        server = socketserver.ThreadingTCPServer((host, port), Handler)
+        server.daemon_threads = True
+        self._tcp_server = server
+        self._start_thread(server.serve_forever, "meter-sim-tcp")
+        host, port = server.server_address[:2]
+        system_logger.info(f"Meter simülatörü (Modbus TCP): {host}:{port}")
+        return f"tcp://{host}:{port}"
+
+    # --- Modbus RTU (pty) ---
+
+    def start_rtu(self) -> str:
+        """
+        pty üzerinden Modbus RTU slave'i başlat
+
+        Her çağrı ayrı bir pty açar (istemci başına bir pty). pty'de RTS
+        yoktur ve aynı parity ayarı ikinci kez uygulanamaz; istemciler
+        rts_control=False kullanmalı, ModbusMeter URL'i parity=N ile
+        verilmeli (rtu://<yol>?parity=N&rts=0).
+
+        Returns:
+            İstemcinin açacağı seri port yolu
+        """
+        master, slave = os.openpty()
+        tty.setraw(master)
+        tty.setraw(slave)
+        self._ptys.append((master, slave))
+        self._start_thread(lambda: self._serve_rtu(master), "meter-sim-rtu")
+        path = os.ttyname(slave)
+        system_logger.info(f"Meter simülatörü (Modbus RTU): {path}")
+        return path
+
+    def _serve_rtu(self, master: int) -> None:
+        buffer = b""
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([master], [], [], 0.05)
+            if not readable:
+                # t3.5 sessizliği: yarım kalmış frame atılır
+                buffer = b""
+                continue
+            try:
+                buffer += os.read(master, 256)
+            except OSError:
+                return
+            while len(buffer) >= RTU_REQUEST_LENGTH:
+                frame = buffer[:RTU_REQUEST_LENGTH]
+                if crc16_modbus(frame) != 0:
+                    # Hizalama kayboldu: bir byte kaydırarak yeniden dene
+                    buffer = buffer[1:]
+                    continue
+                buffer = buffer[RTU_REQUEST_LENGTH:]
+                response = self.handle_pdu(frame[0], frame[1:6])
+                if response is None:
+                    continue
+                body = bytes([frame[0]]) + response
+                crc = crc16_modbus(body)
+                if self._chance(self.corrupt_rate):
+                    self.corrupted += 1
+                    crc ^= 0xFFFF
+                os.write(master, body + struct.pack("<H", crc))
+
+    # --- Yaşam döngüsü ---
+
+    def _start_thread(self, target, name: str) -> None:
+        self._stop_event.clear()
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Sunucuları durdur"""
+        self._stop_event.set()
+        if self._tcp_server is not None:
+            self._tcp_server.shutdown()
+            self._tcp_server.server_close()
+            self._tcp_server = None
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        for pty in self._ptys:
+            for fd in pty:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._ptys = []
+
+    def __enter__(self) -> "MeterSimulator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def _recv_exact(connection, size: int) -> Optional[bytes]:
+    data = b""
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
@@ -0,0 +1,726 @@
+"""
+Modbus Transport Module
+Created: 2025-12-12 04:00:00
+Last Modified: 2025-12-12 06:00:00
+Version: 1.2.0
+Description: Modbus RTU (RS-485, pyserial) ve Modbus TCP transport'ları -
+             CRC16, RTU zamanlaması, frame okuma ve URL'e göre paylaşılan
+             transport havuzu
+"""
+
+import socket
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from api.logging_config import system_logger
+
+# Modbus RTU karakter zamanlaması
+# 8E1 (veya 8N2): 1 start + 8 data + 1 parity + 1 stop = 11 bit/karakter
+RTU_BITS_PER_CHAR = 11
+# 19200 baud üstünde spesifikasyon sabit süreler önerir (t3.5 = 1.75 ms)
+RTU_FIXED_TIMING_BAUDRATE = 19200
+RTU_FIXED_FRAME_GAP = 0.00175
+# Exception response: [Slave ID] [Function Code | 0x80] [Exception Code] [CRC x2]
+RTU_EXCEPTION_FRAME_LENGTH = 5
+
+# Request frame cache'inin üst sınırı (planlanmış bloklar + ad-hoc okumalar)
+MAX_CACHED_REQUESTS = 64
+
+# Modbus TCP varsayılan portu
+MODBUS_TCP_PORT = 502
+
+# Request: [Slave ID] [Function Code] [Start Address] [Quantity] + CRC (little-endian)
+_REQUEST_HEADER = struct.Struct(">BBHH")
+_CRC = struct.Struct("<H")
+# MBAP header: [Transaction ID] [Protocol ID] [Length] [Unit ID]
+_MBAP_HEADER = struct.Struct(">HHHB")
+
+
+class ModbusError(Exception):
+    """Modbus transaction hatası (timeout, eksik frame, CRC, bağlantı)"""
+
+    pass
+
+
+class ModbusExceptionResponse(ModbusError):
+    """Slave'in exception response'u (function code | 0x80)"""
+
+    def __init__(self, function_code: int, exception_code: int):
+        self.function_code = function_code
+        self.exception_code = exception_code
+        super().__init__(
+            f"Modbus hatası: function_code=0x{function_code:02X}, "
+            f"error=0x{exception_code:02X}"
+        )
+
+
+# Modbus RTU CRC16 (poly 0xA001, reflected) - byte başına tek tablo erişimi
+def _build_crc16_table() -> Tuple[int, ...]:
+    table = []
+    for value in range(256):
+        crc = value
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+        table.append(crc)
+    return tuple(table)
+
+
+CRC16_TABLE = _build_crc16_table()
+
+
+def crc16_modbus(data) -> int:
+    """
+    Modbus RTU CRC16 (tablo tabanlı)
+
+    Args:
+        data: bytes, bytearray veya memoryview
+
+    Returns:
+        CRC16 değeri (frame'e little-endian eklenir)
+    """
+    crc = 0xFFFF
+    table = CRC16_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def rtu_char_time(baudrate: int) -> float:
+    """
+    Tek karakterin hat üzerindeki süresi (saniye)
+
+    Args:
+        baudrate: Baudrate
+
+    Returns:
+        Karakter süresi
+    """
+    return RTU_BITS_PER_CHAR / baudrate
+
+
+def rtu_frame_gap(baudrate: int) -> float:
+    """
+    Frame'ler arası sessizlik süresi (t3.5, saniye)
+
+    Args:
+        baudrate: Baudrate
+
+    Returns:
+        3.5 karakter süresi (19200 baud üstünde 1.75 ms)
+    """
+    if baudrate > RTU_FIXED_TIMING_BAUDRATE:
+        return RTU_FIXED_FRAME_GAP
+    return 3.5 * rtu_char_time(baudrate)
+
+
+def rtu_frame_length(header: bytes) -> int:
+    """
+    Read response frame'inin toplam uzunluğu (ilk 3 byte'tan)
+
+    Args:
+        header: [Slave ID] [Function Code] [Byte Count / Exception Code]
+
+    Returns:
+        CRC dahil toplam frame uzunluğu
+    """
+    if header[1] & 0x80:
+        return RTU_EXCEPTION_FRAME_LENGTH
+    return 3 + header[2] + 2
+
+
+def read_rtu_frame(port) -> bytes:
+    """
+    Response frame'ini artımlı oku
+
+    Önce başlık (3 byte) okunur, kalan uzunluk başlıktan hesaplanır ve
+    frame tamamlanınca dönülür. Port timeout'u sadece cevap gelmediğinde
+    (veya frame yarıda kesildiğinde) beklenir.
+
+    Args:
+        port: Açık seri port
+
+    Returns:
+        Okunan byte'lar (timeout'ta eksik olabilir)
+    """
+    header = port.read(3)
+    if len(header) < 3:
+        return header
+    return header + port.read(rtu_frame_length(header) - 3)
+
+
+@lru_cache(maxsize=MAX_CACHED_REQUESTS)
+def build_read_request(
+    slave_id: int, function_code: int, start_address: int, quantity: int
+) -> bytes:
+    """
+    Modbus RTU read request frame'i (cache'lenir)
+
+    Frame (slave_id, function code, adres, adet) ile tamamen belirlendiği
+    için her blok için bir kez oluşturulur; tekrar eden okumalarda CRC
+    yeniden hesaplanmaz. TCP transport'u aynı frame'in PDU kısmını kullanır.
+
+    Args:
+        slave_id: Modbus slave ID
+        function_code: Modbus function code
+        start_address: Başlangıç register adresi
+        quantity: Okunacak register sayısı
+
+    Returns:
+        [Slave ID] [FC] [Adres] [Adet] [CRC Low] [CRC High]
+    """
+    frame = bytearray(_REQUEST_HEADER.size + _CRC.size)
+    _REQUEST_HEADER.pack_into(
+        frame, 0, slave_id, function_code, start_address, quantity
+    )
+    crc = crc16_modbus(memoryview(frame)[: _REQUEST_HEADER.size])
+    _CRC.pack_into(frame, _REQUEST_HEADER.size, crc)
+    return bytes(frame)
+
+
+def parse_read_pdu(pdu: memoryview, function_code: int) -> memoryview:
+    """
+    Read response PDU'sunu doğrula ve register data'sını döndür
+
+    Args:
+        pdu: [Function Code] [Byte Count] [Data...]
+        function_code: Beklenen function code
+
+    Returns:
+        Register data'sı (kopyasız memoryview)
+
+    Raises:
+        ModbusExceptionResponse: Slave exception response döndürdü
+        ModbusError: Beklenmeyen function code veya eksik data
+    """
+    if len(pdu) < 2:
+        raise ModbusError(f"Yetersiz response: {len(pdu)} byte")
+    if pdu[0] & 0x80:
+        raise ModbusExceptionResponse(pdu[0] & 0x7F, pdu[1])
+    if pdu[0] != function_code:
+        raise ModbusError(
+            f"Function code uyuşmazlığı: beklenen 0x{function_code:02X}, "
+            f"alınan 0x{pdu[0]:02X}"
+        )
+    data_end = 2 + pdu[1]
+    if len(pdu) < data_end:
+        raise ModbusError(f"Eksik response: {len(pdu)} byte, beklenen {data_end}")
+    return pdu[2:data_end]
+
+
+def parse_rtu_response(response: bytes, slave_id: int) -> memoryview:
+    """
+    Modbus RTU read response frame'ini doğrula ve data kısmını döndür
+
+    Args:
+        response: [Slave ID] [Function Code] [Byte Count] [Data...] [CRC x2]
+        slave_id: Beklenen slave ID
+
+    Returns:
+        Register data'sı (response üzerinde kopyasız memoryview)
+
+    Raises:
+        ModbusExceptionResponse: Slave exception response döndürdü
+        ModbusError: Timeout, slave uyuşmazlığı, eksik frame veya CRC hatası
+    """
+    if len(response) < RTU_EXCEPTION_FRAME_LENGTH:  # Minimum response uzunluğu
+        raise ModbusError(f"Yetersiz response: {len(response)} byte")
+
+    view = memoryview(response)
+    if view[0] != slave_id:
+        raise ModbusError(
+            f"Slave ID uyuşmazlığı: beklenen {slave_id}, alınan {view[0]}"
+        )
+
+    if view[1] & 0x80:
+        frame_end = 3
+    else:
+        frame_end = 3 + view[2]
+        if len(view) < frame_end + 2:
+            raise ModbusError(
+                f"Eksik response: {len(view)} byte, beklenen {frame_end + 2}"
+            )
+
+    crc_received = _CRC.unpack_from(view, frame_end)[0]
+    crc_calculated = crc16_modbus(view[:frame_end])
+    if crc_received != crc_calculated:
+        raise ModbusError(
+            f"CRC hatası: beklenen 0x{crc_calculated:04X}, alınan 0x{crc_received:04X}"
+        )
+
+    return parse_read_pdu(view[1:frame_end], view[1] & 0x7F)
+
+
+def rtu_exchange(
+    connection,
+    request: bytes,
+    baudrate: int,
+    last_frame_end: float,
+    rts_control: bool = True,
+) -> bytes:
+    """
+    RS-485 üzerinden request gönder ve response frame'ini oku
+
+    Zamanlama sabit bekleme yerine baudrate'ten hesaplanır: önceki
+    frame'den sonra t3.5 sessizlik, gönderimden sonra son karakterin
+    hattan çıkması için bir karakter süresi; response beklenen uzunluğa
+    ulaştığında hemen dönülür.
+
+    Args:
+        connection: Açık seri port
+        request: CRC dahil request frame'i
+        baudrate: Hat baudrate'i
+        last_frame_end: Önceki frame'in bittiği an (time.monotonic)
+        rts_control: RTS ile yön kontrolü (False: otomatik yönlü adaptör / pty)
+
+    Returns:
+        Response byte'ları (timeout'ta eksik olabilir)
+    """
+    char_time = rtu_char_time(baudrate)
+    connection.reset_input_buffer()
+    connection.reset_output_buffer()
+
+    # RS485 TX moduna geç (RTS HIGH) - MAX13487 DE/RE aktif
+    # Frame'ler arası sessizlik (t3.5) aynı zamanda RTS stabilizasyonudur
+    if rts_control:
+        connection.rts = True
+    idle = time.monotonic() - last_frame_end
+    time.sleep(max(rtu_frame_gap(baudrate) - idle, char_time))
+
+    # flush() (tcdrain) tüm veri UART'a verilene kadar bekler; son
+    # karakter shift register'dan çıkana kadar RTS HIGH kalmalı
+    connection.write(request)
+    connection.flush()
+    time.sleep(char_time)
+
+    # RS485 RX moduna geç (RTS LOW) - MAX13487 RX modu
+    if rts_control:
+        connection.rts = False
+
+    return read_rtu_frame(connection)
+
+
+def _serial():
+    """pyserial'ı geç import et (TCP kullanan kurulumlarda gerekmez)"""
+    import serial
+
+    return serial
+
+
+class ModbusTransport(ABC):
+    """
+    Modbus transport'u (RTU veya TCP)
+
+    Bir transport tek bir fiziksel bağlantıdır; aynı bus/gateway üzerindeki
+    tüm slave'ler onu paylaşır. Transaction'lar transport kilidiyle
+    sıralanır (RS-485 half-duplex, TCP gateway'ler de genelde seri).
+    """
+
+    def __init__(self, timeout: float = 1.0):
+        self.timeout = timeout
+        self.lock = threading.Lock()
+
+    @property
+    @abstractmethod
+    def is_open(self) -> bool:
+        """Bağlantı açık mı?"""
+        pass
+
+    @abstractmethod
+    def open(self) -> None:
+        """
+        Bağlantıyı aç (açıksa bir şey yapmaz)
+
+        Raises:
+            ModbusError: Bağlantı açılamadı
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Bağlantıyı kapat"""
+        pass
+
+    @abstractmethod
+    def read_registers(
+        self,
+        slave_id: int,
+        function_code: int,
+        start_address: int,
+        quantity: int,
+        timeout: Optional[float] = None,
+    ) -> memoryview:
+        """
+        Holding (0x03) veya input (0x04) register'ları oku
+
+        Args:
+            slave_id: Modbus slave ID (TCP: unit ID)
+            function_code: MODBUS_READ_HOLDING_REGISTERS veya MODBUS_READ_INPUT_REGISTERS
+            start_address: Başlangıç register adresi
+            quantity: Okunacak register sayısı
+            timeout: Bu transaction için response timeout (None: transport'unki)
+
+        Returns:
+            Register data'sı (2 byte/register, big-endian)
+
+        Raises:
+            ModbusError: Transaction başarısız
+        """
+        pass
+
+
+class RtuTransport(ModbusTransport):
+    """Modbus RTU over RS-485 (pyserial, RTS ile yön kontrolü)"""
+
+    def __init__(
+        self,
+        port: str,
+        baudrate: int = 9600,
+        parity: str = "E",
+        stopbits: int = 1,
+        timeout: float = 1.0,
+        rts_control: bool = True,
+    ):
+        """
+        RTU transport başlatıcı
+
+        Args:
+            port: Seri port (örn: /dev/ttyAMA5)
+            baudrate: Baudrate
+            parity: "E", "O" veya "N"
+            stopbits: 1 veya 2
+            timeout: Response timeout (saniye)
+            rts_control: RTS ile yön kontrolü (False: otomatik yönlü USB
+                         adaptör veya simülatör pty'si)
+        """
+        super().__init__(timeout)
+        self.port = port
+        self.baudrate = baudrate
+        self.parity = parity
+        self.stopbits = stopbits
+        self.rts_control = rts_control
+        self.connection = None
+        # Son frame'in bittiği an (t3.5 sessizliği için)
+        self._last_frame_end = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self.connection is not None and self.connection.is_open
+
+    def open(self) -> None:
+        with self.lock:
+            if self.is_open:
+                return
+            serial = _serial()
+            try:
+                self.connection = serial.Serial(
+                    port=self.port,
+                    baudrate=self.baudrate,
+                    bytesize=serial.EIGHTBITS,
+                    parity=self.parity,
+                    stopbits=self.stopbits,
+                    timeout=self.timeout,
+                )
+            except Exception as e:
+                # SerialException, OSError veya termios.error (port ayarları)
+                raise ModbusError(f"Seri port açılamadı ({self.port}): {e}") from e
+            system_logger.info(
+                f"Modbus RTU açıldı: {self.port} ({self.baudrate} {self.parity})"
+            )
+
+    def close(self) -> None:
+        with self.lock:
+            if self.is_open:
+                self.connection.close()
+            self.connection = None
+
+    def read_registers(
+        self,
+        slave_id: int,
+        function_code: int,
+        start_address: int,
+        quantity: int,
+        timeout: Optional[float] = None,
+    ) -> memoryview:
+        request = build_read_request(slave_id, function_code, start_address, quantity)
+        override = timeout is not None and timeout != self.timeout
+        with self.lock:
+            if not self.is_open:
+                raise ModbusError(f"Seri port açık değil: {self.port}")
+            try:
+                if override:
+                    self.connection.timeout = timeout
+                response = rtu_exchange(
+                    self.connection,
+                    request,
+                    self.baudrate,
+                    self._last_frame_end,
+                    self.rts_control,
+                )
+            except OSError as e:
+                raise ModbusError(f"Seri port hatası ({self.port}): {e}") from e
+            finally:
+                self._last_frame_end = time.monotonic()
+                if override:
+                    self.connection.timeout = self.timeout
+        return parse_rtu_response(response, slave_id)
+
+
+class TcpTransport(ModbusTransport):
+    """Modbus TCP (MBAP header, kalıcı socket)"""
+
+    def __init__(self, host: str, port: int = MODBUS_TCP_PORT, timeout: float = 1.0):
+        """
+        TCP transport başlatıcı
+
+        Args:
+            host: Meter / gateway adresi
+            port: TCP portu
+            timeout: Bağlantı ve response timeout (saniye)
+        """
+        super().__init__(timeout)
+        self.host = host
+        self.port = port
+        self._socket: Optional[socket.socket] = None
+        self._transaction_id = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._socket is not None
+
+    def open(self) -> None:
+        with self.lock:
+            self._connect()
+
+    def _connect(self) -> None:
+        if self._socket is not None:
+            return
+        try:
+            sock = socket.create_connection((self.host, self.port), self.timeout)
+        except OSError as e:
+            raise ModbusError(
+                f"Modbus TCP bağlantı hatası ({self.host}:{self.port}): {e}"
+            ) from e
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(self.timeout)
+        self._socket = sock
+
+    def _disconnect(self) -> None:
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+    def close(self) -> None:
+        with self.lock:
+            self._disconnect()
+
+    def _recv_exact(self, size: int) -> bytes:
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            try:
+                count = self._socket.recv_into(view[received:])
+            except socket.timeout:
+                if received:
+                    # Frame yarıda kaldı: akış hizası kayboldu
+                    raise ModbusError("Modbus TCP frame'i eksik kaldı (timeout)")
+                raise
+            if count == 0:
+                raise ModbusError("Modbus TCP bağlantısı karşı taraftan kapatıldı")
+            received += count
+        return bytes(buffer)
+
+    def read_registers(
+        self,
+        slave_id: int,
+        function_code: int,
+        start_address: int,
+        quantity: int,
+        timeout: Optional[float] = None,
+    ) -> memoryview:
+        # PDU, RTU frame'iyle aynı (slave ID ve CRC hariç)
+        pdu = build_read_request(slave_id, function_code, start_address, quantity)[1:6]
+        with self.lock:
+            self._transaction_id = (self._transaction_id + 1) & 0xFFFF
+            transaction_id = self._transaction_id
+            header = _MBAP_HEADER.pack(transaction_id, 0, len(pdu) + 1, slave_id)
+            in_frame = False
+            try:
+                # Bağlantı düştüyse bir sonraki okumada yeniden açılır
+                self._connect()
+                self._socket.settimeout(self.timeout if timeout is None else timeout)
+                self._socket.sendall(header + pdu)
+                while True:
+                    tid, _, length, unit = _MBAP_HEADER.unpack(
+                        self._recv_exact(_MBAP_HEADER.size)
+                    )
+                    in_frame = True
+                    body = self._recv_exact(length - 1)
+                    in_frame = False
+                    # Timeout sonrası gelen eski cevaplar atlanır
+                    if tid == transaction_id:
+                        break
+            except socket.timeout as e:
+                # Frame arasında timeout: akış hizalı, geç gelen cevap transaction
+                # ID ile atlanır; frame ortasında timeout'ta bağlantı yenilenir
+                if in_frame:
+                    self._disconnect()
+                raise ModbusError(
+                    f"Modbus TCP timeout ({self.host}:{self.port}, unit {slave_id})"
+                ) from e
+            except (OSError, ModbusError) as e:
+                self._disconnect()
+                if isinstance(e, ModbusError):
+                    raise
+                raise ModbusError(
+                    f"Modbus TCP hatası ({self.host}:{self.port}): {e}"
+                ) from e
+
+        if unit != slave_id:
+            raise ModbusError(
+                f"Unit ID uyuşmazlığı: beklenen {slave_id}, alınan {unit}"
+            )
+        return parse_read_pdu(memoryview(body), function_code)
+
+
+def create_transport(url: str, timeout: float = 1.0) -> ModbusTransport:
+    """
+    URL'den transport oluştur
+
+    Örnekler:
+        rtu:///dev/ttyAMA5?baudrate=9600&parity=E&stopbits=1
+        rtu:///dev/ttyUSB0?baudrate=19200&rts=0  (RTS yön kontrolü yok)
+        tcp://192.168.1.50:502
+
+    Args:
+        url: Transport URL'i
+        timeout: Response timeout (saniye)
+
+    Returns:
+        ModbusTransport (henüz açılmamış)
+
+    Raises:
+        ValueError: Geçersiz URL
+    """
+    parts = urlsplit(url)
+    options = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+
+    if parts.scheme == "rtu":
+        if not parts.path:
+            raise ValueError(f"RTU URL'inde seri port yok: {url}")
+        return RtuTransport(
+            parts.path,
+            baudrate=int(options.get("baudrate", 9600)),
+            parity=options.get("parity", "E").upper(),
+            stopbits=int(options.get("stopbits", 1)),
+            timeout=timeout,
+            rts_control=options.get("rts", "1") != "0",
+        )
+    if parts.scheme == "tcp":
+        if not parts.hostname:
+            raise ValueError(f"TCP URL'inde host yok: {url}")
+        return TcpTransport(
+            parts.hostname, parts.port or MODBUS_TCP_PORT, timeout=timeout
+        )
+    raise ValueError(f"Geçersiz transport URL'i: {url} (geçerli: rtu://, tcp://)")
+
+
+class TransportPool:
+    """
+    URL başına tek transport
+
+    Aynı seri porttaki (veya aynı TCP gateway'deki) meter'lar tek bağlantıyı
+    ve onun kilidini paylaşır; son kullanıcı bıraktığında bağlantı kapatılır.
+    """
+
+    def __init__(self):
+        self._transports: Dict[str, Tuple[ModbusTransport, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        parts = urlsplit(url)
+        if parts.scheme == "tcp":
+            return f"tcp://{parts.hostname}:{parts.port or MODBUS_TCP_PORT}"
+        return f"{parts.scheme}://{parts.path}"
+
+    def acquire(self, url: str, timeout: float = 1.0) -> ModbusTransport:
+        """
+        URL'in transport'unu al (yoksa oluştur)
+
+        Args:
+            url: Transport URL'i
+            timeout: Response timeout (sadece ilk oluşturmada kullanılır)
+
+        Returns:
+            Paylaşılan ModbusTransport
+        """
+        key = self._key(url)
+        with self._lock:
+            entry = self._transports.get(key)
+            if entry is None:
+                transport = create_transport(url, timeout)
+            else:
+                transport = entry[0]
+            self._transports[key] = (transport, (entry[1] if entry else 0) + 1)
+        return transport
+
+    def release(self, transport: ModbusTransport) -> None:
+        """
+        Transport'u bırak (son kullanıcıysa bağlantıyı kapat)
+
+        Args:
+            transport: acquire() ile alınan transport
+        """
+        with self._lock:
+            for key, (pooled, users) in self._transports.items():
+                if pooled is transport:
+                    if users > 1:
+                        self._transports[key] = (pooled, users - 1)
+                        return
+                    del self._transports[key]
+                    break
+            else:
+                return
+        transport.close()
+
+    def close_all(self) -> None:
+        """Tüm transport'ları kapat"""
+        with self._lock:
+            transports = [transport for transport, _ in self._transports.values()]
+            self._transports.clear()
+        for transport in transports:
+            transport.close()
+
+
+# Singleton instance
+_transport_pool: Optional[TransportPool] = None
+_transport_pool_lock = threading.Lock()
+
+
+def get_transport_pool() -> TransportPool:
+    """
+    Transport havuzu singleton instance'ını döndür
+
+    Returns:
+        TransportPool instance
+    """
+    global _transport_pool
+
+    if _transport_pool is None:
+        with _transport_pool_lock:
+            if _transport_pool is None:
+                _transport_pool = TransportPool()
+
+    return _transport_pool
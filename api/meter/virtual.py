@@ -0,0 +1,275 @@
+"""
+Virtual Meter Module
+Created: 2025-12-12 09:00:00
+Last Modified: 2025-12-12 11:00:00
+Version: 1.1.0
+Description: Fiziksel meter olmayan donanım için sanal meter - ESP32 STAT
+             akışındaki şarj akımı × nominal voltajdan gücü hesaplar ve
+             arka planda (STAT callback'inde) monoton enerji sayacına
+             integre eder
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from api.logging_config import system_logger
+from api.meter.interface import MeterInterface, MeterReading
+
+# ESP32 CHARGING state'i (bridge STATE_NAME: "CHARGING")
+CHARGING_STATE = 5
+
+# Varsayılan değerler
+VIRTUAL_NOMINAL_VOLTAGE = 230.0  # V (faz-nötr)
+VIRTUAL_PHASES = 1
+# İki STAT arası en fazla bu kadar süre son güçle integre edilir (saniye);
+# ESP32 ~5-7.5 s'de bir STAT gönderir, akış kesilirse sayaç sınırsız artmaz
+VIRTUAL_MAX_GAP = 15.0
+
+
+def status_current(status: Dict[str, Any]) -> float:
+    """
+    STAT mesajından şarj akımı (A)
+
+    Ölçülen akım (CURRENT) varsa o kullanılır. Yoksa CHARGING state'inde
+    araca sunulan akım min(MAX, CABLE) kabul edilir (CABLE kablo
+    kapasitesi, MAX ayarlı akım limitidir); araç daha az çekebileceği için
+    bu bir üst sınır tahminidir.
+
+    Args:
+        status: Parse edilmiş STAT dict'i
+
+    Returns:
+        Akım (A), şarj yoksa 0
+    """
+    if status.get("STATE") != CHARGING_STATE:
+        return 0.0
+    measured = status.get("CURRENT")
+    if isinstance(measured, (int, float)):
+        return max(float(measured), 0.0)
+    limits = [
+        float(status[key])
+        for key in ("MAX", "CABLE")
+        if isinstance(status.get(key), (int, float)) and status[key] > 0
+    ]
+    return min(limits) if limits else 0.0
+
+
+class VirtualMeter(MeterInterface):
+    """
+    ESP32 telemetrisinden türetilen sanal meter
+
+    Enerji her STAT mesajında bir önceki mesajın gücüyle (sıfırıncı derece
+    tutma) integre edilir; okuma anında son mesajdan bu yana geçen kısım da
+    eklenir. Tutma süresi max_gap ile sınırlıdır, böylece bir STAT
+    aralığındaki hata en fazla güç × max_gap olur ve read_energy() değerleri
+    hiçbir zaman azalmaz.
+    """
+
+    def __init__(
+        self,
+        source_getter: Optional[Callable[[], Any]] = None,
+        voltage_v: float = VIRTUAL_NOMINAL_VOLTAGE,
+        phases: int = VIRTUAL_PHASES,
+        max_gap: float = VIRTUAL_MAX_GAP,
+        start_energy_kwh: float = 0.0,
+    ):
+        """
+        Sanal meter başlatıcı
+
+        Args:
+            source_getter: register_status_callback sağlayan STAT kaynağını
+                          döndüren fonksiyon (None: oluşturulmuş ESP32 bridge
+                          singleton'ı)
+            voltage_v: Nominal faz-nötr voltajı (V)
+            phases: Faz sayısı (1 veya 3)
+            max_gap: Son güçle integre edilecek en uzun STAT aralığı (saniye)
+            start_energy_kwh: Enerji sayacının başlangıç değeri (kWh)
+        """
+        self.source_getter = source_getter
+        self.voltage_v = voltage_v
+        self.phases = phases
+        self.max_gap = max_gap
+        self._source = None
+        self._energy_ws = start_energy_kwh * 3_600_000
+        self._current_a = 0.0
+        self._last_status_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _get_source(self):
+        if self.source_getter is not None:
+            return self.source_getter()
+        # Bridge burada oluşturulmaz: get_esp32_bridge() seri portu tarar ve
+        # açar, sampler ise connect()'i her örnekleme periyodunda çağırır
+        from esp32 import bridge as bridge_module
+
+        return bridge_module._esp32_bridge_instance
+
+    def connect(self) -> bool:
+        """
+        STAT akışına abone ol
+
+        Returns:
+            Abone olunduysa True, STAT kaynağı (ESP32 bridge) henüz yoksa False
+        """
+        if self._source is not None:
+            return True
+        try:
+            source = self._get_source()
+        except Exception as e:
+            system_logger.debug(f"Sanal meter STAT kaynağı yok: {e}")
+            return False
+        if source is None:
+            return False
+        source.register_status_callback(self.on_status)
+        self._source = source
+        system_logger.info(
+            f"Sanal meter bağlandı ({self.phases} faz, {self.voltage_v:.0f} V nominal)"
+        )
+        return True
+
+    def disconnect(self) -> bool:
+        """STAT aboneliğini kaldır"""
+        source, self._source = self._source, None
+        if source is not None:
+            source.unregister_status_callback(self.on_status)
+        return True
+
+    def is_connected(self) -> bool:
+        """STAT akışına abone mi?"""
+        return self._source is not None
+
+    def _power_w(self, current_a: float) -> float:
+        return current_a * self.voltage_v * self.phases
+
+    def on_status(self, status: Dict[str, Any]) -> None:
+        """
+        STAT callback'i - önceki aralığı integre et, yeni akımı sakla
+
+        Args:
+            status: Parse edilmiş STAT dict'i
+        """
+        current_a = status_current(status)
+        now = time.monotonic()
+        with self._lock:
+            if self._last_status_at is not None:
+                elapsed = min(now - self._last_status_at, self.max_gap)
+                self._energy_ws += self._power_w(self._current_a) * elapsed
+            self._current_a = current_a
+            self._last_status_at = now
+
+    def _snapshot(self) -> Tuple[Optional[float], float]:
+        # (enerji kWh, akım A) - son STAT'tan bu yana geçen kısım dahil
+        with self._lock:
+            if self._last_status_at is None:
+                return None, 0.0
+            elapsed = min(time.monotonic() - self._last_status_at, self.max_gap)
+            energy_ws = self._energy_ws + self._power_w(self._current_a) * elapsed
+            return energy_ws / 3_600_000, self._current_a
+
+    def read_energy(self) -> Optional[float]:
+        """Toplam enerji (kWh, monoton; henüz STAT yoksa None)"""
+        return self._snapshot()[0]
+
+    def read_power(self) -> Optional[float]:
+        """Anlık güç (kW)"""
+        if self._last_status_at is None:
+            return None
+        return self._power_w(self._current_a) / 1000.0
+
+    def read_voltage(self) -> Optional[float]:
+        """Nominal voltaj (V)"""
+        return self.voltage_v
+
+    def read_current(self) -> Optional[float]:
+        """Şarj akımı (A)"""
+        if self._last_status_at is None:
+            return None
+        return self._current_a
+
+    def read_all(self) -> Optional[MeterReading]:
+        """
+        Tam snapshot
+
+        Returns:
+            MeterReading (henüz STAT gelmediyse is_valid=False)
+        """
+        energy_kwh, current_a = self._snapshot()
+        phase_count = 3 if self.phases >= 3 else 1
+        return MeterReading(
+            timestamp=time.time(),
+            energy_kwh=energy_kwh if energy_kwh is not None else 0.0,
+            power_kw=self._power_w(current_a) / 1000.0,
+            voltage_v=self.voltage_v,
+            current_a=current_a,
+            is_valid=energy_kwh is not None,
+            voltages_v=tuple(
+                self.voltage_v if phase < phase_count else 0.0 for phase in range(3)
+            ),
+            currents_a=tuple(
+                current_a if phase < phase_count else 0.0 for phase in range(3)
+            ),
+        )
+
+    def reset_energy_counter(self) -> bool:
+        """
+        Enerji sayacını sıfırla
+
+        Returns:
+            False (sayaç monoton, sıfırlanmaz)
+        """
+        return False
+
+
+def persisted_energy_kwh() -> float:
+    """
+    Database'e kaydedilmiş en yüksek enerji sayacı değeri
+
+    Sanal sayaç süreç belleğinde tutulur; yeniden başlatmada bu değerden
+    devam ederek session boyunca monoton kalır.
+
+    Returns:
+        Enerji (kWh), kayıt yoksa veya okunamazsa 0
+    """
+    try:
+        from api.database import get_database
+
+        return get_database().get_max_meter_energy() or 0.0
+    except Exception as e:
+        system_logger.warning(f"Sanal meter başlangıç enerjisi okunamadı: {e}")
+        return 0.0
+
+
+def create_virtual_meter(url: str) -> VirtualMeter:
+    """
+    URL'den sanal meter oluştur
+
+    Enerji sayacı kaydedilmiş en yüksek okumadan başlatılır.
+
+    Örnekler:
+        virtual://
+        virtual://?voltage=230&phases=3
+
+    Args:
+        url: virtual:// URL'i
+
+    Returns:
+        VirtualMeter (ESP32 bridge STAT akışıyla)
+
+    Raises:
+        ValueError: Geçersiz URL
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "virtual":
+        raise ValueError(f"Geçersiz sanal meter URL'i: {url} (geçerli: virtual://)")
+    options = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+    phases = int(options.get("phases", VIRTUAL_PHASES))
+    if phases not in (1, 3):
+        raise ValueError(f"Geçersiz faz sayısı: {phases} (geçerli: 1, 3)")
+    return VirtualMeter(
+        voltage_v=float(options.get("voltage", VIRTUAL_NOMINAL_VOLTAGE)),
+        phases=phases,
+        max_gap=float(options.get("max_gap", VIRTUAL_MAX_GAP)),
+        start_energy_kwh=persisted_energy_kwh(),
+    )
@@ -1,11 +1,14 @@
 """
 Prometheus Metrics Module
 Created: 2025-12-10
-Last Modified: 2025-12-10 18:00:00
-Version: 1.0.0
+Last Modified: 2025-12-12 12:00:00
+Version: 1.2.0
 Description: Prometheus metrics export for monitoring and alerting
 """
 
+import threading
+import time
+from datetime import datetime
 from prometheus_client import (
     Counter,
     Histogram,
@@ -15,9 +18,17 @@ from prometheus_client import (
     CONTENT_TYPE_LATEST,
 )
 from fastapi import Response
-from typing import Optional
+from starlette.routing import Match
+from typing import Any, Dict, Optional, Tuple
 from esp32.bridge import ESP32Bridge
 from api.event_detector import EventDetector
+from api.logging_config import system_logger
+
+# Endpoint label for requests that match no route (404s, scanners, typos)
+UNMATCHED_ROUTE = "__unmatched__"
+
+# Max cached (method, raw path) -> route template entries
+ROUTE_CACHE_SIZE = 1024
 
 # Request metrics
 http_requests_total = Counter(
@@ -33,6 +44,19 @@ http_request_duration_seconds = Histogram(
     buckets=[0.01, 0.05, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0],
 )
 
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being processed",
+    ["method", "endpoint"],
+)
+
+http_response_size_bytes = Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size in bytes",
+    ["method", "endpoint"],
+    buckets=[100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000],
+)
+
 # ESP32 metrics
 esp32_connected = Gauge(
     "esp32_connected",
@@ -49,6 +73,67 @@ esp32_status_age_seconds = Gauge(
     "Age of last ESP32 status update in seconds",
 )
 
+esp32_log_suppressed_messages = Gauge(
+    "esp32_log_suppressed_messages",
+    "ESP32 messages not written to esp32.log by log sampling",
+    ["message_type", "reason"],
+)
+
+esp32_state = Gauge(
+    "esp32_state",
+    "Last reported ESP32 STATE value (-1=unknown)",
+)
+
+esp32_max_current_amps = Gauge(
+    "esp32_max_current_amps",
+    "Last reported ESP32 maximum current setting in amperes",
+)
+
+esp32_command_queue_size = Gauge(
+    "esp32_command_queue_size",
+    "Commands waiting to be resent after a connection loss",
+)
+
+esp32_ack_latency_seconds = Histogram(
+    "esp32_ack_latency_seconds",
+    "Time between sending a command and receiving its ACK",
+    ["command"],
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0],
+)
+
+esp32_status_age_sample_seconds = Histogram(
+    "esp32_status_age_sample_seconds",
+    "Age of the last ESP32 status at each metrics update",
+    buckets=[1.0, 2.5, 5.0, 7.5, 10.0, 15.0, 30.0, 60.0, 120.0],
+)
+
+esp32_serial_rx_bytes_total = Counter(
+    "esp32_serial_rx_bytes_total",
+    "Bytes read from the ESP32 serial port",
+)
+
+esp32_serial_tx_bytes_total = Counter(
+    "esp32_serial_tx_bytes_total",
+    "Bytes written to the ESP32 serial port",
+)
+
+esp32_serial_rx_frames_total = Counter(
+    "esp32_serial_rx_frames_total",
+    "Non-empty lines read from the ESP32 serial port",
+)
+
+esp32_serial_rx_bytes_per_second = Histogram(
+    "esp32_serial_rx_bytes_per_second",
+    "ESP32 serial read throughput between metrics updates",
+    buckets=[0, 5, 10, 25, 50, 100, 250, 1000, 5000],
+)
+
+esp32_serial_rx_frames_per_second = Histogram(
+    "esp32_serial_rx_frames_per_second",
+    "ESP32 serial frame rate between metrics updates",
+    buckets=[0, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10],
+)
+
 # System metrics
 system_memory_usage_percent = Gauge(
     "system_memory_usage_percent",
@@ -76,6 +161,16 @@ api_active_sessions = Gauge(
     "Number of active charging sessions",
 )
 
+api_current_session_duration_seconds = Gauge(
+    "api_current_session_duration_seconds",
+    "Duration of the active charging session (0 if none)",
+)
+
+api_current_session_events = Gauge(
+    "api_current_session_events",
+    "Number of events recorded in the active charging session",
+)
+
 api_total_sessions = Counter(
     "api_total_sessions",
     "Total number of charging sessions",
@@ -88,6 +183,26 @@ event_detector_monitoring = Gauge(
     "Event detector monitoring status (1=monitoring, 0=stopped)",
 )
 
+# Storage and cache metrics
+db_write_duration_seconds = Histogram(
+    "db_write_duration_seconds",
+    "SQLite write duration including commit",
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0],
+)
+
+api_cache_requests_total = Counter(
+    "api_cache_requests_total",
+    "Response cache lookups",
+    ["key_prefix", "result"],
+)
+
+api_cache_hit_ratio = Histogram(
+    "api_cache_hit_ratio",
+    "Response cache hit ratio between metrics updates",
+    ["key_prefix"],
+    buckets=[0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 1.0],
+)
+
 event_detector_events_total = Counter(
     "event_detector_events_total",
     "Total events detected",
@@ -101,91 +216,275 @@ app_info = Info(
 )
 
 
+# (method, raw path) -> route template cache for pre-routing lookups
+_route_cache: Dict[Tuple[str, str], str] = {}
+
+
+def _iter_routes(routes: Any):
+    """Yield routes that have a path template, flattening included routers"""
+    for route in routes:
+        if getattr(route, "path", None):
+            yield route
+            continue
+        nested = getattr(getattr(route, "original_router", None), "routes", None)
+        if nested is None:
+            nested = getattr(route, "routes", None)
+        if nested:
+            yield from _iter_routes(nested)
+
+
+def resolve_route_template(scope: Dict[str, Any]) -> str:
+    """
+    Return a bounded-cardinality endpoint label for an ASGI scope
+
+    Uses the matched route template (e.g. /api/sessions/{session_id}) so
+    path parameters do not create new time series. Before routing has run,
+    the application's routes are matched directly and the result cached.
+    Requests that match no route collapse into UNMATCHED_ROUTE.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+    key = (scope.get("method", ""), scope.get("path", ""))
+    template = _route_cache.get(key)
+    if template is not None:
+        return template
+
+    template = UNMATCHED_ROUTE
+    partial = None
+    router = getattr(scope.get("app"), "router", None)
+    for candidate in _iter_routes(getattr(router, "routes", ())):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            template = candidate.path
+            break
+        if match == Match.PARTIAL and partial is None:
+            partial = candidate.path
+    else:
+        if partial:
+            template = partial
+
+    if len(_route_cache) >= ROUTE_CACHE_SIZE:
+        _route_cache.clear()
+    _route_cache[key] = template
+    return template
+
+
+# Previous counter readings for delta/rate calculation
+_last_io_sample: Dict[str, float] = {}
+_last_cache_sample: Dict[str, Dict[str, int]] = {}
+_sample_lock = threading.Lock()
+
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    """Return value if it is a dict, otherwise an empty dict"""
+    return value if isinstance(value, dict) else {}
+
+
+def _status_age_from_timestamp(status_data: Dict[str, Any]) -> Optional[float]:
+    """Compute status age from the ISO timestamp stored in a status dict"""
+    timestamp = status_data.get("timestamp")
+    if not timestamp:
+        return None
+    try:
+        return (datetime.now() - datetime.fromisoformat(timestamp)).total_seconds()
+    except (TypeError, ValueError):
+        return None
+
+
+def _update_esp32_io_metrics(bridge: ESP32Bridge) -> None:
+    """Update serial I/O counters and throughput histograms from bridge stats"""
+    if not hasattr(bridge, "get_io_stats"):
+        return
+    io_stats = _as_dict(bridge.get_io_stats())
+    if not io_stats:
+        return
+
+    now = time.monotonic()
+    with _sample_lock:
+        previous = dict(_last_io_sample)
+        _last_io_sample.update(
+            {
+                "time": now,
+                "rx_bytes": io_stats.get("rx_bytes", 0),
+                "rx_frames": io_stats.get("rx_frames", 0),
+                "tx_bytes": io_stats.get("tx_bytes", 0),
+            }
+        )
+
+    deltas = {
+        key: io_stats.get(key, 0) - previous.get(key, 0)
+        for key in ("rx_bytes", "rx_frames", "tx_bytes")
+    }
+    # Bridge recreated (counters reset) - treat current values as deltas
+    if any(delta < 0 for delta in deltas.values()):
+        deltas = {key: io_stats.get(key, 0) for key in deltas}
+
+    esp32_serial_rx_bytes_total.inc(deltas["rx_bytes"])
+    esp32_serial_rx_frames_total.inc(deltas["rx_frames"])
+    esp32_serial_tx_bytes_total.inc(deltas["tx_bytes"])
+
+    elapsed = now - previous["time"] if "time" in previous else 0.0
+    if elapsed > 0:
+        esp32_serial_rx_bytes_per_second.observe(deltas["rx_bytes"] / elapsed)
+        esp32_serial_rx_frames_per_second.observe(deltas["rx_frames"] / elapsed)
+
+
 def update_esp32_metrics(bridge: Optional[ESP32Bridge]) -> None:
     """Update ESP32-related metrics"""
     if bridge:
         esp32_connected.set(1 if bridge.is_connected else 0)
 
-        if hasattr(bridge, "_reconnect_attempts"):
-            # Reconnect attempts counter'ı sadece artırılır, set edilmez
-            pass
+        if hasattr(bridge, "get_log_sampling_stats"):
+            suppressed = _as_dict(bridge.get_log_sampling_stats()).get("suppressed", {})
+            for message_type, reasons in suppressed.items():
+                for reason, count in reasons.items():
+                    esp32_log_suppressed_messages.labels(
+                        message_type=message_type, reason=reason
+                    ).set(count)
+
+        if hasattr(bridge, "drain_ack_latencies"):
+            latencies = bridge.drain_ack_latencies()
+            if isinstance(latencies, list):
+                for command, seconds in latencies:
+                    esp32_ack_latency_seconds.labels(command=command).observe(seconds)
+
+        command_queue = getattr(bridge, "_command_queue", None)
+        if command_queue is not None and hasattr(command_queue, "qsize"):
+            try:
+                esp32_command_queue_size.set(command_queue.qsize())
+            except (TypeError, NotImplementedError):
+                pass
 
-        if bridge.is_connected:
-            status_data = bridge.get_status(max_age_seconds=60.0)
-            if status_data and hasattr(status_data, "timestamp"):
-                import time
+        _update_esp32_io_metrics(bridge)
 
-                age = time.time() - status_data.timestamp
+        if bridge.is_connected:
+            status_data = _as_dict(bridge.get_status(max_age_seconds=60.0))
+            age = _as_dict(
+                bridge.get_io_stats() if hasattr(bridge, "get_io_stats") else None
+            ).get("status_age_seconds")
+            if age is None and status_data:
+                age = _status_age_from_timestamp(status_data)
+
+            if isinstance(age, (int, float)):
                 esp32_status_age_seconds.set(age)
+                esp32_status_age_sample_seconds.observe(age)
             else:
                 esp32_status_age_seconds.set(-1)  # No status available
+
+            state = status_data.get("STATE")
+            esp32_state.set(state if isinstance(state, (int, float)) else -1)
+            max_current = status_data.get("MAX")
+            if isinstance(max_current, (int, float)):
+                esp32_max_current_amps.set(max_current)
+        else:
+            esp32_state.set(-1)
     else:
         esp32_connected.set(0)
         esp32_status_age_seconds.set(-1)
+        esp32_state.set(-1)
 
 
 def update_system_metrics() -> None:
-    """Update system-related metrics"""
-    try:
-        import psutil
-
-        # Memory usage
-        memory = psutil.virtual_memory()
-        system_memory_usage_percent.set(memory.percent)
-
-        # CPU usage
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        system_cpu_usage_percent.set(cpu_percent)
-
-        # Disk usage
-        disk = psutil.disk_usage("/")
-        disk_percent = (disk.used / disk.total) * 100
-        system_disk_usage_percent.set(disk_percent)
-
-        # CPU temperature (Raspberry Pi)
-        try:
-            with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-                temp_millidegree = int(f.read().strip())
-                temp_celsius = temp_millidegree / 1000.0
-                system_cpu_temperature_celsius.set(temp_celsius)
-        except (OSError, ValueError, FileNotFoundError):
-            # Try psutil sensors
-            try:
-                temps = psutil.sensors_temperatures()
-                if "cpu_thermal" in temps:
-                    system_cpu_temperature_celsius.set(temps["cpu_thermal"][0].current)
-                elif "coretemp" in temps:
-                    system_cpu_temperature_celsius.set(temps["coretemp"][0].current)
-            except (AttributeError, KeyError, IndexError):
-                pass
-    except ImportError:
-        # psutil not available
-        pass
-    except Exception:
-        # Metrics collection error - don't fail
-        pass
+    """
+    Update system-related metrics
+
+    Values come from the background system probe snapshot (the same source
+    as /api/health and the alert rules); nothing is sampled on the caller's
+    thread. Gauges missing from the snapshot keep their previous value.
+    """
+    from api.system_probe import get_system_probe
+
+    snapshot = get_system_probe().get_snapshot()
+    for gauge, key in (
+        (system_memory_usage_percent, "system_memory_percent"),
+        (system_cpu_usage_percent, "system_cpu_percent"),
+        (system_disk_usage_percent, "disk_percent"),
+        (system_cpu_temperature_celsius, "cpu_temperature_celsius"),
+    ):
+        value = snapshot.get(key)
+        if isinstance(value, (int, float)):
+            gauge.set(value)
 
 
 def update_session_metrics() -> None:
     """Update session-related metrics"""
     try:
-        from api.session import get_session_manager
+        from api.session import get_session_manager, SessionStatus
 
         session_manager = get_session_manager()
-        if session_manager:
-            active_sessions = len(
-                [
-                    s
-                    for s in session_manager.get_all_sessions()
-                    if s.status == "CHARGING"
-                ]
+        if not session_manager:
+            return
+
+        active = None  # (start_time, event_count)
+        session = session_manager.current_session
+        if session is not None and session.status == SessionStatus.ACTIVE:
+            active = (session.start_time, len(session.events))
+        elif session is None and not session_manager.owns_hardware:
+            # API worker: sessions live in the hardware daemon, read the
+            # active one from the database
+            summary = session_manager.get_current_session_summary()
+            if summary and summary.get("status") == SessionStatus.ACTIVE.value:
+                active = (
+                    datetime.fromisoformat(summary["start_time"]),
+                    summary.get("event_count", 0),
+                )
+
+        if active is not None:
+            start_time, event_count = active
+            api_active_sessions.set(1)
+            api_current_session_duration_seconds.set(
+                (datetime.now() - start_time).total_seconds()
             )
-            api_active_sessions.set(active_sessions)
+            api_current_session_events.set(event_count)
+        else:
+            api_active_sessions.set(0)
+            api_current_session_duration_seconds.set(0)
+            api_current_session_events.set(0)
+
+        db = getattr(session_manager, "db", None)
+        if db is not None and hasattr(db, "drain_write_durations"):
+            durations = db.drain_write_durations()
+            if isinstance(durations, list):
+                for seconds in durations:
+                    db_write_duration_seconds.observe(seconds)
     except Exception:
         # Session metrics collection error - don't fail
         pass
 
 
+def update_cache_metrics() -> None:
+    """Update response cache hit/miss counters and hit ratio"""
+    try:
+        from api.cache import get_cache_hit_stats
+
+        stats = get_cache_hit_stats()
+    except Exception:
+        return
+
+    with _sample_lock:
+        for prefix, counts in stats.items():
+            previous = _last_cache_sample.get(prefix, {"hits": 0, "misses": 0})
+            hits = counts["hits"] - previous["hits"]
+            misses = counts["misses"] - previous["misses"]
+            _last_cache_sample[prefix] = dict(counts)
+            if hits < 0 or misses < 0:
+                hits, misses = counts["hits"], counts["misses"]
+            if hits:
+                api_cache_requests_total.labels(key_prefix=prefix, result="hit").inc(
+                    hits
+                )
+            if misses:
+                api_cache_requests_total.labels(key_prefix=prefix, result="miss").inc(
+                    misses
+                )
+            if hits + misses:
+                api_cache_hit_ratio.labels(key_prefix=prefix).observe(
+                    hits / (hits + misses)
+                )
+
+
 def update_event_detector_metrics(event_detector: Optional[EventDetector]) -> None:
     """Update event detector-related metrics"""
     if event_detector:
@@ -202,6 +501,7 @@ def update_all_metrics(
     update_esp32_metrics(bridge)
     update_system_metrics()
     update_session_metrics()
+    update_cache_metrics()
     update_event_detector_metrics(event_detector)
 
 
@@ -1,21 +1,275 @@
 """
 Rate Limiting Module
 Created: 2025-12-10 13:00:00
-Last Modified: 2025-12-10 13:00:00
-Version: 1.0.0
-Description: Rate limiting implementation using slowapi for DDoS and brute force protection
+Last Modified: 2025-12-11 19:00:00
+Version: 2.0.0
+Description: DDoS ve brute force koruması için native GCRA (token bucket
+             eşdeğeri) rate limiter - bellek içi veya opsiyonel Redis backend
 """
 
-from typing import Optional
+import functools
+import hashlib
+import inspect
+import itertools
+import math
+import re
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from fastapi import Request
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
+from fastapi.responses import JSONResponse
 
 from api.config import config
 from api.logging_config import system_logger
 
+# Bellek içi storage'da tutulan maksimum client/endpoint anahtarı sayısı
+DEFAULT_MAX_KEYS = 10000
+
+# Süresi dolmuş anahtarların temizlenme aralığı (saniye)
+SWEEP_INTERVAL = 60.0
+
+# API key hash cache boyutu (SHA-256 her istekte hesaplanmaz)
+API_KEY_HASH_CACHE_SIZE = 256
+
+# Redis anahtar öneki
+REDIS_KEY_PREFIX = "ratelimit"
+
+_PERIOD_SECONDS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+_LIMIT_PATTERN = re.compile(
+    r"^\s*(\d+)\s*(?:/|per)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$",
+    re.IGNORECASE,
+)
+
+# GCRA Redis script'i: kontrol ve güncelleme tek atomik adımda yapılır
+# KEYS[1] = anahtar, ARGV = now, emission_interval, period
+# Dönüş: 0 (izin verildi) veya retry_after (saniye)
+_REDIS_GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local period = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if allow_at > now then
+    return tostring(allow_at - now)
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(period * 1000))
+return '0'
+"""
+
+
+class RateLimit:
+    """
+    Parse edilmiş rate limit ("10/minute", "100 per hour", "5/10 minutes")
+
+    GCRA parametreleri parse sırasında bir kez hesaplanır.
+    """
+
+    __slots__ = ("amount", "multiple", "granularity", "period", "emission_interval")
+
+    def __init__(self, amount: int, multiple: int, granularity: str):
+        if amount <= 0 or multiple <= 0:
+            raise ValueError("Rate limit değerleri pozitif olmalı")
+        self.amount = amount
+        self.multiple = multiple
+        self.granularity = granularity
+        self.period = float(multiple * _PERIOD_SECONDS[granularity])
+        self.emission_interval = self.period / amount
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """
+        Rate limit string'ini parse et
+
+        Args:
+            value: Rate limit string (örn: "10/minute")
+
+        Returns:
+            RateLimit instance
+
+        Raises:
+            ValueError: Geçersiz format
+        """
+        match = _LIMIT_PATTERN.match(value or "")
+        if not match:
+            raise ValueError(
+                f"Geçersiz rate limit formatı: {value} (format: 'number/period', örn: '100/minute')"
+            )
+        amount, multiple, granularity = match.groups()
+        return cls(int(amount), int(multiple or 1), granularity.lower())
+
+    def __str__(self) -> str:
+        return f"{self.amount} per {self.multiple} {self.granularity}"
+
+    def __repr__(self) -> str:
+        return f"RateLimit({self})"
+
+
+class RateLimitExceeded(Exception):
+    """Rate limit aşıldığında fırlatılır"""
+
+    def __init__(self, limit: RateLimit, retry_after: float):
+        super().__init__(f"Rate limit exceeded: {limit}")
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+class MemoryRateLimitStorage:
+    """
+    Bellek içi GCRA storage
+
+    Her anahtar için sadece teorik varış zamanı (TAT) tutulur. Kontroller
+    event loop thread'inde çalıştığı için lock kullanılmaz. Sözlük
+    DEFAULT_MAX_KEYS ile sınırlıdır; periyodik sweep'te TAT'ı geçmişte
+    kalan (limiti tamamen dolmuş) anahtarlar silinir.
+    """
+
+    def __init__(
+        self, max_keys: int = DEFAULT_MAX_KEYS, sweep_interval: float = SWEEP_INTERVAL
+    ):
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self._tat: Dict[Tuple[str, str], float] = {}
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def hit(
+        self, key: Tuple[str, str], limit: RateLimit, now: Optional[float] = None
+    ) -> float:
+        """
+        Bir isteği say
+
+        Args:
+            key: (endpoint scope, client identifier)
+            limit: Uygulanacak rate limit
+            now: Monotonic zaman (test için)
+
+        Returns:
+            0.0 (izin verildi) veya saniye cinsinden retry_after
+        """
+        if now is None:
+            now = time.monotonic()
+        tat = self._tat.get(key, now)
+        if tat < now:
+            tat = now
+        new_tat = tat + limit.emission_interval
+        allow_at = new_tat - limit.period
+        if allow_at > now:
+            return allow_at - now
+
+        self._tat[key] = new_tat
+        if now >= self._next_sweep:
+            self.sweep(now)
+        elif len(self._tat) > self.max_keys:
+            # Sweep beklenmeden en eski eklenen anahtarı düşür (O(1))
+            del self._tat[next(iter(self._tat))]
+        return 0.0
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Süresi dolmuş anahtarları temizle
+
+        Temizlikten sonra hâlâ max_keys aşılıyorsa en eski eklenen
+        anahtarlar düşürülür.
+
+        Returns:
+            Silinen anahtar sayısı
+        """
+        if now is None:
+            now = time.monotonic()
+        expired = [key for key, tat in self._tat.items() if tat <= now]
+        for key in expired:
+            del self._tat[key]
+        removed = len(expired)
+
+        overflow = len(self._tat) - self.max_keys
+        if overflow > 0:
+            for key in list(itertools.islice(self._tat, overflow)):
+                del self._tat[key]
+            removed += overflow
+
+        self._next_sweep = now + self.sweep_interval
+        return removed
+
+    def reset(self) -> None:
+        """Tüm sayaçları sıfırla"""
+        self._tat.clear()
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+class RedisRateLimitStorage:
+    """
+    Redis GCRA storage
+
+    Birden fazla uvicorn worker'ı aynı limiti paylaşır. Kontrol ve
+    güncelleme tek bir Lua script'i ile atomik yapılır; anahtarlar bir
+    periyot sonra Redis tarafından expire edilir. Redis hatasında istek
+    engellenmez (fail-open).
+    """
+
+    def __init__(self, redis_url: Optional[str] = None) -> None:
+        try:
+            import redis
+
+            redis_url = redis_url or config.RATE_LIMIT_REDIS_URL
+            self._client = redis.from_url(redis_url, decode_responses=True)
+            # Bağlantı testi
+            self._client.ping()
+            self._script = self._client.register_script(_REDIS_GCRA_SCRIPT)
+            system_logger.info(f"Redis rate limit backend bağlandı: {redis_url}")
+        except ImportError:
+            raise ImportError(
+                "Redis backend için 'redis' paketi gerekli. 'pip install redis' ile yükleyin."
+            )
+        except Exception as e:
+            system_logger.error(f"Redis bağlantı hatası: {e}")
+            raise
+
+    def hit(
+        self, key: Tuple[str, str], limit: RateLimit, now: Optional[float] = None
+    ) -> float:
+        """
+        Bir isteği say (worker'lar arası ortak saat için wall clock kullanılır)
+
+        Returns:
+            0.0 (izin verildi) veya saniye cinsinden retry_after
+        """
+        if now is None:
+            now = time.time()
+        try:
+            result = self._script(
+                keys=[f"{REDIS_KEY_PREFIX}:{key[0]}:{key[1]}"],
+                args=[now, limit.emission_interval, limit.period],
+            )
+            return float(result)
+        except Exception as e:
+            system_logger.error(f"Redis rate limit error: {e}")
+            return 0.0
+
+    def reset(self) -> None:
+        """Tüm rate limit anahtarlarını sil"""
+        try:
+            for key in self._client.scan_iter(f"{REDIS_KEY_PREFIX}:*"):
+                self._client.delete(key)
+        except Exception as e:
+            system_logger.error(f"Redis rate limit reset error: {e}")
+
+
+@functools.lru_cache(maxsize=API_KEY_HASH_CACHE_SIZE)
+def _hash_api_key(api_key: str) -> str:
+    """API key hash'i (cache'lenir; her istekte SHA-256 hesaplanmaz)"""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
 
 def get_client_identifier(request: Request) -> str:
     """
@@ -35,23 +289,169 @@ def get_client_identifier(request: Request) -> str:
     api_key = request.headers.get("X-API-Key")
     if api_key:
         # API key'in hash'ini kullan (güvenlik için)
-        import hashlib
-
-        api_key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:16]
-        return f"api_key:{api_key_hash}"
+        return f"api_key:{_hash_api_key(api_key)}"
 
     # API key yoksa, IP-based rate limiting kullan
-    return get_remote_address(request)
+    client = request.client
+    return client.host if client and client.host else "127.0.0.1"
+
+
+class RateLimiter:
+    """
+    Endpoint decorator'ları ile uygulanan rate limiter
+
+    Her decorate edilen endpoint kendi limitini ve anahtar uzayını kullanır
+    (endpoint scope + client identifier). Route bazlı limitler
+    config.RATE_LIMIT_ROUTES ile route template'ine göre ezilebilir; çözülen
+    limit endpoint başına bir kez hesaplanıp cache'lenir.
+    """
+
+    def __init__(
+        self,
+        key_func: Callable[[Request], str],
+        storage=None,
+        route_limits: Optional[Dict[str, str]] = None,
+        enabled: bool = True,
+    ):
+        """
+        Rate limiter başlatıcı
+
+        Args:
+            key_func: Request'ten client identifier üreten fonksiyon
+            storage: MemoryRateLimitStorage veya RedisRateLimitStorage
+            route_limits: Route template -> rate limit string override'ları
+            enabled: False ise hiçbir istek sınırlanmaz
+        """
+        self.key_func = key_func
+        self.storage = storage if storage is not None else MemoryRateLimitStorage()
+        self.route_limits = {
+            path: RateLimit.parse(value) for path, value in (route_limits or {}).items()
+        }
+        self.enabled = enabled
+        self._resolved_limits: Dict[str, RateLimit] = {}
+
+    def limit(self, limit_value: str) -> Callable:
+        """
+        Endpoint'e rate limit uygulayan decorator
+
+        Endpoint'in "request" (Request) parametresi olmalıdır.
+
+        Args:
+            limit_value: Rate limit string (örn: "10/minute")
+
+        Returns:
+            Decorator function
+        """
+        default_limit = RateLimit.parse(limit_value)
+
+        def decorator(func: Callable) -> Callable:
+            scope = f"{func.__module__}.{func.__name__}"
+            request_param = _find_request_param(func)
+
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    if self.enabled:
+                        self._check(kwargs.get(request_param), scope, default_limit)
+                    return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if self.enabled:
+                    self._check(kwargs.get(request_param), scope, default_limit)
+                return func(*args, **kwargs)
+
+            return sync_wrapper
+
+        return decorator
+
+    def _check(
+        self, request: Optional[Request], scope: str, default_limit: RateLimit
+    ) -> None:
+        """
+        İsteği say, limit aşıldıysa RateLimitExceeded fırlat
+
+        Raises:
+            RateLimitExceeded: Limit aşıldı
+        """
+        if request is None:
+            return
+        limit = self._resolved_limits.get(scope)
+        if limit is None:
+            limit = self._resolve_limit(request, scope, default_limit)
+
+        retry_after = self.storage.hit((scope, self.key_func(request)), limit)
+        if retry_after > 0:
+            raise RateLimitExceeded(limit, retry_after)
+
+    def _resolve_limit(
+        self, request: Request, scope: str, default_limit: RateLimit
+    ) -> RateLimit:
+        """Route override'ı varsa onu, yoksa decorator limitini seç ve cache'le"""
+        route = request.scope.get("route")
+        path = getattr(route, "path", None)
+        limit = self.route_limits.get(path, default_limit)
+        self._resolved_limits[scope] = limit
+        return limit
+
+    def reset(self) -> None:
+        """Tüm sayaçları sıfırla"""
+        self.storage.reset()
+
+
+def _find_request_param(func: Callable) -> str:
+    """
+    Endpoint'in Request parametresinin adını bul
+
+    Raises:
+        TypeError: Endpoint'te Request parametresi yok
+    """
+    for name, param in inspect.signature(func).parameters.items():
+        if param.annotation is Request or name == "request":
+            return name
+    raise TypeError(
+        f"Rate limit uygulanan endpoint'in 'request' parametresi olmalı: {func.__name__}"
+    )
+
+
+def _create_storage():
+    """Config'e göre rate limit storage'ı oluştur (Redis hatasında memory'ye düş)"""
+    if config.RATE_LIMIT_BACKEND == "redis":
+        try:
+            return RedisRateLimitStorage()
+        except Exception as e:
+            system_logger.warning(
+                f"Redis rate limit backend başlatılamadı, memory backend kullanılıyor: {e}"
+            )
+    return MemoryRateLimitStorage(max_keys=config.RATE_LIMIT_MAX_KEYS)
 
 
 # Rate limiter instance oluştur
-limiter = Limiter(
+limiter = RateLimiter(
     key_func=get_client_identifier,
-    default_limits=["100/minute"],  # Varsayılan limit: 100 istek/dakika
-    storage_uri="memory://",  # In-memory storage (production'da Redis kullanılabilir)
+    storage=_create_storage(),
+    route_limits=config.RATE_LIMIT_ROUTES,
 )
 
 
+def rate_limit_exceeded_handler(
+    request: Request, exc: RateLimitExceeded
+) -> JSONResponse:
+    """
+    Rate limit aşıldığında 429 response döndür
+
+    Retry-After header'ı GCRA'nın hesapladığı bekleme süresidir.
+    """
+    return JSONResponse(
+        status_code=429,
+        content={"error": f"Rate limit exceeded: {exc.limit}"},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+
 def get_rate_limit_config() -> dict:
     """
     Rate limit konfigürasyonunu config modülünden al
@@ -65,6 +465,8 @@ def get_rate_limit_config() -> dict:
         "api_key_limit": config.RATE_LIMIT_API_KEY,  # API key-based: 200/dakika
         "charge_limit": config.RATE_LIMIT_CHARGE,  # Charge endpoint'leri: 10/dakika
         "status_limit": config.RATE_LIMIT_STATUS,  # Status endpoint'leri: 30/dakika
+        "route_limits": dict(config.RATE_LIMIT_ROUTES),
+        "backend": config.RATE_LIMIT_BACKEND,
     }
 
 
@@ -123,7 +525,7 @@ def setup_rate_limiting(app):
     app.state.limiter = limiter
 
     # Rate limit exceeded exception handler'ı ekle
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
     system_logger.info(
         "Rate limiting aktif edildi",
@@ -133,6 +535,8 @@ def setup_rate_limiting(app):
             "api_key_limit": rate_limit_config["api_key_limit"],
             "charge_limit": rate_limit_config["charge_limit"],
             "status_limit": rate_limit_config["status_limit"],
+            "route_limits": rate_limit_config["route_limits"],
+            "backend": type(limiter.storage).__name__,
         },
     )
 
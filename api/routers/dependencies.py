@@ -1,13 +1,14 @@
 """
 Common Dependencies for API Routers
 Created: 2025-12-10
-Last Modified: 2025-12-10 02:20:00
-Version: 1.0.0
+Last Modified: 2025-12-11 20:00:00
+Version: 1.1.0
 Description: Common dependencies for API routers
 """
 
 from fastapi import Depends
 
+from api.config import config
 from esp32.bridge import ESP32Bridge, get_esp32_bridge
 
 
@@ -15,8 +16,15 @@ def get_bridge() -> ESP32Bridge:
     """
     ESP32 bridge instance'ı dependency injection için
 
+    Worker modunda (API_MODE=worker) seri port hardware daemon'dadır;
+    aynı arayüzü sağlayan RemoteBridge döndürülür.
+
     Returns:
         ESP32Bridge instance
     """
+    if config.is_api_worker():
+        from api.hardware import get_hardware_client
+
+        return get_hardware_client().bridge
     return get_esp32_bridge()
 
@@ -1,12 +1,16 @@
 """
 Meter API Router
 Created: 2025-12-10
-Last Modified: 2025-12-10
-Version: 1.0.0
-Description: Meter data endpoints (for testing purposes)
+Last Modified: 2025-12-12 11:00:00
+Version: 1.2.1
+Description: Meter data endpoints (for testing purposes) - değerler meter
+             sampler cache'inden okunur, istek yolunda RS-485 bus'a gidilmez;
+             faz başına değerler ve dakikalık güç kalitesi aggregate'leri
 """
 
-from fastapi import APIRouter, HTTPException, status
+import time
+
+from fastapi import APIRouter, HTTPException, Query, status
 from api.models import APIResponse
 from api.cache import cache_response
 from api.logging_config import system_logger
@@ -26,23 +30,23 @@ async def get_meter_status():
     try:
         # Meter modülünü import et (opsiyonel)
         try:
-            from api.meter import get_meter
+            from api.meter import get_meter_sampler
 
-            meter = get_meter()
+            sampler = get_meter_sampler()
 
-            if not meter:
+            if not sampler.is_running:
                 return APIResponse(
                     success=True,
-                    message="Meter modülü yüklü değil",
+                    message="Meter örneklenmiyor",
                     data={
                         "connected": False,
                         "available": False,
-                        "note": "Meter modülü henüz aktif değil",
+                        "note": "Meter bu süreçte örneklenmiyor (worker modu veya session manager başlatılmadı)",
                     },
                 )
 
-            # Meter bağlantı durumu
-            is_connected = meter.is_connected() if hasattr(meter, "is_connected") else False
+            # Meter bağlantı durumu (son örnekleme turu)
+            is_connected = sampler.is_connected()
 
             if not is_connected:
                 return APIResponse(
@@ -55,9 +59,9 @@ async def get_meter_status():
                     },
                 )
 
-            # Meter verilerini oku
+            # Son örneklenen meter verileri
             try:
-                reading = meter.read_all() if hasattr(meter, "read_all") else None
+                reading = sampler.get_latest()
 
                 if reading and hasattr(reading, "is_valid") and reading.is_valid:
                     meter_data = {
@@ -71,6 +75,7 @@ async def get_meter_status():
                         "frequency_hz": getattr(reading, "frequency_hz", None),
                         "power_factor": getattr(reading, "power_factor", None),
                         "timestamp": getattr(reading, "timestamp", None),
+                        "age_seconds": sampler.get_latest_age(),
                     }
                     return APIResponse(
                         success=True,
@@ -133,19 +138,19 @@ async def get_meter_reading():
     try:
         # Meter modülünü import et (opsiyonel)
         try:
-            from api.meter import get_meter
+            from api.meter import get_meter_sampler
 
-            meter = get_meter()
+            sampler = get_meter_sampler()
 
-            if not meter:
+            if not sampler.is_running:
                 return APIResponse(
                     success=True,
-                    message="Meter modülü yüklü değil",
+                    message="Meter örneklenmiyor",
                     data=None,
                 )
 
-            # Meter bağlantı durumu
-            is_connected = meter.is_connected() if hasattr(meter, "is_connected") else False
+            # Meter bağlantı durumu (son örnekleme turu)
+            is_connected = sampler.is_connected()
 
             if not is_connected:
                 return APIResponse(
@@ -154,8 +159,8 @@ async def get_meter_reading():
                     data=None,
                 )
 
-            # Meter verilerini oku
-            reading = meter.read_all() if hasattr(meter, "read_all") else None
+            # Son örneklenen meter verileri
+            reading = sampler.get_latest()
 
             if reading and hasattr(reading, "is_valid") and reading.is_valid:
                 meter_data = {
@@ -167,6 +172,8 @@ async def get_meter_reading():
                     "frequency_hz": getattr(reading, "frequency_hz", None),
                     "power_factor": getattr(reading, "power_factor", None),
                     "timestamp": getattr(reading, "timestamp", None),
+                    "voltages_v": getattr(reading, "voltages_v", None),
+                    "currents_a": getattr(reading, "currents_a", None),
                 }
                 return APIResponse(
                     success=True,
@@ -195,3 +202,52 @@ async def get_meter_reading():
             detail=f"Meter okuması alınamadı: {str(e)}",
         )
 
+
+@router.get("/power-quality")
+@cache_response(ttl=5, key_prefix="meter_power_quality")
+async def get_power_quality(
+    minutes: int = Query(15, ge=1, le=60, description="Döndürülecek dakika sayısı"),
+):
+    """
+    Üç faz güç kalitesi
+
+    Faz başına voltaj/akım ve faz dengesizliği için dakikalık min/max/ortalama
+    değerleri döndürür (içinde bulunulan dakika + son N dakika içinde
+    tamamlanmış dakikalar; okuma olmayan dakikalar listede yer almaz).
+    """
+    try:
+        try:
+            from api.meter import get_meter_sampler, get_power_quality_monitor
+
+            if not get_meter_sampler().is_running:
+                return APIResponse(
+                    success=True,
+                    message="Meter örneklenmiyor",
+                    data=None,
+                )
+
+            monitor = get_power_quality_monitor()
+            now = time.time()
+            return APIResponse(
+                success=True,
+                message="Güç kalitesi verileri başarıyla alındı",
+                data={
+                    "current": monitor.get_current(now=now),
+                    "minutes": monitor.get_history(minutes, now=now),
+                },
+            )
+
+        except ImportError:
+            # Meter modülü yüklü değil
+            return APIResponse(
+                success=True,
+                message="Meter modülü yüklü değil",
+                data=None,
+            )
+
+    except Exception as e:
+        system_logger.error(f"Meter power quality get error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Güç kalitesi verileri alınamadı: {str(e)}",
+        )
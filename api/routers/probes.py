@@ -0,0 +1,135 @@
+"""
+Probe Router
+Created: 2025-12-11 16:00:00
+Last Modified: 2025-12-12 10:00:00
+Version: 1.1.1
+Description: Liveness (/livez) ve readiness (/readyz) endpoint'leri -
+             systemd watchdog ve monitor script'leri için hafif kontroller
+"""
+
+import time
+from typing import Any, Dict
+
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from api import event_detector as event_detector_module
+from api.config import config
+from api.database import core as database_module
+from api.hardware import client as hardware_client_module
+from esp32 import bridge as bridge_module
+
+router = APIRouter(tags=["Probes"])
+
+# Son STAT mesajının kabul edilen maksimum yaşı (saniye)
+# /api/health'teki esp32_status kontrolü ile aynı eşik
+READYZ_MAX_STATUS_AGE = 15.0
+
+# Kabul edilen maksimum bekleyen database yazma işlemi sayısı
+READYZ_MAX_DB_WRITE_QUEUE = 8
+
+_started_at = time.monotonic()
+
+
+@router.get("/livez")
+async def livez() -> Dict[str, Any]:
+    """
+    Liveness kontrolü
+
+    Sabit sürede döner; bridge, database veya dosya sistemine dokunmaz.
+    Cevap gelmesi event loop'un çalıştığını gösterir.
+    """
+    return {"status": "ok", "uptime_seconds": round(time.monotonic() - _started_at, 3)}
+
+
+@router.get("/readyz")
+async def readyz() -> JSONResponse:
+    """
+    Readiness kontrolü
+
+    Sadece bellekteki durumu okur; singleton'lar burada oluşturulmaz,
+    henüz başlatılmamış bileşenler "not_initialized" olarak raporlanır.
+    Worker modunda bridge ve event detector durumu hardware daemon'dan
+    push edilen durumdur (daemon bağlantısı yoksa bağlı değil sayılır);
+    daemon'a istek gönderilmez.
+
+    Kontroller:
+    - ESP32 bridge bağlı ve son STAT mesajı READYZ_MAX_STATUS_AGE içinde
+    - Database yazma kuyruğu READYZ_MAX_DB_WRITE_QUEUE altında
+    - Event detector monitor thread'i çalışıyor
+
+    Returns:
+        Tüm kontroller geçerse 200, aksi halde 503
+    """
+    checks = {
+        "esp32": _check_bridge(),
+        "database": _check_database(),
+        "event_detector": _check_event_detector(),
+    }
+    ready = all(check["ok"] for check in checks.values())
+    return JSONResponse(
+        status_code=(
+            status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        content={"status": "ready" if ready else "not_ready", "checks": checks},
+    )
+
+
+def _result(ok: bool, reason: str, **details: Any) -> Dict[str, Any]:
+    return {"ok": ok, "reason": reason, **details}
+
+
+def _hardware_client():
+    """Worker modunda hardware client (oluşturulmamışsa None)"""
+    if not config.is_api_worker():
+        return None
+    return hardware_client_module._hardware_client_instance
+
+
+def _check_bridge() -> Dict[str, Any]:
+    """ESP32 bridge bağlantısı ve STAT tazeliği (STAT yaşı yerel hesaplanır)"""
+    if config.is_api_worker():
+        client = _hardware_client()
+        bridge = client.bridge if client else None
+    else:
+        bridge = bridge_module._esp32_bridge_instance
+    if bridge is None:
+        return _result(False, "not_initialized")
+    if not bridge.is_connected:
+        return _result(False, "disconnected")
+
+    status_age = bridge.get_io_stats().get("status_age_seconds")
+    if status_age is None:
+        return _result(False, "no_status")
+    status_age = round(status_age, 3)
+    if status_age > READYZ_MAX_STATUS_AGE:
+        return _result(False, "stale_status", status_age_seconds=status_age)
+    return _result(True, "ok", status_age_seconds=status_age)
+
+
+def _check_database() -> Dict[str, Any]:
+    """Database yazma kuyruğu derinliği"""
+    database = database_module.database_instance
+    if database is None:
+        return _result(False, "not_initialized")
+
+    depth = database.get_write_queue_depth()
+    if depth > READYZ_MAX_DB_WRITE_QUEUE:
+        return _result(False, "write_queue_backlog", write_queue_depth=depth)
+    return _result(True, "ok", write_queue_depth=depth)
+
+
+def _check_event_detector() -> Dict[str, Any]:
+    """Event detector monitor thread'i"""
+    if config.is_api_worker():
+        client = _hardware_client()
+        detector = client.event_detector if client else None
+    else:
+        detector = event_detector_module.event_detector_instance
+    if detector is None:
+        return _result(False, "not_initialized")
+
+    thread = detector._monitor_thread
+    if not detector.is_monitoring or thread is None or not thread.is_alive():
+        return _result(False, "thread_not_running")
+    return _result(True, "ok")
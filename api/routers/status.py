@@ -1,13 +1,23 @@
 """
 Status Router
 Created: 2025-12-10
-Last Modified: 2025-12-10 02:20:00
-Version: 1.0.0
+Last Modified: 2025-12-12 10:00:00
+Version: 1.2.1
 Description: Status and health check endpoints
 """
 
 import threading
-from fastapi import APIRouter, HTTPException, status, Depends, Request
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from esp32.bridge import ESP32Bridge
 from api.routers.dependencies import get_bridge
 from api.models import APIResponse
@@ -16,12 +26,18 @@ from api.rate_limiting import status_rate_limit
 from api.services.status_service import StatusService
 from api.cache import cache_response
 from api.metrics import get_metrics_response, update_all_metrics
+from api.streaming import (
+    SSE_KEEPALIVE_INTERVAL,
+    StatusBroadcaster,
+    get_alert_broadcaster,
+    get_status_broadcaster,
+)
+from api.system_probe import get_system_probe
 
 router = APIRouter(prefix="/api", tags=["Status"])
 
 
 @router.get("/health")
-@cache_response(ttl=30, key_prefix="health")  # 30 saniye cache
 async def health_check(bridge: ESP32Bridge = Depends(get_bridge)):
     """
     Sistem sağlık kontrolü (Detaylı)
@@ -31,10 +47,11 @@ async def health_check(bridge: ESP32Bridge = Depends(get_bridge)):
     - ESP32 bağlantı durumu
     - Event detector durumu
     - Thread sayısı
-    - Memory kullanımı (yaklaşık)
-    """
-    import os
+    - Memory, CPU, disk, sıcaklık ve network bilgileri
 
+    Sistem değerleri arka plan system probe servisinin snapshot'ından
+    okunur; handler içinde dosya okuma, subprocess veya bekleme yapılmaz.
+    """
     health_data = {
         "api": "healthy",
         "esp32_connected": False,
@@ -76,252 +93,13 @@ async def health_check(bridge: ESP32Bridge = Depends(get_bridge)):
     except Exception as e:
         health_data["event_detector"] = {"error": str(e)}
 
-    # Process ve sistem metrikleri (/proc kullanarak - psutil gerektirmez)
-    try:
-        pid = os.getpid()
-
-        # Process memory kullanımı
-        try:
-            with open(f"/proc/{pid}/status", "r") as f:
-                for line in f:
-                    if line.startswith("VmRSS:"):
-                        memory_kb = int(line.split()[1])
-                        health_data["memory_mb"] = round(memory_kb / 1024, 2)
-                        break
-        except (OSError, ValueError, FileNotFoundError):
-            pass
-
-        # Process CPU kullanımı (basit hesaplama)
-        try:
-            # /proc/stat ve /proc/[pid]/stat kullanarak CPU% hesapla
-            with open("/proc/stat", "r") as f:
-                cpu_line = f.readline()
-                cpu_fields = cpu_line.split()
-                sum(int(x) for x in cpu_fields[1:])
-
-            with open(f"/proc/{pid}/stat", "r") as f:
-                proc_stat = f.read().split()
-                # utime + stime (14 ve 15. alanlar, 0-indexed: 13 ve 14)
-                proc_utime = int(proc_stat[13])
-                proc_stime = int(proc_stat[14])
-                proc_utime + proc_stime
-
-            # Basit CPU% hesaplama (yaklaşık)
-            # Not: Bu gerçek zamanlı değil, process'in toplam CPU kullanımı
-            # Gerçek zamanlı için psutil veya daha karmaşık hesaplama gerekir
-            # Ancak health check için yaklaşık değer yeterli
-            health_data["cpu_percent"] = None  # Gerçek zamanlı CPU% için psutil gerekli
-            health_data["cpu_note"] = "Real-time CPU% requires psutil module"
-        except (OSError, ValueError, FileNotFoundError, IndexError):
-            pass
-
-        # Sistem genel metrikleri
-        try:
-            # Sistem memory kullanımı
-            with open("/proc/meminfo", "r") as f:
-                meminfo = {}
-                for line in f:
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        meminfo[parts[0].rstrip(":")] = int(parts[1])
-
-                total_mem_kb = meminfo.get("MemTotal", 0)
-                available_mem_kb = meminfo.get(
-                    "MemAvailable", meminfo.get("MemFree", 0)
-                )
-
-                if total_mem_kb > 0:
-                    used_mem_kb = total_mem_kb - available_mem_kb
-                    health_data["system_memory_percent"] = round(
-                        (used_mem_kb / total_mem_kb) * 100, 2
-                    )
-                    health_data["system_memory_total_mb"] = round(
-                        total_mem_kb / 1024, 2
-                    )
-                    health_data["system_memory_available_mb"] = round(
-                        available_mem_kb / 1024, 2
-                    )
-        except (OSError, ValueError, FileNotFoundError):
-            pass
-
-        # Load average
-        try:
-            load_avg = os.getloadavg()
-            health_data["load_average"] = {
-                "1min": round(load_avg[0], 2),
-                "5min": round(load_avg[1], 2),
-                "15min": round(load_avg[2], 2),
-            }
-        except (OSError, AttributeError):
-            pass
-
-        # psutil varsa daha detaylı bilgi ekle
-        try:
-            import psutil
-
-            process = psutil.Process(pid)
-            health_data["cpu_percent"] = round(
-                process.cpu_percent(interval=0.1), 2
-            )  # Kısa interval
-            health_data["memory_percent"] = round(process.memory_percent(), 2)
-            health_data["system_cpu_percent"] = round(
-                psutil.cpu_percent(interval=0.1), 2
-            )
-            # psutil varsa cpu_note'u kaldır
-            health_data.pop("cpu_note", None)
-        except ImportError:
-            pass  # psutil yoksa devam et
-        except Exception:
-            pass  # psutil hatası varsa sessizce geç
-
-        # CPU sıcaklığı (Raspberry Pi ve diğer sistemler için)
-        try:
-            cpu_temp_celsius = None
-
-            # Raspberry Pi: /sys/class/thermal/thermal_zone0/temp (millidegree)
-            try:
-                with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-                    temp_millidegree = int(f.read().strip())
-                    cpu_temp_celsius = round(temp_millidegree / 1000.0, 2)
-            except (OSError, ValueError, FileNotFoundError):
-                # psutil ile CPU sıcaklığı (Linux, alternatif yöntem)
-                try:
-                    import psutil
-
-                    if hasattr(psutil, "sensors_temperatures"):
-                        temps = psutil.sensors_temperatures()
-                        if "cpu_thermal" in temps:
-                            cpu_temp_celsius = round(temps["cpu_thermal"][0].current, 2)
-                        elif "coretemp" in temps:
-                            cpu_temp_celsius = round(temps["coretemp"][0].current, 2)
-                except (ImportError, AttributeError, KeyError, IndexError):
-                    pass
-
-            if cpu_temp_celsius is not None:
-                health_data["cpu_temperature_celsius"] = cpu_temp_celsius
-                health_data["cpu_temperature_fahrenheit"] = round(
-                    cpu_temp_celsius * 9 / 5 + 32, 2
-                )
-
-                # Sıcaklık durumu (Raspberry Pi için eşik değerleri)
-                if cpu_temp_celsius > 80:
-                    health_data["cpu_temperature_status"] = "critical"
-                elif cpu_temp_celsius > 70:
-                    health_data["cpu_temperature_status"] = "high"
-                elif cpu_temp_celsius > 60:
-                    health_data["cpu_temperature_status"] = "warm"
-                else:
-                    health_data["cpu_temperature_status"] = "normal"
-        except Exception:
-            pass  # CPU sıcaklığı alınamadı
-
-        # Disk kullanımı (SSD/HDD)
-        try:
-            import shutil
-
-            disk_usage = shutil.disk_usage("/")
-            disk_total_gb = round(disk_usage.total / (1024**3), 2)
-            disk_used_gb = round(disk_usage.used / (1024**3), 2)
-            disk_free_gb = round(disk_usage.free / (1024**3), 2)
-            disk_percent = round((disk_usage.used / disk_usage.total) * 100, 2)
-
-            health_data["disk_total_gb"] = disk_total_gb
-            health_data["disk_used_gb"] = disk_used_gb
-            health_data["disk_free_gb"] = disk_free_gb
-            health_data["disk_percent"] = disk_percent
-        except Exception:
-            pass  # Disk bilgisi alınamadı
-
-        # Network bilgileri (SSID ve IP adresi)
-        try:
-            import socket
-            import subprocess
-
-            # IP adresi al (eth0 veya wlan0 interface'inden)
-            ip_address = None
-            try:
-                # Önce wlan0, sonra eth0 kontrol et
-                for interface in ["wlan0", "eth0", "enp0s3", "ens33"]:
-                    try:
-                        result = subprocess.run(
-                            ["ip", "addr", "show", interface],
-                            capture_output=True,
-                            text=True,
-                            timeout=1,
-                        )
-                        if result.returncode == 0:
-                            import re
-
-                            match = re.search(
-                                r"inet (\d+\.\d+\.\d+\.\d+)", result.stdout
-                            )
-                            if match:
-                                ip_address = match.group(1)
-                                break
-                    except (subprocess.TimeoutExpired, FileNotFoundError):
-                        continue
-
-                # Alternatif: socket ile
-                if not ip_address:
-                    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                    try:
-                        s.connect(("8.8.8.8", 80))
-                        ip_address = s.getsockname()[0]
-                    except Exception:
-                        pass
-                    finally:
-                        s.close()
-            except Exception:
-                pass
-
-            # SSID al (WiFi network adı)
-            ssid = None
-            try:
-                # iwconfig ile (eski yöntem)
-                result = subprocess.run(
-                    ["iwconfig"], capture_output=True, text=True, timeout=1
-                )
-                if result.returncode == 0:
-                    import re
-
-                    match = re.search(r'ESSID:"([^"]+)"', result.stdout)
-                    if match:
-                        ssid = match.group(1)
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                pass
-
-            # nmcli ile (NetworkManager)
-            if not ssid:
-                try:
-                    result = subprocess.run(
-                        ["nmcli", "-t", "-f", "active,ssid", "dev", "wifi"],
-                        capture_output=True,
-                        text=True,
-                        timeout=1,
-                    )
-                    if result.returncode == 0:
-                        for line in result.stdout.strip().split("\n"):
-                            if line.startswith("yes:"):
-                                ssid = line.split(":")[1]
-                                break
-                except (subprocess.TimeoutExpired, FileNotFoundError):
-                    pass
-
-            # Network bilgilerini ekle
-            health_data["network_ip"] = ip_address
-            health_data["network_ssid"] = ssid
-        except Exception:
-            pass  # Network bilgisi alınamadı
-    except Exception as e:
-        # Metrik toplama hatası - kritik değil, devam et
-        health_data["metrics_error"] = str(e)
-
-    # Genel sağlık durumu
-    (
-        health_data["api"] == "healthy"
-        and health_data["esp32_connected"]
-        and health_data["esp32_status"] == "available"
-    )
+    # Sistem metrikleri (arka plan probe snapshot'ı)
+    probe = get_system_probe()
+    if not probe.is_running:
+        # Startup dışında (örn. testler) ilk istekte başlat; ilk örnek hazır
+        # olana kadar sistem alanları None kalır
+        probe.start()
+    health_data.update(probe.get_snapshot())
 
     return APIResponse(success=True, message="System health check", data=health_data)
 
@@ -367,16 +145,84 @@ async def get_status(request: Request, bridge: ESP32Bridge = Depends(get_bridge)
     )
 
 
+@router.get("/status/stream")
+async def stream_status(request: Request):
+    """
+    Canlı durum akışı (Server-Sent Events)
+
+    /api/status polling'i yerine kullanılır. Bağlantı kurulunca son bilinen
+    STAT ve session özeti gönderilir, ardından her yeni STAT mesajı,
+    state transition event'i ve session güncellemesi push edilir.
+
+    Event tipleri: status, event, session
+    """
+    return _sse_response(request, get_status_broadcaster())
+
+
+@router.websocket("/status/ws")
+async def status_websocket(websocket: WebSocket):
+    """
+    Canlı durum akışı (WebSocket)
+
+    SSE endpoint'i ile aynı mesajları JSON text frame olarak gönderir.
+    """
+    await _websocket_stream(websocket, get_status_broadcaster())
+
+
+def _sse_response(request: Request, broadcaster: StatusBroadcaster):
+    """Broadcaster mesajlarını SSE olarak akıtan response"""
+
+    async def event_stream():
+        # İstemciye yeniden bağlanma aralığını bildir
+        yield "retry: 5000\n\n"
+        async for message in broadcaster.iter_messages(
+            keepalive=SSE_KEEPALIVE_INTERVAL
+        ):
+            if await request.is_disconnected():
+                break
+            if message is None:
+                # Keep-alive yorumu (proxy timeout'larını önler)
+                yield ": keep-alive\n\n"
+                continue
+            yield message.sse
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _websocket_stream(websocket: WebSocket, broadcaster: StatusBroadcaster):
+    """Broadcaster mesajlarını WebSocket text frame olarak gönder"""
+    await websocket.accept()
+    try:
+        async for message in broadcaster.iter_messages():
+            await websocket.send_text(message.payload)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Yavaş abone düşürüldüyse bağlantıyı kapat
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+
 @router.get("/metrics")
 async def metrics(bridge: ESP32Bridge = Depends(get_bridge)):
     """
     Prometheus metrics endpoint
 
     Prometheus tarafından scrape edilebilir metrics endpoint'i.
-    Tüm sistem metriklerini Prometheus formatında döndürür.
+    Tüm sistem metriklerini Prometheus formatında döndürür. Güncelleme
+    (worker modunda aktif session için database okuması dahil) event loop'u
+    bloklamamak için thread pool'da yapılır.
     """
     event_detector = get_event_detector(get_bridge)
-    update_all_metrics(bridge=bridge, event_detector=event_detector)
+    await run_in_threadpool(
+        update_all_metrics, bridge=bridge, event_detector=event_detector
+    )
     return get_metrics_response()
 
 
@@ -391,24 +237,17 @@ async def get_alerts(bridge: ESP32Bridge = Depends(get_bridge)):
     from api.alerting import get_alert_manager
     from api.metrics import update_all_metrics
 
-    event_detector = get_event_detector(get_bridge)
-    update_all_metrics(bridge=bridge, event_detector=event_detector)
-
     alert_manager = get_alert_manager()
-    alert_manager.evaluate_all(bridge=bridge, event_detector=event_detector)
+    if not alert_manager.is_scheduled:
+        # Scheduler çalışmıyorsa (örn. testler) metrics ve kuralları burada
+        # güncelle; normalde alert scheduler thread'i bunları periyodik yapar
+        event_detector = get_event_detector(get_bridge)
+        update_all_metrics(bridge=bridge, event_detector=event_detector)
+        alert_manager.evaluate_all(bridge=bridge, event_detector=event_detector)
 
     active_alerts = alert_manager.get_active_alerts()
 
-    alerts_data = [
-        {
-            "name": alert.name,
-            "severity": alert.severity.value,
-            "message": alert.message,
-            "timestamp": alert.timestamp.isoformat(),
-            "metadata": alert.metadata,
-        }
-        for alert in active_alerts
-    ]
+    alerts_data = [alert.to_dict() for alert in active_alerts]
 
     return APIResponse(
         success=True,
@@ -418,3 +257,34 @@ async def get_alerts(bridge: ESP32Bridge = Depends(get_bridge)):
             "count": len(active_alerts),
         },
     )
+
+
+@router.get("/alerts/stream")
+async def stream_alerts(request: Request):
+    """
+    Canlı alert akışı (Server-Sent Events)
+
+    /api/alerts polling'i yerine kullanılır. Bağlantı kurulunca aktif alert
+    listesi ("alerts" event'i) gönderilir, ardından her alert değişikliği
+    ("alert" event'i, change: triggered/updated/resolved) push edilir.
+    """
+    return _sse_response(request, _get_attached_alert_broadcaster())
+
+
+@router.websocket("/alerts/ws")
+async def alerts_websocket(websocket: WebSocket):
+    """
+    Canlı alert akışı (WebSocket)
+
+    SSE endpoint'i ile aynı mesajları JSON text frame olarak gönderir.
+    """
+    await _websocket_stream(websocket, _get_attached_alert_broadcaster())
+
+
+def _get_attached_alert_broadcaster():
+    """Alert manager'a bağlı alert broadcaster'ı döndür"""
+    from api.alerting import get_alert_manager
+
+    broadcaster = get_alert_broadcaster()
+    broadcaster.attach_alert_manager(get_alert_manager())
+    return broadcaster
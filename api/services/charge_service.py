@@ -1,8 +1,8 @@
 """
 Charge Service
 Created: 2025-12-10 15:30:00
-Last Modified: 2025-12-10
-Version: 1.1.0
+Last Modified: 2025-12-11 20:00:00
+Version: 1.2.0
 Description: Charge control business logic service layer
 """
 
@@ -77,8 +77,7 @@ class ChargeService(BaseService):
                 session_manager = get_session_manager()
                 if session_manager:
                     # pending_user_id'ye user_id'yi kaydet
-                    with session_manager.pending_user_id_lock:
-                        session_manager.pending_user_id = user_id
+                    session_manager.set_pending_user_id(user_id)
             except Exception:
                 # Session manager yoksa veya hata varsa devam et
                 pass
@@ -1,25 +1,30 @@
 """
 Session Events Module
 Created: 2025-12-10 20:40:00
-Last Modified: 2025-12-10 20:40:00
-Version: 1.0.0
+Last Modified: 2025-12-12 10:00:00
+Version: 1.2.1
 Description: Session event handling metodları - Event operations mixin
 """
 
 import os
 import sys
+import time
 import uuid
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 # Logging modülünü import et
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
+from api.config import config
 from api.event_detector import ESP32State, EventType
 from api.logging_config import log_event, system_logger
-from api.session.metrics import calculate_power
+from api.session.metrics import calculate_power, reconcile_meter_energy
 from api.session.session import ChargingSession
 from api.session.status import SessionStatus
 
+if TYPE_CHECKING:
+    from api.meter.interface import MeterReading
+
 
 class SessionEventMixin:
     """
@@ -27,6 +32,51 @@ class SessionEventMixin:
     Bu mixin SessionManager sınıfına event handling metodlarını ekler
     """
 
+    def _get_meter_reading(self) -> Optional["MeterReading"]:
+        """
+        Meter sampler cache'indeki güncel okuma (RS-485 bus'a gidilmez)
+
+        Returns:
+            METER_MAX_READING_AGE'den yeni geçerli okuma veya None
+        """
+        sampler = getattr(self, "meter_sampler", None)
+        if sampler is None:
+            return None
+        return sampler.get_latest(max_age=config.METER_MAX_READING_AGE)
+
+    def _save_meter_reading(self, session_id: str, reading: "MeterReading") -> None:
+        """
+        Meter okumasını session'ın meter_readings kayıtlarına ekle
+
+        Args:
+            session_id: Session UUID
+            reading: Geçerli meter okuması
+        """
+        self._meter_persisted_at = time.monotonic()
+        self.db.add_meter_reading(
+            session_id=session_id,
+            timestamp=reading.timestamp,
+            energy_kwh=reading.energy_kwh,
+            power_kw=reading.power_kw,
+        )
+
+    def _on_meter_reading(self, reading: "MeterReading") -> None:
+        """
+        Meter sampler callback'i - aktif session'ın okumasını periyodik kaydet
+
+        Sampler thread'inde çalışır; sessions_lock alınmaz, kayıt sıklığı
+        METER_PERSIST_INTERVAL ile sınırlıdır.
+
+        Args:
+            reading: Geçerli meter okuması
+        """
+        session = self.current_session
+        if session is None:
+            return
+        if time.monotonic() - self._meter_persisted_at < config.METER_PERSIST_INTERVAL:
+            return
+        self._save_meter_reading(session.session_id, reading)
+
     def _on_event(self, event_type: EventType, event_data: Dict[str, Any]):
         """
         Event Detector'dan gelen event'leri işle
@@ -161,18 +211,11 @@ class SessionEventMixin:
             # Normalized event tablosuna kaydet
             self._save_event_to_table(EventType.CHARGE_STARTED, event_data, user_id)
 
-            # Meter'dan başlangıç enerji seviyesini oku (eğer meter varsa)
-            if self.meter and self.meter.is_connected():
-                try:
-                    meter_reading = self.meter.read_all()
-                    if meter_reading and meter_reading.is_valid:
-                        session.metadata["start_energy_kwh"] = meter_reading.energy_kwh
-                        session.metadata["meter_available"] = True
-                except Exception as e:
-                    system_logger.warning(
-                        f"Meter okuma hatası (session başlangıcı): {e}"
-                    )
-                    session.metadata["meter_available"] = False
+            # Başlangıç enerji seviyesi (meter sampler cache'inden, eğer meter varsa)
+            meter_reading = self._get_meter_reading()
+            if meter_reading:
+                session.metadata["start_energy_kwh"] = meter_reading.energy_kwh
+                session.metadata["meter_available"] = True
             else:
                 session.metadata["meter_available"] = False
 
@@ -185,6 +228,8 @@ class SessionEventMixin:
                 metadata=session.metadata,
                 user_id=user_id,
             )
+            if meter_reading:
+                self._save_meter_reading(session_id, meter_reading)
 
             self.current_session = session
 
@@ -265,33 +310,29 @@ class SessionEventMixin:
         # Final metrikleri hesapla
         final_metrics = self._calculate_final_metrics(session, end_time)
 
-        # Meter'dan bitiş enerji seviyesini oku (eğer meter varsa)
-        if self.meter and self.meter.is_connected():
-            try:
-                meter_reading = self.meter.read_all()
-                if meter_reading and meter_reading.is_valid:
-                    end_energy = meter_reading.energy_kwh
-                    start_energy = session.metadata.get("start_energy_kwh")
-
-                    if start_energy is not None:
-                        # Gerçek enerji tüketimi = bitiş - başlangıç
-                        total_energy = end_energy - start_energy
-                        session.metadata["end_energy_kwh"] = end_energy
-                        session.metadata["total_energy_kwh"] = max(
-                            0, total_energy
-                        )  # Negatif olamaz
-                        session.metadata["energy_source"] = "meter"
-                    else:
-                        # Başlangıç enerjisi yoksa sadece bitiş enerjisini kaydet
-                        session.metadata["end_energy_kwh"] = end_energy
-            except Exception as e:
-                system_logger.warning(f"Meter okuma hatası (session bitişi): {e}")
-                session.metadata["energy_source"] = (
-                    "calculated"  # Fallback: hesaplanmış
-                )
+        # Bitiş okuması (meter sampler cache'inden) session kayıtlarına eklenir;
+        # enerji tek bir okumaya değil, session'ın tüm kayıtlı okumalarına
+        # göre uzlaştırılır (eksik uç okuması en yakın okumalardan bulunur;
+        # son kayıttan sonraki süre kayıtlı güçle extrapolasyonla eklenir)
+        meter_reading = self._get_meter_reading()
+        if meter_reading:
+            self._save_meter_reading(session.session_id, meter_reading)
+        energy = reconcile_meter_energy(
+            self.db.get_meter_readings(session.session_id),
+            session.start_time,
+            end_time,
+            tolerance=config.METER_MAX_READING_AGE,
+            max_extrapolation=config.METER_PERSIST_INTERVAL,
+        )
+        if energy:
+            session.metadata.update(energy)
+            for key in ("start_energy_kwh", "end_energy_kwh", "total_energy_kwh"):
+                final_metrics[key] = energy[key]
         else:
+            if meter_reading:
+                session.metadata["end_energy_kwh"] = meter_reading.energy_kwh
             session.metadata["energy_source"] = (
-                "calculated"  # Meter yok, hesaplanmış kullan
+                "calculated"  # Yeterli meter okuması yok, hesaplanmış kullan
             )
 
         # Database'e kaydet (metriklerle birlikte)
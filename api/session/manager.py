@@ -1,8 +1,8 @@
 """
 Session Manager Class
 Created: 2025-12-10 05:00:00
-Last Modified: 2025-12-10 05:00:00
-Version: 2.0.0
+Last Modified: 2025-12-12 08:00:00
+Version: 2.4.0
 Description: Session yönetim modülü - Event Detector entegrasyonu ve database yönetimi
 """
 
@@ -28,10 +28,20 @@ class SessionManager(SessionEventMixin):
 
     Event Detector'dan gelen event'leri dinler ve session'ları yönetir.
     Thread-safe çalışır.
+
+    owns_hardware=False (API worker süreci) iken session'lar hardware
+    daemon'daki session manager tarafından yazılır; bu instance sadece
+    database'den okur, meter'a bağlanmaz ve aktif session'ı belleğe almaz.
     """
 
-    def __init__(self):
-        """Session Manager başlatıcı"""
+    def __init__(self, owns_hardware: bool = True):
+        """
+        Session Manager başlatıcı
+
+        Args:
+            owns_hardware: Bu süreç session yazıcısı mı (worker'larda False)
+        """
+        self.owns_hardware = owns_hardware
         self.db = get_database()
         self.current_session: Optional[ChargingSession] = None
         self.sessions_lock = threading.Lock()
@@ -40,18 +50,25 @@ class SessionManager(SessionEventMixin):
         self.pending_user_id: Optional[str] = None
         self.pending_user_id_lock = threading.Lock()
 
-        # Meter entegrasyonu için hazırlık
+        self.meter_sampler = None
+        # Son meter_readings kaydının zamanı (monotonic)
+        self._meter_persisted_at = 0.0
+        if not owns_hardware:
+            return
+
+        # Meter arka planda örneklenir; session kodu sadece cache'i okur
+        # (sessions_lock altında RS-485 bus'a gidilmez)
         try:
-            from api.meter import get_meter
-
-            self.meter = get_meter()
-            # Meter bağlantısını dene (başarısız olursa sorun değil)
-            try:
-                self.meter.connect()
-            except Exception:
-                pass  # Meter yok, sorun değil
+            from api.meter import get_meter_sampler, get_power_quality_monitor
+
+            self.meter_sampler = get_meter_sampler()
+            self.meter_sampler.register_callback(self._on_meter_reading)
+            self.meter_sampler.register_callback(
+                get_power_quality_monitor().add_reading
+            )
+            self.meter_sampler.start()
         except ImportError:
-            self.meter = None
+            self.meter_sampler = None
 
         # Startup'ta aktif session'ı restore et
         self._restore_active_session()
@@ -100,6 +117,54 @@ class SessionManager(SessionEventMixin):
                 return db_session
             return None
 
+    def get_current_session_summary(self) -> Optional[Dict[str, Any]]:
+        """
+        Aktif session'ın kısa özeti (canlı durum akışı için)
+
+        Returns:
+            session_id, status, start_time, event_count, user_id veya None
+        """
+        session = self.current_session
+        if session is not None:
+            return {
+                "session_id": session.session_id,
+                "status": session.status.value,
+                "start_time": session.start_time.isoformat(),
+                "event_count": len(session.events),
+                "user_id": session.metadata.get("user_id"),
+            }
+        if self.owns_hardware:
+            return None
+
+        # Worker: session hardware daemon'da yazılır, database'den oku
+        db_session = self.db.get_current_session()
+        if not db_session:
+            return None
+        return {
+            "session_id": db_session["session_id"],
+            "status": db_session["status"],
+            "start_time": db_session["start_time"],
+            "event_count": len(db_session.get("events") or []),
+            "user_id": (db_session.get("metadata") or {}).get("user_id"),
+        }
+
+    def set_pending_user_id(self, user_id: Optional[str]) -> None:
+        """
+        Sonraki CHARGE_STARTED event'inin kullanıcısını kaydet
+
+        Worker'da kullanıcı hardware daemon'daki session manager'a iletilir.
+
+        Args:
+            user_id: Şarjı başlatan kullanıcı
+        """
+        if not self.owns_hardware:
+            from api.hardware import get_hardware_client
+
+            get_hardware_client().set_pending_user_id(user_id)
+            return
+        with self.pending_user_id_lock:
+            self.pending_user_id = user_id
+
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
         Belirli bir session'ı döndür
@@ -246,6 +311,10 @@ def get_session_manager() -> SessionManager:
     if session_manager_instance is None:
         with session_manager_lock:
             if session_manager_instance is None:
-                session_manager_instance = SessionManager()
+                from api.config import config
+
+                session_manager_instance = SessionManager(
+                    owns_hardware=not config.is_api_worker()
+                )
 
     return session_manager_instance
@@ -1,19 +1,22 @@
 """
 Session Metrics Calculator
 Created: 2025-12-10 07:25:00
-Last Modified: 2025-12-10 07:25:00
-Version: 1.0.0
-Description: Session metriklerini hesaplayan sınıf
+Last Modified: 2025-12-12 11:00:00
+Version: 1.2.0
+Description: Session metriklerini hesaplayan sınıf ve meter okumalarından
+             session enerjisi uzlaştırma
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+import bisect
 import sys
 import os
 
 # Logging modülünü import et
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
 from api.event_detector import ESP32State
+from api.logging_config import system_logger
 
 
 def calculate_power(
@@ -57,6 +60,214 @@ def calculate_energy(
     return round(energy_kwh, 3)
 
 
+def valid_meter_readings(readings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Enerji sayacı okumalarını zamana göre sırala ve geçersizleri ayıkla
+
+    Önceki geçerli okumadan küçük tek bir enerji okuması, sonraki okuma
+    tekrar eski seviyeye dönüyorsa (bozuk frame, yanlış register) atılır.
+    Geri sıçrama sonraki okumada da sürüyorsa (veya son okumaysa) sayaç
+    sıfırlanmıştır (meter değişimi, sanal meter yeniden başlatma); bu okumalar
+    korunur ve split_meter_segments() ile ayrı segment olarak ele alınır.
+
+    Args:
+        readings: timestamp, energy_kwh içeren okuma dict'leri
+
+    Returns:
+        Sıralı geçerli okumalar
+    """
+    ordered = [
+        reading
+        for reading in sorted(readings, key=lambda r: r["timestamp"])
+        if reading.get("energy_kwh") is not None
+    ]
+    valid: List[Dict[str, Any]] = []
+    for index, reading in enumerate(ordered):
+        if valid and reading["energy_kwh"] < valid[-1]["energy_kwh"]:
+            following = ordered[index + 1 : index + 2]
+            if following and following[0]["energy_kwh"] >= valid[-1]["energy_kwh"]:
+                continue  # Tek okumalık bozukluk
+        valid.append(reading)
+    return valid
+
+
+def split_meter_segments(
+    readings: List[Dict[str, Any]],
+) -> List[List[Dict[str, Any]]]:
+    """
+    Geçerli okumaları sayaç sıfırlanmalarından bölerek monoton segmentlere ayır
+
+    Args:
+        readings: valid_meter_readings() çıktısı
+
+    Returns:
+        Her biri monoton artan okuma listelerinden oluşan liste
+    """
+    segments: List[List[Dict[str, Any]]] = []
+    for reading in readings:
+        if not segments or reading["energy_kwh"] < segments[-1][-1]["energy_kwh"]:
+            segments.append([])
+        segments[-1].append(reading)
+    return segments
+
+
+def interpolate_energy(
+    readings: List[Dict[str, Any]], timestamp: float
+) -> Optional[float]:
+    """
+    Verilen andaki enerji sayacı değeri
+
+    İki okuma arasındaki an için doğrusal interpolasyon yapılır; okuma
+    aralığının dışındaki an için en yakın okuma kullanılır.
+
+    Args:
+        readings: valid_meter_readings() çıktısı
+        timestamp: Unix timestamp
+
+    Returns:
+        Enerji (kWh) veya None (okuma yok)
+    """
+    if not readings:
+        return None
+    times = [r["timestamp"] for r in readings]
+    index = bisect.bisect_left(times, timestamp)
+    if index == 0:
+        return readings[0]["energy_kwh"]
+    if index == len(readings):
+        return readings[-1]["energy_kwh"]
+    before, after = readings[index - 1], readings[index]
+    span = after["timestamp"] - before["timestamp"]
+    ratio = (timestamp - before["timestamp"]) / span if span else 1.0
+    return before["energy_kwh"] + (after["energy_kwh"] - before["energy_kwh"]) * ratio
+
+
+def extrapolate_energy(
+    reading: Dict[str, Any], timestamp: float, max_gap: float
+) -> float:
+    """
+    Okuma aralığı dışındaki an için enerji sayacı tahmini
+
+    En yakın okumanın gücüyle (power_kw) ileri/geri extrapolasyon yapılır;
+    extrapolasyon süresi max_gap ile sınırlıdır. Güç bilinmiyorsa okumanın
+    kendi değeri döner.
+
+    Args:
+        reading: Okuma aralığının ucundaki okuma (timestamp, energy_kwh, power_kw)
+        timestamp: Unix timestamp
+        max_gap: En fazla extrapolasyon süresi (saniye)
+
+    Returns:
+        Enerji (kWh)
+    """
+    power_kw = reading.get("power_kw")
+    if not power_kw or power_kw < 0:
+        return reading["energy_kwh"]
+    gap = max(-max_gap, min(timestamp - reading["timestamp"], max_gap))
+    return max(0.0, reading["energy_kwh"] + power_kw * gap / 3600.0)
+
+
+def _boundary_energy(
+    readings: List[Dict[str, Any]],
+    moment: float,
+    tolerance: float,
+    max_extrapolation: float,
+) -> Tuple[float, str]:
+    """Monoton okumalardan session sınırındaki enerji ve kaynağı"""
+    times = [r["timestamp"] for r in readings]
+    index = bisect.bisect_left(times, moment)
+    nearest = min(
+        (i for i in (index - 1, index) if 0 <= i < len(times)),
+        key=lambda i: abs(times[i] - moment),
+    )
+    if abs(times[nearest] - moment) <= tolerance:
+        return readings[nearest]["energy_kwh"], "meter"
+    if 0 < index < len(readings):
+        return interpolate_energy(readings, moment), "meter_interpolated"
+    return (
+        extrapolate_energy(readings[nearest], moment, max_extrapolation),
+        "meter_extrapolated",
+    )
+
+
+def reconcile_meter_energy(
+    readings: List[Dict[str, Any]],
+    start_time: datetime,
+    end_time: datetime,
+    tolerance: float = 5.0,
+    max_extrapolation: float = 60.0,
+) -> Optional[Dict[str, Any]]:
+    """
+    Session enerjisini periyodik meter okumalarından uzlaştır
+
+    Her session sınırı için tolerans içindeki en yakın geçerli okuma
+    kullanılır; yoksa (uç okuması başarısız) sınır iki yanındaki okumalar
+    arasında interpolasyonla bulunur. Böylece tek bir okumanın başarısız
+    olması session enerjisini bozmaz. Sınır okuma aralığının dışındaysa
+    (örn. bitişte taze okuma yok, son kayıt bir persist periyodu önce) uçtaki
+    okumanın gücüyle en fazla max_extrapolation saniye extrapolasyon yapılır.
+
+    Sayaç session içinde sıfırlandıysa (geri sıçrama kalıcı) okumalar
+    segmentlere bölünür ve toplam enerji segment farklarının toplamıdır;
+    sıfırlanma sırasında ölçülemeyen enerji dahil değildir.
+
+    Kaynak: sayaç sıfırlandıysa "meter_reset"; her iki sınırda tolerans
+    içinde okuma varsa "meter"; bir sınır okuma aralığı dışındaysa
+    "meter_extrapolated"; aksi halde "meter_interpolated".
+
+    Args:
+        readings: timestamp, energy_kwh, power_kw içeren okuma dict'leri
+        start_time: Session başlangıç zamanı
+        end_time: Session bitiş zamanı
+        tolerance: Sınıra bu kadar yakın okuma doğrudan kabul edilir (saniye)
+        max_extrapolation: Okuma aralığı dışında en fazla extrapolasyon (saniye)
+
+    Returns:
+        start_energy_kwh, end_energy_kwh, total_energy_kwh, energy_source,
+        meter_reading_count dict'i veya None (en az iki geçerli okuma yok)
+    """
+    valid = valid_meter_readings(readings)
+    if len(valid) < 2:
+        return None
+
+    segments = split_meter_segments(valid)
+    first, last = segments[0], segments[-1]
+    start_energy, start_source = _boundary_energy(
+        first, start_time.timestamp(), tolerance, max_extrapolation
+    )
+    end_energy, end_source = _boundary_energy(
+        last, end_time.timestamp(), tolerance, max_extrapolation
+    )
+    sources = (start_source, end_source)
+
+    if len(segments) > 1:
+        total_energy = (
+            (first[-1]["energy_kwh"] - start_energy)
+            + sum(s[-1]["energy_kwh"] - s[0]["energy_kwh"] for s in segments[1:-1])
+            + (end_energy - last[0]["energy_kwh"])
+        )
+        energy_source = "meter_reset"
+        system_logger.warning(
+            f"Meter enerji sayacı session içinde {len(segments) - 1} kez "
+            f"sıfırlandı; enerji {len(segments)} segmentin toplamı olarak "
+            f"hesaplandı ({total_energy:.3f} kWh)"
+        )
+    else:
+        total_energy = end_energy - start_energy
+        if "meter_extrapolated" in sources:
+            energy_source = "meter_extrapolated"
+        elif "meter_interpolated" in sources:
+            energy_source = "meter_interpolated"
+        else:
+            energy_source = "meter"
+    return {
+        "start_energy_kwh": round(start_energy, 3),
+        "end_energy_kwh": round(end_energy, 3),
+        "total_energy_kwh": round(max(0.0, total_energy), 3),
+        "energy_source": energy_source,
+        "meter_reading_count": len(valid),
+    }
+
+
 class SessionMetricsCalculator:
     """
     Session metriklerini hesaplayan sınıf
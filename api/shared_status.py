@@ -0,0 +1,495 @@
+"""
+Shared Status Module
+Created: 2025-12-11 21:00:00
+Last Modified: 2025-12-11 21:00:00
+Version: 1.0.0
+Description: Son STAT, EventDetector durumu ve aktif session özetini
+             /dev/shm altındaki mmap'lenmiş, sabit yerleşimli bir kayda yazar;
+             diğer süreçler (monitoring script'leri, worker'lar) HTTP veya
+             SQLite'a gitmeden seqlock ile tutarlı kopya okur
+
+Kullanım (okuyucu):
+    python -m api.shared_status [--path /dev/shm/charger-status]
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from api.logging_config import system_logger
+
+# Varsayılan kayıt yolu (config.SHARED_STATUS_PATH ile ezilir)
+DEFAULT_SHARED_STATUS_PATH = "/dev/shm/charger-status"
+
+# Kayıt başlığı: magic, yerleşim versiyonu, payload boyutu, sequence sayacı
+MAGIC = b"CHST"
+LAYOUT_VERSION = 1
+_HEADER = struct.Struct("<4sHHQ")
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+
+# STAT alanları (ESP32 sendStat() sırası) - hepsi int32, yoksa MISSING
+STAT_FIELDS = (
+    "ID",
+    "CP",
+    "CPV",
+    "PP",
+    "PPV",
+    "RL",
+    "LOCK",
+    "MOTOR",
+    "PWM",
+    "MAX",
+    "CABLE",
+    "AUTH",
+    "STATE",
+    "PB",
+    "STOP",
+)
+MISSING = -(2**31)
+
+# Sabit uzunluklu string alanları (byte, UTF-8, NUL ile doldurulur)
+STATE_NAME_SIZE = 16
+SESSION_ID_SIZE = 36
+SESSION_STATUS_SIZE = 16
+USER_ID_SIZE = 64
+
+# Payload yerleşimi:
+#   updated_at (d), connected (B), has_status (B), monitoring (B), has_session (B)
+#   status_timestamp (d), STAT alanları (15 x i), STATE_NAME (16s)
+#   current_state (i), previous_state (i)
+#   session_id (36s), session_status (16s), session_start (d), event_count (I),
+#   user_id (64s)
+_PAYLOAD = struct.Struct(
+    "<dBBBBd"
+    + "i" * len(STAT_FIELDS)
+    + f"{STATE_NAME_SIZE}sii{SESSION_ID_SIZE}s{SESSION_STATUS_SIZE}sdI{USER_ID_SIZE}s"
+)
+_PAYLOAD_OFFSET = _HEADER.size
+RECORD_SIZE = _HEADER.size + _PAYLOAD.size
+
+# Okuyucunun yazma ortasına denk geldiğinde kaç kez yeniden deneyeceği
+READ_RETRIES = 1000
+
+
+class SharedStatusError(Exception):
+    """Paylaşılan durum kaydı yok, bozuk veya farklı yerleşim versiyonunda"""
+
+
+def _encode(value: Optional[str], size: int) -> bytes:
+    if not value:
+        return b""
+    # struct "s" formatı fazlasını keser; çok byte'lı karakteri bölmemek için
+    # önce karakter bazında kısalt
+    value = str(value)
+    data = value.encode("utf-8")
+    while len(data) > size:
+        value = value[:-1]
+        data = value.encode("utf-8")
+    return data
+
+
+def _decode(data: bytes) -> Optional[str]:
+    text = data.rstrip(b"\x00").decode("utf-8", errors="replace")
+    return text or None
+
+
+def _int_field(value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return MISSING
+    value = int(value)
+    if not MISSING < value < 2**31:
+        return MISSING
+    return value
+
+
+def _timestamp(value: Any) -> float:
+    """ISO string veya datetime -> unix zamanı (yoksa 0.0)"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+def _iso(value: float) -> Optional[str]:
+    return datetime.fromtimestamp(value).isoformat() if value else None
+
+
+class SharedStatusPublisher:
+    """
+    Paylaşılan durum kaydının tek yazıcısı
+
+    Seri portun sahibi olan süreçte (standalone API veya hardware daemon)
+    çalışır. Bridge STAT ve connection callback'leri ile EventDetector
+    callback'ine kaydolur; her güncellemede bellekteki son durumla tüm kayıt
+    yeniden yazılır (sabit yerleşim, ~300 byte).
+
+    Seqlock: yazıcı sequence sayacını tek sayıya çeker, payload'u yazar ve
+    sayacı tekrar çift sayıya çeker. Okuyucu payload'u kopyalar ve sayaç
+    değişmemiş (ve çift) ise kopyayı kabul eder; yazıcı okuyucuyu beklemez.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Shared status publisher başlatıcı
+
+        Args:
+            path: Kayıt dosyası yolu (None ise DEFAULT_SHARED_STATUS_PATH)
+        """
+        self.path = path or DEFAULT_SHARED_STATUS_PATH
+        self._lock = threading.Lock()
+        self._mmap: Optional[mmap.mmap] = None
+        self._seq = 0
+        self._connected = False
+        self._status: Optional[Dict[str, Any]] = None
+        self._detector: Optional[Dict[str, Any]] = None
+        self._session: Optional[Dict[str, Any]] = None
+        self._bridge = None
+        self._event_detector = None
+        self._session_manager = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._mmap is not None
+
+    # Yaşam döngüsü
+
+    def open(self) -> bool:
+        """
+        Kayıt dosyasını oluştur ve mmap'le
+
+        Returns:
+            bool: Başarılı ise True (örn. /dev/shm yoksa False)
+        """
+        with self._lock:
+            if self._mmap is not None:
+                return True
+            try:
+                directory = os.path.dirname(self.path)
+                if directory and not os.path.isdir(directory):
+                    raise FileNotFoundError(f"Dizin yok: {directory}")
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    os.ftruncate(fd, RECORD_SIZE)
+                    self._mmap = mmap.mmap(fd, RECORD_SIZE)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                system_logger.warning(
+                    f"Paylaşılan durum kaydı açılamadı ({self.path}): {e}"
+                )
+                return False
+
+            # Önceki yazıcının sayacından devam et (okuyucular geri gitmesin)
+            magic, version, _, seq = _HEADER.unpack_from(self._mmap, 0)
+            self._seq = seq + (seq & 1) if magic == MAGIC else 0
+            _HEADER.pack_into(
+                self._mmap, 0, MAGIC, LAYOUT_VERSION, _PAYLOAD.size, self._seq
+            )
+            self._write_locked()
+        system_logger.info(f"Paylaşılan durum kaydı yayınlanıyor: {self.path}")
+        return True
+
+    def close(self, unlink: bool = False) -> None:
+        """Callback kayıtlarını kaldır ve mmap'i kapat"""
+        self.detach()
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+        if unlink:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    # Kaynak entegrasyonu
+
+    def attach(self, bridge=None, event_detector=None, session_manager=None) -> None:
+        """
+        Bridge, EventDetector ve SessionManager'a bağlan
+
+        EventDetector callback'i session manager'dan sonra kaydedilmelidir;
+        böylece session özeti event işlendikten sonra okunur.
+
+        Args:
+            bridge: ESP32Bridge instance'ı (STAT ve bağlantı durumu)
+            event_detector: EventDetector instance'ı (state transition'lar)
+            session_manager: SessionManager instance'ı (aktif session özeti)
+        """
+        self.detach()
+        self._bridge = bridge
+        self._event_detector = event_detector
+        self._session_manager = session_manager
+        if bridge is not None:
+            bridge.register_status_callback(self._on_status)
+            bridge.register_connection_callback(self._on_connection)
+            self._connected = bool(bridge.is_connected)
+            self._status = bridge.get_status(max_age_seconds=float("inf"))
+        if event_detector is not None:
+            event_detector.register_callback(self._on_event)
+            self._detector = self._detector_state()
+        self._session = self._session_summary()
+        self.publish()
+
+    def detach(self) -> None:
+        if self._bridge is not None:
+            self._bridge.unregister_status_callback(self._on_status)
+            self._bridge.unregister_connection_callback(self._on_connection)
+            self._bridge = None
+        if self._event_detector is not None:
+            self._event_detector.unregister_callback(self._on_event)
+            self._event_detector = None
+        self._session_manager = None
+
+    def _on_status(self, status: Dict[str, Any]) -> None:
+        self._status = status
+        self.publish()
+
+    def _on_connection(self, connected: bool) -> None:
+        self._connected = bool(connected)
+        self.publish()
+
+    def _on_event(self, event_type, event_data: Dict[str, Any]) -> None:
+        self._detector = self._detector_state()
+        self._session = self._session_summary()
+        self.publish()
+
+    def _detector_state(self) -> Optional[Dict[str, Any]]:
+        detector = self._event_detector
+        if detector is None:
+            return None
+        return {
+            "monitoring": detector.is_monitoring,
+            "current_state": detector.get_current_state(),
+            "previous_state": detector.get_previous_state(),
+        }
+
+    def _session_summary(self) -> Optional[Dict[str, Any]]:
+        if self._session_manager is None:
+            return None
+        try:
+            return self._session_manager.get_current_session_summary()
+        except Exception as e:
+            system_logger.warning(f"Paylaşılan durum için session özeti alınamadı: {e}")
+            return self._session
+
+    # Yazma
+
+    def publish(self) -> None:
+        """Bellekteki son durumu kayda yaz (thread-safe)"""
+        with self._lock:
+            if self._mmap is not None:
+                self._write_locked()
+
+    def _write_locked(self) -> None:
+        status = self._status or {}
+        detector = self._detector or {}
+        session = self._session or {}
+        payload = _PAYLOAD.pack(
+            time.time(),
+            self._connected,
+            bool(self._status),
+            bool(detector.get("monitoring")),
+            bool(self._session),
+            _timestamp(status.get("timestamp")),
+            *(_int_field(status.get(name)) for name in STAT_FIELDS),
+            _encode(status.get("STATE_NAME"), STATE_NAME_SIZE),
+            _int_field(detector.get("current_state")),
+            _int_field(detector.get("previous_state")),
+            _encode(session.get("session_id"), SESSION_ID_SIZE),
+            _encode(session.get("status"), SESSION_STATUS_SIZE),
+            _timestamp(session.get("start_time")),
+            max(0, _int_field(session.get("event_count"))),
+            _encode(session.get("user_id"), USER_ID_SIZE),
+        )
+        # Payload önceden pack edilir; sayaç tek iken sadece kopyalama yapılır
+        self._seq += 1
+        _SEQ.pack_into(self._mmap, _SEQ_OFFSET, self._seq)
+        self._mmap[_PAYLOAD_OFFSET:RECORD_SIZE] = payload
+        self._seq += 1
+        _SEQ.pack_into(self._mmap, _SEQ_OFFSET, self._seq)
+
+
+class SharedStatusReader:
+    """
+    Paylaşılan durum kaydı okuyucusu
+
+    Herhangi bir süreçten kullanılabilir; dosya salt okunur mmap'lenir.
+    Yazıcı yeniden başlarsa dosya aynı inode ile yeniden kullanılır.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Shared status reader başlatıcı
+
+        Args:
+            path: Kayıt dosyası yolu (None ise DEFAULT_SHARED_STATUS_PATH)
+        """
+        self.path = path or DEFAULT_SHARED_STATUS_PATH
+        self._mmap: Optional[mmap.mmap] = None
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def read(self) -> Dict[str, Any]:
+        """
+        Tutarlı bir durum kopyası oku
+
+        Returns:
+            seq, updated_at, connected, status, detector ve session içeren dict
+
+        Raises:
+            SharedStatusError: Kayıt yok, bozuk veya yazıcı sürekli yazıyor
+        """
+        buffer = self._map()
+        for _ in range(READ_RETRIES):
+            (seq_before,) = _SEQ.unpack_from(buffer, _SEQ_OFFSET)
+            if seq_before & 1:
+                continue
+            payload = buffer[_PAYLOAD_OFFSET:RECORD_SIZE]
+            (seq_after,) = _SEQ.unpack_from(buffer, _SEQ_OFFSET)
+            if seq_before == seq_after:
+                return self._unpack(seq_before, payload)
+        raise SharedStatusError("Paylaşılan durum kaydı tutarlı okunamadı")
+
+    def _map(self) -> mmap.mmap:
+        if self._mmap is not None:
+            return self._mmap
+        try:
+            with open(self.path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), RECORD_SIZE, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SharedStatusError(f"Paylaşılan durum kaydı açılamadı: {e}")
+        magic, version, payload_size, _ = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION or payload_size != _PAYLOAD.size:
+            buffer.close()
+            raise SharedStatusError(
+                f"Paylaşılan durum kaydı uyumsuz (magic={magic!r}, version={version})"
+            )
+        self._mmap = buffer
+        return buffer
+
+    @staticmethod
+    def _unpack(seq: int, payload: bytes) -> Dict[str, Any]:
+        values = _PAYLOAD.unpack(payload)
+        updated_at, connected, has_status, monitoring, has_session, status_ts = values[
+            :6
+        ]
+        stat_end = 6 + len(STAT_FIELDS)
+        (
+            state_name,
+            current_state,
+            previous_state,
+            session_id,
+            session_status,
+            session_start,
+            event_count,
+            user_id,
+        ) = values[stat_end:]
+
+        status = None
+        if has_status:
+            status = {
+                name: value
+                for name, value in zip(STAT_FIELDS, values[6:stat_end])
+                if value != MISSING
+            }
+            status["timestamp"] = _iso(status_ts)
+            name = _decode(state_name)
+            if name:
+                status["STATE_NAME"] = name
+
+        session = None
+        if has_session:
+            session = {
+                "session_id": _decode(session_id),
+                "status": _decode(session_status),
+                "start_time": _iso(session_start),
+                "event_count": event_count,
+                "user_id": _decode(user_id),
+            }
+
+        return {
+            "seq": seq,
+            "updated_at": _iso(updated_at),
+            "connected": bool(connected),
+            "status": status,
+            "detector": {
+                "monitoring": bool(monitoring),
+                "current_state": None if current_state == MISSING else current_state,
+                "previous_state": (
+                    None if previous_state == MISSING else previous_state
+                ),
+            },
+            "session": session,
+        }
+
+
+def read_shared_status(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Tek seferlik okuma (script'ler için)
+
+    Args:
+        path: Kayıt dosyası yolu (None ise DEFAULT_SHARED_STATUS_PATH)
+
+    Raises:
+        SharedStatusError: Kayıt okunamadı
+    """
+    reader = SharedStatusReader(path)
+    try:
+        return reader.read()
+    finally:
+        reader.close()
+
+
+# Singleton instance
+_publisher_instance: Optional[SharedStatusPublisher] = None
+_publisher_lock = threading.Lock()
+
+
+def get_shared_status_publisher() -> SharedStatusPublisher:
+    """
+    Shared status publisher singleton instance'ı döndür
+
+    Returns:
+        SharedStatusPublisher instance
+    """
+    global _publisher_instance
+
+    if _publisher_instance is None:
+        with _publisher_lock:
+            if _publisher_instance is None:
+                from api.config import config
+
+                _publisher_instance = SharedStatusPublisher(config.SHARED_STATUS_PATH)
+
+    return _publisher_instance
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Paylaşılan charger durumunu oku")
+    parser.add_argument("--path", default=None, help="Kayıt dosyası yolu")
+    args = parser.parse_args()
+    try:
+        print(json.dumps(read_shared_status(args.path), indent=2, ensure_ascii=False))
+    except SharedStatusError as e:
+        print(str(e), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
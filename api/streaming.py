@@ -0,0 +1,406 @@
+"""
+Live Status Streaming Module
+Created: 2025-12-11 09:00:00
+Last Modified: 2025-12-11 20:00:00
+Version: 1.1.1
+Description: STAT snapshot, state transition, session ve alert güncellemelerini
+             SSE/WebSocket abonelerine dağıtan ortak fan-out modülü
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from api.logging_config import system_logger
+
+# Abone başına maksimum bekleyen mesaj sayısı
+# ESP32 7.5 saniyede bir STAT gönderiyor; 32 mesaj ~4 dakikalık birikim demek.
+# Bu kadar geride kalan istemci yavaş kabul edilir ve düşürülür.
+SUBSCRIBER_QUEUE_SIZE = 32
+
+# SSE keep-alive aralığı (saniye) - proxy'lerin bağlantıyı kapatmaması için
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+# Mesaj tipleri
+MESSAGE_STATUS = "status"
+MESSAGE_EVENT = "event"
+MESSAGE_SESSION = "session"
+MESSAGE_ALERT = "alert"
+MESSAGE_ALERTS = "alerts"
+
+
+class StreamMessage:
+    """
+    Yayınlanan tek bir mesaj
+
+    JSON ve SSE gösterimi yayın anında bir kez üretilir ve tüm abonelerle
+    paylaşılır (abone başına serialization yapılmaz).
+    """
+
+    __slots__ = ("seq", "type", "payload", "sse")
+
+    def __init__(self, seq: int, message_type: str, data: Any):
+        self.seq = seq
+        self.type = message_type
+        self.payload = json.dumps(
+            {
+                "seq": seq,
+                "type": message_type,
+                "timestamp": datetime.now().isoformat(),
+                "data": data,
+            },
+            ensure_ascii=False,
+            default=str,
+        )
+        self.sse = f"id: {seq}\nevent: {message_type}\ndata: {self.payload}\n\n"
+
+
+class StreamSubscriber:
+    """
+    Tek bir SSE/WebSocket istemcisi
+
+    Her abonenin kendi bounded queue'su vardır. Queue dolarsa abone
+    yavaş kabul edilir ve bağlantısı kapatılır (diğer aboneleri bekletmez).
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = False
+        self.created_at = time.time()
+
+    async def get(self) -> Optional[StreamMessage]:
+        """
+        Sıradaki mesajı bekle
+
+        Returns:
+            StreamMessage veya None (abone kapatıldıysa)
+        """
+        return await self.queue.get()
+
+
+class StatusBroadcaster:
+    """
+    Canlı durum yayıncısı (fan-out)
+
+    Bridge ve EventDetector thread'lerinden gelen mesajları tek noktadan
+    tüm abonelere dağıtır. Publish işlemi thread-safe'tir; mesajlar her
+    event loop'a tek bir call_soon_threadsafe çağrısı ile aktarılır.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        """
+        Status broadcaster başlatıcı
+
+        Args:
+            queue_size: Abone başına maksimum bekleyen mesaj sayısı
+        """
+        self.queue_size = queue_size
+        self._subscribers: Dict[asyncio.AbstractEventLoop, List[StreamSubscriber]] = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self._last_status: Optional[StreamMessage] = None
+        self._last_session: Optional[StreamMessage] = None
+        self._published_count = 0
+        self._dropped_subscribers = 0
+        self._attached_bridge = None
+        self._attached_detector = None
+
+    # Abone yönetimi
+
+    def subscribe(self) -> StreamSubscriber:
+        """
+        Yeni abone oluştur (event loop içinden çağrılmalı)
+
+        Returns:
+            StreamSubscriber instance
+        """
+        loop = asyncio.get_running_loop()
+        subscriber = StreamSubscriber(loop, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(loop, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: StreamSubscriber) -> None:
+        """
+        Aboneyi kaldır
+
+        Args:
+            subscriber: Kaldırılacak abone
+        """
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.loop)
+            if subscribers and subscriber in subscribers:
+                subscribers.remove(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.loop]
+
+    def get_snapshot(self) -> List[StreamMessage]:
+        """
+        Yeni bağlanan istemci için son bilinen durum mesajları
+
+        Returns:
+            Son status ve session mesajları (varsa)
+        """
+        with self._lock:
+            return [m for m in (self._last_status, self._last_session) if m]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Yayıncı istatistiklerini döndür"""
+        with self._lock:
+            return {
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "published": self._published_count,
+                "dropped_subscribers": self._dropped_subscribers,
+            }
+
+    # Yayın
+
+    def publish(self, message_type: str, data: Any) -> None:
+        """
+        Mesajı tüm abonelere yayınla (thread-safe)
+
+        Args:
+            message_type: Mesaj tipi (status, event, session)
+            data: JSON'a çevrilebilir mesaj verisi
+        """
+        try:
+            message = StreamMessage(next(self._seq), message_type, data)
+        except Exception as e:
+            system_logger.error(f"Stream mesajı oluşturulamadı: {e}", exc_info=True)
+            return
+
+        with self._lock:
+            self._published_count += 1
+            if message_type == MESSAGE_STATUS:
+                self._last_status = message
+            elif message_type == MESSAGE_SESSION:
+                self._last_session = message
+            loops = list(self._subscribers.keys())
+
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._fan_out, loop, message)
+            except RuntimeError:
+                # Event loop kapanmış - abonelerini temizle
+                with self._lock:
+                    self._subscribers.pop(loop, None)
+
+    def _fan_out(self, loop: asyncio.AbstractEventLoop, message: StreamMessage) -> None:
+        """
+        Mesajı bir event loop'taki abonelere dağıt (loop thread'inde çalışır)
+
+        Args:
+            loop: Hedef event loop
+            message: Yayınlanacak mesaj
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(loop, ()))
+
+        for subscriber in subscribers:
+            if subscriber.dropped:
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop_subscriber(subscriber)
+
+    def _drop_subscriber(self, subscriber: StreamSubscriber) -> None:
+        """
+        Yavaş aboneyi düşür
+
+        Queue boşaltılır ve yerine kapanış sinyali (None) konur.
+        """
+        subscriber.dropped = True
+        while not subscriber.queue.empty():
+            try:
+                subscriber.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+        subscriber.queue.put_nowait(None)
+        self.unsubscribe(subscriber)
+        with self._lock:
+            self._dropped_subscribers += 1
+        system_logger.warning("Yavaş stream abonesi düşürüldü (queue dolu)")
+
+    # Kaynak entegrasyonu
+
+    def attach(self, bridge=None, event_detector=None) -> None:
+        """
+        Bridge ve EventDetector'a callback olarak kaydol
+
+        Args:
+            bridge: ESP32Bridge instance'ı (STAT mesajları için)
+            event_detector: EventDetector instance'ı (state transition'lar için)
+        """
+        if bridge is not None and bridge is not self._attached_bridge:
+            bridge.register_status_callback(self._on_status)
+            self._attached_bridge = bridge
+        if event_detector is not None and event_detector is not self._attached_detector:
+            event_detector.register_callback(self._on_event)
+            self._attached_detector = event_detector
+        system_logger.info("Status broadcaster bridge ve event detector'a bağlandı")
+
+    def _on_status(self, status: Dict[str, Any]) -> None:
+        """Bridge STAT callback'i"""
+        self.publish(MESSAGE_STATUS, status)
+
+    def _on_event(self, event_type, event_data: Dict[str, Any]) -> None:
+        """
+        EventDetector callback'i
+
+        Event'i yayınlar, ardından session manager'ın güncel session
+        özetini yayınlar (session manager daha önce kaydolduğu için
+        event'i bu noktada işlemiş olur).
+        """
+        self.publish(
+            MESSAGE_EVENT,
+            {
+                "event_type": getattr(event_type, "value", event_type),
+                "from_state": event_data.get("from_state"),
+                "to_state": event_data.get("to_state"),
+                "from_state_name": event_data.get("from_state_name"),
+                "to_state_name": event_data.get("to_state_name"),
+                "timestamp": event_data.get("timestamp"),
+            },
+        )
+        self.publish_session()
+
+    def publish_session(self) -> None:
+        """Aktif session özetini yayınla"""
+        try:
+            from api.session import get_session_manager
+
+            summary = get_session_manager().get_current_session_summary()
+            self.publish(MESSAGE_SESSION, summary)
+        except Exception as e:
+            system_logger.warning(f"Session stream güncellemesi yayınlanamadı: {e}")
+
+    # İstemci tarafı iterator'lar
+
+    async def iter_messages(
+        self, keepalive: Optional[float] = None
+    ) -> AsyncIterator[Optional[StreamMessage]]:
+        """
+        Abone ol ve mesajları sırayla üret
+
+        Önce son bilinen snapshot, ardından canlı mesajlar üretilir.
+        keepalive verilirse, bu süre boyunca mesaj gelmezse None üretilir.
+
+        Args:
+            keepalive: Keep-alive aralığı (saniye, opsiyonel)
+        """
+        subscriber = self.subscribe()
+        try:
+            for message in self.get_snapshot():
+                yield message
+            while True:
+                try:
+                    if keepalive:
+                        message = await asyncio.wait_for(
+                            subscriber.get(), timeout=keepalive
+                        )
+                    else:
+                        message = await subscriber.get()
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if message is None:
+                    # Abone düşürüldü
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+
+class AlertBroadcaster(StatusBroadcaster):
+    """
+    Alert yayıncısı
+
+    AlertManager'a callback olarak kaydolur ve her alert değişikliğini
+    (triggered, updated, resolved) abonelere push eder. Yeni bağlanan
+    istemci önce aktif alert listesini alır.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        super().__init__(queue_size=queue_size)
+        self._attached_manager = None
+
+    def attach_alert_manager(self, alert_manager) -> None:
+        """
+        AlertManager'a callback olarak kaydol
+
+        Args:
+            alert_manager: AlertManager instance'ı
+        """
+        if alert_manager is self._attached_manager:
+            return
+        if self._attached_manager is not None:
+            self._attached_manager.unregister_callback(self._on_alert)
+        alert_manager.register_callback(self._on_alert)
+        self._attached_manager = alert_manager
+        system_logger.info("Alert broadcaster alert manager'a bağlandı")
+
+    def get_snapshot(self) -> List[StreamMessage]:
+        """
+        Yeni bağlanan istemci için aktif alert listesi
+
+        Returns:
+            Tek bir "alerts" mesajı (alert manager bağlı değilse boş liste)
+        """
+        manager = self._attached_manager
+        if manager is None:
+            return []
+        active = [alert.to_dict() for alert in manager.get_active_alerts()]
+        return [StreamMessage(next(self._seq), MESSAGE_ALERTS, active)]
+
+    def _on_alert(self, change: str, alert) -> None:
+        """AlertManager callback'i (scheduler thread'inde çalışır)"""
+        self.publish(MESSAGE_ALERT, {"change": change, **alert.to_dict()})
+
+
+# Singleton instance
+_broadcaster_instance: Optional[StatusBroadcaster] = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_status_broadcaster() -> StatusBroadcaster:
+    """
+    Status broadcaster singleton instance'ı döndür
+
+    Returns:
+        StatusBroadcaster instance
+    """
+    global _broadcaster_instance
+
+    if _broadcaster_instance is None:
+        with _broadcaster_lock:
+            if _broadcaster_instance is None:
+                _broadcaster_instance = StatusBroadcaster()
+
+    return _broadcaster_instance
+
+
+# Alert yayıncısı singleton instance
+_alert_broadcaster_instance: Optional[AlertBroadcaster] = None
+
+
+def get_alert_broadcaster() -> AlertBroadcaster:
+    """
+    Alert broadcaster singleton instance'ı döndür
+
+    Returns:
+        AlertBroadcaster instance
+    """
+    global _alert_broadcaster_instance
+
+    if _alert_broadcaster_instance is None:
+        with _broadcaster_lock:
+            if _alert_broadcaster_instance is None:
+                _alert_broadcaster_instance = AlertBroadcaster()
+
+    return _alert_broadcaster_instance
@@ -0,0 +1,378 @@
+"""
+System Probe Module
+Created: 2025-12-11 15:00:00
+Last Modified: 2025-12-11 15:00:00
+Version: 1.0.0
+Description: Arka plan sistem probe servisi - network, disk, memory, CPU ve
+             sıcaklık değerlerini kendi periyodunda /proc, /sys ve os.statvfs
+             üzerinden okur; health endpoint'i hazır snapshot'tan cevap verir
+"""
+
+import array
+import fcntl
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from api.logging_config import system_logger
+
+# Varsayılan örnekleme aralığı (saniye)
+SYSTEM_PROBE_INTERVAL = 10.0
+
+# IP adresi için tercih edilen interface sırası (bulunamazsa diğer "up" interface'ler)
+PREFERRED_INTERFACES = ("wlan0", "eth0", "enp0s3", "ens33")
+
+# Disk kullanımı ölçülen mount noktası
+DISK_PATH = "/"
+
+# Sıcaklık durum eşikleri (Raspberry Pi için, °C)
+TEMPERATURE_THRESHOLDS = (
+    (80.0, "critical"),
+    (70.0, "high"),
+    (60.0, "warm"),
+)
+
+# Linux ioctl kodları (linux/sockios.h, linux/wireless.h)
+SIOCGIFADDR = 0x8915
+SIOCGIWESSID = 0x8B1B
+IW_ESSID_MAX_SIZE = 32
+
+_BYTES_PER_GB = 1024**3
+
+
+class SystemProbe:
+    """
+    Arka plan sistem probe servisi
+
+    Tüm okumalar daemon thread'de yapılır ve son değerler snapshot olarak
+    saklanır; get_snapshot() sadece dict kopyası döndürür. Subprocess
+    çalıştırılmaz: IP adresi ve SSID ioctl ile, diğer değerler /proc ve
+    /sys dosyalarından okunur. CPU yüzdeleri iki örnek arasındaki
+    /proc/stat farkından hesaplanır (ilk örnekte None).
+    """
+
+    def __init__(self, interval: float = SYSTEM_PROBE_INTERVAL):
+        """
+        System probe başlatıcı
+
+        Args:
+            interval: Örnekleme aralığı (saniye)
+        """
+        self.interval = interval
+        self._snapshot: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._clock_ticks = os.sysconf("SC_CLK_TCK")
+        self._prev_cpu: Optional[Tuple[int, int]] = None
+        self._prev_process: Optional[Tuple[int, float]] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Probe thread'i çalışıyor mu?"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Probe thread'ini başlat (idempotent)"""
+        with self._lock:
+            if self.is_running:
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="system-probe", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Probe thread'ini durdur"""
+        self._stop_event.set()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout=timeout)
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Son örneklenen değerleri döndür
+
+        Returns:
+            Health endpoint alan adlarıyla sistem değerleri ve
+            system_probe_age_seconds (henüz örnek yoksa boş dict)
+        """
+        with self._lock:
+            snapshot = dict(self._snapshot)
+        sampled_at = snapshot.pop("_sampled_at", None)
+        if sampled_at is not None:
+            snapshot["system_probe_age_seconds"] = round(
+                time.monotonic() - sampled_at, 3
+            )
+        return snapshot
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                system_logger.debug(f"System probe örnekleme hatası: {e}")
+            self._stop_event.wait(self.interval)
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        Tek bir örnek al ve snapshot'ı güncelle
+
+        Returns:
+            Yeni snapshot
+        """
+        snapshot: Dict[str, Any] = {}
+        for name, reader in (
+            ("memory", self._read_memory),
+            ("cpu", self._read_cpu),
+            ("load_average", self._read_load_average),
+            ("temperature", self._read_temperature),
+            ("disk", self._read_disk),
+            ("network", self._read_network),
+        ):
+            try:
+                snapshot.update(reader())
+            except (OSError, ValueError, IndexError) as e:
+                system_logger.debug(f"System probe okuma hatası ({name}): {e}")
+        snapshot["_sampled_at"] = time.monotonic()
+
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    # Memory
+
+    def _read_memory(self) -> Dict[str, Any]:
+        """Process RSS ve sistem memory değerlerini /proc'tan oku"""
+        values: Dict[str, Any] = {}
+        meminfo = _read_key_values("/proc/meminfo")
+        total_kb = meminfo.get("MemTotal", 0)
+        available_kb = meminfo.get("MemAvailable", meminfo.get("MemFree", 0))
+        if total_kb > 0:
+            values["system_memory_percent"] = round(
+                (total_kb - available_kb) / total_kb * 100, 2
+            )
+            values["system_memory_total_mb"] = round(total_kb / 1024, 2)
+            values["system_memory_available_mb"] = round(available_kb / 1024, 2)
+
+        rss_kb = _read_key_values(f"/proc/{self._pid}/status").get("VmRSS")
+        if rss_kb is not None:
+            values["memory_mb"] = round(rss_kb / 1024, 2)
+            if total_kb > 0:
+                values["memory_percent"] = round(rss_kb / total_kb * 100, 2)
+        return values
+
+    # CPU
+
+    def _read_cpu(self) -> Dict[str, Any]:
+        """
+        Sistem ve process CPU yüzdelerini hesapla
+
+        /proc/stat toplam/idle jiffy'leri ve /proc/[pid]/stat utime+stime
+        değerleri önceki örnekle karşılaştırılır; bekleme yapılmaz.
+        """
+        with open("/proc/stat", "r") as f:
+            fields = [int(x) for x in f.readline().split()[1:]]
+        total = sum(fields)
+        # idle + iowait
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+
+        with open(f"/proc/{self._pid}/stat", "r") as f:
+            # comm alanı boşluk içerebilir, ')' sonrasından parse et
+            proc_fields = f.read().rsplit(")", 1)[1].split()
+        # utime ve stime (stat alanları 14 ve 15)
+        process_ticks = int(proc_fields[11]) + int(proc_fields[12])
+        now = time.monotonic()
+
+        values: Dict[str, Any] = {"system_cpu_percent": None, "cpu_percent": None}
+        if self._prev_cpu is not None:
+            prev_total, prev_idle = self._prev_cpu
+            total_delta = total - prev_total
+            if total_delta > 0:
+                values["system_cpu_percent"] = round(
+                    (1 - (idle - prev_idle) / total_delta) * 100, 2
+                )
+        if self._prev_process is not None:
+            prev_ticks, prev_time = self._prev_process
+            elapsed = now - prev_time
+            if elapsed > 0:
+                values["cpu_percent"] = round(
+                    (process_ticks - prev_ticks) / self._clock_ticks / elapsed * 100,
+                    2,
+                )
+        self._prev_cpu = (total, idle)
+        self._prev_process = (process_ticks, now)
+        return values
+
+    @staticmethod
+    def _read_load_average() -> Dict[str, Any]:
+        """Load average değerlerini oku"""
+        load_avg = os.getloadavg()
+        return {
+            "load_average": {
+                "1min": round(load_avg[0], 2),
+                "5min": round(load_avg[1], 2),
+                "15min": round(load_avg[2], 2),
+            }
+        }
+
+    # Sıcaklık
+
+    @staticmethod
+    def _read_temperature() -> Dict[str, Any]:
+        """CPU sıcaklığını /sys/class/thermal üzerinden oku"""
+        celsius = None
+        thermal_dir = "/sys/class/thermal"
+        try:
+            zones = sorted(
+                z for z in os.listdir(thermal_dir) if z.startswith("thermal_zone")
+            )
+        except OSError:
+            zones = []
+        for zone in zones:
+            try:
+                with open(os.path.join(thermal_dir, zone, "temp"), "r") as f:
+                    celsius = round(int(f.read().strip()) / 1000.0, 2)
+                break
+            except (OSError, ValueError):
+                continue
+
+        if celsius is None:
+            return {}
+
+        status = "normal"
+        for threshold, label in TEMPERATURE_THRESHOLDS:
+            if celsius > threshold:
+                status = label
+                break
+        return {
+            "cpu_temperature_celsius": celsius,
+            "cpu_temperature_fahrenheit": round(celsius * 9 / 5 + 32, 2),
+            "cpu_temperature_status": status,
+        }
+
+    # Disk
+
+    @staticmethod
+    def _read_disk() -> Dict[str, Any]:
+        """Disk kullanımını os.statvfs ile oku"""
+        stat = os.statvfs(DISK_PATH)
+        total = stat.f_blocks * stat.f_frsize
+        free = stat.f_bavail * stat.f_frsize
+        used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+        if total <= 0:
+            return {}
+        return {
+            "disk_total_gb": round(total / _BYTES_PER_GB, 2),
+            "disk_used_gb": round(used / _BYTES_PER_GB, 2),
+            "disk_free_gb": round(free / _BYTES_PER_GB, 2),
+            "disk_percent": round(used / total * 100, 2),
+        }
+
+    # Network
+
+    def _read_network(self) -> Dict[str, Any]:
+        """IP adresi ve SSID'yi subprocess kullanmadan oku"""
+        interfaces = _list_up_interfaces()
+        ip_address = None
+        ssid = None
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for interface in interfaces:
+                if ip_address is None:
+                    ip_address = _ioctl_ipv4_address(sock, interface)
+                if ssid is None and os.path.isdir(
+                    f"/sys/class/net/{interface}/wireless"
+                ):
+                    ssid = _ioctl_essid(sock, interface)
+        return {"network_ip": ip_address, "network_ssid": ssid}
+
+
+def _read_key_values(path: str) -> Dict[str, int]:
+    """'Anahtar: değer [kB]' formatındaki /proc dosyalarını parse et"""
+    values: Dict[str, int] = {}
+    with open(path, "r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+
+def _list_up_interfaces() -> List[str]:
+    """
+    Aktif network interface'lerini tercih sırasıyla listele
+
+    /sys/class/net/<iface>/operstate "up" (veya carrier bilgisi olmayan
+    "unknown") olan interface'ler döner; loopback hariç tutulur.
+    """
+    try:
+        names = os.listdir("/sys/class/net")
+    except OSError:
+        return []
+    active = []
+    for name in names:
+        if name == "lo":
+            continue
+        try:
+            with open(f"/sys/class/net/{name}/operstate", "r") as f:
+                state = f.read().strip()
+        except OSError:
+            continue
+        if state in ("up", "unknown"):
+            active.append(name)
+    preferred = [name for name in PREFERRED_INTERFACES if name in active]
+    return preferred + sorted(name for name in active if name not in preferred)
+
+
+def _ioctl_ipv4_address(sock: socket.socket, interface: str) -> Optional[str]:
+    """SIOCGIFADDR ile interface'in IPv4 adresini oku"""
+    try:
+        request = struct.pack("256s", interface.encode()[:15])
+        result = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, request)
+        return socket.inet_ntoa(result[20:24])
+    except OSError:
+        return None
+
+
+def _ioctl_essid(sock: socket.socket, interface: str) -> Optional[str]:
+    """SIOCGIWESSID (wireless extensions) ile bağlı olunan SSID'yi oku"""
+    buffer = array.array("B", bytes(IW_ESSID_MAX_SIZE + 1))
+    address, _ = buffer.buffer_info()
+    # struct iwreq: ifname[16] + iw_point {pointer, length, flags}
+    request = struct.pack(
+        "16sPHH", interface.encode()[:15], address, len(buffer), 0
+    ).ljust(32, b"\0")
+    try:
+        result = fcntl.ioctl(sock.fileno(), SIOCGIWESSID, request)
+    except OSError:
+        return None
+    length = struct.unpack_from("H", result, 16 + struct.calcsize("P"))[0]
+    ssid = buffer.tobytes()[:length].rstrip(b"\0").decode("utf-8", "replace")
+    return ssid or None
+
+
+# Singleton instance
+_system_probe: Optional[SystemProbe] = None
+_system_probe_lock = threading.Lock()
+
+
+def get_system_probe() -> SystemProbe:
+    """
+    System probe singleton instance'ını döndür
+
+    Returns:
+        SystemProbe instance
+    """
+    global _system_probe
+
+    if _system_probe is None:
+        with _system_probe_lock:
+            if _system_probe is None:
+                _system_probe = SystemProbe()
+
+    return _system_probe
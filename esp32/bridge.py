@@ -1,7 +1,7 @@
 """
 ESP32-RPi Bridge Module
 Created: 2025-12-08
-Last Modified: 2025-12-08
+Last Modified: 2025-12-11 22:00:00
 Version: 1.0.0
 Description: ESP32 ile USB seri port üzerinden iletişim modülü
 """
@@ -15,14 +15,12 @@ import threading
 import time
 from collections import deque
 from datetime import datetime
-from typing import Any, Dict, Optional
-
-import serial
-import serial.tools.list_ports
+from typing import Any, Callable, Dict, List, Optional
 
 # Logging modülünü import et
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from api.logging_config import esp32_logger, log_esp32_message
+from esp32.log_sampling import ESP32LogSampler
 from esp32.retry import RetryConfig, RetryStrategy
 
 # Protocol constants
@@ -32,6 +30,28 @@ PROTOCOL_FOOTER = 0x10
 BAUDRATE = 115200
 STATUS_UPDATE_INTERVAL = 5  # seconds
 
+
+def _serial():
+    """
+    pyserial'ı ilk kullanımda import et
+
+    Bridge sınıfı router'larda tip olarak import edilir; seri port sadece
+    connect() sırasında gerekir (API worker'larında hiç gerekmez).
+    """
+    global serial
+    import serial
+    import serial.tools.list_ports
+
+    return serial
+
+
+def __getattr__(name: str) -> Any:
+    # esp32.bridge.serial erişimi (örn. mock.patch hedefleri) pyserial'ı yükler
+    if name == "serial":
+        return _serial()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # Status message format: <STAT;ID=X;CP=X;CPV=X;PP=X;PPV=X;RL=X;LOCK=X;MOTOR=X;PWM=X;MAX=X;CABLE=X;AUTH=X;STATE=X;PB=X;STOP=X;>
 
 
@@ -50,7 +70,7 @@ class ESP32Bridge:
         """
         self.port = port
         self.baudrate = baudrate
-        self.serial_connection: Optional[serial.Serial] = None
+        self.serial_connection: Optional["serial.Serial"] = None
         self.protocol_data = self._load_protocol()
         self.last_status: Optional[Dict[str, Any]] = None
         self.status_lock = threading.Lock()
@@ -66,7 +86,9 @@ class ESP32Bridge:
         self._pending_commands = {}  # {command_id: CommandInfo}
         self._command_counter = 0
         self._command_lock = threading.Lock()  # Komut tracking için lock
-        self.is_connected = False
+        # Bağlantı durumu değiştiğinde çağrılacak callback'ler (alerting vb.)
+        self._connection_callbacks: List[Callable[[bool], None]] = []
+        self._is_connected = False
         self._monitor_thread: Optional[threading.Thread] = None
         self._monitor_running = False
         self._reconnect_enabled = True
@@ -74,6 +96,17 @@ class ESP32Bridge:
         self._max_reconnect_attempts = 3
         self._reconnect_delay = 5  # seconds
         self._last_connection_error: Optional[str] = None
+        # Yeni STAT mesajı geldiğinde çağrılacak callback'ler (stream, metrics vb.)
+        self._status_callbacks: List[Callable[[Dict[str, Any]], None]] = []
+        # Yüksek frekanslı mesajlar (STAT, ACK, status request) için log sampling
+        self._log_sampler = ESP32LogSampler.from_config()
+        # Metrics için seri port I/O sayaçları (sadece monitor/komut thread'leri yazar)
+        self._rx_bytes = 0
+        self._rx_frames = 0
+        self._tx_bytes = 0
+        self._last_status_monotonic: Optional[float] = None
+        # ACK bekleme süreleri (metrics tarafından drain edilir)
+        self._ack_latencies: deque = deque(maxlen=100)
 
     def _load_protocol(self) -> Dict[str, Any]:
         """Protokol tanımlarını yükle"""
@@ -94,7 +127,7 @@ class ESP32Bridge:
         Returns:
             Port adı veya None
         """
-        ports = serial.tools.list_ports.comports()
+        ports = _serial().tools.list_ports.comports()
         # ESP32 genellikle USB Serial veya CP210x, CH340 gibi chipsetler kullanır
         for port in ports:
             # ESP32 için yaygın tanımlayıcılar
@@ -121,6 +154,7 @@ class ESP32Bridge:
                 esp32_logger.warning("ESP32 portu bulunamadı")
                 return False
 
+            serial = _serial()
             self.serial_connection = serial.Serial(
                 port=port,
                 baudrate=self.baudrate,
@@ -290,6 +324,7 @@ class ESP32Bridge:
 
                 self.serial_connection.write(bytes(command_bytes))
                 self.serial_connection.flush()
+                self._tx_bytes += len(command_bytes)
 
                 # Komut gönderildikten sonra bağlantıyı tekrar kontrol et
                 if not self.serial_connection.is_open:
@@ -330,10 +365,10 @@ class ESP32Bridge:
         byte_array = cmd.get("byte_array", [65, 0, 44, 0, 16])
         result = self._send_command_bytes(byte_array)
         if result:
-            log_esp32_message(
+            self._log_sampled_message(
                 "status_request",
                 "tx",
-                data={"command": "status_request", "bytes": byte_array},
+                {"command": "status_request", "bytes": byte_array},
             )
         return result
 
@@ -654,10 +689,10 @@ class ESP32Bridge:
                 try:
                     ack = self._ack_queue.get(timeout=0.1)
                     if ack and ack.get("CMD") == expected_cmd:
-                        esp32_logger.debug(
-                            f"ACK alındı: {expected_cmd} - {ack.get('STATUS', 'N/A')}"
+                        # ACK monitor thread'inde zaten loglandı
+                        self._ack_latencies.append(
+                            (expected_cmd, time.time() - start_time)
                         )
-                        log_esp32_message("ack", "rx", data=ack)
                         return ack
                     # Yanlış komutun ACK'sı, queue'ya geri koy (başka thread bekliyor olabilir)
                     # Ancak bu durumda queue'ya geri koymak yerine kaybolmasına izin veriyoruz
@@ -702,14 +737,13 @@ class ESP32Bridge:
                 read_lines = []  # Okunan satırları sakla (lock dışında işle)
 
                 while self.serial_connection.in_waiting > 0 and lines_read < max_lines:
-                    line = (
-                        self.serial_connection.readline()
-                        .decode("utf-8", errors="ignore")
-                        .strip()
-                    )
+                    raw_line = self.serial_connection.readline()
+                    line = raw_line.decode("utf-8", errors="ignore").strip()
                     lines_read += 1
                     if line:
                         read_lines.append(line)
+                        self._rx_bytes += len(raw_line)
+                        self._rx_frames += 1
 
             # Eğer çok fazla satır okunduysa, buffer'ı temizle (overflow koruması)
             # Ancak önce önemli mesajları (STAT, ACK) kontrol et
@@ -734,6 +768,8 @@ class ESP32Bridge:
                                     with self.status_lock:
                                         self.last_status = status
                                         self._status_buffer.append(status)
+                                        self._last_status_monotonic = time.monotonic()
+                                    self._notify_status_callbacks(status)
                             elif "<ACK;" in remaining_line:
                                 ack = self._parse_ack_message(remaining_line)
                                 if ack:
@@ -760,19 +796,15 @@ class ESP32Bridge:
                             self.last_status = status
                             # Ring buffer'a ekle (geçmiş mesajlar için)
                             self._status_buffer.append(status)
-                        esp32_logger.debug(
-                            f"Status güncellendi: {status.get('STATE', 'N/A')}"
-                        )
-                        log_esp32_message("status", "rx", data=status)
+                            self._last_status_monotonic = time.monotonic()
+                        self._log_sampled_message("status", "rx", status)
+                        self._notify_status_callbacks(status)
                         # En son mesajı bulduk, diğerlerini okumaya devam et (en güncel olanı almak için)
                 # ACK mesajı kontrolü - Queue'ya ekle (thread-safe)
                 elif "<ACK;" in line:
                     ack = self._parse_ack_message(line)
                     if ack:
-                        esp32_logger.debug(
-                            f"ACK alındı: {ack.get('CMD', 'N/A')} - {ack.get('STATUS', 'N/A')}"
-                        )
-                        log_esp32_message("ack", "rx", data=ack)
+                        self._log_sampled_message("ack", "rx", ack)
                         # Ring buffer'a ekle (geçmiş ACK'lar için)
                         self._ack_buffer.append(ack)
                         # ACK'ı queue'ya ekle (_wait_for_ack tarafından okunacak)
@@ -787,7 +819,7 @@ class ESP32Bridge:
                             except queue.Empty:
                                 pass
 
-        except serial.SerialException as e:
+        except _serial().SerialException as e:
             # Serial port hatası - reconnection dene (improved error recovery)
             error_msg = str(e)
             esp32_logger.error(f"Serial port hatası: {error_msg}")
@@ -823,6 +855,138 @@ class ESP32Bridge:
         except Exception as e:
             esp32_logger.error(f"Status okuma hatası: {e}", exc_info=True)
 
+    @property
+    def is_connected(self) -> bool:
+        """ESP32 bağlantı durumu"""
+        return self._is_connected
+
+    @is_connected.setter
+    def is_connected(self, value: bool):
+        """
+        Bağlantı durumunu güncelle
+
+        Durum değiştiğinde (bağlandı/koptu) connection callback'leri çağrılır;
+        bu sayede bağlantı kopması periyodik kontrolü beklemeden bildirilir.
+        """
+        previous = self._is_connected
+        self._is_connected = value
+        if bool(previous) != bool(value):
+            self._notify_connection_callbacks(bool(value))
+
+    def register_connection_callback(self, callback: Callable[[bool], None]):
+        """
+        Bağlantı durumu callback kaydetme
+
+        Args:
+            callback: Bağlantı durumu değiştiğinde çağrılacak fonksiyon
+                     Signature: callback(connected: bool)
+        """
+        if callback not in self._connection_callbacks:
+            self._connection_callbacks.append(callback)
+
+    def unregister_connection_callback(self, callback: Callable[[bool], None]):
+        """Bağlantı durumu callback kaldırma"""
+        if callback in self._connection_callbacks:
+            self._connection_callbacks.remove(callback)
+
+    def _notify_connection_callbacks(self, connected: bool):
+        """
+        Kayıtlı bağlantı callback'lerini çağır (hata toleranslı)
+
+        Callback'ler durumu değiştiren thread'de çalışır, bu yüzden hızlı olmalıdır.
+        """
+        for callback in list(self._connection_callbacks):
+            try:
+                callback(connected)
+            except Exception as e:
+                esp32_logger.error(f"Connection callback hatası: {e}", exc_info=True)
+
+    def register_status_callback(self, callback: Callable[[Dict[str, Any]], None]):
+        """
+        STAT callback kaydetme
+
+        Args:
+            callback: Yeni status mesajı parse edildiğinde çağrılacak fonksiyon
+                     Signature: callback(status: Dict[str, Any])
+        """
+        if callback not in self._status_callbacks:
+            self._status_callbacks.append(callback)
+
+    def unregister_status_callback(self, callback: Callable[[Dict[str, Any]], None]):
+        """STAT callback kaldırma"""
+        if callback in self._status_callbacks:
+            self._status_callbacks.remove(callback)
+
+    def _notify_status_callbacks(self, status: Dict[str, Any]):
+        """
+        Kayıtlı STAT callback'lerini çağır (hata toleranslı)
+
+        Callback'ler monitor thread'inde çalışır, bu yüzden hızlı olmalıdır.
+        """
+        for callback in list(self._status_callbacks):
+            try:
+                callback(status)
+            except Exception as e:
+                esp32_logger.error(f"Status callback hatası: {e}", exc_info=True)
+
+    def _log_sampled_message(
+        self, message_type: str, direction: str, data: Dict[str, Any]
+    ):
+        """
+        Yüksek frekanslı mesajı sampling kurallarına göre logla
+
+        Bastırılan mesajlar sayılır; mesaj loglandığında arada bastırılan
+        mesaj sayısı "suppressed" alanı olarak eklenir.
+        """
+        suppressed = self._log_sampler.should_log(message_type, data)
+        if suppressed is None:
+            return
+        if suppressed:
+            log_esp32_message(message_type, direction, data=data, suppressed=suppressed)
+        else:
+            log_esp32_message(message_type, direction, data=data)
+
+    def get_log_sampling_stats(self) -> Dict[str, Any]:
+        """
+        ESP32 log sampling istatistiklerini al
+
+        Returns:
+            Mesaj tipi bazında görülen, loglanan ve bastırılan mesaj sayıları
+        """
+        return self._log_sampler.get_stats()
+
+    def get_io_stats(self) -> Dict[str, Any]:
+        """
+        Seri port I/O istatistiklerini al (metrics için)
+
+        Returns:
+            Toplam okunan/yazılan byte, okunan frame sayısı ve son STAT yaşı
+        """
+        last_status = self._last_status_monotonic
+        return {
+            "rx_bytes": self._rx_bytes,
+            "rx_frames": self._rx_frames,
+            "tx_bytes": self._tx_bytes,
+            "status_age_seconds": (
+                time.monotonic() - last_status if last_status is not None else None
+            ),
+        }
+
+    def drain_ack_latencies(self) -> List[tuple]:
+        """
+        Birikmiş ACK bekleme sürelerini al ve temizle
+
+        Returns:
+            (komut, süre saniye) tuple listesi
+        """
+        latencies = []
+        while self._ack_latencies:
+            try:
+                latencies.append(self._ack_latencies.popleft())
+            except IndexError:
+                break
+        return latencies
+
     def _start_monitoring(self):
         """Durum izleme thread'ini başlat"""
         if self._monitor_running:
@@ -0,0 +1,208 @@
+"""
+ESP32 Log Sampling Module
+Created: 2025-12-11 11:00:00
+Last Modified: 2025-12-12 10:00:00
+Version: 1.0.1
+Description: ESP32 mesaj logları için mesaj tipi bazlı sampling,
+             change-only STAT loglama ve token bucket rate limiting
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Varsayılan sampling oranları (her N mesajdan 1'i loglanır)
+# status_request her STAT döngüsünde gönderilir ve bilgi taşımaz
+DEFAULT_SAMPLE_RATES: Dict[str, int] = {
+    "status": 1,
+    "ack": 1,
+    "status_request": 20,
+}
+
+# Değişmeyen STAT mesajı en fazla bu aralıkta bir loglanır (saniye)
+# Uzun süre değişiklik olmasa da log'da canlılık izi kalması için
+DEFAULT_STATUS_HEARTBEAT = 300.0
+
+# Token bucket varsayılanları (tüm örneklenmiş mesajlar için ortak)
+DEFAULT_RATE_PER_SECOND = 1.0
+DEFAULT_BURST = 20
+
+# Karşılaştırmada yok sayılan alanlar (her mesajda değişir)
+VOLATILE_STATUS_FIELDS = ("timestamp",)
+
+# Bastırma nedenleri
+SUPPRESSED_SAMPLED = "sampled"
+SUPPRESSED_UNCHANGED = "unchanged"
+SUPPRESSED_RATE_LIMITED = "rate_limited"
+
+
+class TokenBucket:
+    """
+    Basit token bucket rate limiter
+
+    rate saniyede token eklenir, en fazla burst token birikir.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+
+    def consume(self, now: Optional[float] = None) -> bool:
+        """
+        Bir token harca
+
+        Returns:
+            Token varsa True, yoksa False
+        """
+        if self.rate <= 0:
+            return True
+        now = time.monotonic() if now is None else now
+        elapsed = max(0.0, now - self._last)
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._last = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+
+class ESP32LogSampler:
+    """
+    ESP32 mesaj log sampler'ı
+
+    Karar sırası: mesaj tipi sampling -> change-only (sadece status) ->
+    token bucket. Bastırılan mesajlar tip ve neden bazında sayılır; bir
+    mesaj loglandığında o tipten arada bastırılan mesaj sayısı döndürülür.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, int]] = None,
+        status_change_only: bool = True,
+        status_heartbeat: float = DEFAULT_STATUS_HEARTBEAT,
+        rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+        burst: int = DEFAULT_BURST,
+    ):
+        """
+        Log sampler başlatıcı
+
+        Args:
+            sample_rates: Mesaj tipi -> N (her N mesajdan 1'i loglanır)
+            status_change_only: STAT sadece alanlar değiştiğinde loglansın
+            status_heartbeat: Değişmeyen STAT için maksimum loglama aralığı (saniye, 0 = kapalı)
+            rate_per_second: Token bucket dolum hızı (0 = sınırsız)
+            burst: Token bucket kapasitesi
+        """
+        self.sample_rates = dict(DEFAULT_SAMPLE_RATES)
+        if sample_rates:
+            self.sample_rates.update(sample_rates)
+        self.status_change_only = status_change_only
+        self.status_heartbeat = status_heartbeat
+        self._bucket = TokenBucket(rate_per_second, burst)
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self._logged: Dict[str, int] = {}
+        self._suppressed: Dict[str, Dict[str, int]] = {}
+        self._pending_suppressed: Dict[str, int] = {}
+        self._last_status: Optional[Dict[str, Any]] = None
+        self._last_status_logged_at = 0.0
+
+    @classmethod
+    def from_config(cls) -> "ESP32LogSampler":
+        """Merkezi configuration'dan sampler oluştur"""
+        from api.config import config
+
+        return cls(
+            sample_rates=config.ESP32_LOG_SAMPLE_RATES,
+            status_change_only=config.ESP32_LOG_STATUS_CHANGE_ONLY,
+            status_heartbeat=config.ESP32_LOG_STATUS_HEARTBEAT,
+            rate_per_second=config.ESP32_LOG_RATE,
+            burst=config.ESP32_LOG_BURST,
+        )
+
+    def should_log(
+        self, message_type: str, data: Optional[Dict[str, Any]] = None
+    ) -> Optional[int]:
+        """
+        Mesajın loglanıp loglanmayacağına karar ver
+
+        Args:
+            message_type: Mesaj tipi (status, ack, status_request, ...)
+            data: Mesaj verisi (status için change-only karşılaştırması)
+
+        Returns:
+            Loglanacaksa arada bastırılan mesaj sayısı (0 veya daha fazla),
+            bastırılacaksa None
+        """
+        now = time.monotonic()
+        comparable = None
+        with self._lock:
+            seen = self._seen.get(message_type, 0)
+            self._seen[message_type] = seen + 1
+
+            rate = self.sample_rates.get(message_type, 1)
+            if rate > 1 and seen % rate != 0:
+                return self._suppress(message_type, SUPPRESSED_SAMPLED)
+
+            if message_type == "status" and self.status_change_only and data:
+                comparable = {
+                    k: v for k, v in data.items() if k not in VOLATILE_STATUS_FIELDS
+                }
+                unchanged = comparable == self._last_status
+                heartbeat_due = (
+                    self.status_heartbeat > 0
+                    and now - self._last_status_logged_at >= self.status_heartbeat
+                )
+                if unchanged and not heartbeat_due:
+                    return self._suppress(message_type, SUPPRESSED_UNCHANGED)
+
+            if not self._bucket.consume(now):
+                return self._suppress(message_type, SUPPRESSED_RATE_LIMITED)
+
+            if message_type == "status":
+                self._last_status_logged_at = now
+                # Referans sadece loglanan STAT olur; rate limit ile bastırılan
+                # değişiklik bir sonraki mesajda tekrar değişiklik sayılır
+                if comparable is not None:
+                    self._last_status = comparable
+            self._logged[message_type] = self._logged.get(message_type, 0) + 1
+            return self._pending_suppressed.pop(message_type, 0)
+
+    def _suppress(self, message_type: str, reason: str) -> None:
+        """Bastırılan mesajı say (lock altında çağrılır)"""
+        counters = self._suppressed.setdefault(message_type, {})
+        counters[reason] = counters.get(reason, 0) + 1
+        self._pending_suppressed[message_type] = (
+            self._pending_suppressed.get(message_type, 0) + 1
+        )
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Sampling istatistiklerini döndür
+
+        Returns:
+            Mesaj tipi bazında görülen, loglanan ve bastırılan mesaj sayıları
+        """
+        with self._lock:
+            suppressed_total = sum(
+                sum(reasons.values()) for reasons in self._suppressed.values()
+            )
+            return {
+                "seen": dict(self._seen),
+                "logged": dict(self._logged),
+                "suppressed": {k: dict(v) for k, v in self._suppressed.items()},
+                "suppressed_total": suppressed_total,
+            }
+
+    def reset(self) -> None:
+        """Sayaçları ve change-only durumunu sıfırla"""
+        with self._lock:
+            self._seen.clear()
+            self._logged.clear()
+            self._suppressed.clear()
+            self._pending_suppressed.clear()
+            self._last_status = None
+            self._last_status_logged_at = 0.0
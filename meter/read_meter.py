@@ -1,19 +1,57 @@
 """
 ABB Meter RS485 Okuma Modülü
 Created: 2025-12-09 02:50:00
-Last Modified: 2025-12-09 02:50:00
-Version: 1.0.0
+Last Modified: 2025-12-12 06:00:00
+Version: 1.5.0
 Description: ABB meter'dan RS485 üzerinden Modbus RTU protokolü ile veri okuma
+             (register haritası birleştirilmiş blok request'ler ile okunur,
+             RTU zamanlaması baudrate'ten hesaplanır; register haritası ve
+             Modbus codec'i api.meter ile ortaktır)
 """
 
+import os
+import sys
 import serial
 import time
-import struct
 import threading
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, List
 from datetime import datetime
 import logging
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Register haritası, CRC16, RTU zamanlaması ve frame parse api.meter'da
+# (ModbusMeter ile ortak); buradan da import edilebilmeleri için re-export edilir
+from api.meter.registers import (  # noqa: E402,F401
+    ABB_REGISTERS,
+    DEFAULT_MAX_REGISTER_GAP,
+    MODBUS_MAX_READ_REGISTERS,
+    MODBUS_READ_COILS,
+    MODBUS_READ_DISCRETE_INPUTS,
+    MODBUS_READ_HOLDING_REGISTERS,
+    MODBUS_READ_INPUT_REGISTERS,
+    RegisterBlock,
+    RegisterSpec,
+    decode_register_block,
+    decode_register_value,
+    plan_register_blocks,
+    register_struct,
+)
+from api.meter.transport import (  # noqa: E402,F401
+    CRC16_TABLE,
+    RTU_BITS_PER_CHAR,
+    RTU_EXCEPTION_FRAME_LENGTH,
+    ModbusError,
+    build_read_request,
+    crc16_modbus,
+    parse_rtu_response,
+    read_rtu_frame,
+    rtu_char_time,
+    rtu_exchange,
+    rtu_frame_gap,
+    rtu_frame_length,
+)
+
 # RS485/UART5 Konfigürasyonu
 # GPIO 12 (TX) -> MAX13487 Pin 4 (DI)
 # GPIO 13 (RX) <- MAX13487 Pin 1 (RO)
@@ -24,16 +62,9 @@ DEFAULT_BAUDRATE = 9600  # ABB meter için tipik baudrate (model'e göre değiş
 DEFAULT_SLAVE_ID = 1  # Modbus slave ID (meter'a göre ayarlanmalı)
 DEFAULT_TIMEOUT = 1.0  # Timeout (saniye)
 
-# Modbus RTU Function Codes
-MODBUS_READ_HOLDING_REGISTERS = 0x03
-MODBUS_READ_INPUT_REGISTERS = 0x04
-MODBUS_READ_COILS = 0x01
-MODBUS_READ_DISCRETE_INPUTS = 0x02
-
-# ABB Meter Register Adresleri
+# ABB Meter Modeli
 # Model: ABB B23 112-100
-# NOT: Gerçek register adresleri meter dokümantasyonundan alınmalı
-# Şu anki değerler örnek/placeholder - AC istasyonu açıldığında güncellenecek
+# Register haritası aşağıda (ABB_REGISTERS) - AC istasyonunda doğrulanacak
 
 ABB_METER_MODEL = "ABB B23 112-100"
 ABB_METER_SPECS = {
@@ -44,22 +75,20 @@ ABB_METER_SPECS = {
     "impulse_rate": "1000 imp/kW"
 }
 
-# ABB Meter Register Adresleri (örnek - gerçek adresler meter modeline göre değişir)
-# Bu adresler ABB meter dokümantasyonundan alınmalı
-# AC istasyonu açıldığında meter dokümantasyonu kontrol edilecek
-ABB_REGISTERS = {
-    "voltage_l1": 0x0000,  # L1 voltajı (V) - ÖRNEK
-    "voltage_l2": 0x0001,  # L2 voltajı (V) - ÖRNEK
-    "voltage_l3": 0x0002,  # L3 voltajı (V) - ÖRNEK
-    "current_l1": 0x0003,  # L1 akımı (A) - ÖRNEK
-    "current_l2": 0x0004,  # L2 akımı (A) - ÖRNEK
-    "current_l3": 0x0005,  # L3 akımı (A) - ÖRNEK
-    "power_active": 0x0006,  # Aktif güç (W) - ÖRNEK
-    "power_reactive": 0x0007,  # Reaktif güç (VAR) - ÖRNEK
-    "power_apparent": 0x0008,  # Görünür güç (VA) - ÖRNEK
-    "energy_active": 0x0009,  # Aktif enerji (kWh) - ÖRNEK
-    "energy_reactive": 0x000A,  # Reaktif enerji (kVARh) - ÖRNEK
-    "frequency": 0x000B,  # Frekans (Hz) - ÖRNEK
+# read_meter_data çıktı anahtarları (register adı -> birimli anahtar)
+METER_DATA_KEYS = {
+    "voltage_l1": "voltage_l1",
+    "voltage_l2": "voltage_l2",
+    "voltage_l3": "voltage_l3",
+    "current_l1": "current_l1",
+    "current_l2": "current_l2",
+    "current_l3": "current_l3",
+    "power_active": "power_active_w",
+    "power_reactive": "power_reactive_var",
+    "power_apparent": "power_apparent_va",
+    "frequency": "frequency_hz",
+    "energy_active": "energy_active_kwh",
+    "energy_reactive": "energy_reactive_kvarh",
 }
 
 
@@ -72,7 +101,8 @@ class ABBMeterReader:
                  device: str = UART5_DEVICE,
                  baudrate: int = DEFAULT_BAUDRATE,
                  slave_id: int = DEFAULT_SLAVE_ID,
-                 timeout: float = DEFAULT_TIMEOUT):
+                 timeout: float = DEFAULT_TIMEOUT,
+                 rts_control: bool = True):
         """
         ABB Meter Reader başlatıcı
         
@@ -81,13 +111,22 @@ class ABBMeterReader:
             baudrate: Baudrate (genellikle 9600 veya 19200)
             slave_id: Modbus slave ID (meter adresi)
             timeout: Timeout süresi (saniye)
+            rts_control: RTS ile yön kontrolü (False: otomatik yönlü adaptör
+                         veya simülatör pty'si)
         """
         self.device = device
         self.baudrate = baudrate
         self.slave_id = slave_id
         self.timeout = timeout
+        self.rts_control = rts_control
         self.serial_connection: Optional[serial.Serial] = None
         self.is_connected = False
+        # Son frame'in bittiği an (t3.5 sessizliği için)
+        self._last_frame_end = 0.0
+
+        # Tam snapshot için request planı (bir kez hesaplanır)
+        self.register_map = ABB_REGISTERS
+        self._snapshot_blocks = plan_register_blocks(self.register_map)
         
         # Logging setup
         self.logger = logging.getLogger(__name__)
@@ -144,213 +183,210 @@ class ABBMeterReader:
     def _calculate_crc16(self, data: bytes) -> int:
         """
         Modbus RTU CRC16 hesaplama
-        
+
         Args:
             data: CRC hesaplanacak veri
-            
+
         Returns:
             CRC16 değeri (2 byte)
         """
-        crc = 0xFFFF
-        for byte in data:
-            crc ^= byte
-            for _ in range(8):
-                if crc & 0x0001:
-                    crc = (crc >> 1) ^ 0xA001
-                else:
-                    crc >>= 1
-        return crc
-    
-    def _build_modbus_request(self, 
+        return crc16_modbus(data)
+
+    def _build_modbus_request(self,
                               function_code: int,
                               start_address: int,
                               quantity: int) -> bytes:
         """
         Modbus RTU request paketi oluştur
-        
+
+        Frame (slave_id, function code, adres, adet) ile tamamen belirlendiği
+        için her blok için bir kez oluşturulup cache'lenir; tekrar eden
+        okumalarda CRC yeniden hesaplanmaz.
+
         Args:
             function_code: Modbus function code
             start_address: Başlangıç register adresi
             quantity: Okunacak register sayısı
-            
+
         Returns:
             Modbus RTU request paketi (bytes)
         """
-        # Paket: [Slave ID] [Function Code] [Start Address High] [Start Address Low] 
-        #        [Quantity High] [Quantity Low] [CRC Low] [CRC High]
-        request = struct.pack('>BBHH', 
-                             self.slave_id,
-                             function_code,
-                             start_address,
-                             quantity)
-        
-        # CRC hesapla ve ekle
-        crc = self._calculate_crc16(request)
-        request += struct.pack('<H', crc)  # Little-endian CRC
-        
-        return request
-    
+        return build_read_request(self.slave_id, function_code, start_address, quantity)
+
+    def _parse_modbus_payload(self, response: bytes) -> Optional[memoryview]:
+        """
+        Modbus RTU response paketini doğrula ve data kısmını döndür
+
+        Args:
+            response: Modbus RTU response paketi
+
+        Returns:
+            Register data'sı (kopyasız memoryview) veya None (hata durumunda)
+        """
+        try:
+            return parse_rtu_response(response, self.slave_id)
+        except ModbusError as e:
+            self.logger.error(str(e))
+            return None
+
     def _parse_modbus_response(self, response: bytes) -> Optional[List[int]]:
         """
         Modbus RTU response paketini parse et
-        
+
         Args:
             response: Modbus RTU response paketi
-            
+
         Returns:
             Register değerleri listesi veya None (hata durumunda)
         """
-        if len(response) < 5:  # Minimum response uzunluğu
-            return None
-        
-        # Response formatı: [Slave ID] [Function Code] [Byte Count] [Data...] [CRC Low] [CRC High]
-        slave_id = response[0]
-        function_code = response[1]
-        
-        if slave_id != self.slave_id:
-            self.logger.warning(f"Slave ID uyuşmazlığı: beklenen {self.slave_id}, alınan {slave_id}")
+        payload = self._parse_modbus_payload(response)
+        if payload is None:
             return None
-        
-        if function_code & 0x80:  # Error response
-            error_code = response[2]
-            self.logger.error(f"Modbus hatası: function_code=0x{function_code:02X}, error=0x{error_code:02X}")
-            return None
-        
-        byte_count = response[2]
-        data = response[3:3+byte_count]
-        crc_received = struct.unpack('<H', response[-2:])[0]
-        
-        # CRC kontrolü
-        crc_calculated = self._calculate_crc16(response[:-2])
-        if crc_received != crc_calculated:
-            self.logger.error(f"CRC hatası: beklenen 0x{crc_calculated:04X}, alınan 0x{crc_received:04X}")
-            return None
-        
-        # Register değerlerini parse et (her register 2 byte)
-        registers = []
-        for i in range(0, len(data), 2):
-            if i + 1 < len(data):
-                value = struct.unpack('>H', data[i:i+2])[0]  # Big-endian 16-bit
-                registers.append(value)
-        
-        return registers
-    
-    def read_holding_registers(self, 
+        # Register değerleri (her register 2 byte, big-endian)
+        return list(register_struct(len(payload) // 2).unpack_from(payload))
+
+    @property
+    def char_time(self) -> float:
+        """Yapılandırılmış baudrate için karakter süresi (saniye)"""
+        return rtu_char_time(self.baudrate)
+
+    @property
+    def frame_gap(self) -> float:
+        """Yapılandırılmış baudrate için frame'ler arası sessizlik (t3.5)"""
+        return rtu_frame_gap(self.baudrate)
+
+    def _transact(self, request: bytes) -> bytes:
+        """
+        Request gönder ve response frame'ini oku
+
+        Zamanlama baudrate'ten hesaplanır (bkz. rtu_exchange).
+
+        Args:
+            request: CRC dahil request frame'i
+
+        Returns:
+            Response byte'ları
+        """
+        try:
+            return rtu_exchange(self.serial_connection, request, self.baudrate,
+                                self._last_frame_end, self.rts_control)
+        finally:
+            self._last_frame_end = time.monotonic()
+
+    def read_register_payload(self,
+                              function_code: int,
                               start_address: int,
-                              quantity: int) -> Optional[List[int]]:
+                              quantity: int) -> Optional[memoryview]:
         """
-        Holding register'ları oku (Function Code 0x03)
-        
+        Register'ları oku ve response data'sını kopyalamadan döndür
+
         Args:
+            function_code: MODBUS_READ_HOLDING_REGISTERS veya MODBUS_READ_INPUT_REGISTERS
             start_address: Başlangıç register adresi
             quantity: Okunacak register sayısı
-            
+
         Returns:
-            Register değerleri listesi veya None (hata durumunda)
+            Register data'sı (2 byte/register, big-endian) veya None (hata durumunda)
         """
         if not self.is_connected or not self.serial_connection or not self.serial_connection.is_open:
             self.logger.error("ABB Meter bağlantısı yok")
             return None
-        
+
         try:
-            # Request paketi oluştur
-            request = self._build_modbus_request(
-                MODBUS_READ_HOLDING_REGISTERS,
-                start_address,
-                quantity
-            )
-            
-            # Buffer'ı temizle
-            self.serial_connection.reset_input_buffer()
-            self.serial_connection.reset_output_buffer()
-            
-            # Request gönder
-            self.serial_connection.write(request)
-            self.serial_connection.flush()
-            
-            # Response bekle
-            time.sleep(0.05)  # Modbus RTU için tipik bekleme süresi
-            
-            # Response oku
-            response = self.serial_connection.read(5 + quantity * 2 + 2)  # Min response + data + CRC
-            
+            request = self._build_modbus_request(function_code, start_address, quantity)
+            response = self._transact(request)
+
             if len(response) < 5:
                 self.logger.error(f"Yetersiz response: {len(response)} byte")
                 return None
-            
-            # Response parse et
-            registers = self._parse_modbus_response(response)
-            return registers
-            
+
+            return self._parse_modbus_payload(response)
+
         except Exception as e:
-            self.logger.error(f"Register okuma hatası: {e}")
+            self.logger.error(f"Register okuma hatası (0x{function_code:02X}): {e}")
             return None
-    
+
+    def read_registers(self,
+                       function_code: int,
+                       start_address: int,
+                       quantity: int) -> Optional[List[int]]:
+        """
+        Holding (0x03) veya input (0x04) register'ları oku
+
+        Args:
+            function_code: MODBUS_READ_HOLDING_REGISTERS veya MODBUS_READ_INPUT_REGISTERS
+            start_address: Başlangıç register adresi
+            quantity: Okunacak register sayısı
+
+        Returns:
+            Register değerleri listesi veya None (hata durumunda)
+        """
+        payload = self.read_register_payload(function_code, start_address, quantity)
+        if payload is None:
+            return None
+        return list(register_struct(len(payload) // 2).unpack_from(payload))
+
+    def read_holding_registers(self,
+                               start_address: int,
+                               quantity: int) -> Optional[List[int]]:
+        """
+        Holding register'ları oku (Function Code 0x03)
+
+        Args:
+            start_address: Başlangıç register adresi
+            quantity: Okunacak register sayısı
+
+        Returns:
+            Register değerleri listesi veya None (hata durumunda)
+        """
+        return self.read_registers(MODBUS_READ_HOLDING_REGISTERS, start_address, quantity)
+
     def read_input_registers(self,
-                            start_address: int,
-                            quantity: int) -> Optional[List[int]]:
+                             start_address: int,
+                             quantity: int) -> Optional[List[int]]:
         """
         Input register'ları oku (Function Code 0x04)
-        
+
         Args:
             start_address: Başlangıç register adresi
             quantity: Okunacak register sayısı
-            
+
         Returns:
             Register değerleri listesi veya None (hata durumunda)
         """
-        if not self.is_connected or not self.serial_connection or not self.serial_connection.is_open:
-            self.logger.error("ABB Meter bağlantısı yok")
-            return None
-        
-        try:
-            # Request paketi oluştur
-            request = self._build_modbus_request(
-                MODBUS_READ_INPUT_REGISTERS,
-                start_address,
-                quantity
-            )
-            
-            # Buffer'ı temizle
-            self.serial_connection.reset_input_buffer()
-            self.serial_connection.reset_output_buffer()
-            
-            # RS485 TX moduna geç (RTS HIGH) - MAX13487 DE/RE aktif
-            self.serial_connection.rts = True
-            time.sleep(0.005)  # RTS stabilizasyonu için bekleme (5ms önerilir)
-            
-            # Request gönder
-            self.serial_connection.write(request)
-            self.serial_connection.flush()
-            
-            # RS485 RX moduna geç (RTS LOW) - MAX13487 RX modu
-            # Tüm veri gönderildikten sonra RTS'i düşür
-            time.sleep(0.002)  # Son byte'ın gönderilmesi için bekleme
-            self.serial_connection.rts = False
-            time.sleep(0.005)  # RTS stabilizasyonu için bekleme (5ms önerilir)
-            
-            # Response bekle
-            time.sleep(0.05)
-            
-            # Response oku
-            response = self.serial_connection.read(5 + quantity * 2 + 2)
-            
-            if len(response) < 5:
-                self.logger.error(f"Yetersiz response: {len(response)} byte")
-                return None
-            
-            # Response parse et
-            registers = self._parse_modbus_response(response)
-            return registers
-            
-        except Exception as e:
-            self.logger.error(f"Input register okuma hatası: {e}")
-            return None
-    
+        return self.read_registers(MODBUS_READ_INPUT_REGISTERS, start_address, quantity)
+
+    def read_register_map(self,
+                          names: Optional[Iterable[str]] = None) -> Dict[str, Optional[float]]:
+        """
+        Register haritasındaki alanları birleştirilmiş bloklar halinde oku
+
+        Args:
+            names: Okunacak register adları (None: tüm harita, önceden planlanmış)
+
+        Returns:
+            Register adı -> değer (okunamayan blokların alanları dahil edilmez)
+        """
+        if names is None:
+            blocks = self._snapshot_blocks
+        else:
+            blocks = plan_register_blocks(self.register_map, names)
+
+        values: Dict[str, Optional[float]] = {}
+        for block in blocks:
+            payload = self.read_register_payload(block.function_code, block.start, block.count)
+            if payload is None:
+                continue
+            values.update(decode_register_block(block, payload, self.register_map))
+        return values
+
     def read_meter_data(self) -> Optional[Dict[str, Any]]:
         """
         ABB meter'dan tüm önemli verileri oku
-        
+
+        Register haritası tek tek değil, planlanmış bloklar halinde okunur
+        (ABB_REGISTERS için iki bus transaction).
+
         Returns:
             Meter verileri dict'i veya None (hata durumunda)
         """
@@ -365,35 +401,8 @@ class ABBMeterReader:
         }
         
         try:
-            # Örnek: Voltaj değerlerini oku (L1, L2, L3)
-            # NOT: Gerçek register adresleri ABB meter dokümantasyonundan alınmalı
-            voltage_registers = self.read_input_registers(ABB_REGISTERS["voltage_l1"], 3)
-            if voltage_registers:
-                meter_data["voltage_l1"] = voltage_registers[0] / 10.0 if len(voltage_registers) > 0 else None
-                meter_data["voltage_l2"] = voltage_registers[1] / 10.0 if len(voltage_registers) > 1 else None
-                meter_data["voltage_l3"] = voltage_registers[2] / 10.0 if len(voltage_registers) > 2 else None
-            
-            # Akım değerlerini oku
-            current_registers = self.read_input_registers(ABB_REGISTERS["current_l1"], 3)
-            if current_registers:
-                meter_data["current_l1"] = current_registers[0] / 100.0 if len(current_registers) > 0 else None
-                meter_data["current_l2"] = current_registers[1] / 100.0 if len(current_registers) > 1 else None
-                meter_data["current_l3"] = current_registers[2] / 100.0 if len(current_registers) > 2 else None
-            
-            # Aktif güç oku
-            power_registers = self.read_input_registers(ABB_REGISTERS["power_active"], 1)
-            if power_registers:
-                meter_data["power_active_w"] = power_registers[0] if len(power_registers) > 0 else None
-            
-            # Aktif enerji oku
-            energy_registers = self.read_input_registers(ABB_REGISTERS["energy_active"], 1)
-            if energy_registers:
-                meter_data["energy_active_kwh"] = energy_registers[0] / 100.0 if len(energy_registers) > 0 else None
-            
-            # Frekans oku
-            freq_registers = self.read_input_registers(ABB_REGISTERS["frequency"], 1)
-            if freq_registers:
-                meter_data["frequency_hz"] = freq_registers[0] / 100.0 if len(freq_registers) > 0 else None
+            for name, value in self.read_register_map().items():
+                meter_data[METER_DATA_KEYS.get(name, name)] = value
             
             return meter_data
             
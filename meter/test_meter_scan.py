@@ -1,16 +1,19 @@
 """
 ABB Meter RS485 Tarama ve Test Scripti
 Created: 2025-12-09 04:23:00
-Last Modified: 2025-12-09 04:23:00
-Version: 1.0.0
+Last Modified: 2025-12-12 05:00:00
+Version: 1.1.0
 Description: Farklı baudrate ve slave ID kombinasyonlarını test eder
+             (slave başına baudrate'ten hesaplanan kısa timeout ile tüm
+             ID aralığı taranır)
 """
 
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from meter.read_meter import ABBMeterReader
+from api.meter.bus import scan_bus, scan_timeout
+from api.meter.transport import ModbusError, RtuTransport
 import time
 import logging
 
@@ -21,7 +24,7 @@ print("=" * 60)
 
 # Test edilecek kombinasyonlar
 BAUDRATES = [9600, 19200, 4800]
-SLAVE_IDS = [1, 2, 3, 247]  # 247 genellikle broadcast adresi
+SLAVE_IDS = range(1, 248)  # 1-247 (0 broadcast adresidir, cevap gelmez)
 DEVICES = ["/dev/ttyAMA5", "/dev/ttyAMA4"]
 
 found = False
@@ -31,44 +34,29 @@ for device in DEVICES:
     print("-" * 60)
     
     for baudrate in BAUDRATES:
-        print(f"\n  📡 Baudrate: {baudrate}")
+        transport = RtuTransport(device, baudrate=baudrate, timeout=0.5)
+        try:
+            transport.open()
+        except ModbusError as e:
+            print(f"  ❌ (Bağlantı hatası: {e})")
+            break
         
-        for slave_id in SLAVE_IDS:
-            print(f"    🔢 Slave ID: {slave_id}", end=" ... ")
-            
-            try:
-                reader = ABBMeterReader(
-                    device=device,
-                    baudrate=baudrate,
-                    slave_id=slave_id,
-                    timeout=0.5
-                )
-                
-                if reader.connect():
-                    # Basit bir register okuma denemesi
-                    result = reader.read_input_registers(0x0000, 1)
-                    
-                    if result is not None:
-                        print(f"✅ BAŞARILI! Response: {result}")
-                        print(f"\n🎯 BULUNAN AYARLAR:")
-                        print(f"   Device: {device}")
-                        print(f"   Baudrate: {baudrate}")
-                        print(f"   Slave ID: {slave_id}")
-                        found = True
-                        reader.disconnect()
-                        break
-                    else:
-                        print("❌")
-                    reader.disconnect()
-                else:
-                    print("❌ (Bağlantı hatası)")
-                    
-            except Exception as e:
-                print(f"❌ (Hata: {e})")
-            
-            time.sleep(0.1)  # Kısa bekleme
+        print(f"\n  📡 Baudrate: {baudrate} (slave başına timeout: {scan_timeout(transport) * 1000:.0f} ms)")
+        started = time.monotonic()
+        slave_ids = scan_bus(
+            transport,
+            SLAVE_IDS,
+            on_found=lambda slave_id: print(f"    🔢 Slave ID: {slave_id} ✅"),
+        )
+        transport.close()
+        print(f"    {len(SLAVE_IDS)} ID {time.monotonic() - started:.1f} s'de tarandı")
         
-        if found:
+        if slave_ids:
+            print(f"\n🎯 BULUNAN AYARLAR:")
+            print(f"   Device: {device}")
+            print(f"   Baudrate: {baudrate}")
+            print(f"   Slave ID: {', '.join(str(slave_id) for slave_id in slave_ids)}")
+            found = True
             break
     
     if found:
@@ -2,8 +2,8 @@
 """
 API Health Monitor Script
 Oluşturulma Tarihi: 2025-12-10 01:15:00
-Son Güncelleme: 2025-12-10 01:15:00
-Version: 1.0.0
+Son Güncelleme: 2025-12-11 16:00:00
+Version: 1.1.0
 Açıklama: API servisinin sağlığını kontrol eder ve sorun durumunda restart eder
 """
 
@@ -32,28 +32,51 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Yapılandırma
-API_URL = "http://localhost:8000/api/health"
+# Liveness (restart kararı) ve readiness (sadece loglanır) endpoint'leri
+LIVEZ_URL = "http://localhost:8000/livez"
+READYZ_URL = "http://localhost:8000/readyz"
 CHECK_INTERVAL = 30  # saniye
 MAX_FAILURES = 3  # 3 başarısız kontrol sonrası restart
 SERVICE_NAME = "charger-api.service"
 
 
-def check_api_health():
-    """API sağlık kontrolü yapar"""
+def _get(url):
+    """Endpoint'e GET isteği at, (status kodu, JSON body) döndür"""
+    import json
+    import urllib.request
+    import urllib.error
+
+    req = urllib.request.Request(url)
+    req.add_header('User-Agent', 'API-Health-Monitor/1.1')
     try:
-        import urllib.request
-        import urllib.error
+        with urllib.request.urlopen(req, timeout=5) as response:
+            return response.status, json.loads(response.read().decode())
+    except urllib.error.HTTPError as e:
+        # 503 (not ready) gibi cevaplar da body içerir
+        return e.code, json.loads(e.read().decode() or "{}")
 
-        req = urllib.request.Request(API_URL)
-        req.add_header('User-Agent', 'API-Health-Monitor/1.0')
 
-        with urllib.request.urlopen(req, timeout=5) as response:
-            if response.status == 200:
-                return True, "OK"
-            else:
-                return False, f"HTTP {response.status}"
-    except urllib.error.URLError as e:
+def check_api_health():
+    """API liveness kontrolü yapar (/livez - bridge/DB'ye dokunmaz)"""
+    try:
+        status_code, _ = _get(LIVEZ_URL)
+        if status_code == 200:
+            return True, "OK"
+        return False, f"HTTP {status_code}"
+    except Exception as e:
         return False, f"Connection error: {e}"
+
+
+def check_api_readiness():
+    """API readiness kontrolü yapar (/readyz - ESP32, DB, event detector)"""
+    try:
+        status_code, body = _get(READYZ_URL)
+        failed = [
+            f"{name}={check.get('reason')}"
+            for name, check in body.get("checks", {}).items()
+            if not check.get("ok")
+        ]
+        return status_code == 200, ", ".join(failed) or f"HTTP {status_code}"
     except Exception as e:
         return False, f"Error: {e}"
 
@@ -96,16 +119,18 @@ def check_service_status():
 def main():
     """Ana monitoring döngüsü"""
     logger.info("API Health Monitor başlatıldı")
-    logger.info(f"API URL: {API_URL}")
+    logger.info(f"Liveness URL: {LIVEZ_URL}")
+    logger.info(f"Readiness URL: {READYZ_URL}")
     logger.info(f"Check Interval: {CHECK_INTERVAL} saniye")
     logger.info(f"Max Failures: {MAX_FAILURES}")
 
     failure_count = 0
     last_success_time = datetime.now()
+    was_ready = None
 
     while True:
         try:
-            # API health check
+            # API liveness check (restart kararı sadece buna göre verilir)
             is_healthy, message = check_api_health()
 
             if is_healthy:
@@ -113,6 +138,15 @@ def main():
                     logger.info(f"API sağlığı düzeldi. Önceki hata sayısı: {failure_count}")
                 failure_count = 0
                 last_success_time = datetime.now()
+
+                # Readiness değişimlerini logla (ESP32/DB sorunu restart ile düzelmez)
+                is_ready, reason = check_api_readiness()
+                if is_ready != was_ready:
+                    if is_ready:
+                        logger.info("API hazır (readyz)")
+                    else:
+                        logger.warning(f"API hazır değil (readyz): {reason}")
+                was_ready = is_ready
             else:
                 failure_count += 1
                 logger.warning(f"API sağlık kontrolü başarısız ({failure_count}/{MAX_FAILURES}): {message}")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Meter Codec Benchmark Script
+Oluşturulma Tarihi: 2025-12-12 02:00:00
+Son Güncelleme: 2025-12-12 02:00:00
+Version: 1.0.0
+Açıklama: Modbus RTU CRC16 ve response parse maliyeti - bit döngülü CRC +
+          bytes kopyalayan parse ile tablo tabanlı CRC + memoryview /
+          struct.unpack_from parse karşılaştırması
+
+Kullanım:
+    python scripts/benchmark_meter_codec.py [--iterations 20000]
+
+Ölçülen frame'ler ABB tam snapshot'ının iki bloğudur (0x5000 x16 ve
+0x5B00 x45 register). Seri port kullanılmaz; sadece CPU maliyeti ölçülür.
+"""
+
+import argparse
+import statistics
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from meter.read_meter import (
+    ABB_REGISTERS,
+    ABBMeterReader,
+    crc16_modbus,
+    decode_register_block,
+    decode_register_value,
+    plan_register_blocks,
+)
+
+
+def _crc16_bitwise(data: bytes) -> int:
+    """Referans: önceki bit döngülü CRC"""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+    return crc
+
+
+def _parse_before(response: bytes, block, register_map) -> dict:
+    """Referans: önceki parse (slice kopyaları + register başına unpack)"""
+    byte_count = response[2]
+    data = response[3 : 3 + byte_count]
+    crc_received = struct.unpack("<H", response[-2:])[0]
+    if crc_received != _crc16_bitwise(response[:-2]):
+        raise ValueError("CRC")
+    registers = []
+    for i in range(0, len(data), 2):
+        if i + 1 < len(data):
+            registers.append(struct.unpack(">H", data[i : i + 2])[0])
+    return {
+        name: decode_register_value(
+            registers, register_map[name].address - block.start, register_map[name]
+        )
+        for name in block.fields
+    }
+
+
+def _parse_after(reader: ABBMeterReader, response: bytes, block, register_map) -> dict:
+    payload = reader._parse_modbus_payload(response)
+    return decode_register_block(block, payload, register_map)
+
+
+def _frames(reader: ABBMeterReader) -> list:
+    frames = []
+    for block in plan_register_blocks(ABB_REGISTERS):
+        words = [(block.start + i) & 0x7FFF for i in range(block.count)]
+        body = struct.pack(
+            ">BBB", reader.slave_id, block.function_code, block.count * 2
+        )
+        body += struct.pack(f">{block.count}H", *words)
+        frames.append((block, body + struct.pack("<H", crc16_modbus(body))))
+    return frames
+
+
+def _measure(func, iterations: int) -> list:
+    for _ in range(min(1000, iterations)):
+        func()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _summary(name: str, latencies: list) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "name": name,
+        "mean_us": statistics.mean(ordered) * 1e6,
+        "p50_us": ordered[len(ordered) // 2] * 1e6,
+        "p99_us": ordered[int(len(ordered) * 0.99) - 1] * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    reader = ABBMeterReader()
+    frames = _frames(reader)
+    largest = max((response for _, response in frames), key=len)
+
+    cases = [
+        ("crc before (bitwise)", lambda: _crc16_bitwise(largest)),
+        ("crc after (table)", lambda: crc16_modbus(largest)),
+        (
+            "snapshot parse before",
+            lambda: [_parse_before(r, b, ABB_REGISTERS) for b, r in frames],
+        ),
+        (
+            "snapshot parse after",
+            lambda: [_parse_after(reader, r, b, ABB_REGISTERS) for b, r in frames],
+        ),
+    ]
+    results = [_summary(name, _measure(func, args.iterations)) for name, func in cases]
+
+    print(
+        f"Meter codec - {args.iterations} tekrar (en büyük frame {len(largest)} byte)"
+    )
+    print(f"{'case':<28}{'mean (µs)':>12}{'p50 (µs)':>12}{'p99 (µs)':>12}")
+    for r in results:
+        print(
+            f"{r['name']:<28}{r['mean_us']:>12.1f}{r['p50_us']:>12.1f}{r['p99_us']:>12.1f}"
+        )
+    for before, after in (results[0:2], results[2:4]):
+        print(
+            f"{after['name']}: {before['mean_us'] / after['mean_us']:.1f}x daha hızlı"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Meter Simulator Benchmark Script
+Oluşturulma Tarihi: 2025-12-12 06:00:00
+Son Güncelleme: 2025-12-12 06:00:00
+Version: 1.0.0
+Açıklama: Fiziksel meter olmadan uçtan uca meter okuma ölçümü - ABBMeterReader
+          ve ModbusMeter ile snapshot gecikmesi / throughput ve hızlandırılmış
+          şarj session'ında enerji doğruluğu (MeterSimulator üzerinden)
+
+Kullanım:
+    python scripts/benchmark_meter_simulator.py [--iterations 200]
+        [--latency 0.0] [--error-rate 0.0] [--speed 60] [--poll 0.5]
+
+RTU ölçümleri pty üzerinden yapılır; pty baud hızını uygulamadığı için
+sonuçlar codec + işletim sistemi + t3.5 beklemesi maliyetini gösterir, hat
+süresini değil. Enerji doğruluğu iki yöntemle karşılaştırılır: meter enerji
+sayacı farkı ve okunan gücün trapez integrali.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.meter.modbus import ModbusMeter
+from api.meter.simulator import MeterSimulator, PowerCurve
+from api.meter.transport import TransportPool
+from meter.read_meter import ABBMeterReader
+
+
+def _measure(func, iterations: int) -> list:
+    for _ in range(min(10, iterations)):
+        func()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _summary(name: str, latencies: list) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "name": name,
+        "mean_ms": statistics.mean(ordered) * 1e3,
+        "p50_ms": ordered[len(ordered) // 2] * 1e3,
+        "p99_ms": ordered[max(int(len(ordered) * 0.99) - 1, 0)] * 1e3,
+        "per_s": len(ordered) / sum(ordered),
+    }
+
+
+def _snapshot_cases(simulator: MeterSimulator) -> list:
+    reader = ABBMeterReader(
+        device=simulator.start_rtu(), baudrate=115200, timeout=0.5, rts_control=False
+    )
+    reader.connect()
+    rtu_meter = ModbusMeter(
+        f"rtu://{simulator.start_rtu()}?baudrate=115200&parity=N&rts=0",
+        pool=TransportPool(),
+    )
+    rtu_meter.connect()
+    tcp_meter = ModbusMeter(simulator.start_tcp(), pool=TransportPool())
+    tcp_meter.connect()
+    return [
+        ("ABBMeterReader rtu (pty)", reader.read_meter_data),
+        ("ModbusMeter rtu (pty)", rtu_meter.read_all),
+        ("ModbusMeter tcp", tcp_meter.read_all),
+    ]
+
+
+def _session_accuracy(args) -> dict:
+    curve = PowerCurve.charging_session(peak_w=7200.0, ramp=30.0, hold=600.0, idle=30)
+    simulator = MeterSimulator(
+        curve,
+        start_energy_kwh=1000.0,
+        speed=args.speed,
+        error_rate=args.error_rate,
+        seed=1,
+    )
+    try:
+        meter = ModbusMeter(simulator.start_tcp(), pool=TransportPool())
+        meter.connect()
+        simulator.reset_clock()
+        samples = []
+        failed = 0
+        while simulator.elapsed() < curve.duration:
+            reading = meter.read_all()
+            if reading is None or not reading.is_valid:
+                failed += 1
+            else:
+                samples.append((simulator.elapsed(), reading))
+            time.sleep(args.poll)
+        end = simulator.elapsed()
+        last = meter.read_all()
+        if last is not None and last.is_valid:
+            samples.append((simulator.elapsed(), last))
+        meter.disconnect()
+    finally:
+        simulator.stop()
+
+    true_kwh = curve.energy_at(end) - curve.energy_at(samples[0][0])
+    counter_kwh = samples[-1][1].energy_kwh - samples[0][1].energy_kwh
+    integrated_kwh = sum(
+        (t1 - t0) * (r0.power_kw + r1.power_kw) / 2 / 3600
+        for (t0, r0), (t1, r1) in zip(samples, samples[1:])
+    )
+    return {
+        "samples": len(samples),
+        "failed": failed,
+        "true_kwh": true_kwh,
+        "counter_kwh": counter_kwh,
+        "integrated_kwh": integrated_kwh,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--speed", type=float, default=60.0)
+    parser.add_argument("--poll", type=float, default=0.5)
+    args = parser.parse_args()
+
+    simulator = MeterSimulator(
+        PowerCurve.constant(7200.0), start_energy_kwh=1000.0, latency=args.latency
+    )
+    try:
+        results = [
+            _summary(name, _measure(func, args.iterations))
+            for name, func in _snapshot_cases(simulator)
+        ]
+    finally:
+        simulator.stop()
+
+    print(
+        f"Meter snapshot - {args.iterations} tekrar (simülatör gecikmesi "
+        f"{args.latency * 1e3:.1f} ms)"
+    )
+    print(
+        f"{'case':<28}{'mean (ms)':>12}{'p50 (ms)':>12}{'p99 (ms)':>12}"
+        f"{'snapshot/s':>12}"
+    )
+    for r in results:
+        print(
+            f"{r['name']:<28}{r['mean_ms']:>12.2f}{r['p50_ms']:>12.2f}"
+            f"{r['p99_ms']:>12.2f}{r['per_s']:>12.0f}"
+        )
+
+    accuracy = _session_accuracy(args)
+    print()
+    print(
+        f"Session enerji doğruluğu - {args.speed:.0f}x hız, {args.poll} s okuma "
+        f"periyodu, hata oranı {args.error_rate:.0%}"
+    )
+    print(f"örnek: {accuracy['samples']}, başarısız okuma: {accuracy['failed']}")
+    print(f"gerçek enerji: {accuracy['true_kwh']:.4f} kWh")
+    for name in ("counter", "integrated"):
+        value = accuracy[f"{name}_kwh"]
+        error = (value - accuracy["true_kwh"]) / accuracy["true_kwh"]
+        print(f"{name:<12}{value:>10.4f} kWh{error:>+10.3%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Request Middleware Benchmark Script
+Oluşturulma Tarihi: 2025-12-11 14:00:00
+Son Güncelleme: 2025-12-11 14:00:00
+Version: 1.0.0
+Açıklama: /api/status üzerinde eski BaseHTTPMiddleware tabanlı logging
+          middleware'i ile pure ASGI APILoggingMiddleware'i karşılaştırır
+
+Kullanım:
+    python scripts/benchmark_middleware.py [--requests 5000] [--warmup 200]
+
+İstekler ağ katmanı olmadan doğrudan ASGI uygulamasına gönderilir; ölçülen
+süre middleware + routing + handler süresidir. ESP32 bridge mock'lanır ve
+rate limiter devre dışı bırakılır.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from api.main import APILoggingMiddleware, app, config, log_api_request
+from api.rate_limiting import limiter
+from api.routers.dependencies import get_bridge
+
+BENCHMARK_PATH = "/api/status"
+
+
+class LegacyAPILoggingMiddleware(BaseHTTPMiddleware):
+    """Referans: BaseHTTPMiddleware tabanlı önceki implementasyon"""
+
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        client_ip = request.client.host if request.client else None
+        user_id = config.get_user_id()
+        response = await call_next(request)
+        process_time = (time.time() - start_time) * 1000
+        try:
+            # Önceki davranış: istek başına import
+            from api.metrics import (
+                http_request_duration_seconds as duration_metric,
+                http_requests_total as requests_metric,
+            )
+
+            requests_metric.labels(
+                method=request.method,
+                endpoint=request.url.path,
+                status_code=response.status_code,
+            ).inc()
+            duration_metric.labels(
+                method=request.method, endpoint=request.url.path
+            ).observe(process_time / 1000.0)
+        except Exception:
+            pass
+        log_api_request(
+            method=request.method,
+            path=request.url.path,
+            client_ip=client_ip,
+            status_code=response.status_code,
+            response_time_ms=process_time,
+            user_id=user_id,
+        )
+        return response
+
+
+def _mock_bridge() -> Mock:
+    bridge = Mock()
+    bridge.is_connected = True
+    bridge.get_status.return_value = {
+        "CP": 0,
+        "PP": 0,
+        "STATE": 1,
+        "MAX": 16,
+        "timestamp": datetime.now().isoformat(),
+    }
+    return bridge
+
+
+def _use_middleware(middleware_cls) -> None:
+    """Uygulamanın logging middleware'ini değiştir ve stack'i yeniden kur"""
+    app.user_middleware = [
+        (
+            Middleware(middleware_cls)
+            if m.cls in (APILoggingMiddleware, LegacyAPILoggingMiddleware)
+            else m
+        )
+        for m in app.user_middleware
+    ]
+    app.middleware_stack = None
+
+
+async def _request(path: str) -> int:
+    """Tek bir GET isteğini doğrudan ASGI uygulamasına gönder"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 8000),
+        "app": app,
+    }
+    status_code = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+
+async def _run(requests: int, warmup: int) -> list:
+    for _ in range(warmup):
+        await _request(BENCHMARK_PATH)
+
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        status_code = await _request(BENCHMARK_PATH)
+        latencies.append(time.perf_counter() - start)
+        if status_code != 200:
+            raise RuntimeError(f"Beklenmeyen status kodu: {status_code}")
+    return latencies
+
+
+def _summary(name: str, latencies: list) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "name": name,
+        "mean_us": statistics.mean(ordered) * 1e6,
+        "p50_us": ordered[len(ordered) // 2] * 1e6,
+        "p99_us": ordered[int(len(ordered) * 0.99) - 1] * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+
+    app.dependency_overrides[get_bridge] = _mock_bridge
+    limiter.enabled = False
+
+    results = []
+    for name, middleware_cls in (
+        ("before (BaseHTTPMiddleware)", LegacyAPILoggingMiddleware),
+        ("after (pure ASGI)", APILoggingMiddleware),
+    ):
+        _use_middleware(middleware_cls)
+        latencies = asyncio.run(_run(args.requests, args.warmup))
+        results.append(_summary(name, latencies))
+
+    print(f"GET {BENCHMARK_PATH} - {args.requests} istek")
+    print(f"{'middleware':<30}{'mean (µs)':>12}{'p50 (µs)':>12}{'p99 (µs)':>12}")
+    for r in results:
+        print(
+            f"{r['name']:<30}{r['mean_us']:>12.1f}{r['p50_us']:>12.1f}{r['p99_us']:>12.1f}"
+        )
+    before, after = results
+    print(
+        f"mean latency değişimi: {(1 - after['mean_us'] / before['mean_us']) * 100:.1f}%"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Benchmark Script
+Oluşturulma Tarihi: 2025-12-11 19:00:00
+Son Güncelleme: 2025-12-11 19:00:00
+Version: 1.0.0
+Açıklama: Endpoint decorator'ı başına rate limiter overhead'ini ölçer -
+          slowapi (memory://) ile native GCRA RateLimiter karşılaştırması
+
+Kullanım:
+    python scripts/benchmark_rate_limiter.py [--requests 20000] [--api-key]
+
+Decorate edilmiş boş bir endpoint doğrudan çağrılır; ölçülen süre sadece
+limiter kontrolü + client identifier hesaplamasıdır. Limitler istekleri
+reddetmeyecek kadar yüksek tutulur. slowapi sadece bu karşılaştırma için
+gereklidir (pip install slowapi).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI, Request
+
+from api.rate_limiting import RateLimiter, get_client_identifier
+
+BENCHMARK_LIMIT = "100000000/minute"
+
+
+def _slowapi_key(request: Request) -> str:
+    """Referans: önceki get_client_identifier (istek başına SHA-256)"""
+    from slowapi.util import get_remote_address
+
+    api_key = request.headers.get("X-API-Key")
+    if api_key:
+        return f"api_key:{hashlib.sha256(api_key.encode()).hexdigest()[:16]}"
+    return get_remote_address(request)
+
+
+def _make_request(app: FastAPI, api_key: bool) -> Request:
+    headers = [(b"host", b"localhost")]
+    if api_key:
+        headers.append((b"x-api-key", b"benchmark-key"))
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/status",
+            "root_path": "",
+            "query_string": b"",
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("localhost", 8000),
+            "app": app,
+        }
+    )
+
+
+def _slowapi_endpoint(app: FastAPI):
+    from slowapi import Limiter
+
+    limiter = Limiter(key_func=_slowapi_key, storage_uri="memory://")
+    app.state.limiter = limiter
+
+    @limiter.limit(BENCHMARK_LIMIT)
+    async def endpoint(request: Request):
+        return None
+
+    return endpoint
+
+
+def _native_endpoint(app: FastAPI):
+    limiter = RateLimiter(key_func=get_client_identifier)
+    app.state.limiter = limiter
+
+    @limiter.limit(BENCHMARK_LIMIT)
+    async def endpoint(request: Request):
+        return None
+
+    return endpoint
+
+
+async def _run(endpoint, app: FastAPI, api_key: bool, requests: int) -> list:
+    # Her istek için yeni Request (slowapi kontrol sonucunu request.state'te tutar)
+    for _ in range(min(1000, requests)):
+        await endpoint(request=_make_request(app, api_key))
+
+    pending = [_make_request(app, api_key) for _ in range(requests)]
+    latencies = []
+    for request in pending:
+        start = time.perf_counter()
+        await endpoint(request=request)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _summary(name: str, latencies: list) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "name": name,
+        "mean_us": statistics.mean(ordered) * 1e6,
+        "p50_us": ordered[len(ordered) // 2] * 1e6,
+        "p99_us": ordered[int(len(ordered) * 0.99) - 1] * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument(
+        "--api-key", action="store_true", help="X-API-Key header'ı ile ölç"
+    )
+    args = parser.parse_args()
+
+    results = []
+    for name, factory in (
+        ("before (slowapi memory://)", _slowapi_endpoint),
+        ("after (native GCRA)", _native_endpoint),
+    ):
+        app = FastAPI()
+        endpoint = factory(app)
+        latencies = asyncio.run(_run(endpoint, app, args.api_key, args.requests))
+        results.append(_summary(name, latencies))
+
+    key_type = "API key" if args.api_key else "IP"
+    print(f"Rate limiter overhead - {args.requests} istek ({key_type} anahtarı)")
+    print(f"{'limiter':<30}{'mean (µs)':>12}{'p50 (µs)':>12}{'p99 (µs)':>12}")
+    for r in results:
+        print(
+            f"{r['name']:<30}{r['mean_us']:>12.1f}{r['p50_us']:>12.1f}{r['p99_us']:>12.1f}"
+        )
+    before, after = results
+    print(
+        f"mean overhead değişimi: {(1 - after['mean_us'] / before['mean_us']) * 100:.1f}%"
+    )
+
+
+if __name__ == "__main__":
+    main()
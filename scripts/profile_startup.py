@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Startup Profile Script
+Oluşturulma Tarihi: 2025-12-11 22:00:00
+Son Güncelleme: 2025-12-11 22:00:00
+Version: 1.0.0
+Açıklama: API cold start profili - "python -X importtime -c 'import api.main'"
+          çıktısından en pahalı modüller ve mevcut database'in açılış süresi
+
+Kullanım:
+    python scripts/profile_startup.py [--top 20] [--db api/data/sessions.db]
+
+Import süreleri ayrı bir Python sürecinde ölçülür (ısınmış modül cache'i
+sonucu etkilemez). Database süresi şema versiyonu kontrolü dahil Database()
+oluşturma süresidir; şema güncelse tablo/index adımları atlanır.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def _importtime(module: str) -> list:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="api.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument(
+        "--db", default=None, help="Açılış süresi ölçülecek database dosyası"
+    )
+    args = parser.parse_args()
+
+    rows = _importtime(args.module)
+    total = next((c for name, _, c in rows if name.strip() == args.module), 0)
+    project_self = sum(
+        s for name, s, _ in rows if name.strip().split(".")[0] in ("api", "esp32")
+    )
+    print(f"import {args.module}: {total / 1000:.1f} ms")
+    print(f"api.* + esp32.* self: {project_self / 1000:.1f} ms")
+    print(f"\n{'modül':<50}{'self (ms)':>12}{'cum (ms)':>12}")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: -r[2])[: args.top]:
+        print(f"{name:<50}{self_us / 1000:>12.1f}{cumulative_us / 1000:>12.1f}")
+
+    if args.db:
+        from api.database.core import Database
+
+        start = time.perf_counter()
+        database = Database(db_path=args.db)
+        elapsed = time.perf_counter() - start
+        database._close_connection()
+        print(f"\nDatabase({args.db}): {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
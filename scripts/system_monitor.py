@@ -2,8 +2,8 @@
 """
 System Monitor Script
 Oluşturulma Tarihi: 2025-12-10 01:30:00
-Son Güncelleme: 2025-12-10 01:30:00
-Version: 1.0.0
+Son Güncelleme: 2025-12-11 21:00:00
+Version: 1.2.0
 Açıklama: Sistem metriklerini toplar, alerting yapar ve monitoring sağlar
 """
 
@@ -17,6 +17,13 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from api.shared_status import (
+    DEFAULT_SHARED_STATUS_PATH,
+    SharedStatusError,
+    SharedStatusReader,
+)
+
 # Logging yapılandırması
 log_dir = Path(__file__).parent.parent / "logs"
 log_dir.mkdir(exist_ok=True)
@@ -34,8 +41,11 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Yapılandırma
-API_URL = "http://localhost:8000/api/health"
+# Readiness endpoint'i (sadece bellekteki durumu okur, cache'lenmez)
+API_URL = "http://localhost:8000/readyz"
 CHECK_INTERVAL = 30  # saniye
+# Charger durumu HTTP yerine seri port sahibinin /dev/shm kaydından okunur
+SHARED_STATUS_PATH = os.getenv("SHARED_STATUS_PATH", DEFAULT_SHARED_STATUS_PATH)
 ALERT_THRESHOLDS = {
     "api_response_time_ms": 100,  # ms
     "error_rate_percent": 5,  # %
@@ -75,30 +85,50 @@ def get_system_metrics() -> Dict[str, Any]:
 
 
 def check_api_health() -> Optional[Dict[str, Any]]:
-    """API health check endpoint'ini çağır"""
+    """API readiness endpoint'ini çağır (/readyz)"""
     try:
         import urllib.request
         import urllib.error
 
         start_time = time.time()
         req = urllib.request.Request(API_URL)
-        req.add_header('User-Agent', 'System-Monitor/1.0')
-
-        with urllib.request.urlopen(req, timeout=5) as response:
-            response_time_ms = (time.time() - start_time) * 1000
-            if response.status == 200:
-                data = json.loads(response.read().decode())
-                health_data = data.get("data", {})
-                health_data["response_time_ms"] = response_time_ms
-                return health_data
-            else:
-                logger.warning(f"API health check HTTP {response.status}")
+        req.add_header('User-Agent', 'System-Monitor/1.1')
+
+        try:
+            with urllib.request.urlopen(req, timeout=5) as response:
+                body = response.read().decode()
+        except urllib.error.HTTPError as e:
+            # 503 = API çalışıyor ama hazır değil; kontrol detayları body'de
+            if e.code != 503:
+                logger.warning(f"API readiness check HTTP {e.code}")
                 return None
+            body = e.read().decode()
+        response_time_ms = (time.time() - start_time) * 1000
+
+        data = json.loads(body)
+        checks = data.get("checks", {})
+        return {
+            "ready": data.get("status") == "ready",
+            "checks": checks,
+            "esp32_connected": checks.get("esp32", {}).get("reason")
+            not in ("disconnected", "not_initialized"),
+            "response_time_ms": response_time_ms,
+        }
     except urllib.error.URLError as e:
-        logger.error(f"API health check connection error: {e}")
+        logger.error(f"API readiness check connection error: {e}")
         return None
     except Exception as e:
-        logger.error(f"API health check error: {e}")
+        logger.error(f"API readiness check error: {e}")
+        return None
+
+
+def get_charger_state(reader: SharedStatusReader) -> Optional[Dict[str, Any]]:
+    """Son STAT, event detector durumu ve session özetini paylaşılan kayıttan oku"""
+    try:
+        return reader.read()
+    except SharedStatusError as e:
+        logger.debug(f"Paylaşılan durum kaydı okunamadı: {e}")
+        reader.close()
         return None
 
 
@@ -138,8 +168,16 @@ def check_alerts(health_data: Dict[str, Any], system_metrics: Dict[str, Any]) ->
             "message": "ESP32 bağlantısı yok"
         })
 
+    # Readiness (ESP32 STAT tazeliği, DB yazma kuyruğu, event detector)
+    for name, check in health_data.get("checks", {}).items():
+        if not check.get("ok") and (name != "esp32" or esp32_connected):
+            alerts.append({
+                "level": "warning",
+                "message": f"Readiness kontrolü başarısız: {name} ({check.get('reason')})"
+            })
+
     # Thread count
-    thread_count = health_data.get("threads") or system_metrics.get("thread_count")
+    thread_count = system_metrics.get("thread_count")
     if thread_count and thread_count > ALERT_THRESHOLDS["thread_count"]:
         alerts.append({
             "level": "warning",
@@ -149,7 +187,12 @@ def check_alerts(health_data: Dict[str, Any], system_metrics: Dict[str, Any]) ->
     return alerts
 
 
-def log_metrics(health_data: Dict[str, Any], system_metrics: Dict[str, Any], alerts: list):
+def log_metrics(
+    health_data: Dict[str, Any],
+    system_metrics: Dict[str, Any],
+    alerts: list,
+    charger_state: Optional[Dict[str, Any]] = None,
+):
     """Metrikleri logla"""
     timestamp = datetime.now().isoformat()
 
@@ -157,6 +200,7 @@ def log_metrics(health_data: Dict[str, Any], system_metrics: Dict[str, Any], ale
         "timestamp": timestamp,
         "health": health_data,
         "system": system_metrics,
+        "charger": charger_state,
         "alerts": alerts
     }
 
@@ -176,21 +220,31 @@ def main():
     logger.info(f"API URL: {API_URL}")
     logger.info(f"Check Interval: {CHECK_INTERVAL} saniye")
     logger.info(f"Alert Thresholds: {ALERT_THRESHOLDS}")
+    logger.info(f"Shared Status: {SHARED_STATUS_PATH}")
 
+    reader = SharedStatusReader(SHARED_STATUS_PATH)
     while True:
         try:
             # Metrikleri topla
             system_metrics = get_system_metrics()
             health_data = check_api_health()
+            charger_state = get_charger_state(reader)
 
             if health_data:
                 # Alert'leri kontrol et
                 alerts = check_alerts(health_data, system_metrics)
 
                 # Metrikleri logla
-                log_metrics(health_data, system_metrics, alerts)
+                log_metrics(health_data, system_metrics, alerts, charger_state)
             else:
-                logger.error("API health check başarısız")
+                logger.error("API readiness check başarısız")
+                # API cevap vermese de seri port sahibinin son yazdığı durum
+                if charger_state:
+                    logger.info(
+                        f"Charger durumu (shm, {charger_state['updated_at']}): "
+                        f"connected={charger_state['connected']}, "
+                        f"state={charger_state['detector']['current_state']}"
+                    )
 
             # Bekleme
             time.sleep(CHECK_INTERVAL)
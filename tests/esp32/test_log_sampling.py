@@ -0,0 +1,143 @@
+"""
+ESP32 Log Sampling Tests
+Created: 2025-12-11 11:00:00
+Last Modified: 2025-12-11 11:00:00
+Version: 1.0.0
+Description: ESP32 mesaj log sampling, change-only STAT ve rate limit testleri
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.config import Config
+from esp32.bridge import ESP32Bridge
+from esp32.log_sampling import (
+    SUPPRESSED_RATE_LIMITED,
+    SUPPRESSED_SAMPLED,
+    SUPPRESSED_UNCHANGED,
+    ESP32LogSampler,
+    TokenBucket,
+)
+
+
+def _status(state=1, timestamp="2025-12-11T11:00:00"):
+    return {"STATE": state, "CABLE": 0, "timestamp": timestamp}
+
+
+class TestESP32LogSampler:
+    """ESP32LogSampler karar testleri"""
+
+    def test_unchanged_status_suppressed(self):
+        """Aynı STAT tekrar loglanmamalı (timestamp farkı yok sayılır)"""
+        sampler = ESP32LogSampler(rate_per_second=0)
+
+        assert sampler.should_log("status", _status(1, "t1")) == 0
+        assert sampler.should_log("status", _status(1, "t2")) is None
+        assert sampler.should_log("status", _status(1, "t3")) is None
+        # Değişiklikte loglanır ve arada bastırılan sayı döner
+        assert sampler.should_log("status", _status(2, "t4")) == 2
+
+        stats = sampler.get_stats()
+        assert stats["suppressed"]["status"][SUPPRESSED_UNCHANGED] == 2
+        assert stats["logged"]["status"] == 2
+
+    def test_status_heartbeat_logs_unchanged(self):
+        """Heartbeat süresi dolunca değişmeyen STAT de loglanmalı"""
+        sampler = ESP32LogSampler(rate_per_second=0, status_heartbeat=0.0001)
+
+        assert sampler.should_log("status", _status()) == 0
+        with patch("esp32.log_sampling.time.monotonic", return_value=1e9):
+            assert sampler.should_log("status", _status()) == 0
+
+    def test_change_only_disabled(self):
+        """Change-only kapalıysa her STAT loglanmalı"""
+        sampler = ESP32LogSampler(status_change_only=False, rate_per_second=0)
+
+        assert sampler.should_log("status", _status()) == 0
+        assert sampler.should_log("status", _status()) == 0
+
+    def test_sample_rate(self):
+        """Her N mesajdan sadece biri loglanmalı"""
+        sampler = ESP32LogSampler(sample_rates={"status_request": 5}, rate_per_second=0)
+
+        results = [sampler.should_log("status_request") for _ in range(10)]
+        assert results[0] == 0
+        assert results[5] == 4
+        assert sum(r is not None for r in results) == 2
+        stats = sampler.get_stats()
+        assert stats["suppressed"]["status_request"][SUPPRESSED_SAMPLED] == 8
+
+    def test_token_bucket_limits_bursts(self):
+        """Burst aşılınca mesajlar rate limit ile bastırılmalı"""
+        sampler = ESP32LogSampler(rate_per_second=0.001, burst=3)
+
+        results = [sampler.should_log("ack", {"CMD": "AUTH"}) for _ in range(5)]
+        assert sum(r is not None for r in results) == 3
+        stats = sampler.get_stats()
+        assert stats["suppressed"]["ack"][SUPPRESSED_RATE_LIMITED] == 2
+        assert stats["suppressed_total"] == 2
+
+    def test_rate_limited_change_logged_later(self):
+        """Bucket boşken gelen değişiklik, token dolunca loglanmalı"""
+        sampler = ESP32LogSampler(rate_per_second=1.0, burst=1)
+
+        with patch("esp32.log_sampling.time.monotonic", return_value=100.0):
+            assert sampler.should_log("status", _status(1, "t1")) == 0
+            # Değişiklik geldi ama bucket boş
+            assert sampler.should_log("status", _status(2, "t2")) is None
+        with patch("esp32.log_sampling.time.monotonic", return_value=101.5):
+            # Aynı (yeni) state heartbeat'i beklemeden loglanır
+            assert sampler.should_log("status", _status(2, "t3")) == 1
+            assert sampler.should_log("status", _status(2, "t4")) is None
+
+        stats = sampler.get_stats()
+        assert stats["suppressed"]["status"][SUPPRESSED_RATE_LIMITED] == 1
+        assert stats["suppressed"]["status"][SUPPRESSED_UNCHANGED] == 1
+
+    def test_token_bucket_refills(self):
+        """Token bucket zamanla dolmalı"""
+        bucket = TokenBucket(rate=1.0, burst=1)
+        assert bucket.consume(now=100.0) is True
+        assert bucket.consume(now=100.1) is False
+        assert bucket.consume(now=101.2) is True
+
+    def test_reset(self):
+        """reset sayaçları sıfırlamalı"""
+        sampler = ESP32LogSampler(rate_per_second=0)
+        sampler.should_log("status", _status())
+        sampler.should_log("status", _status())
+        sampler.reset()
+
+        assert sampler.get_stats()["suppressed_total"] == 0
+        assert sampler.should_log("status", _status()) == 0
+
+
+class TestSampleRateConfig:
+    """ESP32_LOG_SAMPLE_RATES parse testleri"""
+
+    def test_parse_sample_rates(self):
+        """Geçerli girdiler parse edilmeli, geçersizler atlanmalı"""
+        rates = Config._parse_sample_rates("status_request:20, ack:0,bad,status:x")
+        assert rates == {"status_request": 20, "ack": 1}
+
+
+class TestBridgeSampledLogging:
+    """Bridge entegrasyon testleri"""
+
+    def test_unchanged_status_not_logged(self):
+        """Bridge aynı STAT mesajını tekrar loglamamalı"""
+        bridge = ESP32Bridge()
+        bridge._log_sampler = ESP32LogSampler(rate_per_second=0)
+
+        with patch("esp32.bridge.log_esp32_message") as mock_log:
+            bridge._log_sampled_message("status", "rx", _status())
+            bridge._log_sampled_message("status", "rx", _status())
+            bridge._log_sampled_message("status", "rx", _status(5))
+
+        assert mock_log.call_count == 2
+        assert mock_log.call_args.kwargs["suppressed"] == 1
+        stats = bridge.get_log_sampling_stats()
+        assert stats["suppressed"]["status"][SUPPRESSED_UNCHANGED] == 1
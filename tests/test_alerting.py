@@ -0,0 +1,352 @@
+"""
+Alerting Tests
+Created: 2025-12-11 17:00:00
+Last Modified: 2025-12-11 18:00:00
+Version: 1.1.0
+Description: Alert kuralları, debounce/hysteresis, alert geçmişi, alert akışı,
+             paylaşılan sistem snapshot'ı ve alert scheduler testleri
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api import alerting
+from api.alerting import AlertManager, AlertRule, AlertScheduler, AlertSeverity
+from api.event_detector import EventType
+from api.streaming import MESSAGE_ALERT, MESSAGE_ALERTS, AlertBroadcaster
+from esp32.bridge import ESP32Bridge
+
+
+def _bridge(connected=True, state=1):
+    bridge = Mock()
+    bridge.is_connected = connected
+    bridge.get_status.return_value = {"STATE": state}
+    return bridge
+
+
+def _scheduler(manager, bridge=None, event_detector=None):
+    return AlertScheduler(
+        manager, bridge=bridge, event_detector=event_detector, metrics_interval=None
+    )
+
+
+class TestAlertRules:
+    """Alert kuralı testleri"""
+
+    def test_rules_share_one_snapshot(self):
+        """Tüm kurallar tek bir snapshot'ı paylaşmalı"""
+        manager = AlertManager()
+        snapshot = {
+            "system_memory_percent": 85.0,
+            "system_cpu_percent": 95.0,
+            "disk_percent": 10.0,
+        }
+        for rule in manager.rules:
+            rule.debounce = 0.0
+        with patch.object(
+            alerting, "collect_system_snapshot", return_value=snapshot
+        ) as mock_collect:
+            alerts = manager.evaluate_all(bridge=_bridge())
+
+        mock_collect.assert_called_once()
+        by_name = {a.name: a for a in alerts}
+        assert by_name["high_memory_usage"].severity == AlertSeverity.WARNING
+        assert by_name["high_cpu_usage"].severity == AlertSeverity.CRITICAL
+        assert "high_disk_usage" not in by_name
+
+    def test_legacy_check_function_signature(self):
+        """snapshot almayan eski check function'lar çalışmaya devam etmeli"""
+        check = Mock(return_value=None)
+        rule = AlertRule(
+            "custom",
+            AlertSeverity.INFO,
+            lambda bridge=None, event_detector=None: check(bridge),
+        )
+
+        assert rule.evaluate(bridge="b", snapshot={}) is None
+        check.assert_called_once_with("b")
+
+    def test_fault_rule(self):
+        """FAULT_HARD state'i kritik alert üretmeli"""
+        manager = AlertManager()
+        alerts = manager.evaluate_all(bridge=_bridge(state=8), snapshot={})
+
+        assert any(a.name == "esp32_fault" for a in alerts)
+
+    def test_stale_status_rule(self):
+        """Son STAT 30 saniyeden eskiyse stale alert'i oluşmalı"""
+        manager = AlertManager()
+        manager.rules = [r for r in manager.rules if r.name == "esp32_status_stale"]
+        manager.rules[0].debounce = 0.0
+        bridge = _bridge()
+
+        bridge.get_io_stats.return_value = {"status_age_seconds": 5.0}
+        assert manager.evaluate_all(bridge=bridge, snapshot={}) == []
+
+        bridge.get_io_stats.return_value = {"status_age_seconds": 45.0}
+        alerts = manager.evaluate_all(bridge=bridge, snapshot={})
+        assert [a.name for a in alerts] == ["esp32_status_stale"]
+        assert alerts[0].metadata["age_seconds"] == 45.0
+
+
+class TestDebounceAndHysteresis:
+    """Debounce ve trigger/clear hysteresis testleri"""
+
+    def test_single_sample_spike_does_not_alert(self):
+        """Debounce süresi dolmadan CPU alert'i oluşmamalı"""
+        manager = AlertManager()
+        high = {"system_cpu_percent": 95.0}
+
+        assert not manager.evaluate_all(snapshot=high, now=1000.0)
+        manager.evaluate_all(snapshot={"system_cpu_percent": 20.0}, now=1030.0)
+        assert not manager.evaluate_all(snapshot=high, now=1070.0)
+        assert manager.get_active_alerts() == []
+
+    def test_sustained_condition_alerts_after_debounce(self):
+        """Koşul debounce süresi boyunca sürerse alert oluşmalı"""
+        manager = AlertManager()
+        high = {"system_cpu_percent": 95.0}
+
+        manager.evaluate_all(snapshot=high, now=1000.0)
+        manager.evaluate_all(snapshot=high, now=1030.0)
+        alerts = manager.evaluate_all(snapshot=high, now=1060.0)
+
+        assert [a.name for a in alerts] == ["high_cpu_usage"]
+
+    def test_clear_requires_margin_below_threshold(self):
+        """Alert eşiğin clear_margin kadar altına inmeden kapanmamalı"""
+        manager = AlertManager()
+        manager.rules = [r for r in manager.rules if r.name == "high_memory_usage"]
+        manager.rules[0].debounce = 0.0
+
+        manager.evaluate_all(snapshot={"system_memory_percent": 82.0})
+        manager.evaluate_all(snapshot={"system_memory_percent": 78.0})
+        assert [a.name for a in manager.get_active_alerts()] == ["high_memory_usage"]
+
+        manager.evaluate_all(snapshot={"system_memory_percent": 74.0})
+        assert manager.get_active_alerts() == []
+
+    def test_critical_deescalates_with_margin(self):
+        """Kritik alert, kritik eşik - margin altına inince warning'e düşmeli"""
+        manager = AlertManager()
+        manager.rules = [r for r in manager.rules if r.name == "high_disk_usage"]
+
+        manager.evaluate_all(snapshot={"disk_percent": 96.0})
+        manager.evaluate_all(snapshot={"disk_percent": 94.0})
+        assert manager.get_active_alerts()[0].severity == AlertSeverity.CRITICAL
+
+        manager.evaluate_all(snapshot={"disk_percent": 92.0})
+        assert manager.get_active_alerts()[0].severity == AlertSeverity.WARNING
+
+
+class TestAlertHistory:
+    """Alert geçmişi ve callback testleri"""
+
+    def _manager_with_rule(self, severity_by_call):
+        manager = AlertManager()
+        results = iter(severity_by_call)
+
+        def check(bridge=None, event_detector=None):
+            severity = next(results)
+            if severity is None:
+                return None
+            return alerting.Alert("flappy", severity, "test")
+
+        manager.rules = [AlertRule("flappy", AlertSeverity.WARNING, check)]
+        return manager
+
+    def test_history_is_bounded_and_indexed_by_severity(self):
+        """Geçmiş sabit boyutlu olmalı, severity filtresi index'ten okunmalı"""
+        warning, critical = AlertSeverity.WARNING, AlertSeverity.CRITICAL
+        manager = self._manager_with_rule([warning, None, critical, None] * 600)
+        for _ in range(2400):
+            manager.evaluate_all(snapshot={})
+
+        assert len(manager.alert_history) == manager.max_history_size
+        critical_history = manager.get_alert_history(limit=5, severity=critical)
+        assert len(critical_history) == 5
+        assert all(a.severity == critical for a in critical_history)
+        assert manager.get_alert_history(limit=3)[-1].severity == critical
+
+    def test_callbacks_receive_changes(self):
+        """Callback'ler triggered/updated/resolved değişikliklerini almalı"""
+        manager = self._manager_with_rule(
+            [AlertSeverity.WARNING, AlertSeverity.CRITICAL, None]
+        )
+        callback = Mock()
+        manager.register_callback(callback)
+        for _ in range(3):
+            manager.evaluate_all(snapshot={})
+        manager.unregister_callback(callback)
+
+        changes = [c.args[0] for c in callback.call_args_list]
+        assert changes == [
+            alerting.ALERT_TRIGGERED,
+            alerting.ALERT_UPDATED,
+            alerting.ALERT_RESOLVED,
+        ]
+
+
+class TestAlertFeed:
+    """Alert SSE/WebSocket akışı testleri"""
+
+    def test_broadcaster_streams_snapshot_then_changes(self):
+        """Yeni abone önce aktif alert'leri, sonra değişiklikleri almalı"""
+        manager = AlertManager()
+        manager.active_alerts["existing"] = alerting.Alert(
+            "existing", AlertSeverity.INFO, "already active"
+        )
+        broadcaster = AlertBroadcaster()
+        broadcaster.attach_alert_manager(manager)
+
+        async def scenario():
+            messages = broadcaster.iter_messages()
+            first = await messages.__anext__()
+            broadcaster.publish(MESSAGE_ALERT, {"change": "triggered"})
+            second = await asyncio.wait_for(messages.__anext__(), timeout=1.0)
+            await messages.aclose()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert first.type == MESSAGE_ALERTS
+        assert json.loads(first.payload)["data"][0]["name"] == "existing"
+        assert second.type == MESSAGE_ALERT
+
+    def test_manager_changes_published(self):
+        """Alert manager değişiklikleri broadcaster'a yayınlanmalı"""
+        manager = AlertManager()
+        manager.rules = [r for r in manager.rules if r.name == "esp32_disconnected"]
+        broadcaster = AlertBroadcaster()
+        broadcaster.attach_alert_manager(manager)
+
+        with patch.object(broadcaster, "publish") as mock_publish:
+            manager.evaluate_all(bridge=_bridge(connected=False), snapshot={})
+
+        message_type, data = mock_publish.call_args.args
+        assert message_type == MESSAGE_ALERT
+        assert data["change"] == alerting.ALERT_TRIGGERED
+        assert data["name"] == "esp32_disconnected"
+
+
+class TestAlertScheduler:
+    """Alert scheduler testleri"""
+
+    def test_rules_run_on_their_own_interval(self):
+        """Kurallar sadece kendi aralıkları dolduğunda değerlendirilmeli"""
+        manager = AlertManager()
+        fast = Mock(return_value=None)
+        slow = Mock(return_value=None)
+        manager.rules = [
+            AlertRule("fast", AlertSeverity.INFO, fast, interval=10),
+            AlertRule("slow", AlertSeverity.INFO, slow, interval=60),
+        ]
+        scheduler = _scheduler(manager)
+
+        with patch.object(alerting, "collect_system_snapshot", return_value={}):
+            scheduler.run_pending(now=1000.0)
+            scheduler.run_pending(now=1005.0)
+            scheduler.run_pending(now=1011.0)
+
+        assert fast.call_count == 2
+        assert slow.call_count == 1
+
+    def test_snapshot_collected_once_per_tick(self):
+        """Aynı tick'teki kurallar için snapshot bir kez toplanmalı"""
+        manager = AlertManager()
+        scheduler = _scheduler(manager, bridge=_bridge())
+
+        with patch.object(
+            alerting, "collect_system_snapshot", return_value={}
+        ) as mock_collect:
+            scheduler.run_pending(now=1000.0)
+
+        mock_collect.assert_called_once()
+
+    def test_disconnect_triggers_immediate_evaluation(self):
+        """Bridge bağlantısı koptuğunda kural beklemeden değerlendirilmeli"""
+        bridge = ESP32Bridge()
+        bridge.is_connected = True
+        manager = AlertManager()
+        scheduler = _scheduler(manager, bridge=bridge)
+        scheduler.start()
+        try:
+            deadline = time.monotonic() + 2.0
+            while not scheduler._next_run and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            bridge.is_connected = False  # periyodik aralık (10s) beklenmemeli
+
+            deadline = time.monotonic() + 2.0
+            while time.monotonic() < deadline:
+                if any(
+                    a.name == "esp32_disconnected" for a in manager.get_active_alerts()
+                ):
+                    break
+                time.sleep(0.01)
+        finally:
+            scheduler.stop()
+
+        assert any(a.name == "esp32_disconnected" for a in manager.get_active_alerts())
+        assert scheduler._on_connection_change not in bridge._connection_callbacks
+
+    def test_fault_event_triggers_fault_rule(self):
+        """FAULT_DETECTED event'i fault kuralını tetiklemeli"""
+        manager = AlertManager()
+        scheduler = _scheduler(manager, bridge=_bridge(state=8))
+        with patch.object(alerting, "collect_system_snapshot", return_value={}):
+            scheduler.run_pending(now=1000.0)
+            manager.active_alerts.clear()
+
+            scheduler._on_event(EventType.FAULT_DETECTED, {})
+            alerts = scheduler.run_pending(now=1001.0)
+
+        assert [a.name for a in alerts] == ["esp32_fault"]
+
+    def test_scheduler_updates_metrics_off_loop(self):
+        """Metrics güncellemesi scheduler tick'inde yapılmalı"""
+        manager = AlertManager()
+        manager.rules = []
+        scheduler = AlertScheduler(manager, metrics_interval=30)
+
+        with patch("api.metrics.update_all_metrics") as mock_update:
+            scheduler.run_pending(now=1000.0)
+            scheduler.run_pending(now=1010.0)
+            scheduler.run_pending(now=1031.0)
+
+        assert mock_update.call_count == 2
+
+
+class TestBridgeConnectionCallbacks:
+    """Bridge bağlantı callback testleri"""
+
+    def test_callback_only_on_transition(self):
+        """Callback sadece durum değiştiğinde çağrılmalı"""
+        bridge = ESP32Bridge()
+        callback = Mock()
+        bridge.register_connection_callback(callback)
+
+        bridge.is_connected = False
+        bridge.is_connected = True
+        bridge.is_connected = True
+        bridge.is_connected = False
+
+        assert [c.args[0] for c in callback.call_args_list] == [True, False]
+
+
+class TestAlertFeedEndpoints:
+    """Alert stream endpoint testleri"""
+
+    def test_websocket_receives_active_alerts(self, client):
+        """WebSocket bağlantısı aktif alert listesi ile başlamalı"""
+        with client.websocket_connect("/api/alerts/ws") as websocket:
+            payload = json.loads(websocket.receive_text())
+
+        assert payload["type"] == MESSAGE_ALERTS
+        assert isinstance(payload["data"], list)
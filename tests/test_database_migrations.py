@@ -0,0 +1,135 @@
+"""
+Database Migrations Tests
+Created: 2025-12-11 23:00:00
+Last Modified: 2025-12-11 23:00:00
+Version: 1.0.0
+Description: schema_version tablosu ve sıralı migration runner testleri -
+             yeni database, güncel database, eski şema ve rollback
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.database import migrations
+from api.database.core import Database
+
+
+def _versions(conn):
+    return [
+        row[0]
+        for row in conn.execute(
+            f"SELECT version FROM {migrations.SCHEMA_VERSION_TABLE} ORDER BY version"
+        )
+    ]
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_fresh_database_applies_all_steps(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "sessions.db"))
+
+    applied = migrations.run_migrations(conn)
+
+    expected = [version for version, _, _ in migrations.MIGRATIONS]
+    assert applied == expected
+    assert _versions(conn) == expected
+    assert migrations.get_schema_version(conn) == migrations.LATEST_VERSION
+    indexes = {
+        row[0]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")
+    }
+    assert {name for name, _ in migrations.SESSION_INDEXES} <= indexes
+
+
+def test_current_database_runs_single_query(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "sessions.db"))
+    migrations.run_migrations(conn)
+    statements = []
+    conn.set_trace_callback(statements.append)
+
+    assert migrations.run_migrations(conn) == []
+    assert len(statements) == 1
+
+
+def test_legacy_database_is_upgraded(tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+    conn = sqlite3.connect(db_path)
+    # schema_version öncesi şema: TEXT timestamp, metrik ve user_id kolonu yok
+    conn.execute("""
+        CREATE TABLE sessions (
+            session_id TEXT PRIMARY KEY,
+            start_time TEXT NOT NULL,
+            end_time TEXT,
+            start_state INTEGER NOT NULL,
+            end_state INTEGER,
+            events TEXT NOT NULL DEFAULT '[]',
+            metadata TEXT NOT NULL DEFAULT '{}',
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """)
+    conn.execute(
+        "INSERT INTO sessions VALUES ('s1', '2025-12-01T10:00:00', NULL, 3, NULL,"
+        " '[]', '{}', 'ACTIVE', '2025-12-01T10:00:00', '2025-12-01T10:00:00')"
+    )
+    conn.commit()
+    conn.close()
+
+    database = Database(db_path=db_path)
+    conn = database._get_connection()
+
+    assert _versions(conn)[-1] == migrations.LATEST_VERSION
+    assert {"user_id", "total_energy_kwh", "max_power_kw"} <= _columns(conn, "sessions")
+    assert "user_id" in _columns(conn, "session_events")
+    assert database.get_session_count() == 1
+
+
+def test_failing_step_rolls_back(tmp_path, monkeypatch):
+    conn = sqlite3.connect(str(tmp_path / "sessions.db"))
+
+    def broken(cursor):
+        raise sqlite3.OperationalError("broken step")
+
+    monkeypatch.setattr(
+        migrations,
+        "MIGRATIONS",
+        migrations.MIGRATIONS + ((migrations.LATEST_VERSION + 1, "broken", broken),),
+    )
+    monkeypatch.setattr(migrations, "LATEST_VERSION", migrations.LATEST_VERSION + 1)
+
+    with pytest.raises(sqlite3.OperationalError):
+        migrations.run_migrations(conn)
+
+    assert migrations.get_schema_version(conn) == 0
+    assert _columns(conn, "sessions") == set()
+
+
+def test_only_pending_steps_are_applied(tmp_path, monkeypatch):
+    conn = sqlite3.connect(str(tmp_path / "sessions.db"))
+    migrations.run_migrations(conn)
+    calls = []
+    next_version = migrations.LATEST_VERSION + 1
+
+    def add_column(cursor):
+        calls.append(next_version)
+        cursor.execute("ALTER TABLE sessions ADD COLUMN tariff_id TEXT")
+
+    monkeypatch.setattr(
+        migrations,
+        "MIGRATIONS",
+        migrations.MIGRATIONS + ((next_version, "tariff_id", add_column),),
+    )
+    monkeypatch.setattr(migrations, "LATEST_VERSION", next_version)
+
+    assert migrations.run_migrations(conn) == [next_version]
+    assert migrations.run_migrations(conn) == []
+    assert calls == [next_version]
+    assert "tariff_id" in _columns(conn, "sessions")
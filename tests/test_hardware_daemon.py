@@ -0,0 +1,249 @@
+"""
+Hardware Daemon Tests
+Created: 2025-12-11 20:00:00
+Last Modified: 2025-12-12 12:00:00
+Version: 1.1.0
+Description: Çoklu worker modu - hardware daemon ile RemoteBridge /
+             RemoteEventDetector arasındaki Unix socket akışı ve socket
+             yolu sahiplik kontrolü testleri
+"""
+
+import os
+import socket
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.event_detector import EventType
+from api.hardware import HardwareClient, HardwareDaemonError
+from api.hardware.daemon import HardwareDaemon
+from api.hardware.protocol import (
+    EVENT_STATS,
+    ProtocolError,
+    decode_message,
+    encode_message,
+)
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def _status(state=1):
+    return {"STATE": state, "timestamp": datetime.now().isoformat()}
+
+
+def _bridge():
+    """Gerçek callback listeleri olan sahte ESP32Bridge"""
+    bridge = Mock()
+    bridge.is_connected = True
+    bridge._reconnect_attempts = 0
+    bridge.status_callbacks = []
+    bridge.connection_callbacks = []
+    bridge.register_status_callback.side_effect = bridge.status_callbacks.append
+    bridge.unregister_status_callback.side_effect = bridge.status_callbacks.remove
+    bridge.register_connection_callback.side_effect = bridge.connection_callbacks.append
+    bridge.unregister_connection_callback.side_effect = (
+        bridge.connection_callbacks.remove
+    )
+    bridge.get_status.return_value = _status(state=2)
+    bridge.send_current_set.return_value = True
+    bridge.get_io_stats.return_value = {"rx_bytes": 10, "status_age_seconds": 1.0}
+    bridge.get_log_sampling_stats.return_value = {"suppressed": {}}
+    bridge.drain_ack_latencies.return_value = []
+    return bridge
+
+
+def _event_detector():
+    detector = Mock()
+    detector.is_monitoring = True
+    detector._monitor_thread.is_alive.return_value = True
+    detector.get_current_state.return_value = 2
+    detector.get_previous_state.return_value = 1
+    detector.callbacks = []
+    detector.register_callback.side_effect = detector.callbacks.append
+    detector.unregister_callback.side_effect = detector.callbacks.remove
+    return detector
+
+
+@pytest.fixture
+def linked(tmp_path):
+    """Çalışan daemon + ona bağlı client"""
+    socket_path = str(tmp_path / "hardware.sock")
+    bridge = _bridge()
+    detector = _event_detector()
+    session_manager = Mock()
+    daemon = HardwareDaemon(
+        socket_path=socket_path,
+        bridge=bridge,
+        event_detector=detector,
+        session_manager=session_manager,
+    )
+    daemon.start()
+    client = HardwareClient(socket_path=socket_path, request_timeout=1.0)
+    client.start()
+    assert client.wait_linked(3.0)
+    yield daemon, client, bridge, detector, session_manager
+    client.stop()
+    daemon.stop()
+
+
+def test_protocol_roundtrip():
+    line = encode_message({"id": 1, "method": "send_charge_stop", "params": {}})
+    assert line.endswith(b"\n")
+    assert decode_message(line)["method"] == "send_charge_stop"
+    with pytest.raises(ProtocolError):
+        decode_message(b"[1, 2]\n")
+    with pytest.raises(ProtocolError):
+        decode_message(b"not json\n")
+
+
+def test_snapshot_links_remote_objects(linked):
+    daemon, client, bridge, detector, _ = linked
+    remote_bridge = client.bridge
+    remote_detector = client.event_detector
+
+    assert remote_bridge.is_connected is True
+    assert remote_bridge.get_status()["STATE"] == 2
+    assert remote_detector.is_monitoring is True
+    assert remote_detector._monitor_thread.is_alive() is True
+    assert remote_detector.get_current_state() == 2
+    assert remote_detector.get_previous_state() == 1
+
+
+def test_status_push_reaches_worker_callbacks(linked):
+    daemon, client, bridge, _, _ = linked
+    received = []
+    client.bridge.register_status_callback(received.append)
+
+    for callback in bridge.status_callbacks:
+        callback(_status(state=5))
+
+    assert _wait_for(lambda: received)
+    assert received[0]["STATE"] == 5
+    assert client.bridge.get_status()["STATE"] == 5
+
+
+def test_command_forwarded_to_daemon_bridge(linked):
+    _, client, bridge, _, session_manager = linked
+
+    assert client.bridge.send_current_set(16) is True
+    bridge.send_current_set.assert_called_once_with(amperage=16)
+
+    client.set_pending_user_id("user-1")
+    session_manager.set_pending_user_id.assert_called_once_with("user-1")
+
+
+def test_unknown_method_returns_error(linked):
+    _, client, bridge, _, _ = linked
+
+    with pytest.raises(HardwareDaemonError):
+        client.call("disconnect")
+    bridge.disconnect.assert_not_called()
+    # Hata sonrası bağlantı kullanılmaya devam eder
+    assert client.bridge.send_charge_stop() is not None
+
+
+def test_state_event_reaches_worker_callbacks(linked):
+    _, client, _, detector, _ = linked
+    events = []
+    client.event_detector.register_callback(
+        lambda event_type, data: events.append((event_type, data))
+    )
+
+    detector.get_current_state.return_value = 5
+    detector.get_previous_state.return_value = 2
+    for callback in detector.callbacks:
+        callback(EventType.CHARGE_STARTED, {"to_state": 5})
+
+    assert _wait_for(lambda: events)
+    event_type, data = events[0]
+    assert event_type is EventType.CHARGE_STARTED
+    assert data == {"to_state": 5}
+    assert client.event_detector.get_current_state() == 5
+
+
+def test_stats_pushed_and_read_locally(linked):
+    daemon, client, bridge, _, _ = linked
+    remote_bridge = client.bridge
+    # Snapshot sayaçları taşır ama ACK sürelerini drain etmez
+    assert remote_bridge.get_io_stats()["rx_bytes"] == 10
+    bridge.drain_ack_latencies.assert_not_called()
+
+    bridge.get_io_stats.return_value = {"rx_bytes": 42}
+    bridge.get_log_sampling_stats.return_value = {"suppressed_total": 3}
+    bridge.drain_ack_latencies.return_value = [("AUTH", 0.05)]
+    daemon.publish(EVENT_STATS, daemon.get_stats())
+    assert _wait_for(lambda: remote_bridge.get_io_stats().get("rx_bytes") == 42)
+
+    # Okumalar daemon'a istek göndermez
+    client.call = Mock(side_effect=AssertionError("istek gönderilmemeli"))
+    for callback in bridge.status_callbacks:
+        callback(_status(state=5))
+    assert _wait_for(lambda: remote_bridge.get_status()["STATE"] == 5)
+    assert remote_bridge.get_io_stats()["status_age_seconds"] < 1.0
+    assert remote_bridge.get_log_sampling_stats() == {"suppressed_total": 3}
+    assert remote_bridge.drain_ack_latencies() == [("AUTH", 0.05)]
+    assert remote_bridge.drain_ack_latencies() == []
+
+
+def test_daemon_stop_marks_bridge_disconnected(linked):
+    daemon, client, _, _, _ = linked
+    changes = []
+    client.bridge.register_connection_callback(changes.append)
+
+    daemon.stop()
+
+    assert _wait_for(lambda: not client.bridge.is_connected)
+    assert changes == [False]
+    assert client.event_detector.is_monitoring is False
+    assert client.bridge.send_current_set(16) is False
+
+
+def test_refuses_socket_path_owned_by_another_user(tmp_path):
+    """Başka kullanıcıya ait veya socket olmayan yol silinmemeli"""
+    socket_path = tmp_path / "hardware.sock"
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(socket_path))
+    stale.close()
+    bridge = _bridge()
+    daemon = HardwareDaemon(socket_path=str(socket_path), bridge=bridge)
+
+    with patch("os.getuid", return_value=os.getuid() + 1):
+        with pytest.raises(PermissionError):
+            daemon.start()
+    assert socket_path.exists()
+    assert bridge.status_callbacks == []
+
+    socket_path.unlink()
+    socket_path.write_text("not a socket")
+    with pytest.raises(PermissionError):
+        daemon.start()
+    assert socket_path.read_text() == "not a socket"
+
+
+def test_replaces_own_stale_socket(tmp_path):
+    socket_path = tmp_path / "run" / "hardware.sock"
+    socket_path.parent.mkdir()
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(socket_path))
+    stale.close()
+    daemon = HardwareDaemon(socket_path=str(socket_path), bridge=_bridge())
+
+    daemon.start()
+    try:
+        assert daemon.is_running
+        assert oct(socket_path.stat().st_mode & 0o777) == oct(0o660)
+    finally:
+        daemon.stop()
@@ -0,0 +1,106 @@
+"""
+Logging Queue Pipeline Tests
+Created: 2025-12-11 10:30:00
+Last Modified: 2025-12-11 10:30:00
+Version: 1.0.0
+Description: QueueHandler/QueueListener pipeline ve tek geçişli JSON encoder testleri
+"""
+
+import json
+import logging
+import queue
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.logging_config import (
+    JSONFormatter,
+    LogQueueHandler,
+    _listeners,
+    api_logger,
+    esp32_logger,
+    setup_logger,
+    system_logger,
+)
+
+
+def _make_record(msg="test", args=(), exc_info=None):
+    return logging.LogRecord(
+        name="test",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=1,
+        msg=msg,
+        args=args,
+        exc_info=exc_info,
+    )
+
+
+class TestQueuePipeline:
+    """Logger'lar sadece queue'ya yazmalı"""
+
+    def test_main_loggers_use_queue_handler(self):
+        """Ana logger'larda sadece LogQueueHandler olmalı"""
+        for logger in (api_logger, esp32_logger, system_logger):
+            assert len(logger.handlers) == 1
+            assert isinstance(logger.handlers[0], LogQueueHandler)
+
+    def test_setup_logger_writes_file_via_listener(self, tmp_path):
+        """Kayıtlar listener thread'i üzerinden dosyaya yazılmalı"""
+        log_file = tmp_path / "queue_test.log"
+        logger = setup_logger("queue_pipeline_test", log_file)
+        logger.propagate = False
+        listener = _listeners[-1]
+
+        logger.info("merhaba %s", "dünya")
+        listener.stop()
+        _listeners.remove(listener)
+
+        line = log_file.read_text(encoding="utf-8").strip().splitlines()[-1]
+        data = json.loads(line)
+        assert data["message"] == "merhaba dünya"
+        assert data["logger"] == "queue_pipeline_test"
+
+    def test_prepare_merges_args_and_exception(self):
+        """prepare mesajı birleştirmeli ve traceback'i metne çevirmeli"""
+        handler = LogQueueHandler(queue.Queue())
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = _make_record("value=%d", (5,), sys.exc_info())
+
+        prepared = handler.prepare(record)
+        assert prepared.getMessage() == "value=5"
+        assert prepared.args is None
+        assert prepared.exc_info is None
+        assert "ValueError: boom" in prepared.exc_text
+
+    def test_full_queue_drops_record(self):
+        """Queue doluysa kayıt atılmalı, çağıran bloklanmamalı"""
+        handler = LogQueueHandler(queue.Queue(maxsize=1))
+        handler.emit(_make_record("first"))
+        handler.emit(_make_record("second"))
+        assert handler.dropped_records == 1
+        assert handler.queue.qsize() == 1
+
+
+class TestSinglePassJSONFormatter:
+    """JSONFormatter tek geçişte tolerant serialization yapmalı"""
+
+    def test_non_serializable_values_stringified(self):
+        """Non-serializable değerler string'e çevrilmeli"""
+        record = _make_record()
+        record.extra_fields = {"obj": object(), "nested": {"value": {1, 2}}}
+
+        data = json.loads(JSONFormatter().format(record))
+        assert data["obj"].startswith("<object object")
+        assert isinstance(data["nested"]["value"], str)
+
+    def test_exc_text_used_when_exc_info_cleared(self):
+        """Queue'dan gelen kayıtta exc_text exception alanına yazılmalı"""
+        record = _make_record()
+        record.exc_text = "Traceback: test"
+
+        data = json.loads(JSONFormatter().format(record))
+        assert data["exception"] == "Traceback: test"
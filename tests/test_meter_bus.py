@@ -0,0 +1,193 @@
+"""
+Meter Bus Scheduler Tests
+Created: 2025-12-12 05:00:00
+Last Modified: 2025-12-12 05:00:00
+Version: 1.0.0
+Description: Çoklu slave RS-485 zamanlayıcısı - öncelik/periyot seçimi,
+             yanıt vermeyen slave back-off'u ve kısa timeout'lu bus taraması
+"""
+
+import struct
+import sys
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.meter.bus import (
+    ACTIVE_PRIORITY,
+    BusScheduler,
+    scan_bus,
+    scan_timeout,
+)
+from api.meter.interface import MeterReading
+from api.meter.transport import RtuTransport, crc16_modbus
+
+
+def _reading(energy_kwh=1.0):
+    return MeterReading(
+        timestamp=time.time(),
+        energy_kwh=energy_kwh,
+        power_kw=0.0,
+        voltage_v=230.0,
+        current_a=0.0,
+    )
+
+
+def _meter(slave_id, reading=None):
+    meter = Mock()
+    meter.slave_id = slave_id
+    meter.is_connected.return_value = True
+    meter.read_all.side_effect = lambda: reading or _reading(float(slave_id))
+    return meter
+
+
+class FakeBus:
+    """Sadece belirli slave ID'lere cevap veren sahte RS-485 hattı"""
+
+    def __init__(self, present, exception_ids=()):
+        self.present = set(present)
+        self.exception_ids = set(exception_ids)
+        self.is_open = True
+        self.rts = False
+        self.timeout = 1.0
+        self.timeouts = []
+        self._response = b""
+
+    def reset_input_buffer(self):
+        pass
+
+    def reset_output_buffer(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def write(self, request):
+        slave_id, function_code = request[0], request[1]
+        self.timeouts.append(self.timeout)
+        if slave_id in self.exception_ids:
+            body = bytes([slave_id, function_code | 0x80, 0x02])
+        elif slave_id in self.present:
+            body = bytes([slave_id, function_code, 2, 0x00, 0x2A])
+        else:
+            self._response = b""
+            return
+        self._response = body + struct.pack("<H", crc16_modbus(body))
+
+    def read(self, size):
+        data, self._response = self._response[:size], self._response[size:]
+        return data
+
+
+def test_due_device_with_highest_priority_is_polled_first():
+    scheduler = BusScheduler()
+    idle = scheduler.add_meter(_meter(1), interval=30.0)
+    busy = scheduler.add_meter(_meter(2), interval=1.0, priority=5)
+
+    assert scheduler.poll_next() is busy
+    assert scheduler.poll_next() is idle
+    # İkisi de okundu, sırası gelen yok
+    assert scheduler.poll_next() is None
+    assert scheduler.get_reading(2).energy_kwh == 2.0
+
+
+def test_set_active_switches_rates():
+    scheduler = BusScheduler(active_interval=1.0, idle_interval=30.0)
+    first = scheduler.add_meter(_meter(1))
+    second = scheduler.add_meter(_meter(2))
+
+    scheduler.set_active(1)
+    assert (first.interval, first.priority) == (1.0, ACTIVE_PRIORITY)
+
+    scheduler.set_active(2)
+    assert (first.interval, first.priority) == (30.0, 0)
+    assert (second.interval, second.priority) == (1.0, ACTIVE_PRIORITY)
+    assert scheduler.poll_next() is second
+
+
+def test_non_responding_slave_backs_off_exponentially():
+    scheduler = BusScheduler(max_backoff=20.0)
+    meter = _meter(3)
+    meter.read_all.side_effect = lambda: None
+    device = scheduler.add_meter(meter, interval=2.0)
+
+    delays = []
+    for _ in range(4):
+        before = time.monotonic()
+        scheduler.poll(device)
+        delays.append(device.next_poll - before)
+
+    assert [round(delay) for delay in delays] == [4, 8, 16, 20]
+    assert device.failures == 4
+
+    # Cevap gelince normal periyoda dönülür
+    meter.read_all.side_effect = lambda: _reading()
+    scheduler.poll(device)
+    assert device.failures == 0
+    assert device.next_poll - time.monotonic() == pytest.approx(2.0, abs=0.1)
+
+
+def test_backoff_does_not_overflow_after_many_failures():
+    scheduler = BusScheduler(max_backoff=300.0)
+    meter = _meter(4)
+    meter.read_all.side_effect = lambda: None
+    device = scheduler.add_meter(meter, interval=30.0)
+    device.failures = 5000  # ~85 saat kopuk meter
+
+    before = time.monotonic()
+    assert scheduler.poll(device) is None
+
+    assert device.failures == 5001
+    assert device.next_poll - before == pytest.approx(300.0, abs=0.1)
+
+
+def test_callbacks_receive_slave_and_reading():
+    scheduler = BusScheduler()
+    scheduler.add_meter(_meter(4))
+    received = []
+    scheduler.register_callback(lambda slave_id, reading: received.append(slave_id))
+
+    scheduler.poll_next()
+
+    assert received == [4]
+
+
+def test_thread_polls_active_meter_more_often():
+    scheduler = BusScheduler(active_interval=0.01, idle_interval=10.0)
+    active = _meter(1)
+    idle = _meter(2)
+    scheduler.add_meter(active)
+    scheduler.add_meter(idle)
+    scheduler.set_active(1)
+
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 2.0
+        while active.read_all.call_count < 5 and time.monotonic() < deadline:
+            time.sleep(0.005)
+    finally:
+        scheduler.stop()
+
+    assert active.read_all.call_count >= 5
+    assert idle.read_all.call_count == 1
+    assert not scheduler.is_running
+
+
+def test_scan_finds_responding_slaves_with_short_timeout():
+    transport = RtuTransport("/dev/null", baudrate=9600)
+    transport.connection = FakeBus(present={2, 17}, exception_ids={5})
+
+    with patch("api.meter.transport.time.sleep"):
+        found = scan_bus(transport, range(1, 21))
+
+    # Exception response da slave'in var olduğunu gösterir
+    assert found == [2, 5, 17]
+    short = scan_timeout(transport)
+    assert short < 0.1
+    assert set(transport.connection.timeouts) == {short}
+    # Tarama sonrası port timeout'u geri yüklenir
+    assert transport.connection.timeout == transport.timeout
@@ -0,0 +1,110 @@
+"""
+Meter Codec Tests
+Created: 2025-12-12 02:00:00
+Last Modified: 2025-12-12 02:00:00
+Version: 1.0.0
+Description: Tablo tabanlı Modbus CRC16, cache'lenen request frame'leri,
+             memoryview response parse ve pytest-benchmark ölçümleri
+"""
+
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from meter.read_meter import (
+    ABB_REGISTERS,
+    MODBUS_READ_HOLDING_REGISTERS,
+    ABBMeterReader,
+    crc16_modbus,
+    decode_register_block,
+    plan_register_blocks,
+)
+
+
+def _response(reader, block, words):
+    body = struct.pack(">BBB", reader.slave_id, block.function_code, block.count * 2)
+    body += struct.pack(f">{block.count}H", *words)
+    return body + struct.pack("<H", crc16_modbus(body))
+
+
+@pytest.fixture
+def reader():
+    return ABBMeterReader()
+
+
+@pytest.fixture
+def snapshot_frames(reader):
+    return [
+        (block, _response(reader, block, [i & 0x7FFF for i in range(block.count)]))
+        for block in plan_register_blocks(ABB_REGISTERS)
+    ]
+
+
+def test_crc16_known_vectors():
+    assert crc16_modbus(bytes.fromhex("01030000000A")) == 0xCDC5
+    assert crc16_modbus(b"123456789") == 0x4B37
+    assert crc16_modbus(memoryview(b"123456789")[:9]) == 0x4B37
+    assert crc16_modbus(b"") == 0xFFFF
+
+
+def test_request_frame_is_cached_per_block(reader):
+    first = reader._build_modbus_request(MODBUS_READ_HOLDING_REGISTERS, 0x5B00, 45)
+
+    assert first == bytes.fromhex("01035B00002D") + struct.pack(
+        "<H", crc16_modbus(bytes.fromhex("01035B00002D"))
+    )
+    assert (
+        reader._build_modbus_request(MODBUS_READ_HOLDING_REGISTERS, 0x5B00, 45) is first
+    )
+
+    reader.slave_id = 2
+    second = reader._build_modbus_request(MODBUS_READ_HOLDING_REGISTERS, 0x5B00, 45)
+    assert second[0] == 2
+    assert second[-2:] != first[-2:]
+
+
+def test_parse_payload_is_zero_copy_and_validated(reader, snapshot_frames):
+    block, response = snapshot_frames[1]
+
+    payload = reader._parse_modbus_payload(response)
+    assert isinstance(payload, memoryview)
+    assert payload.obj is response
+    assert reader._parse_modbus_response(response) == list(range(block.count))
+
+    # Kısa frame ve bozuk CRC reddedilir
+    assert reader._parse_modbus_payload(response[:-3]) is None
+    corrupted = response[:-1] + bytes([response[-1] ^ 0xFF])
+    assert reader._parse_modbus_payload(corrupted) is None
+
+
+def test_decode_block_from_payload(reader, snapshot_frames):
+    block, response = snapshot_frames[1]
+    values = decode_register_block(
+        block, reader._parse_modbus_payload(response), ABB_REGISTERS
+    )
+
+    # voltage_l1: register 0 ve 1 -> 0x0000_0001 * 0.1
+    assert values["voltage_l1"] == pytest.approx(0.1)
+    # frequency: 0x5B2C - 0x5B00 = 44
+    assert values["frequency"] == pytest.approx(0.44)
+
+
+def test_benchmark_crc16(benchmark, snapshot_frames):
+    response = snapshot_frames[1][1]
+
+    assert benchmark(crc16_modbus, response) == 0
+
+
+def test_benchmark_snapshot_parse(benchmark, reader, snapshot_frames):
+    def parse():
+        values = {}
+        for block, response in snapshot_frames:
+            payload = reader._parse_modbus_payload(response)
+            values.update(decode_register_block(block, payload, ABB_REGISTERS))
+        return values
+
+    assert set(benchmark(parse)) == set(ABB_REGISTERS)
@@ -0,0 +1,173 @@
+"""
+Meter Register Map Tests
+Created: 2025-12-12 00:00:00
+Last Modified: 2025-12-12 00:00:00
+Version: 1.0.0
+Description: ABB register haritası blok planlayıcısı, 32/64-bit çözümleme ve
+             read_meter_data'nın birleştirilmiş request'leri
+"""
+
+import struct
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from meter.read_meter import (
+    ABB_REGISTERS,
+    MODBUS_READ_HOLDING_REGISTERS,
+    MODBUS_READ_INPUT_REGISTERS,
+    ABBMeterReader,
+    RegisterSpec,
+    decode_register_value,
+    plan_register_blocks,
+)
+
+
+class FakeSerial:
+    """Register bankasından FC03/FC04 response üreten sahte seri port"""
+
+    def __init__(self, reader, bank):
+        self.reader = reader
+        self.bank = bank
+        self.is_open = True
+        self.rts = False
+        self.requests = []
+        self._response = b""
+
+    def reset_input_buffer(self):
+        pass
+
+    def reset_output_buffer(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+    def write(self, request):
+        slave_id, function_code, start, count = struct.unpack(">BBHH", request[:6])
+        self.requests.append((function_code, start, count))
+        words = [self.bank.get(start + i, 0) for i in range(count)]
+        body = struct.pack(">BBB", slave_id, function_code, count * 2)
+        body += struct.pack(f">{count}H", *words)
+        self._response = body + struct.pack("<H", self.reader._calculate_crc16(body))
+
+    def read(self, size):
+        response, self._response = self._response[:size], self._response[size:]
+        return response
+
+
+def _put(bank, spec, raw):
+    for i in range(spec.words):
+        shift = 16 * (spec.words - 1 - i)
+        bank[spec.address + i] = (raw >> shift) & 0xFFFF
+
+
+@pytest.fixture
+def reader():
+    reader = ABBMeterReader()
+    bank = {}
+    _put(bank, ABB_REGISTERS["voltage_l1"], 2301)
+    _put(bank, ABB_REGISTERS["voltage_l2"], 2298)
+    _put(bank, ABB_REGISTERS["voltage_l3"], 2310)
+    _put(bank, ABB_REGISTERS["current_l1"], 1605)
+    _put(bank, ABB_REGISTERS["current_l2"], 1598)
+    _put(bank, ABB_REGISTERS["current_l3"], 1610)
+    _put(bank, ABB_REGISTERS["power_active"], 1104000)
+    _put(bank, ABB_REGISTERS["power_reactive"], (1 << 32) - 25000)
+    _put(bank, ABB_REGISTERS["power_apparent"], 0x7FFFFFFF)
+    _put(bank, ABB_REGISTERS["frequency"], 5001)
+    _put(bank, ABB_REGISTERS["energy_active"], 123456789)
+    _put(bank, ABB_REGISTERS["energy_reactive"], 4200)
+    reader.serial_connection = FakeSerial(reader, bank)
+    reader.is_connected = True
+    return reader
+
+
+def test_abb_snapshot_plan_needs_two_requests():
+    blocks = plan_register_blocks(ABB_REGISTERS)
+
+    assert [(block.start, block.count) for block in blocks] == [
+        (0x5000, 16),
+        (0x5B00, 45),
+    ]
+    assert sorted(name for block in blocks for name in block.fields) == sorted(
+        ABB_REGISTERS
+    )
+
+
+def test_planner_respects_gap_limit_and_function_code():
+    register_map = {
+        "a": RegisterSpec(0x0000, 2, "u32"),
+        "b": RegisterSpec(0x0004, 1, "u16"),
+        "c": RegisterSpec(0x0020, 1, "u16"),
+        "d": RegisterSpec(0x0005, 1, "u16", function_code=MODBUS_READ_INPUT_REGISTERS),
+    }
+
+    blocks = plan_register_blocks(register_map, max_gap=2)
+
+    assert [(b.function_code, b.start, b.count, b.fields) for b in blocks] == [
+        (MODBUS_READ_HOLDING_REGISTERS, 0x0000, 5, ("a", "b")),
+        (MODBUS_READ_HOLDING_REGISTERS, 0x0020, 1, ("c",)),
+        (MODBUS_READ_INPUT_REGISTERS, 0x0005, 1, ("d",)),
+    ]
+
+
+def test_planner_splits_at_register_limit():
+    register_map = {
+        f"r{i}": RegisterSpec(i * 4, 4, "u64") for i in range(40)
+    }  # 160 register
+
+    blocks = plan_register_blocks(register_map, max_count=125)
+
+    assert [(block.start, block.count) for block in blocks] == [(0, 124), (124, 36)]
+
+
+def test_decode_signed_and_not_available_values():
+    s32 = RegisterSpec(0, 2, "s32", 0.01)
+    u64 = RegisterSpec(0, 4, "u64", 0.01)
+
+    assert decode_register_value([0xFFFF, 0x9E58], 0, s32) == pytest.approx(-250.0)
+    assert decode_register_value([0x0000, 0x0000, 0x0001, 0x0000], 0, u64) == (
+        pytest.approx(655.36)
+    )
+    assert decode_register_value([0xFFFF] * 4, 0, u64) is None
+    assert decode_register_value([0x0001], 0, s32) is None
+
+
+def test_read_meter_data_uses_coalesced_requests(reader):
+    with patch("meter.read_meter.time.sleep"):
+        data = reader.read_meter_data()
+
+    assert reader.serial_connection.requests == [
+        (MODBUS_READ_HOLDING_REGISTERS, 0x5000, 16),
+        (MODBUS_READ_HOLDING_REGISTERS, 0x5B00, 45),
+    ]
+    assert data["voltage_l1"] == pytest.approx(230.1)
+    assert data["current_l3"] == pytest.approx(16.10)
+    assert data["power_active_w"] == pytest.approx(11040.0)
+    assert data["power_reactive_var"] == pytest.approx(-250.0)
+    assert data["power_apparent_va"] is None
+    assert data["frequency_hz"] == pytest.approx(50.01)
+    assert data["energy_active_kwh"] == pytest.approx(1234567.89)
+    assert data["energy_reactive_kvarh"] == pytest.approx(42.0)
+
+
+def test_read_register_map_subset(reader):
+    with patch("meter.read_meter.time.sleep"):
+        values = reader.read_register_map(["frequency", "voltage_l1"])
+
+    assert reader.serial_connection.requests == [
+        (MODBUS_READ_HOLDING_REGISTERS, 0x5B00, 2),
+        (MODBUS_READ_HOLDING_REGISTERS, 0x5B2C, 1),
+    ]
+    assert values == {
+        "voltage_l1": pytest.approx(230.1),
+        "frequency": pytest.approx(50.01),
+    }
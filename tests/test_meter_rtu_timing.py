@@ -0,0 +1,135 @@
+"""
+Meter RTU Timing Tests
+Created: 2025-12-12 01:00:00
+Last Modified: 2025-12-12 01:00:00
+Version: 1.0.0
+Description: Baudrate'e göre Modbus RTU zamanlaması ve artımlı response
+             frame okuma testleri
+"""
+
+import struct
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from meter.read_meter import (
+    ABBMeterReader,
+    read_rtu_frame,
+    rtu_char_time,
+    rtu_frame_gap,
+)
+
+
+class ScriptedSerial:
+    """Write sonrası hazır response döndüren, okuma boyutlarını kaydeden port"""
+
+    def __init__(self, response=b""):
+        self.is_open = True
+        self.rts = False
+        self.response = response
+        self.buffer = b""
+        self.read_sizes = []
+
+    def reset_input_buffer(self):
+        pass
+
+    def reset_output_buffer(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def write(self, request):
+        self.buffer = self.response
+
+    def read(self, size):
+        self.read_sizes.append(size)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def _frame(reader, body):
+    return body + struct.pack("<H", reader._calculate_crc16(body))
+
+
+def test_frame_gap_follows_baudrate():
+    assert rtu_char_time(9600) == pytest.approx(11 / 9600)
+    assert rtu_frame_gap(9600) == pytest.approx(0.00401, abs=1e-5)
+    assert rtu_frame_gap(19200) == pytest.approx(0.002005, abs=1e-6)
+    # 19200 üstünde sabit 1.75 ms
+    assert rtu_frame_gap(38400) == pytest.approx(0.00175)
+    assert rtu_frame_gap(115200) == pytest.approx(0.00175)
+
+
+def test_read_frame_stops_at_byte_count():
+    reader = ABBMeterReader()
+    frame = _frame(reader, bytes([1, 0x03, 4, 0x00, 0x01, 0x00, 0x02]))
+    port = ScriptedSerial()
+    port.buffer = frame + b"\x00\x00"
+
+    assert read_rtu_frame(port) == frame
+    assert port.read_sizes == [3, 6]
+
+
+def test_read_frame_exception_pdu():
+    reader = ABBMeterReader()
+    frame = _frame(reader, bytes([1, 0x83, 0x02]))
+    port = ScriptedSerial()
+    port.buffer = frame
+
+    assert read_rtu_frame(port) == frame
+    assert port.read_sizes == [3, 2]
+
+
+def test_read_frame_without_response_returns_partial():
+    port = ScriptedSerial()
+
+    assert read_rtu_frame(port) == b""
+    assert port.read_sizes == [3]
+
+
+@pytest.mark.parametrize("baudrate", [9600, 19200])
+def test_transaction_uses_computed_waits(baudrate):
+    reader = ABBMeterReader(baudrate=baudrate)
+    port = ScriptedSerial(_frame(reader, bytes([1, 0x03, 2, 0x13, 0x89])))
+    reader.serial_connection = port
+    reader.is_connected = True
+
+    with patch("meter.read_meter.time.sleep") as sleep:
+        assert reader.read_holding_registers(0x5B2C, 1) == [5001]
+
+    # Hat uzun süredir boşta: t3.5 dolmuş, sadece RTS için bir karakter süresi
+    waits = [call.args[0] for call in sleep.call_args_list]
+    assert waits == [pytest.approx(rtu_char_time(baudrate))] * 2
+    assert max(waits) < 0.002
+    assert port.rts is False
+
+
+def test_back_to_back_transactions_keep_frame_gap():
+    reader = ABBMeterReader()
+    port = ScriptedSerial(_frame(reader, bytes([1, 0x04, 2, 0x00, 0x07])))
+    reader.serial_connection = port
+    reader.is_connected = True
+
+    with patch("meter.read_meter.time.sleep") as sleep:
+        reader.read_input_registers(0x0000, 1)
+        reader.read_input_registers(0x0000, 1)
+
+    # İkinci request'ten önce de en fazla t3.5, en az bir karakter süresi beklenir
+    before_second = sleep.call_args_list[2].args[0]
+    assert reader.char_time <= before_second <= reader.frame_gap
+
+
+def test_exception_response_returns_none():
+    reader = ABBMeterReader()
+    port = ScriptedSerial(_frame(reader, bytes([1, 0x83, 0x02])))
+    reader.serial_connection = port
+    reader.is_connected = True
+
+    with patch("meter.read_meter.time.sleep"):
+        assert reader.read_holding_registers(0x9999, 1) is None
+    assert port.read_sizes == [3, 2]
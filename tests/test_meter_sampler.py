@@ -0,0 +1,177 @@
+"""
+Meter Sampler Tests
+Created: 2025-12-12 03:00:00
+Last Modified: 2025-12-12 07:00:00
+Version: 1.1.0
+Description: Arka plan meter örnekleme servisi - cache, ring buffer, periyodik
+             thread ve session'ların meter'ı bus'a gitmeden cache'ten okuması
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.database import Database
+from api.event_detector import ESP32State, EventType
+from api.meter.interface import MeterReading
+from api.meter.sampler import MeterSampler
+from api.session import SessionManager
+
+
+def _reading(energy_kwh=10.0, valid=True, timestamp=None):
+    return MeterReading(
+        timestamp=timestamp or time.time(),
+        energy_kwh=energy_kwh,
+        power_kw=7.2,
+        voltage_v=230.0,
+        current_a=31.3,
+        frequency_hz=50.0,
+        is_valid=valid,
+    )
+
+
+def _meter(*readings):
+    meter = Mock()
+    meter.is_connected.return_value = True
+    meter.read_all.side_effect = list(readings)
+    return meter
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_sample_updates_latest_and_history():
+    sampler = MeterSampler(_meter(_reading(1.0), _reading(2.0)), history_size=10)
+    assert sampler.get_latest() is None
+
+    sampler.sample()
+    sampler.sample()
+
+    assert sampler.get_latest().energy_kwh == 2.0
+    assert [r.energy_kwh for r in sampler.get_history()] == [1.0, 2.0]
+    assert sampler.is_connected() is True
+
+
+def test_invalid_reading_keeps_previous_value():
+    sampler = MeterSampler(_meter(_reading(1.0), _reading(9.0, valid=False), None))
+
+    sampler.sample()
+    sampler.sample()
+    sampler.sample()
+
+    assert sampler.get_latest().energy_kwh == 1.0
+    assert len(sampler.get_history()) == 1
+
+
+def test_ring_buffer_keeps_last_samples():
+    sampler = MeterSampler(
+        _meter(*(_reading(float(i)) for i in range(5))), history_size=3
+    )
+    for _ in range(5):
+        sampler.sample()
+
+    assert [r.energy_kwh for r in sampler.get_history()] == [2.0, 3.0, 4.0]
+
+
+def test_stale_reading_is_rejected_by_max_age():
+    sampler = MeterSampler(_meter(_reading()))
+    sampler.sample()
+
+    assert sampler.get_latest(max_age=5.0) is not None
+    with patch("api.meter.sampler.time.monotonic", return_value=time.monotonic() + 10):
+        assert sampler.get_latest(max_age=5.0) is None
+        assert sampler.get_latest_age() > 5.0
+
+
+def test_callbacks_receive_only_valid_readings():
+    sampler = MeterSampler(_meter(_reading(1.0), _reading(2.0, valid=False)))
+    received = []
+    sampler.register_callback(lambda reading: received.append(reading.energy_kwh))
+
+    sampler.sample()
+    sampler.sample()
+
+    assert received == [1.0]
+
+
+def test_disconnected_meter_is_reconnected_before_read():
+    meter = _meter(_reading())
+    meter.is_connected.side_effect = [False, False]
+    sampler = MeterSampler(meter)
+
+    assert sampler.sample() is None
+    meter.connect.assert_called_once()
+    meter.read_all.assert_not_called()
+    assert sampler.is_connected() is False
+
+
+def test_thread_polls_on_schedule():
+    meter = Mock()
+    meter.is_connected.return_value = True
+    meter.read_all.side_effect = lambda: _reading()
+    sampler = MeterSampler(meter, interval=0.01)
+
+    sampler.start()
+    sampler.start()  # idempotent
+    try:
+        assert _wait_for(lambda: len(sampler.get_history()) >= 5)
+    finally:
+        sampler.stop()
+    assert not sampler.is_running
+
+
+def test_session_energy_comes_from_cache_without_bus_access(tmp_path):
+    ended_at = datetime.now() + timedelta(minutes=30)
+    meter = _meter(_reading(100.0), _reading(112.5, timestamp=ended_at.timestamp()))
+    sampler = MeterSampler(meter)
+    database = Database(str(tmp_path / "sessions.db"))
+    with patch("api.session.manager.get_database", return_value=database):
+        manager = SessionManager(owns_hardware=False)
+    manager.meter_sampler = sampler
+
+    sampler.sample()
+    meter.read_all.reset_mock()
+    manager._start_session({"to_state": ESP32State.CHARGING.value})
+    session = manager.current_session
+    assert session.metadata["start_energy_kwh"] == 100.0
+    assert session.metadata["meter_available"] is True
+
+    sampler.sample()
+    meter.read_all.reset_mock()
+    with patch("api.session.events.datetime") as clock:
+        clock.now.return_value = ended_at
+        manager._end_session(
+            EventType.CHARGE_STOPPED, {"to_state": ESP32State.STOPPED.value}
+        )
+
+    meter.read_all.assert_not_called()
+    assert session.metadata["end_energy_kwh"] == 112.5
+    assert session.metadata["total_energy_kwh"] == 12.5
+    assert session.metadata["energy_source"] == "meter"
+
+
+def test_session_without_fresh_reading_falls_back_to_calculated(tmp_path):
+    sampler = MeterSampler(_meter(_reading(100.0)))
+    database = Database(str(tmp_path / "sessions.db"))
+    with patch("api.session.manager.get_database", return_value=database):
+        manager = SessionManager(owns_hardware=False)
+    manager.meter_sampler = sampler
+
+    manager._start_session({"to_state": ESP32State.CHARGING.value})
+    session = manager.current_session
+    manager._end_session(
+        EventType.CHARGE_STOPPED, {"to_state": ESP32State.STOPPED.value}
+    )
+
+    assert session.metadata["meter_available"] is False
+    assert session.metadata["energy_source"] == "calculated"
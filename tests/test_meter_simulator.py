@@ -0,0 +1,140 @@
+"""
+Meter Simulator Tests
+Created: 2025-12-12 06:00:00
+Last Modified: 2025-12-12 06:00:00
+Version: 1.0.0
+Description: Modbus meter simülatörü - güç eğrisi integrali, TCP ve pty RTU
+             üzerinden ModbusMeter / ABBMeterReader okuması, gecikme ve hata
+             enjeksiyonu
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.meter.modbus import ModbusMeter
+from api.meter.registers import ABB_REGISTERS, encode_register_value
+from api.meter.simulator import MeterSimulator, PowerCurve
+from api.meter.transport import TransportPool
+
+
+@pytest.fixture
+def simulator():
+    sim = MeterSimulator(PowerCurve.constant(6900.0), start_energy_kwh=100.0)
+    try:
+        yield sim
+    finally:
+        sim.stop()
+
+
+def test_curve_energy_is_exact_integral():
+    curve = PowerCurve.charging_session(peak_w=7200.0, ramp=30.0, hold=600.0)
+
+    assert curve.duration == 660.0
+    assert curve.power_at(15.0) == pytest.approx(3600.0)
+    assert curve.power_at(100.0) == pytest.approx(7200.0)
+    # Rampalar yarım güçte 30 s, arada 600 s tam güç
+    assert curve.energy_at(30.0) == pytest.approx(7200.0 * 15 / 3_600_000)
+    assert curve.energy_at(660.0) == pytest.approx(7200.0 * 630 / 3_600_000)
+    # Eğri bittikten sonra son güç (0 W) korunur
+    assert curve.energy_at(1000.0) == pytest.approx(curve.energy_at(660.0))
+
+
+def test_encode_register_value_and_not_available():
+    spec = ABB_REGISTERS["energy_active"]
+
+    assert encode_register_value(spec, 12345.67) == (0, 0, 0x0012, 0xD687)
+    assert encode_register_value(spec, None) == (0xFFFF,) * 4
+
+
+def test_tcp_meter_reads_simulated_values(simulator):
+    meter = ModbusMeter(simulator.start_tcp(), pool=TransportPool())
+    assert meter.connect() is True
+
+    reading = meter.read_all()
+
+    assert reading.is_valid
+    assert reading.energy_kwh == pytest.approx(100.0, abs=0.01)
+    assert reading.power_kw == pytest.approx(6.9)
+    assert reading.voltage_v == pytest.approx(230.0)
+    assert reading.current_a == pytest.approx(10.0)
+    assert reading.frequency_hz == pytest.approx(50.0)
+    assert simulator.requests == 2
+    meter.disconnect()
+
+
+def test_injected_exception_keeps_connection(simulator):
+    simulator.error_rate = 1.0
+    meter = ModbusMeter(simulator.start_tcp(), pool=TransportPool())
+    meter.connect()
+
+    assert meter.read_energy() is None
+    assert meter.is_connected() is True
+    assert simulator.errors == 1
+    meter.disconnect()
+
+
+def test_dropped_request_times_out_and_disconnects(simulator):
+    simulator.drop_rate = 1.0
+    meter = ModbusMeter(simulator.start_tcp(), timeout=0.1, pool=TransportPool())
+    meter.connect()
+
+    assert meter.read_energy() is None
+    assert meter.is_connected() is False
+    assert simulator.dropped == 1
+
+
+def test_latency_is_applied(simulator):
+    simulator.latency = 0.05
+    meter = ModbusMeter(simulator.start_tcp(), pool=TransportPool())
+    meter.connect()
+
+    start = time.perf_counter()
+    assert meter.read_energy() is not None
+    assert time.perf_counter() - start >= 0.05
+    meter.disconnect()
+
+
+def test_rtu_pty_serves_abb_reader(simulator):
+    from meter.read_meter import ABBMeterReader
+
+    reader = ABBMeterReader(
+        device=simulator.start_rtu(), baudrate=115200, timeout=0.5, rts_control=False
+    )
+    assert reader.connect() is True
+
+    data = reader.read_meter_data()
+
+    assert data["energy_active_kwh"] == pytest.approx(100.0, abs=0.01)
+    assert data["power_active_w"] == pytest.approx(6900.0)
+    assert data["current_l1"] == pytest.approx(10.0)
+    reader.disconnect()
+
+
+def test_rtu_pty_serves_modbus_meter(simulator):
+    path = simulator.start_rtu()
+    meter = ModbusMeter(
+        f"rtu://{path}?baudrate=115200&parity=N&rts=0", pool=TransportPool()
+    )
+    assert meter.connect() is True
+
+    assert meter.read_power() == pytest.approx(6.9)
+    meter.disconnect()
+
+
+def test_corrupted_rtu_response_is_rejected(simulator):
+    simulator.corrupt_rate = 1.0
+    path = simulator.start_rtu()
+    meter = ModbusMeter(
+        f"rtu://{path}?baudrate=115200&parity=N&rts=0",
+        timeout=0.2,
+        pool=TransportPool(),
+    )
+    meter.connect()
+
+    assert meter.read_power() is None
+    assert simulator.corrupted == 1
@@ -0,0 +1,285 @@
+"""
+Prometheus Metrics Tests
+Created: 2025-12-11 12:00:00
+Last Modified: 2025-12-12 12:00:00
+Version: 1.1.0
+Description: Metrics güncelleme fonksiyonları ve system probe'dan beslenen sistem gauge testleri
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from prometheus_client import REGISTRY
+
+from api import metrics
+from api.session import SessionStatus
+
+
+def _sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {})
+
+
+def _bridge(**overrides):
+    bridge = Mock()
+    bridge.is_connected = True
+    bridge.get_status.return_value = {
+        "STATE": 5,
+        "MAX": 16,
+        "timestamp": datetime.now().isoformat(),
+    }
+    bridge.get_io_stats.return_value = {
+        "rx_bytes": 0,
+        "rx_frames": 0,
+        "tx_bytes": 0,
+        "status_age_seconds": 2.0,
+    }
+    bridge.drain_ack_latencies.return_value = []
+    bridge.get_log_sampling_stats.return_value = {"suppressed": {}}
+    bridge._command_queue.qsize.return_value = 0
+    for key, value in overrides.items():
+        setattr(bridge, key, value)
+    return bridge
+
+
+class TestESP32Metrics:
+    """ESP32 metrics testleri"""
+
+    def test_status_age_and_state_from_dict(self):
+        """Status dict'inden yaş ve state gauge'ları set edilmeli"""
+        bridge = _bridge()
+        metrics.update_esp32_metrics(bridge)
+
+        assert _sample("esp32_status_age_seconds") == 2.0
+        assert _sample("esp32_state") == 5
+        assert _sample("esp32_max_current_amps") == 16
+
+    def test_status_age_falls_back_to_timestamp(self):
+        """I/O istatistiği yoksa yaş timestamp'ten hesaplanmalı"""
+        bridge = _bridge()
+        bridge.get_io_stats.return_value = {}
+        bridge.get_status.return_value = {
+            "STATE": 1,
+            "timestamp": (datetime.now() - timedelta(seconds=4)).isoformat(),
+        }
+        metrics.update_esp32_metrics(bridge)
+
+        assert 3.5 < _sample("esp32_status_age_seconds") < 10
+
+    def test_ack_latencies_observed(self):
+        """Drain edilen ACK süreleri histogram'a yazılmalı"""
+        before = _sample("esp32_ack_latency_seconds_count", {"command": "AUTH"}) or 0
+        bridge = _bridge()
+        bridge.drain_ack_latencies.return_value = [("AUTH", 0.02), ("AUTH", 0.03)]
+        metrics.update_esp32_metrics(bridge)
+
+        after = _sample("esp32_ack_latency_seconds_count", {"command": "AUTH"})
+        assert after == before + 2
+
+    def test_serial_counters_use_deltas(self):
+        """Seri port sayaçları sadece artış kadar ilerlemeli"""
+        bridge = _bridge()
+        metrics.update_esp32_metrics(bridge)
+        start = _sample("esp32_serial_rx_bytes_total")
+
+        bridge.get_io_stats.return_value = {
+            "rx_bytes": 300,
+            "rx_frames": 3,
+            "tx_bytes": 10,
+            "status_age_seconds": 1.0,
+        }
+        metrics.update_esp32_metrics(bridge)
+        metrics.update_esp32_metrics(bridge)
+
+        assert _sample("esp32_serial_rx_bytes_total") == start + 300
+
+    def test_disconnected_bridge(self):
+        """Bridge yoksa bağlantı ve yaş gauge'ları sıfırlanmalı"""
+        metrics.update_esp32_metrics(None)
+
+        assert _sample("esp32_connected") == 0
+        assert _sample("esp32_status_age_seconds") == -1
+
+
+class TestSystemMetrics:
+    """Sistem gauge'larının probe snapshot'ından set edilmesi testleri"""
+
+    def test_gauges_come_from_probe_snapshot(self):
+        """Gauge'lar system probe snapshot'ından okunmalı, örnekleme yapılmamalı"""
+        probe = Mock()
+        probe.get_snapshot.return_value = {
+            "system_memory_percent": 41.5,
+            "system_cpu_percent": 12.5,
+            "disk_percent": 63.2,
+            "cpu_temperature_celsius": 48.0,
+        }
+        with patch("api.system_probe.get_system_probe", return_value=probe):
+            metrics.update_system_metrics()
+
+        probe.sample.assert_not_called()
+        assert _sample("system_memory_usage_percent") == 41.5
+        assert _sample("system_cpu_usage_percent") == 12.5
+        assert _sample("system_disk_usage_percent") == 63.2
+        assert _sample("system_cpu_temperature_celsius") == 48.0
+
+    def test_missing_values_keep_previous_gauge(self):
+        """İlk örnekteki None CPU değeri gauge'u ezmemeli"""
+        probe = Mock()
+        probe.get_snapshot.return_value = {"system_cpu_percent": 7.0}
+        with patch("api.system_probe.get_system_probe", return_value=probe):
+            metrics.update_system_metrics()
+            probe.get_snapshot.return_value = {"system_cpu_percent": None}
+            metrics.update_system_metrics()
+
+        assert _sample("system_cpu_usage_percent") == 7.0
+
+
+class TestSessionAndStorageMetrics:
+    """Session, database ve cache metrics testleri"""
+
+    def test_active_session_gauges(self):
+        """Aktif session gauge'ları current_session'dan set edilmeli"""
+        session = Mock()
+        session.status = SessionStatus.ACTIVE
+        session.start_time = datetime.now() - timedelta(seconds=30)
+        session.events = [1, 2, 3]
+        manager = Mock()
+        manager.current_session = session
+        manager.db.drain_write_durations.return_value = [0.004]
+        before = _sample("db_write_duration_seconds_count") or 0
+
+        with patch("api.session.get_session_manager", return_value=manager):
+            metrics.update_session_metrics()
+
+        assert _sample("api_active_sessions") == 1
+        assert _sample("api_current_session_events") == 3
+        assert _sample("api_current_session_duration_seconds") >= 30
+        assert _sample("db_write_duration_seconds_count") == before + 1
+
+    def test_no_active_session(self):
+        """Aktif session yoksa gauge'lar sıfır olmalı"""
+        manager = Mock()
+        manager.current_session = None
+        manager.db.drain_write_durations.return_value = []
+
+        with patch("api.session.get_session_manager", return_value=manager):
+            metrics.update_session_metrics()
+
+        assert _sample("api_active_sessions") == 0
+
+    def test_worker_active_session_from_database(self, tmp_path):
+        """Worker modunda aktif session database'den okunmalı"""
+        from api.database import Database
+        from api.session import SessionManager
+
+        db = Database(db_path=str(tmp_path / "metrics.db"))
+        db.create_session(
+            "s-1", datetime.now() - timedelta(seconds=30), 5, [{"e": 1}], {}
+        )
+        with patch("api.session.manager.get_database", return_value=db):
+            manager = SessionManager(owns_hardware=False)
+
+        with patch("api.session.get_session_manager", return_value=manager):
+            metrics.update_session_metrics()
+
+        assert manager.current_session is None
+        assert _sample("api_active_sessions") == 1
+        assert _sample("api_current_session_events") == 1
+        assert _sample("api_current_session_duration_seconds") >= 30
+
+    def test_cache_hit_ratio(self):
+        """Cache hit/miss sayaçları ve oran histogram'ı güncellenmeli"""
+        stats = {"metrics_test": {"hits": 3, "misses": 1}}
+        with patch("api.cache.get_cache_hit_stats", return_value=stats):
+            metrics.update_cache_metrics()
+            metrics.update_cache_metrics()
+
+        labels = {"key_prefix": "metrics_test"}
+        assert _sample("api_cache_requests_total", {**labels, "result": "hit"}) == 3
+        assert _sample("api_cache_hit_ratio_count", labels) == 1
+        assert _sample("api_cache_hit_ratio_sum", labels) == 0.75
+
+    def test_database_write_durations_recorded(self, tmp_path):
+        """Database yazma süreleri kaydedilip drain edilebilmeli"""
+        from api.database import Database
+
+        db = Database(db_path=str(tmp_path / "metrics.db"))
+        db.create_session("s-1", datetime.now(), 1, [], {})
+        db.update_session("s-1", status="COMPLETED")
+
+        durations = db.drain_write_durations()
+        assert len(durations) == 2
+        assert all(d >= 0 for d in durations)
+        assert db.drain_write_durations() == []
+
+
+class TestHTTPMetricLabels:
+    """HTTP metrics label cardinality testleri"""
+
+    def test_route_template_used_as_label(self, client):
+        """Path parametreleri yeni label üretmemeli, route template kullanılmalı"""
+        client.get("/api/sessions/11111111-1111-1111-1111-111111111111")
+        client.get("/api/sessions/22222222-2222-2222-2222-222222222222")
+
+        endpoints = {
+            sample.labels["endpoint"]
+            for family in REGISTRY.collect()
+            if family.name == "http_requests"
+            for sample in family.samples
+        }
+        assert "/api/sessions/{session_id}" in endpoints
+        assert not any("1111" in e or "2222" in e for e in endpoints)
+
+    def test_unknown_paths_collapsed(self, client):
+        """Eşleşmeyen path'ler tek label'da toplanmalı"""
+        before = (
+            _sample(
+                "http_requests_total",
+                {
+                    "method": "GET",
+                    "endpoint": metrics.UNMATCHED_ROUTE,
+                    "status_code": "404",
+                },
+            )
+            or 0
+        )
+        client.get("/no/such/path-1")
+        client.get("/no/such/path-2")
+
+        after = _sample(
+            "http_requests_total",
+            {
+                "method": "GET",
+                "endpoint": metrics.UNMATCHED_ROUTE,
+                "status_code": "404",
+            },
+        )
+        assert after == before + 2
+
+    def test_in_progress_returns_to_zero_and_size_recorded(self, client):
+        """In-flight gauge istek sonunda sıfırlanmalı, response boyutu kaydedilmeli"""
+        client.get("/")
+
+        labels = {"method": "GET", "endpoint": "/"}
+        assert _sample("http_requests_in_progress", labels) == 0
+        assert _sample("http_response_size_bytes_count", labels) >= 1
+
+    def test_resolve_route_template_before_routing(self):
+        """Routing öncesi scope için template eşleştirilmeli ve cache'lenmeli"""
+        from api.main import app
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/sessions/abc/metrics",
+            "root_path": "",
+            "app": app,
+        }
+        assert (
+            metrics.resolve_route_template(scope)
+            == "/api/sessions/{session_id}/metrics"
+        )
+        assert ("GET", "/api/sessions/abc/metrics") in metrics._route_cache
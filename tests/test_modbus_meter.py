@@ -0,0 +1,263 @@
+"""
+Modbus Meter Tests
+Created: 2025-12-12 04:00:00
+Last Modified: 2025-12-12 04:00:00
+Version: 1.0.0
+Description: ModbusMeter - TCP/RTU transport'ları, model profilleri, paylaşılan
+             transport havuzu ve get_meter()'ın yapılandırılmış meter'ı döndürmesi
+"""
+
+import socketserver
+import struct
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.meter.modbus import ModbusMeter
+from api.meter.registers import (
+    ABB_REGISTERS,
+    EASTRON_SDM630_REGISTERS,
+    METER_PROFILES,
+)
+from api.meter.transport import (
+    ModbusError,
+    RtuTransport,
+    TcpTransport,
+    TransportPool,
+    create_transport,
+    crc16_modbus,
+)
+
+
+def _put(bank, spec, raw):
+    for i in range(spec.words):
+        shift = 16 * (spec.words - 1 - i)
+        bank[spec.address + i] = (raw >> shift) & 0xFFFF
+
+
+def _put_float(bank, spec, value):
+    _put(bank, spec, struct.unpack(">I", struct.pack(">f", value))[0])
+
+
+def _abb_bank():
+    bank = {}
+    _put(bank, ABB_REGISTERS["voltage_l1"], 2301)
+    _put(bank, ABB_REGISTERS["voltage_l2"], 2299)
+    _put(bank, ABB_REGISTERS["voltage_l3"], 0)
+    _put(bank, ABB_REGISTERS["current_l1"], 3150)
+    _put(bank, ABB_REGISTERS["current_l2"], 1200)
+    _put(bank, ABB_REGISTERS["current_l3"], 0)
+    _put(bank, ABB_REGISTERS["power_active"], 722000)
+    _put(bank, ABB_REGISTERS["frequency"], 5001)
+    _put(bank, ABB_REGISTERS["energy_active"], 1234567)
+    return bank
+
+
+def _read_response(bank, function_code, start, count):
+    words = [bank.get(start + i, 0) for i in range(count)]
+    return struct.pack(">BB", function_code, count * 2) + struct.pack(
+        f">{count}H", *words
+    )
+
+
+class _ModbusTcpHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            header = self.request.recv(7)
+            if len(header) < 7:
+                return
+            tid, _, length, unit = struct.unpack(">HHHB", header)
+            function_code, start, count = struct.unpack(
+                ">BHH", self.request.recv(length - 1)
+            )
+            server.requests.append((unit, function_code, start, count))
+            if unit != server.unit_id:
+                pdu = bytes([function_code | 0x80, 0x0B])
+            else:
+                pdu = _read_response(server.bank, function_code, start, count)
+            self.request.sendall(struct.pack(">HHHB", tid, 0, len(pdu) + 1, unit) + pdu)
+
+
+@pytest.fixture
+def tcp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _ModbusTcpHandler)
+    server.daemon_threads = True
+    server.bank = _abb_bank()
+    server.unit_id = 1
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _url(server):
+    return "tcp://127.0.0.1:%d" % server.server_address[1]
+
+
+class FakeSerial:
+    """Register bankasından RTU response üreten sahte seri port"""
+
+    def __init__(self, bank):
+        self.bank = bank
+        self.is_open = True
+        self.rts = False
+        self._response = b""
+
+    def reset_input_buffer(self):
+        pass
+
+    def reset_output_buffer(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+    def write(self, request):
+        slave_id, function_code, start, count = struct.unpack(">BBHH", request[:6])
+        body = bytes([slave_id]) + _read_response(
+            self.bank, function_code, start, count
+        )
+        self._response = body + struct.pack("<H", crc16_modbus(body))
+
+    def read(self, size):
+        data, self._response = self._response[:size], self._response[size:]
+        return data
+
+
+def test_create_transport_from_url():
+    rtu = create_transport("rtu:///dev/ttyAMA5?baudrate=19200&parity=n&stopbits=2")
+    tcp = create_transport("tcp://192.168.1.50")
+
+    assert isinstance(rtu, RtuTransport)
+    assert (rtu.port, rtu.baudrate, rtu.parity, rtu.stopbits) == (
+        "/dev/ttyAMA5",
+        19200,
+        "N",
+        2,
+    )
+    assert isinstance(tcp, TcpTransport)
+    assert (tcp.host, tcp.port) == ("192.168.1.50", 502)
+    with pytest.raises(ValueError):
+        create_transport("udp://127.0.0.1")
+
+
+def test_tcp_meter_reads_snapshot_in_planned_blocks(tcp_server):
+    meter = ModbusMeter(_url(tcp_server), pool=TransportPool())
+    assert meter.connect() is True
+
+    reading = meter.read_all()
+
+    assert [request[1:] for request in tcp_server.requests] == [
+        (0x03, 0x5000, 16),
+        (0x03, 0x5B00, 45),
+    ]
+    assert reading.is_valid
+    assert reading.energy_kwh == pytest.approx(12345.67)
+    assert reading.power_kw == pytest.approx(7.22)
+    # L3 bağlı değil: ortalamaya katılmaz; akım en yüklü faz
+    assert reading.voltage_v == pytest.approx(230.0)
+    assert reading.current_a == pytest.approx(31.5)
+    assert reading.frequency_hz == pytest.approx(50.01)
+    meter.disconnect()
+
+
+def test_exception_response_keeps_connection(tcp_server):
+    meter = ModbusMeter(_url(tcp_server), slave_id=7, pool=TransportPool())
+    meter.connect()
+
+    assert meter.read_energy() is None
+    assert meter.is_connected() is True
+    meter.disconnect()
+
+
+def test_unreachable_meter_reports_disconnected(tcp_server):
+    url = _url(tcp_server)
+    tcp_server.shutdown()
+    tcp_server.server_close()
+    meter = ModbusMeter(url, timeout=0.2, pool=TransportPool())
+
+    assert meter.connect() is False
+    assert meter.is_connected() is False
+    assert meter.read_all() is None
+
+
+def test_pool_shares_transport_per_bus(tcp_server):
+    pool = TransportPool()
+    first = ModbusMeter(_url(tcp_server), slave_id=1, pool=pool)
+    second = ModbusMeter(_url(tcp_server), slave_id=2, pool=pool)
+    first.connect()
+    second.connect()
+
+    assert first.transport is second.transport
+    first.disconnect()
+    assert second.transport.is_open
+    transport = second.transport
+    second.disconnect()
+    assert not transport.is_open
+
+
+def test_rtu_transport_with_float_profile():
+    bank = {}
+    _put_float(bank, EASTRON_SDM630_REGISTERS["voltage_l1"], 231.5)
+    _put_float(bank, EASTRON_SDM630_REGISTERS["current_l1"], 15.25)
+    _put_float(bank, EASTRON_SDM630_REGISTERS["power_active"], 3530.0)
+    _put_float(bank, EASTRON_SDM630_REGISTERS["energy_active"], 812.5)
+    _put(bank, EASTRON_SDM630_REGISTERS["frequency"], 0x7FC00000)  # NaN
+
+    transport = RtuTransport("/dev/null")
+    transport.connection = FakeSerial(bank)
+    pool = TransportPool()
+    meter = ModbusMeter("rtu:///dev/null", profile="eastron_sdm630", pool=pool)
+    meter.transport = transport
+    meter._connected = True
+
+    with patch("api.meter.transport.time.sleep"):
+        reading = meter.read_all()
+
+    assert [(b.start, b.count) for b in meter._snapshot_blocks] == [
+        (0x00, 12),
+        (0x34, 22),
+    ]
+    assert reading.energy_kwh == pytest.approx(812.5)
+    assert reading.power_kw == pytest.approx(3.53)
+    assert reading.voltage_v == pytest.approx(231.5)
+    assert reading.current_a == pytest.approx(15.25)
+    assert reading.frequency_hz is None
+
+
+def test_rtu_transport_rejects_corrupted_frame():
+    connection = FakeSerial({})
+    transport = RtuTransport("/dev/null")
+    transport.connection = connection
+    connection.write = lambda request: setattr(
+        connection, "_response", b"\x01\x03\x02\x00\x01\x00\x00"
+    )
+
+    with patch("api.meter.transport.time.sleep"):
+        with pytest.raises(ModbusError):
+            transport.read_registers(1, 0x03, 0x0000, 1)
+
+
+def test_get_meter_uses_configured_modbus_meter():
+    from api.meter import interface
+
+    with patch.object(interface, "_meter_instance", None), patch(
+        "api.config.config.METER_URL", "tcp://127.0.0.1:5020"
+    ), patch("api.config.config.METER_PROFILE", "eastron_sdm630"):
+        meter = interface.get_meter()
+
+    assert isinstance(meter, ModbusMeter)
+    assert meter.profile is METER_PROFILES["eastron_sdm630"]
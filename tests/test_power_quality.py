@@ -0,0 +1,135 @@
+"""
+Power Quality Tests
+Created: 2025-12-12 08:00:00
+Last Modified: 2025-12-12 11:00:00
+Version: 1.0.1
+Description: Üç faz güç kalitesi - faz dengesizliği, dakikalık min/max/ortalama
+             aggregate'leri, sabit boyutlu ring buffer ve ModbusMeter'ın faz
+             başına değerleri
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.meter.interface import MeterReading
+from api.meter.power_quality import PowerQualityMonitor, phase_imbalance
+
+MINUTE = 1_765_533_600.0  # Dakika başı
+
+
+def _reading(offset, voltages, currents, valid=True):
+    return MeterReading(
+        timestamp=MINUTE + offset,
+        energy_kwh=1.0,
+        power_kw=0.0,
+        voltage_v=0.0,
+        current_a=0.0,
+        is_valid=valid,
+        voltages_v=voltages,
+        currents_a=currents,
+    )
+
+
+def test_phase_imbalance_is_max_deviation_over_mean():
+    assert phase_imbalance([230.0, 230.0, 230.0]) == 0.0
+    assert phase_imbalance([220.0, 230.0, 240.0]) == pytest.approx(10 / 230 * 100)
+    assert phase_imbalance([]) is None
+    assert phase_imbalance([0.0, 0.0]) is None
+
+
+def test_minute_aggregates_per_phase():
+    monitor = PowerQualityMonitor()
+    monitor.add_reading(_reading(0, (230.0, 231.0, 229.0), (16.0, 16.0, 16.0)))
+    monitor.add_reading(_reading(30, (226.0, 233.0, 231.0), (16.0, 10.0, 16.0)))
+
+    current = monitor.get_current(now=MINUTE + 30)
+
+    assert current["timestamp"] == MINUTE
+    assert current["samples"] == 2
+    assert current["voltage_v"][0] == {"min": 226.0, "max": 230.0, "mean": 228.0}
+    assert current["current_a"][1] == {"min": 10.0, "max": 16.0, "mean": 13.0}
+    assert current["current_imbalance_pct"]["min"] == 0.0
+    assert current["current_imbalance_pct"]["max"] == pytest.approx(28.571, abs=1e-3)
+    # Dakika tamamlanmadan geçmişte yok
+    assert monitor.get_history(now=MINUTE + 30) == []
+
+
+def test_single_phase_installation_has_no_imbalance():
+    monitor = PowerQualityMonitor()
+    monitor.add_reading(_reading(0, (230.0, 0.0, 0.0), (32.0, 0.0, 0.0)))
+
+    current = monitor.get_current(now=MINUTE)
+
+    assert current["voltage_imbalance_pct"]["max"] == 0.0
+    assert current["current_imbalance_pct"]["max"] == 0.0
+    assert current["voltage_v"][2]["mean"] == 0.0
+
+
+def test_readings_without_phase_values_are_ignored():
+    monitor = PowerQualityMonitor()
+    monitor.add_reading(_reading(0, None, None))
+    monitor.add_reading(_reading(0, (230.0,) * 3, (1.0,) * 3, valid=False))
+
+    assert monitor.get_current(now=MINUTE) is None
+
+
+def test_ring_buffer_keeps_last_minutes():
+    monitor = PowerQualityMonitor(window=3)
+    for minute in range(5):
+        monitor.add_reading(
+            _reading(minute * 60, (230.0 + minute,) * 3, (16.0, 16.0, 16.0))
+        )
+
+    now = MINUTE + 240
+    history = monitor.get_history(now=now)
+
+    # Son dakika hâlâ açık; tamamlanmış 4 dakikanın son 3'ü saklanır
+    assert [row["timestamp"] for row in history] == [
+        MINUTE + 60,
+        MINUTE + 120,
+        MINUTE + 180,
+    ]
+    assert [row["voltage_v"][0]["mean"] for row in history] == [231.0, 232.0, 233.0]
+    assert [row["timestamp"] for row in monitor.get_history(1, now=now)] == [
+        MINUTE + 180
+    ]
+    assert monitor.get_current(now=now)["timestamp"] == MINUTE + 240
+
+    monitor.reset()
+    assert monitor.get_history(now=now) == []
+    assert monitor.get_current(now=now) is None
+
+
+def test_outage_closes_open_minute_and_drops_old_rows():
+    monitor = PowerQualityMonitor()
+    for minute in range(3):
+        monitor.add_reading(_reading(minute * 60, (230.0,) * 3, (16.0,) * 3))
+
+    # Meter 20 dakikadır okuma vermiyor
+    now = MINUTE + 20 * 60
+    assert monitor.get_current(now=now) is None
+    assert monitor.get_history(15, now=now) == []
+    assert [row["timestamp"] for row in monitor.get_history(20, now=now)] == [
+        MINUTE,
+        MINUTE + 60,
+        MINUTE + 120,
+    ]
+
+
+def test_modbus_meter_reports_phase_values():
+    from api.meter.modbus import ModbusMeter
+    from api.meter.simulator import MeterSimulator, PowerCurve
+    from api.meter.transport import TransportPool
+
+    with MeterSimulator(PowerCurve.constant(3450.0), phases=1) as simulator:
+        meter = ModbusMeter(simulator.start_tcp(), pool=TransportPool())
+        meter.connect()
+        reading = meter.read_all()
+        meter.disconnect()
+
+    assert reading.voltages_v == pytest.approx((230.0, 230.0, 230.0))
+    assert reading.currents_a == pytest.approx((15.0, 0.0, 0.0))
@@ -0,0 +1,139 @@
+"""
+Liveness/Readiness Probe Tests
+Created: 2025-12-11 16:00:00
+Last Modified: 2025-12-11 16:00:00
+Version: 1.0.0
+Description: /livez ve /readyz endpoint testleri
+"""
+
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.routers import probes
+
+
+def _ready_components(status_age=1.0, queue_depth=0):
+    bridge = Mock()
+    bridge.is_connected = True
+    bridge.get_io_stats.return_value = {"status_age_seconds": status_age}
+    database = Mock()
+    database.get_write_queue_depth.return_value = queue_depth
+    detector = Mock()
+    detector.is_monitoring = True
+    detector._monitor_thread.is_alive.return_value = True
+    return bridge, database, detector
+
+
+def _patch_components(bridge, database, detector):
+    return (
+        patch.object(probes.bridge_module, "_esp32_bridge_instance", bridge),
+        patch.object(probes.database_module, "database_instance", database),
+        patch.object(probes.event_detector_module, "event_detector_instance", detector),
+    )
+
+
+class TestLivez:
+    """Liveness endpoint testleri"""
+
+    def test_livez_does_not_touch_components(self, client):
+        """/livez bridge veya database'e erişmemeli"""
+        with patch("esp32.bridge.ESP32Bridge") as mock_bridge_cls, patch(
+            "api.database.core.Database"
+        ) as mock_db_cls:
+            response = client.get("/livez")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ok"
+        mock_bridge_cls.assert_not_called()
+        mock_db_cls.assert_not_called()
+
+
+class TestReadyz:
+    """Readiness endpoint testleri"""
+
+    def test_ready(self, client):
+        """Tüm kontroller geçerse 200 dönmeli"""
+        p1, p2, p3 = _patch_components(*_ready_components())
+        with p1, p2, p3:
+            response = client.get("/readyz")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["checks"]["database"]["write_queue_depth"] == 0
+
+    def test_stale_bridge_status(self, client):
+        """Eski STAT mesajı 503 döndürmeli"""
+        components = _ready_components(status_age=probes.READYZ_MAX_STATUS_AGE + 5)
+        p1, p2, p3 = _patch_components(*components)
+        with p1, p2, p3:
+            response = client.get("/readyz")
+
+        assert response.status_code == 503
+        assert response.json()["checks"]["esp32"]["reason"] == "stale_status"
+
+    def test_db_write_backlog(self, client):
+        """Yazma kuyruğu eşiği aşarsa 503 dönmeli"""
+        components = _ready_components(queue_depth=probes.READYZ_MAX_DB_WRITE_QUEUE + 1)
+        p1, p2, p3 = _patch_components(*components)
+        with p1, p2, p3:
+            response = client.get("/readyz")
+
+        assert response.status_code == 503
+        assert response.json()["checks"]["database"]["reason"] == "write_queue_backlog"
+
+    def test_uninitialized_components_not_created(self, client):
+        """Başlatılmamış bileşenler oluşturulmadan not_initialized raporlanmalı"""
+        p1, p2, p3 = _patch_components(None, None, None)
+        with p1, p2, p3:
+            response = client.get("/readyz")
+            assert probes.bridge_module._esp32_bridge_instance is None
+
+        checks = response.json()["checks"]
+        assert response.status_code == 503
+        assert {c["reason"] for c in checks.values()} == {"not_initialized"}
+
+    def test_dead_event_detector_thread(self, client):
+        """Event detector thread'i ölmüşse 503 dönmeli"""
+        bridge, database, detector = _ready_components()
+        detector._monitor_thread.is_alive.return_value = False
+        p1, p2, p3 = _patch_components(bridge, database, detector)
+        with p1, p2, p3:
+            response = client.get("/readyz")
+
+        assert response.status_code == 503
+        assert response.json()["checks"]["event_detector"]["reason"] == (
+            "thread_not_running"
+        )
+
+
+class TestDatabaseWriteQueue:
+    """Database yazma kuyruğu derinliği testleri"""
+
+    def test_write_queue_depth_counts_waiting_writers(self, tmp_path):
+        """Lock'u bekleyen yazma işlemleri kuyruk derinliğine yansımalı"""
+        from api.database import Database
+
+        db = Database(db_path=str(tmp_path / "probes.db"))
+        assert db.get_write_queue_depth() == 0
+
+        writer = threading.Thread(
+            target=db.create_session, args=("s-1", datetime.now(), 1, [], {})
+        )
+        with db._write_lock():
+            assert db.get_write_queue_depth() == 1
+            writer.start()
+            deadline = time.monotonic() + 2.0
+            while db.get_write_queue_depth() < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert db.get_write_queue_depth() == 2
+
+        writer.join(2.0)
+        assert db.get_write_queue_depth() == 0
+        assert db.get_session("s-1") is not None
@@ -1,15 +1,24 @@
 """
 Rate Limiting Tests
 Created: 2025-12-10 13:00:00
-Last Modified: 2025-12-10 13:00:00
-Version: 1.0.0
+Last Modified: 2025-12-11 19:00:00
+Version: 1.1.0
 Description: Rate limiting functionality tests
 """
 
 import pytest
+from fastapi import FastAPI, Request
 from fastapi.testclient import TestClient
 
+from api import rate_limiting
 from api.main import app
+from api.rate_limiting import (
+    MemoryRateLimitStorage,
+    RateLimit,
+    RateLimiter,
+    RateLimitExceeded,
+    get_client_identifier,
+)
 
 
 @pytest.fixture
@@ -117,3 +126,150 @@ def test_rate_limiting_different_endpoints(client, api_key):
     assert 429 in status_responses[-2:] or all(
         code in [200, 503, 504] for code in status_responses
     )
+
+
+def _limited_app(limit="3/minute", route_limits=None):
+    limiter = RateLimiter(key_func=get_client_identifier, route_limits=route_limits)
+    test_app = FastAPI()
+    test_app.add_exception_handler(
+        RateLimitExceeded, rate_limiting.rate_limit_exceeded_handler
+    )
+
+    @test_app.get("/limited")
+    @limiter.limit(limit)
+    async def limited(request: Request):
+        return {"ok": True}
+
+    return TestClient(test_app), limiter
+
+
+class TestRateLimitParsing:
+    """Rate limit string parse testleri"""
+
+    @pytest.mark.parametrize(
+        "value, amount, period",
+        [
+            ("10/minute", 10, 60.0),
+            ("100 per hour", 100, 3600.0),
+            ("5/10 minutes", 5, 600.0),
+            ("2/second", 2, 1.0),
+        ],
+    )
+    def test_parse(self, value, amount, period):
+        """Desteklenen formatlar parse edilmeli"""
+        limit = RateLimit.parse(value)
+        assert limit.amount == amount
+        assert limit.period == period
+
+    def test_invalid_format(self):
+        """Geçersiz format ValueError fırlatmalı"""
+        with pytest.raises(ValueError):
+            RateLimit.parse("ten per minute")
+
+
+class TestMemoryStorage:
+    """GCRA bellek içi storage testleri"""
+
+    def test_burst_then_reject_then_refill(self):
+        """Limit kadar istek geçmeli, sonrası reddedilmeli, zamanla dolmalı"""
+        storage = MemoryRateLimitStorage()
+        limit = RateLimit.parse("3/minute")
+        key = ("scope", "client")
+
+        assert [storage.hit(key, limit, now=100.0) for _ in range(3)] == [0.0] * 3
+        retry_after = storage.hit(key, limit, now=100.0)
+        assert retry_after == pytest.approx(20.0)
+
+        # Bir emission interval (20s) sonra tek istek hakkı açılır
+        assert storage.hit(key, limit, now=120.0) == 0.0
+        assert storage.hit(key, limit, now=120.0) > 0
+
+    def test_keys_are_independent(self):
+        """Farklı client'lar birbirinin limitini tüketmemeli"""
+        storage = MemoryRateLimitStorage()
+        limit = RateLimit.parse("1/minute")
+
+        assert storage.hit(("s", "a"), limit, now=0.0) == 0.0
+        assert storage.hit(("s", "b"), limit, now=0.0) == 0.0
+        assert storage.hit(("s", "a"), limit, now=0.0) > 0
+
+    def test_sweep_removes_expired_keys(self):
+        """Sweep limiti tamamen dolmuş anahtarları silmeli"""
+        storage = MemoryRateLimitStorage(sweep_interval=60.0)
+        limit = RateLimit.parse("10/minute")
+        for i in range(5):
+            storage.hit(("s", str(i)), limit, now=0.0)
+
+        assert storage.sweep(now=10.0) == 5
+        assert len(storage) == 0
+
+    def test_bounded_key_count(self):
+        """Anahtar sayısı max_keys'i aşmamalı"""
+        storage = MemoryRateLimitStorage(max_keys=100, sweep_interval=3600.0)
+        limit = RateLimit.parse("10/minute")
+        for i in range(500):
+            storage.hit(("s", str(i)), limit, now=1.0)
+
+        assert len(storage) == 100
+
+
+class TestRateLimiter:
+    """Endpoint decorator testleri"""
+
+    def test_exceeded_returns_429_with_retry_after(self):
+        """Limit aşılınca 429 ve Retry-After dönmeli"""
+        client, _ = _limited_app("3/minute")
+        codes = [client.get("/limited").status_code for _ in range(4)]
+
+        assert codes == [200, 200, 200, 429]
+        response = client.get("/limited")
+        assert response.headers["Retry-After"] == "20"
+        assert response.json()["error"] == "Rate limit exceeded: 3 per 1 minute"
+
+    def test_route_limit_override(self):
+        """Route template override'ı decorator limitinin yerine geçmeli"""
+        client, _ = _limited_app("3/minute", route_limits={"/limited": "1/minute"})
+        codes = [client.get("/limited").status_code for _ in range(2)]
+
+        assert codes == [200, 429]
+
+    def test_api_key_and_ip_counted_separately(self):
+        """API key'li istekler IP limitinden ayrı sayılmalı"""
+        client, _ = _limited_app("1/minute")
+
+        assert client.get("/limited").status_code == 200
+        assert client.get("/limited", headers={"X-API-Key": "k"}).status_code == 200
+        assert client.get("/limited").status_code == 429
+
+    def test_disabled_and_reset(self):
+        """Devre dışı limiter sınırlamamalı, reset sayaçları sıfırlamalı"""
+        client, limiter = _limited_app("1/minute")
+        client.get("/limited")
+        limiter.enabled = False
+        assert client.get("/limited").status_code == 200
+
+        limiter.enabled = True
+        assert client.get("/limited").status_code == 429
+        limiter.reset()
+        assert client.get("/limited").status_code == 200
+
+    def test_endpoint_without_request_rejected(self):
+        """Request parametresi olmayan endpoint decorate edilememeli"""
+        limiter = RateLimiter(key_func=get_client_identifier)
+
+        with pytest.raises(TypeError):
+
+            @limiter.limit("1/minute")
+            async def no_request():
+                return None
+
+    def test_api_key_hash_cached(self):
+        """Aynı API key için hash tekrar hesaplanmamalı"""
+        rate_limiting._hash_api_key.cache_clear()
+        client, _ = _limited_app("100/minute")
+        for _ in range(3):
+            client.get("/limited", headers={"X-API-Key": "cached-key"})
+
+        info = rate_limiting._hash_api_key.cache_info()
+        assert info.misses == 1
+        assert info.hits == 2
@@ -0,0 +1,177 @@
+"""
+Session Energy Reconciliation Tests
+Created: 2025-12-12 07:00:00
+Last Modified: 2025-12-12 07:00:00
+Version: 1.0.0
+Description: Periyodik meter okumalarının session başına kaydı (meter_readings)
+             ve session enerjisinin en yakın okumalardan / boşluk
+             interpolasyonuyla uzlaştırılması
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.database import Database
+from api.meter.interface import MeterReading
+from api.session import SessionManager
+from api.session.metrics import (
+    extrapolate_energy,
+    interpolate_energy,
+    reconcile_meter_energy,
+    split_meter_segments,
+    valid_meter_readings,
+)
+from api.session.session import ChargingSession
+
+START = datetime(2025, 12, 12, 10, 0, 0)
+
+
+def _row(offset, energy_kwh, power_kw=7.2):
+    return {
+        "timestamp": START.timestamp() + offset,
+        "energy_kwh": energy_kwh,
+        "power_kw": power_kw,
+    }
+
+
+def _reading(energy_kwh, timestamp=None):
+    return MeterReading(
+        timestamp=timestamp or time.time(),
+        energy_kwh=energy_kwh,
+        power_kw=7.2,
+        voltage_v=230.0,
+        current_a=31.3,
+    )
+
+
+@pytest.fixture
+def database(tmp_path):
+    return Database(str(tmp_path / "sessions.db"))
+
+
+def _create_session(database, session_id="s1"):
+    database.create_session(
+        session_id=session_id,
+        start_time=START,
+        start_state=5,
+        events=[],
+        metadata={},
+    )
+
+
+def test_boundaries_use_nearest_readings():
+    readings = [_row(-1, 100.0), _row(600, 101.2), _row(1199, 102.4)]
+
+    energy = reconcile_meter_energy(readings, START, START + timedelta(seconds=1200))
+
+    assert energy == {
+        "start_energy_kwh": 100.0,
+        "end_energy_kwh": 102.4,
+        "total_energy_kwh": 2.4,
+        "energy_source": "meter",
+        "meter_reading_count": 3,
+    }
+
+
+def test_missing_end_reading_is_interpolated_across_gap():
+    # Bitişteki okuma başarısız oldu; sonraki ilk okuma 300 s sonra geldi
+    readings = [_row(0, 100.0), _row(600, 101.2), _row(1200, 102.4)]
+
+    energy = reconcile_meter_energy(readings, START, START + timedelta(seconds=900))
+
+    assert energy["end_energy_kwh"] == pytest.approx(101.8)
+    assert energy["total_energy_kwh"] == pytest.approx(1.8)
+    assert energy["energy_source"] == "meter_interpolated"
+
+
+def test_missing_end_reading_without_later_sample_is_extrapolated():
+    # Bitişte taze okuma yok; son kayıt 40 s önce, sonrasında okuma yok
+    readings = [_row(0, 100.0), _row(600, 101.2, power_kw=7.2)]
+
+    energy = reconcile_meter_energy(readings, START, START + timedelta(seconds=640))
+
+    assert energy["end_energy_kwh"] == pytest.approx(101.28)
+    assert energy["total_energy_kwh"] == pytest.approx(1.28)
+    assert energy["energy_source"] == "meter_extrapolated"
+    # Extrapolasyon max_extrapolation ile sınırlı, güç bilinmiyorsa yapılmaz
+    assert extrapolate_energy(readings[1], START.timestamp() + 6000, 60.0) == (
+        pytest.approx(101.32)
+    )
+    assert extrapolate_energy(
+        _row(600, 101.2, power_kw=None), START.timestamp() + 640, 60.0
+    ) == pytest.approx(101.2)
+
+
+def test_backwards_reading_is_discarded():
+    readings = [_row(0, 100.0), _row(10, 3.2), _row(20, 100.5)]
+
+    assert [r["energy_kwh"] for r in valid_meter_readings(readings)] == [
+        100.0,
+        100.5,
+    ]
+    assert interpolate_energy(
+        valid_meter_readings(readings), START.timestamp() + 15
+    ) == pytest.approx(100.375)
+    assert reconcile_meter_energy(readings[:1], START, START) is None
+
+
+def test_counter_reset_starts_new_segment():
+    # 3 saat 1 kW, sayaç sıfırlandı (meter değişimi / yeniden başlatma), 2 saat 1 kW
+    readings = [_row(hour * 3600, 100.0 + hour, 1.0) for hour in range(4)]
+    readings += [_row(10900 + hour * 3600, float(hour), 1.0) for hour in range(3)]
+
+    with patch("api.session.metrics.system_logger") as logger:
+        energy = reconcile_meter_energy(
+            readings, START, START + timedelta(seconds=10900 + 7200)
+        )
+
+    assert len(split_meter_segments(valid_meter_readings(readings))) == 2
+    assert energy["total_energy_kwh"] == pytest.approx(5.0)
+    assert energy["energy_source"] == "meter_reset"
+    assert energy["meter_reading_count"] == 7
+    logger.warning.assert_called_once()
+
+
+def test_readings_are_stored_compactly_and_deleted_with_session(database):
+    _create_session(database)
+
+    database.add_meter_reading("s1", START.timestamp(), 100.004, 7.2)
+    database.add_meter_reading("s1", START.timestamp() + 60, 100.125, None)
+
+    assert database.get_meter_readings("s1") == [
+        {"timestamp": int(START.timestamp()), "energy_kwh": 100.004, "power_kw": 7.2},
+        {
+            "timestamp": int(START.timestamp()) + 60,
+            "energy_kwh": 100.125,
+            "power_kw": None,
+        },
+    ]
+    conn = database._get_connection()
+    conn.execute("DELETE FROM sessions WHERE session_id = 's1'")
+    conn.commit()
+    assert database.get_meter_readings("s1") == []
+
+
+def test_sampler_readings_are_persisted_periodically(database):
+    with patch("api.session.manager.get_database", return_value=database):
+        manager = SessionManager(owns_hardware=False)
+    _create_session(database)
+    manager.current_session = ChargingSession("s1", START, 5)
+
+    with patch("api.config.config.METER_PERSIST_INTERVAL", 60.0):
+        manager._on_meter_reading(_reading(100.0, START.timestamp()))
+        manager._on_meter_reading(_reading(100.1, START.timestamp() + 1))
+        manager._meter_persisted_at -= 60
+        manager._on_meter_reading(_reading(100.2, START.timestamp() + 61))
+
+    assert [r["energy_kwh"] for r in database.get_meter_readings("s1")] == [
+        100.0,
+        100.2,
+    ]
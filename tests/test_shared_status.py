@@ -0,0 +1,226 @@
+"""
+Shared Status Tests
+Created: 2025-12-11 21:00:00
+Last Modified: 2025-12-11 21:00:00
+Version: 1.0.0
+Description: /dev/shm paylaşılan durum kaydı - yazıcı, seqlock okuyucu ve
+             bridge/event detector/session manager entegrasyonu testleri
+"""
+
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api import shared_status
+from api.shared_status import (
+    SharedStatusError,
+    SharedStatusPublisher,
+    SharedStatusReader,
+)
+
+
+def _status(state=5, **fields):
+    status = {
+        "ID": 1,
+        "CP": 3,
+        "CPV": 1850,
+        "PP": 1,
+        "PPV": 2100,
+        "RL": 1,
+        "LOCK": 1,
+        "MOTOR": 0,
+        "PWM": 16,
+        "MAX": 32,
+        "CABLE": 32,
+        "AUTH": 1,
+        "STATE": state,
+        "PB": 0,
+        "STOP": 0,
+        "timestamp": datetime(2025, 12, 11, 21, 0, 0).isoformat(),
+        "STATE_NAME": "CHARGING",
+    }
+    status.update(fields)
+    return status
+
+
+def _bridge(status=None):
+    bridge = Mock()
+    bridge.is_connected = True
+    bridge.status_callbacks = []
+    bridge.connection_callbacks = []
+    bridge.register_status_callback.side_effect = bridge.status_callbacks.append
+    bridge.unregister_status_callback.side_effect = bridge.status_callbacks.remove
+    bridge.register_connection_callback.side_effect = bridge.connection_callbacks.append
+    bridge.unregister_connection_callback.side_effect = (
+        bridge.connection_callbacks.remove
+    )
+    bridge.get_status.return_value = status
+    return bridge
+
+
+def _event_detector(current=5, previous=4):
+    detector = Mock()
+    detector.is_monitoring = True
+    detector.get_current_state.return_value = current
+    detector.get_previous_state.return_value = previous
+    detector.callbacks = []
+    detector.register_callback.side_effect = detector.callbacks.append
+    detector.unregister_callback.side_effect = detector.callbacks.remove
+    return detector
+
+
+@pytest.fixture
+def publisher(tmp_path):
+    publisher = SharedStatusPublisher(str(tmp_path / "charger-status"))
+    assert publisher.open()
+    yield publisher
+    publisher.close()
+
+
+def test_reader_without_record_raises(tmp_path):
+    reader = SharedStatusReader(str(tmp_path / "missing"))
+    with pytest.raises(SharedStatusError):
+        reader.read()
+
+
+def test_empty_record_after_open(publisher):
+    state = SharedStatusReader(publisher.path).read()
+
+    assert state["seq"] % 2 == 0
+    assert state["connected"] is False
+    assert state["status"] is None
+    assert state["session"] is None
+    assert state["detector"] == {
+        "monitoring": False,
+        "current_state": None,
+        "previous_state": None,
+    }
+
+
+def test_attach_publishes_full_state(publisher):
+    session_manager = Mock()
+    session_manager.get_current_session_summary.return_value = {
+        "session_id": "8f14e45f-ceea-467f-a0f6-3b1c2a4d5e6f",
+        "status": "ACTIVE",
+        "start_time": datetime(2025, 12, 11, 20, 30, 0).isoformat(),
+        "event_count": 3,
+        "user_id": "user-42",
+    }
+    publisher.attach(_bridge(_status()), _event_detector(), session_manager)
+
+    state = SharedStatusReader(publisher.path).read()
+
+    assert state["connected"] is True
+    expected = _status()
+    assert state["status"] == expected
+    assert state["detector"] == {
+        "monitoring": True,
+        "current_state": 5,
+        "previous_state": 4,
+    }
+    assert state["session"] == session_manager.get_current_session_summary()
+
+
+def test_callbacks_update_record(publisher):
+    bridge = _bridge()
+    detector = _event_detector(current=2, previous=1)
+    session_manager = Mock()
+    session_manager.get_current_session_summary.return_value = None
+    publisher.attach(bridge, detector, session_manager)
+    reader = SharedStatusReader(publisher.path)
+    seq = reader.read()["seq"]
+
+    for callback in bridge.status_callbacks:
+        callback({"STATE": 3, "timestamp": datetime.now().isoformat()})
+    for callback in bridge.connection_callbacks:
+        callback(False)
+    detector.get_current_state.return_value = 3
+    for callback in detector.callbacks:
+        callback("CABLE_CONNECTED", {})
+
+    state = reader.read()
+    assert state["seq"] == seq + 6
+    assert state["status"]["STATE"] == 3
+    assert "CP" not in state["status"]
+    assert state["connected"] is False
+    assert state["detector"]["current_state"] == 3
+
+    publisher.detach()
+    assert bridge.status_callbacks == []
+    assert detector.callbacks == []
+
+
+def test_odd_sequence_is_never_returned(publisher, monkeypatch):
+    # Yazıcı sayacı tek bırakıp ölmüş gibi: okuyucu yarım kaydı döndürmemeli
+    publisher._seq += 1
+    shared_status._SEQ.pack_into(
+        publisher._mmap, shared_status._SEQ_OFFSET, publisher._seq
+    )
+    monkeypatch.setattr(shared_status, "READ_RETRIES", 10)
+
+    with pytest.raises(SharedStatusError):
+        SharedStatusReader(publisher.path).read()
+
+
+def test_reopen_continues_sequence(tmp_path):
+    path = str(tmp_path / "charger-status")
+    first = SharedStatusPublisher(path)
+    first.open()
+    first.publish()
+    seq = SharedStatusReader(path).read()["seq"]
+    first.close()
+
+    second = SharedStatusPublisher(path)
+    second.open()
+    try:
+        assert SharedStatusReader(path).read()["seq"] > seq
+    finally:
+        second.close(unlink=True)
+    assert not Path(path).exists()
+
+
+def test_long_strings_are_truncated_on_character_boundary(publisher):
+    session_manager = Mock()
+    session_manager.get_current_session_summary.return_value = {
+        "session_id": "s",
+        "status": "ACTIVE",
+        "start_time": None,
+        "event_count": 0,
+        "user_id": "ş" * 40,
+    }
+    publisher.attach(session_manager=session_manager)
+
+    session = SharedStatusReader(publisher.path).read()["session"]
+    assert session["user_id"] == "ş" * 32
+    assert session["start_time"] is None
+
+
+def test_concurrent_reads_are_consistent(publisher):
+    # Her yazımda tüm STAT alanları aynı değer - yırtık okuma farklı değer görür
+    stop = threading.Event()
+
+    def writer():
+        value = 0
+        while not stop.is_set():
+            value = (value + 1) % 1000
+            publisher._status = {name: value for name in shared_status.STAT_FIELDS}
+            publisher.publish()
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    reader = SharedStatusReader(publisher.path)
+    try:
+        for _ in range(2000):
+            status = reader.read()["status"]
+            if status:
+                values = {status[name] for name in shared_status.STAT_FIELDS}
+                assert len(values) == 1
+    finally:
+        stop.set()
+        thread.join(timeout=2.0)
@@ -0,0 +1,95 @@
+"""
+Startup Profile Tests
+Created: 2025-12-11 22:00:00
+Last Modified: 2025-12-11 23:00:00
+Version: 1.0.1
+Description: Cold start bütçesi - "python -X importtime -c 'import api.main'"
+             çıktısı üzerinden ertelenen modüller ve proje modülü import
+             süresi, şema versiyonu eşleştiğinde atlanan database init işi
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.database import migrations
+from api.database.core import SCHEMA_VERSION, Database
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# api.main import edilirken yüklenmemesi gereken modüller (ilk kullanımda yüklenir)
+DEFERRED_MODULES = (
+    "serial",  # connect() sırasında (worker modunda hiç)
+    "slowapi",  # native rate limiter kullanılıyor
+    "api.meter",  # meter endpoint'i çağrıldığında
+    "api.database_optimization",  # index'ler migration adımında
+    "api.alerting",  # startup event'inde
+    "api.shared_status",  # startup event'inde
+    "api.hardware.daemon",  # ayrı süreç
+    "psutil",
+    "redis",
+)
+
+# api.* ve esp32.* modüllerinin toplam self import süresi bütçesi (ms)
+# Pi üzerinde ölçüm için STARTUP_IMPORT_BUDGET_MS ile değiştirilebilir
+PROJECT_IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "400"))
+
+
+def _importtime(module: str):
+    """-X importtime çıktısını {modül: (self_us, cumulative_us)} olarak döndür"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def test_api_main_import_defers_optional_subsystems():
+    timings = _importtime("api.main")
+
+    assert "api.main" in timings
+    loaded = [name for name in DEFERRED_MODULES if name in timings]
+    assert loaded == []
+
+
+def test_api_main_project_import_budget():
+    timings = _importtime("api.main")
+
+    project_us = sum(
+        self_us
+        for name, (self_us, _) in timings.items()
+        if name.split(".")[0] in ("api", "esp32")
+    )
+    assert project_us / 1000 < PROJECT_IMPORT_BUDGET_MS
+
+
+def test_schema_work_skipped_when_version_matches(tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+    first = Database(db_path=db_path)
+    assert migrations.get_schema_version(first._get_connection()) == SCHEMA_VERSION
+    first._close_connection()
+
+    with (
+        patch.object(migrations, "migrate_timestamp_columns") as migrate,
+        patch.object(migrations, "_create_session_indexes") as indexes,
+    ):
+        second = Database(db_path=db_path)
+
+    migrate.assert_not_called()
+    indexes.assert_not_called()
+    # Şema atlanmış olsa da tablolar kullanılabilir
+    assert second.get_session_count() == 0
@@ -0,0 +1,182 @@
+"""
+Status Stream Tests
+Created: 2025-12-11 09:30:00
+Last Modified: 2025-12-11 09:30:00
+Version: 1.0.0
+Description: StatusBroadcaster fan-out, slow-consumer dropping ve stream endpoint testleri
+"""
+
+import asyncio
+import json
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import Mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.event_detector import EventType
+from api.streaming import (
+    MESSAGE_EVENT,
+    MESSAGE_STATUS,
+    StatusBroadcaster,
+    get_status_broadcaster,
+)
+
+
+class TestStatusBroadcaster:
+    """StatusBroadcaster unit testleri"""
+
+    def test_publish_reaches_all_subscribers(self):
+        """Yayınlanan mesaj tüm abonelere ulaşmalı"""
+        broadcaster = StatusBroadcaster()
+
+        async def scenario():
+            first = broadcaster.subscribe()
+            second = broadcaster.subscribe()
+            broadcaster.publish(MESSAGE_STATUS, {"STATE": 1})
+            msg1 = await asyncio.wait_for(first.get(), timeout=1)
+            msg2 = await asyncio.wait_for(second.get(), timeout=1)
+            return msg1, msg2
+
+        msg1, msg2 = asyncio.run(scenario())
+        # Aynı mesaj objesi paylaşılmalı (tek serialization)
+        assert msg1 is msg2
+        assert json.loads(msg1.payload)["data"] == {"STATE": 1}
+        assert msg1.sse.startswith(f"id: {msg1.seq}\nevent: status\n")
+
+    def test_publish_from_other_thread(self):
+        """Başka thread'den publish edilen mesaj loop'a aktarılmalı"""
+        broadcaster = StatusBroadcaster()
+
+        async def scenario():
+            subscriber = broadcaster.subscribe()
+            thread = threading.Thread(
+                target=broadcaster.publish, args=(MESSAGE_STATUS, {"STATE": 5})
+            )
+            thread.start()
+            thread.join()
+            return await asyncio.wait_for(subscriber.get(), timeout=1)
+
+        message = asyncio.run(scenario())
+        assert json.loads(message.payload)["data"]["STATE"] == 5
+
+    def test_slow_subscriber_dropped(self):
+        """Queue'su dolan abone düşürülmeli, diğerleri etkilenmemeli"""
+        broadcaster = StatusBroadcaster(queue_size=2)
+
+        async def scenario():
+            slow = broadcaster.subscribe()
+            fast = broadcaster.subscribe()
+            received = []
+            for i in range(3):
+                broadcaster.publish(MESSAGE_STATUS, {"i": i})
+                await asyncio.sleep(0)
+                received.append(await fast.get())
+            return slow, received
+
+        slow, received = asyncio.run(scenario())
+        assert slow.dropped is True
+        assert slow.queue.get_nowait() is None  # Kapanış sinyali
+        assert len(received) == 3
+        stats = broadcaster.get_stats()
+        assert stats["dropped_subscribers"] == 1
+        assert stats["subscribers"] == 1
+
+    def test_iter_messages_starts_with_snapshot(self):
+        """Yeni abone önce son bilinen status'u almalı"""
+        broadcaster = StatusBroadcaster()
+        broadcaster.publish(MESSAGE_STATUS, {"STATE": 3})
+
+        async def scenario():
+            iterator = broadcaster.iter_messages()
+            first = await iterator.__anext__()
+            await iterator.aclose()
+            return first
+
+        first = asyncio.run(scenario())
+        assert json.loads(first.payload)["data"] == {"STATE": 3}
+        assert broadcaster.get_stats()["subscribers"] == 0
+
+    def test_iter_messages_keepalive(self):
+        """Keep-alive süresi dolunca None üretilmeli"""
+        broadcaster = StatusBroadcaster()
+
+        async def scenario():
+            iterator = broadcaster.iter_messages(keepalive=0.01)
+            item = await iterator.__anext__()
+            await iterator.aclose()
+            return item
+
+        assert asyncio.run(scenario()) is None
+
+    def test_attach_registers_callbacks(self):
+        """attach bridge ve event detector callback'lerini kaydetmeli"""
+        broadcaster = StatusBroadcaster()
+        bridge = Mock()
+        detector = Mock()
+
+        broadcaster.attach(bridge=bridge, event_detector=detector)
+        broadcaster.attach(bridge=bridge, event_detector=detector)
+
+        bridge.register_status_callback.assert_called_once()
+        detector.register_callback.assert_called_once()
+
+    def test_event_callback_publishes_event(self):
+        """EventDetector callback'i event mesajı yayınlamalı"""
+        broadcaster = StatusBroadcaster()
+        broadcaster.publish_session = Mock()
+
+        async def scenario():
+            subscriber = broadcaster.subscribe()
+            broadcaster._on_event(
+                EventType.CHARGE_STARTED,
+                {"from_state": 3, "to_state": 5, "status": {"STATE": 5}},
+            )
+            return await asyncio.wait_for(subscriber.get(), timeout=1)
+
+        message = asyncio.run(scenario())
+        payload = json.loads(message.payload)
+        assert payload["type"] == MESSAGE_EVENT
+        assert payload["data"]["event_type"] == "CHARGE_STARTED"
+        assert payload["data"]["to_state"] == 5
+        broadcaster.publish_session.assert_called_once()
+
+
+class TestBridgeStatusCallbacks:
+    """ESP32Bridge STAT callback testleri"""
+
+    def test_status_callback_invoked(self):
+        """Parse edilen STAT mesajı callback'lere iletilmeli"""
+        from esp32.bridge import ESP32Bridge
+
+        bridge = ESP32Bridge()
+        received = []
+        bridge.register_status_callback(received.append)
+        bridge._notify_status_callbacks({"STATE": 1})
+        assert received == [{"STATE": 1}]
+
+    def test_failing_callback_does_not_break_others(self):
+        """Hatalı callback diğerlerini engellememeli"""
+        from esp32.bridge import ESP32Bridge
+
+        bridge = ESP32Bridge()
+        received = []
+        bridge.register_status_callback(Mock(side_effect=Exception("boom")))
+        bridge.register_status_callback(received.append)
+        bridge._notify_status_callbacks({"STATE": 2})
+        assert received == [{"STATE": 2}]
+
+
+class TestStatusStreamEndpoints:
+    """Stream endpoint testleri"""
+
+    def test_websocket_receives_snapshot(self, client):
+        """WebSocket bağlantısı son bilinen status ile başlamalı"""
+        get_status_broadcaster().publish(MESSAGE_STATUS, {"STATE": 1, "CABLE": 0})
+
+        with client.websocket_connect("/api/status/ws") as websocket:
+            payload = json.loads(websocket.receive_text())
+
+        assert payload["type"] == MESSAGE_STATUS
+        assert payload["data"]["STATE"] == 1
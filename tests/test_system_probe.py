@@ -0,0 +1,113 @@
+"""
+System Probe Tests
+Created: 2025-12-11 15:00:00
+Last Modified: 2025-12-11 15:00:00
+Version: 1.0.0
+Description: Arka plan system probe servisi ve snapshot tabanlı health endpoint testleri
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api import system_probe
+from api.routers.dependencies import get_bridge
+from api.system_probe import SystemProbe
+
+
+class TestSystemProbe:
+    """SystemProbe okuma ve snapshot testleri"""
+
+    def test_sample_reads_proc_without_subprocess(self):
+        """Örnekleme subprocess çalıştırmadan memory/disk/load değerlerini okumalı"""
+        probe = SystemProbe(interval=60)
+        with patch("subprocess.run") as mock_run:
+            snapshot = probe.sample()
+
+        mock_run.assert_not_called()
+        assert snapshot["memory_mb"] > 0
+        assert 0 <= snapshot["disk_percent"] <= 100
+        assert snapshot["disk_total_gb"] > 0
+        assert "1min" in snapshot["load_average"]
+        assert "network_ip" in snapshot
+
+    def test_cpu_percent_needs_two_samples(self):
+        """CPU yüzdeleri ilk örnekte None, sonrakinde hesaplanmış olmalı"""
+        probe = SystemProbe(interval=60)
+        first = probe.sample()
+        sum(i * i for i in range(200000))  # biraz CPU harca
+        second = probe.sample()
+
+        assert first["system_cpu_percent"] is None
+        assert first["cpu_percent"] is None
+        assert second["cpu_percent"] is not None
+        assert 0 <= second["system_cpu_percent"] <= 100
+
+    def test_snapshot_is_copy_with_age(self):
+        """get_snapshot kopya döndürmeli ve örnek yaşını içermeli"""
+        probe = SystemProbe(interval=60)
+        assert probe.get_snapshot() == {}
+
+        probe.sample()
+        snapshot = probe.get_snapshot()
+        snapshot["memory_mb"] = -1
+
+        assert probe.get_snapshot()["memory_mb"] != -1
+        assert probe.get_snapshot()["system_probe_age_seconds"] >= 0
+        assert "_sampled_at" not in snapshot
+
+    def test_reader_error_does_not_break_sample(self):
+        """Bir okuyucunun hatası diğer değerleri engellememeli"""
+        probe = SystemProbe(interval=60)
+        with patch.object(probe, "_read_disk", side_effect=OSError("yok")):
+            snapshot = probe.sample()
+
+        assert "disk_percent" not in snapshot
+        assert snapshot["memory_mb"] > 0
+
+    def test_temperature_status_thresholds(self):
+        """Sıcaklık durumu eşiklere göre belirlenmeli"""
+        with patch("os.listdir", return_value=["thermal_zone0"]), patch(
+            "builtins.open",
+            new=lambda *a, **k: __import__("io").StringIO("72500\n"),
+        ):
+            values = SystemProbe._read_temperature()
+
+        assert values["cpu_temperature_celsius"] == 72.5
+        assert values["cpu_temperature_status"] == "high"
+
+    def test_start_stop(self):
+        """Probe thread'i başlatılıp durdurulabilmeli"""
+        probe = SystemProbe(interval=60)
+        probe.start()
+        probe.start()  # idempotent
+        assert probe.is_running
+        probe.stop()
+        assert not probe.is_running
+
+
+class TestHealthFromSnapshot:
+    """Health endpoint'inin snapshot kullanımı testleri"""
+
+    def test_health_serves_probe_snapshot(self, client, mock_esp32_bridge):
+        """Health endpoint sistem değerlerini probe snapshot'ından almalı"""
+        from api.main import app
+
+        probe = system_probe.get_system_probe()
+        snapshot = {"disk_percent": 42.0, "network_ssid": "station-wifi"}
+        app.dependency_overrides[get_bridge] = lambda: mock_esp32_bridge
+        try:
+            with patch.object(probe, "get_snapshot", return_value=snapshot), patch(
+                "subprocess.run"
+            ) as mock_run:
+                response = client.get("/api/health")
+        finally:
+            app.dependency_overrides.pop(get_bridge, None)
+
+        mock_run.assert_not_called()
+        data = response.json()["data"]
+        assert data["disk_percent"] == 42.0
+        assert data["network_ssid"] == "station-wifi"
+        assert data["esp32_connected"] is True
@@ -0,0 +1,208 @@
+"""
+Virtual Meter Tests
+Created: 2025-12-12 09:00:00
+Last Modified: 2025-12-12 11:00:00
+Version: 1.1.0
+Description: ESP32 STAT akışından türetilen sanal meter - akım seçimi, enerji
+             integrasyonu, STAT boşluğu sınırı, monoton okumalar,
+             virtual:// URL'i ve yeniden başlatmada sayacın sürmesi
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.database import Database
+from api.meter.virtual import VirtualMeter, create_virtual_meter, status_current
+from api.session.metrics import reconcile_meter_energy
+
+
+class FakeBridge:
+    """register_status_callback sağlayan STAT kaynağı"""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def register_status_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def unregister_status_callback(self, callback):
+        self.callbacks.remove(callback)
+
+    def send(self, **status):
+        for callback in list(self.callbacks):
+            callback(status)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with patch("api.meter.virtual.time.monotonic", clock):
+        yield clock
+
+
+@pytest.fixture
+def bridge():
+    return FakeBridge()
+
+
+def _charging(max_a=16, cable=32):
+    return {"STATE": 5, "MAX": max_a, "CABLE": cable}
+
+
+def test_status_current_uses_offered_current_while_charging():
+    assert status_current(_charging(max_a=16, cable=32)) == 16.0
+    assert status_current(_charging(max_a=32, cable=20)) == 20.0
+    assert status_current({"STATE": 5, "MAX": 16, "CABLE": 0}) == 16.0
+    assert status_current({"STATE": 5, "CURRENT": 9.5, "MAX": 16}) == 9.5
+    assert status_current({"STATE": 3, "MAX": 16, "CABLE": 32}) == 0.0
+
+
+def test_energy_integrates_stat_stream(clock, bridge):
+    meter = VirtualMeter(lambda: bridge, voltage_v=230.0, phases=1)
+    assert meter.connect() is True
+    assert meter.read_energy() is None
+    assert meter.read_all().is_valid is False
+
+    bridge.send(**_charging())
+    clock.now += 5
+    bridge.send(**_charging())
+    clock.now += 5
+    bridge.send(STATE=6, MAX=16, CABLE=32)  # Şarj durdu
+    clock.now += 5
+
+    # 10 s × 16 A × 230 V = 36800 Ws; son 5 s güç 0
+    assert meter.read_energy() == pytest.approx(36800 / 3_600_000)
+    assert meter.read_power() == 0.0
+
+    meter.disconnect()
+    assert bridge.callbacks == []
+    assert meter.is_connected() is False
+
+
+def test_reads_between_stats_are_monotonic(clock, bridge):
+    meter = VirtualMeter(lambda: bridge, voltage_v=230.0, phases=3)
+    meter.connect()
+    bridge.send(**_charging())
+
+    readings = []
+    for _ in range(4):
+        clock.now += 2
+        readings.append(meter.read_energy())
+        bridge.send(**_charging())
+        readings.append(meter.read_energy())
+
+    assert readings == sorted(readings)
+    assert readings[-1] == pytest.approx(8 * 16 * 230 * 3 / 3_600_000)
+
+    reading = meter.read_all()
+    assert reading.is_valid
+    assert reading.power_kw == pytest.approx(16 * 230 * 3 / 1000)
+    assert reading.currents_a == (16.0, 16.0, 16.0)
+
+
+def test_stat_gap_is_capped(clock, bridge):
+    meter = VirtualMeter(lambda: bridge, voltage_v=230.0, max_gap=15.0)
+    meter.connect()
+    bridge.send(**_charging())
+    clock.now += 600  # STAT akışı kesildi
+
+    capped = 15 * 16 * 230 / 3_600_000
+    assert meter.read_energy() == pytest.approx(capped)
+    bridge.send(**_charging())
+    assert meter.read_energy() == pytest.approx(capped)
+
+
+def test_connect_fails_without_bridge():
+    def unavailable():
+        raise RuntimeError("ESP32 bulunamadı")
+
+    meter = VirtualMeter(unavailable)
+
+    assert meter.connect() is False
+    assert meter.is_connected() is False
+
+
+def test_connect_does_not_create_bridge():
+    """Bridge oluşturulmamışsa seri port açılmadan False dönmeli"""
+    from esp32 import bridge as bridge_module
+
+    meter = VirtualMeter()
+    with patch.object(bridge_module, "_esp32_bridge_instance", None), patch.object(
+        bridge_module, "get_esp32_bridge"
+    ) as get_bridge:
+        assert meter.connect() is False
+    get_bridge.assert_not_called()
+
+    fake = FakeBridge()
+    with patch.object(bridge_module, "_esp32_bridge_instance", fake):
+        assert meter.connect() is True
+    assert fake.callbacks == [meter.on_status]
+
+
+def test_get_meter_uses_virtual_meter_url():
+    from api.meter import interface
+
+    database = Mock()
+    database.get_max_meter_energy.return_value = None
+    with patch.object(interface, "_meter_instance", None), patch(
+        "api.config.config.METER_URL", "virtual://?voltage=220&phases=3"
+    ), patch("api.database.get_database", return_value=database):
+        meter = interface.get_meter()
+
+    assert isinstance(meter, VirtualMeter)
+    assert (meter.voltage_v, meter.phases) == (220.0, 3)
+    with pytest.raises(ValueError):
+        create_virtual_meter("virtual://?phases=2")
+
+
+def test_counter_continues_after_restart(clock, bridge, tmp_path):
+    """Yeniden başlatmadan sonra sayaç kaydedilmiş en yüksek değerden sürmeli"""
+    database = Database(str(tmp_path / "sessions.db"))
+    start = datetime(2025, 12, 12, 10, 0, 0)
+    database.create_session("s1", start, 5, [], {})
+    url = "virtual://?voltage=250&max_gap=3600"  # 4 A × 250 V = 1 kW
+
+    def charge(meter, hours, offset):
+        meter.source_getter = lambda: bridge
+        meter.connect()
+        for hour in range(hours + 1):
+            if hour:
+                clock.now += 3600
+            bridge.send(**_charging(max_a=4))
+            database.add_meter_reading(
+                "s1",
+                start.timestamp() + offset + hour * 3600,
+                meter.read_energy(),
+                meter.read_power(),
+            )
+        meter.disconnect()
+
+    with patch("api.database.get_database", return_value=database):
+        charge(create_virtual_meter(url), 3, 0)
+        # Daemon yeniden başladı: yeni süreç, yeni sanal meter
+        restarted = create_virtual_meter(url)
+        charge(restarted, 2, 3 * 3600 + 100)
+
+    energy = reconcile_meter_energy(
+        database.get_meter_readings("s1"),
+        start,
+        start + timedelta(seconds=5 * 3600 + 100),
+    )
+    # Sayaç geri gitmedi: tek segment, sıfırlanma yok
+    assert energy["total_energy_kwh"] == pytest.approx(5.0)
+    assert energy["energy_source"] == "meter"
+    assert database.get_max_meter_energy() == pytest.approx(5.0)